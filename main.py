@@ -175,8 +175,8 @@ class SupportUtilityApp:
         for module in self.module_manager.get_modules().values():
             if hasattr(module, '_stop_auto_refresh'):
                 module._stop_auto_refresh()
-            if hasattr(module, 'is_collecting'):
-                module.is_collecting = False
+            if hasattr(module, '_cancel_background_jobs'):
+                module._cancel_background_jobs()
         
         # Limpa o frame de conteúdo
         for widget in self.content_frame.winfo_children():
@@ -5,13 +5,14 @@ Ferramenta para corrigir problemas de autenticação em contas locais do Windows
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import subprocess
 import sys
 import os
 import ctypes
 import winreg
 import threading
 
+from utils.powershell_host import run_powershell
+
 
 class LocalAccountTokenFixModule:
     """Módulo para corrigir LocalAccountTokenFilterPolicy"""
@@ -381,12 +382,7 @@ $notify.ShowBalloonTip(5000, "{title}", "{message}", [System.Windows.Forms.ToolT
 Start-Sleep -Seconds 6
 $notify.Dispose()
 '''
-            subprocess.run(
-                ["powershell", "-Command", ps_command],
-                capture_output=True,
-                timeout=10,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
+            run_powershell(ps_command, timeout=10)
         except Exception:
             # Se falhar, apenas ignora (a messagebox já foi mostrada)
             pass
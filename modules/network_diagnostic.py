@@ -6,29 +6,169 @@ Similar ao LDWin
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import subprocess
+import bisect
 import socket
 import platform
+import ipaddress
 import re
 import threading
 import time
 
+from utils.background_executor import (
+    PRIORITY_AUTO, PRIORITY_BACKGROUND, PRIORITY_MANUAL, BackgroundExecutor
+)
+from utils.bridge_mib import SwitchPortLocator
+from utils.collection_cache import CollectionCache, cached_probe
+from utils.command_parsers import (
+    default_gateway_from_routes, parse_ipconfig, parse_netsh_interfaces, parse_netsh_lldp, parse_route_print
+)
+from utils.command_runner import run_command
+from utils.dns_benchmark import DnsBenchmark, build_query_set, format_report
+from utils.dns_resolver import get_resolver
+from utils.lan_inventory import LanInventory
+from utils.latency_monitor import TARGET_DNS, TARGET_GATEWAY, TARGET_MANUAL, LatencyMonitor
+from utils.link_fingerprint import LinkChangeDetector, collect_link_fingerprint
+from utils.lldp import LldpListener, merge_switch_info
+from utils.native_interfaces import get_adapters
+from utils.neighbor_table import NeighborTable
+from utils.netbios import get_netbios_client
+from utils.network_snapshot import UNKNOWN, NetworkSnapshot, SwitchInfo, known, text
+from utils.network_watcher import CHANGE_ADDRESS, CHANGE_LINK, CHANGE_ROUTE, NetworkChangeWatcher
+from utils.powershell_host import run_powershell
+from utils.probe_scheduler import Probe, ProbeScheduler, check_cancelled
+from utils.property_grid import PropertyGrid, field, heading, message, separator
+from utils.reachability import get_prober
+from utils.routing_table import RoutingTable
+from utils.snmp import DEFAULT_COMMUNITIES, OID_SYS_DESCR, OID_SYS_NAME, SnmpClient, as_text
+
+
+# Texto exibido nos campos cuja fonte ainda não terminou
+PENDING_TEXT = "Aguardando..."
+
+# Número de sondas da coleta executadas simultaneamente
+COLLECTION_PROBE_WORKERS = 8
+
+# Intervalo (segundos) da atualização automática sem notificações do sistema
+AUTO_REFRESH_INTERVAL = 5
+
+# Intervalo (segundos) da consulta de segurança quando as notificações de mudança
+# de rede do sistema estão ativas
+SAFETY_POLL_INTERVAL = 60
+
+# Silêncio (segundos) aguardado após uma rajada de notificações antes de recoletar
+NETWORK_CHANGE_DEBOUNCE = 1.5
+
+# Tempo máximo (segundos) que a atualização automática reaproveita as informações
+# do switch enquanto a impressão digital dos enlaces não muda
+SWITCH_INFO_TTL = 300
+
+# Chaves das tarefas no executor em segundo plano
+COLLECTION_JOB = 'network_collection'
+CONNECTIVITY_JOB = 'connectivity_test'
+ROUTE_EXPLAIN_JOB = 'route_explain'
+DNS_BENCHMARK_JOB = 'dns_benchmark'
+
+# Echos enviados ao gateway para medir latência, perda e jitter
+CONNECTIVITY_PROBE_COUNT = 3
+
+# Communities SNMP testadas no switch/gateway (todas ao mesmo tempo) e espera por tentativa
+SNMP_COMMUNITIES = DEFAULT_COMMUNITIES
+SNMP_TIMEOUT = 1.0
+
+# Colunas da tabela do inventário da rede local: (chave, título, largura)
+INVENTORY_COLUMNS = (
+    ('address', 'Endereço IP', 110),
+    ('mac', 'MAC', 130),
+    ('vendor', 'Fabricante', 150),
+    ('hostname', 'Nome (DNS)', 200),
+    ('netbios', 'NetBIOS', 160),
+    ('methods', 'Detecção', 90),
+    ('rtt', 'Latência', 80),
+)
+
+# Frequências (sondas por segundo) oferecidas no monitor de conectividade
+MONITOR_RATES = (1, 2, 5, 10)
+
+# Intervalo (ms) de atualização da tabela do monitor e janela (segundos) das estatísticas
+MONITOR_REFRESH_MS = 1000
+MONITOR_WINDOW = 60
+
+# Colunas da tabela do monitor: (chave, título, largura)
+MONITOR_COLUMNS = (
+    ('address', 'Alvo', 120),
+    ('kind', 'Tipo', 70),
+    ('last', 'Última', 70),
+    ('p50', 'p50', 70),
+    ('p95', 'p95', 70),
+    ('jitter', 'Jitter', 70),
+    ('loss', 'Perda (1 min)', 90),
+    ('outages', 'Quedas', 60),
+    ('history', 'Histórico', 260),
+)
+
+# Fontes acompanhadas durante a coleta (exibidas como "pendentes" na interface)
+COLLECTION_SOURCES = ('adapters', 'gateway', 'dns', 'wmi', 'switch')
+
+# Evento emitido quando cada sonda termina (sondas não listadas emitem 'switch')
+COLLECTION_EVENTS = {
+    'ipconfig': 'adapters',
+    'netsh': 'interfaces',
+    'wmi': 'wmi',
+    'gateway': 'gateway',
+    'dns': 'dns',
+    'lldp': 'lldp',
+}
+
 
 class NetworkDiagnosticModule:
     """Módulo para diagnóstico de rede"""
     
     def __init__(self):
         self.network_info = {}
+        self.snapshot = None
+        self.last_snapshot_changes = {}
         self.root_window = None
         self.auto_refresh = False
         self.refresh_thread = None
-        self.collect_thread = None
-        self.is_collecting = False
-        self.loading_label = None
+        self.executor = BackgroundExecutor(max_queue=4, name="coleta de rede")
+        self.left_grid = None
+        self.right_grid = None
+        self.switch_grid = None
+        self.connectivity_result = None
         self.refresh_button = None
         self.loading_indicator = None
         self.loading_animation_id = None
-        self.is_manual_refresh = False
+        self.collection_cache = None
+        self.last_cache_stats = None
+        self.last_probe_stats = None
+        self.partial_network_info = None
+        self.partial_render_scheduled = False
+        self.switch_change_detector = LinkChangeDetector(ttl=SWITCH_INFO_TTL)
+        self.network_watcher = None
+        self.routing_table = RoutingTable()
+        self.neighbor_table = NeighborTable()
+        self.resolver = get_resolver()
+        self.netbios_client = get_netbios_client()
+        self.snmp_client = SnmpClient(timeout=SNMP_TIMEOUT, retries=1)
+        self.snmp_communities = list(SNMP_COMMUNITIES)
+        self.switch_port_locator = SwitchPortLocator(self.snmp_client)
+        self.lldp_listener = LldpListener(on_change=self._on_lldp_neighbor)
+        self.route_destination_var = None
+        self.inventory = None
+        self.inventory_running = False
+        self.inventory_generation = 0
+        self.inventory_keys = []
+        self.inventory_tree = None
+        self.inventory_status = None
+        self.inventory_button = None
+        self.monitor = None
+        self.monitor_manual_targets = []
+        self.monitor_tree = None
+        self.monitor_status = None
+        self.monitor_button = None
+        self.monitor_rate_var = None
+        self.monitor_targets_var = None
+        self.monitor_refresh_id = None
     
     def get_display_name(self):
         """Retorna o nome de exibição do módulo"""
@@ -82,12 +222,35 @@ class NetworkDiagnosticModule:
         self.auto_refresh_var = tk.BooleanVar(value=False)
         auto_refresh_check = ttk.Checkbutton(
             controls_frame,
-            text="Atualização Automática (5s)",
+            text="Atualização Automática",
             variable=self.auto_refresh_var,
             command=self._toggle_auto_refresh
         )
         auto_refresh_check.grid(row=0, column=1, padx=(10, 0))
         
+        # Consulta de rota: por qual interface e próximo salto o destino é alcançado
+        route_frame = ttk.Frame(controls_frame)
+        route_frame.grid(row=1, column=0, columnspan=3, sticky=tk.W, pady=(10, 0))
+        ttk.Label(route_frame, text="Destino:", font=("Segoe UI", 9)).grid(row=0, column=0, padx=(0, 5))
+        self.route_destination_var = tk.StringVar()
+        route_entry = ttk.Entry(route_frame, textvariable=self.route_destination_var, width=30)
+        route_entry.grid(row=0, column=1, padx=(0, 10))
+        route_entry.bind('<Return>', lambda event: self._explain_route())
+        ttk.Button(
+            route_frame,
+            text="Explicar Rota",
+            command=self._explain_route,
+            width=15
+        ).grid(row=0, column=2)
+        
+        # Teste de resposta dos servidores DNS configurados
+        ttk.Button(
+            route_frame,
+            text="Testar Servidores DNS",
+            command=self._benchmark_dns,
+            width=22
+        ).grid(row=0, column=3, padx=(10, 0))
+        
         # Frame principal de informações
         main_info_frame = ttk.Frame(frame)
         main_info_frame.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -110,15 +273,27 @@ class NetworkDiagnosticModule:
         switch_frame = ttk.LabelFrame(main_info_frame, text="Informações do Switch", padding="15")
         switch_frame.grid(row=0, column=2, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(5, 0))
         
+        # Inventário da rede local (varredura do segmento do adaptador ativo)
+        inventory_frame = ttk.LabelFrame(frame, text="Inventário da Rede Local", padding="15")
+        inventory_frame.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(15, 0))
+        self._create_inventory_ui(inventory_frame)
+        
+        # Monitor contínuo de latência, jitter e perda
+        monitor_frame = ttk.LabelFrame(frame, text="Monitor de Conectividade", padding="15")
+        monitor_frame.grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(15, 0))
+        self._create_monitor_ui(monitor_frame)
+        
         # Configura grid weights
         frame.columnconfigure(0, weight=1)
         frame.rowconfigure(3, weight=1)
+        frame.rowconfigure(4, weight=1)
+        frame.rowconfigure(5, weight=1)
         main_info_frame.rowconfigure(0, weight=1)
         
-        # Armazena referências aos frames para atualização
-        self.left_frame = left_frame
-        self.right_frame = right_frame
-        self.switch_frame = switch_frame
+        # Grades reaproveitadas a cada atualização (só os valores alterados são redesenhados)
+        self.left_grid = PropertyGrid(left_frame)
+        self.right_grid = PropertyGrid(right_frame)
+        self.switch_grid = PropertyGrid(switch_frame)
         
         # Mostra indicador de carregamento
         self._show_loading()
@@ -130,53 +305,25 @@ class NetworkDiagnosticModule:
     
     def _show_loading(self):
         """Mostra indicador de carregamento"""
-        # Verifica se os frames ainda existem
-        if not hasattr(self, 'left_frame') or not self.left_frame or not self.left_frame.winfo_exists():
-            return
-        if not hasattr(self, 'right_frame') or not self.right_frame or not self.right_frame.winfo_exists():
-            return
-        if not hasattr(self, 'switch_frame') or not self.switch_frame or not self.switch_frame.winfo_exists():
+        if not self._grids_exist():
             return
         
-        # Limpa frames
         try:
-            for widget in self.left_frame.winfo_children():
-                try:
-                    widget.destroy()
-                except (tk.TclError, AttributeError):
-                    pass
-        except (tk.TclError, AttributeError):
-            pass
-        
-        try:
-            for widget in self.right_frame.winfo_children():
-                try:
-                    widget.destroy()
-                except (tk.TclError, AttributeError):
-                    pass
-        except (tk.TclError, AttributeError):
-            pass
-        
-        try:
-            for widget in self.switch_frame.winfo_children():
-                try:
-                    widget.destroy()
-                except (tk.TclError, AttributeError):
-                    pass
+            self.left_grid.update([
+                message('loading', "Carregando informações de rede...",
+                        foreground="blue", font=("Segoe UI", 10), pady=50)
+            ])
+            self.right_grid.clear()
+            self.switch_grid.clear()
         except (tk.TclError, AttributeError):
             pass
-        
-        # Mostra mensagem de carregamento
-        try:
-            self.loading_label = ttk.Label(
-                self.left_frame,
-                text="Carregando informações de rede...",
-                font=("Segoe UI", 10),
-                foreground="blue"
-            )
-            self.loading_label.grid(row=0, column=0, pady=50)
-        except (tk.TclError, AttributeError):
-            self.loading_label = None
+    
+    def _grids_exist(self):
+        """Verifica se os painéis ainda existem (podem ter sido destruídos se o módulo foi trocado)"""
+        for grid in (self.left_grid, self.right_grid, self.switch_grid):
+            if not grid or not grid.parent or not grid.parent.winfo_exists():
+                return False
+        return True
     
     def _show_refresh_loading(self):
         """Mostra indicador de carregamento quando o botão de atualizar é clicado"""
@@ -240,13 +387,36 @@ class NetworkDiagnosticModule:
             self._stop_auto_refresh()
     
     def _start_auto_refresh(self):
-        """Inicia thread de atualização automática"""
+        """
+        Inicia a atualização automática
+        
+        Com notificações de mudança de rede do sistema disponíveis, a recoleta é
+        disparada por elas e a consulta periódica vira apenas uma rede de segurança.
+        """
+        if not self.network_watcher:
+            self.network_watcher = NetworkChangeWatcher(
+                self._on_network_change,
+                debounce=NETWORK_CHANGE_DEBOUNCE
+            )
+        watching = self.network_watcher.start()
+        # Escuta passiva dos anúncios LLDP do switch (requer privilégio ou Npcap)
+        self.lldp_listener.start()
+        interval = SAFETY_POLL_INTERVAL if watching else AUTO_REFRESH_INTERVAL
+        print(f"Atualização automática: notificações {'ativas' if watching else 'indisponíveis'}, "
+              f"consulta a cada {interval}s")  # Debug
+        
         if self.refresh_thread and self.refresh_thread.is_alive():
             return
         
         def refresh_loop():
+            elapsed = 0
             while self.auto_refresh:
-                time.sleep(5)
+                time.sleep(1)
+                elapsed += 1
+                watching = self.network_watcher and self.network_watcher.running
+                if elapsed < (SAFETY_POLL_INTERVAL if watching else AUTO_REFRESH_INTERVAL):
+                    continue
+                elapsed = 0
                 if self.auto_refresh:
                     self.root_window.after(0, self._refresh_network_info_silent)
         
@@ -255,374 +425,735 @@ class NetworkDiagnosticModule:
     
     def _refresh_network_info_silent(self):
         """Atualiza as informações de rede sem mostrar indicador do botão (para auto-refresh)"""
-        if self.is_collecting:
-            return
-        
-        self.is_collecting = True
-        self.is_manual_refresh = False  # Marca como atualização automática
-        
-        def collect_in_thread():
-            try:
-                # Coleta informações
-                network_info = self._collect_network_info()
-                
-                # Debug: verifica se coletou algo
-                adapters = network_info.get('adapters', [])
-                if not adapters:
-                    # Tenta método alternativo
-                    alt_info = self._collect_network_info_alternative()
-                    if alt_info.get('adapters'):
-                        network_info = alt_info
-                    else:
-                        # Se ainda não tem adaptadores, pelo menos mostra informações básicas
-                        if not network_info.get('hostname'):
-                            network_info['hostname'] = socket.gethostname()
-                        if not network_info.get('fqdn'):
-                            network_info['fqdn'] = socket.getfqdn()
-                
-                # Atualiza na thread principal
-                if self.root_window:
-                    self.network_info = network_info
-                    self.root_window.after(0, self._update_ui)
-                    
-            except Exception as e:
-                import traceback
-                error_msg = f"Erro ao coletar informações de rede: {str(e)}\n\n{traceback.format_exc()}"
-                if self.root_window:
-                    self.root_window.after(0, lambda: messagebox.showerror("Erro", error_msg))
-            finally:
-                self.is_collecting = False
-                self.is_manual_refresh = False
-        
-        thread = threading.Thread(target=collect_in_thread, daemon=True)
-        thread.start()
+        # Sondas do switch só rodam se o enlace mudou ou o TTL expirou
+        self._request_collection(allow_switch_reuse=True)
     
     def _stop_auto_refresh(self):
         """Para atualização automática"""
         self.auto_refresh = False
+        if self.network_watcher:
+            self.network_watcher.stop()
+        # Os vizinhos já capturados continuam em cache até o TTL anunciado expirar
+        self.lldp_listener.stop()
     
-    def _refresh_network_info_async(self):
-        """Inicia coleta de informações de rede em thread separada"""
-        if self.is_collecting:
+    def _cancel_background_jobs(self):
+        """Descarta coletas e testes ainda na fila (ex.: ao trocar de módulo)"""
+        if self.inventory:
+            self.inventory.cancel()
+        if self.monitor:
+            self.monitor.stop()
+        removed = self.executor.cancel_pending()
+        if removed:
+            print(f"{removed} tarefa(s) em segundo plano descartada(s)")  # Debug
+    
+    def _on_network_change(self, kinds):
+        """Recebe uma rajada de mudanças de rede (thread do observador) e agenda a recoleta"""
+        print(f"Mudança de rede detectada: {sorted(kinds)}")  # Debug
+        if not self.auto_refresh or not self.root_window:
+            return
+        if CHANGE_LINK in kinds or CHANGE_ADDRESS in kinds:
+            # Interface ou endereço mudou: o switch do outro lado pode ser outro,
+            # e os servidores DNS e nomes resolvidos também
+            self.switch_change_detector.invalidate()
+            self.resolver.invalidate()
+            self.netbios_client.invalidate()
+        if CHANGE_ROUTE in kinds:
+            # Aplica ao índice de rotas apenas as rotas que mudaram
+            self._refresh_routing_table()
+        # A coleta em andamento pode ter começado antes da mudança
+        self._request_collection(allow_switch_reuse=True, fresh=True)
+    
+    def _on_lldp_neighbor(self, neighbor):
+        """Recebe um vizinho LLDP novo ou alterado (thread de captura) e agenda a recoleta"""
+        print(f"Vizinho LLDP: {neighbor.get('system_name') or neighbor.get('chassis_id')} "
+              f"porta {neighbor.get('port_id')}")  # Debug
+        if not self.auto_refresh or not self.root_window:
             return
+        self.switch_change_detector.invalidate()
+        self._request_collection(allow_switch_reuse=True, fresh=True)
+    
+    def _refresh_network_info_async(self):
+        """Inicia coleta de informações de rede em segundo plano (carga inicial)"""
+        self._request_collection(stream=True)
+    
+    def _refresh_network_info(self):
+        """Atualiza as informações de rede a pedido do usuário"""
+        # Mostra indicador de carregamento e desabilita botão
+        self._show_refresh_loading()
+        job = self._request_collection(manual=True, stream=True)
+        if job is None:
+            self._hide_refresh_loading()
+    
+    def _request_collection(self, manual=False, stream=False, allow_switch_reuse=False, fresh=False):
+        """
+        Pede uma coleta ao executor em segundo plano
+        
+        Pedidos feitos enquanto outra coleta aguarda na fila são agrupados nela; um
+        pedido manual feito durante uma coleta automática equivalente é atendido
+        por ela. Pedidos manuais passam à frente na fila.
+        
+        Args:
+            manual: Pedido do usuário (prioridade e indicador do botão)
+            stream: Exibe cada fonte assim que fica pronta
+            allow_switch_reuse: Permite reaproveitar as informações do switch (ver SWITCH_INFO_TTL)
+            fresh: A coleta precisa começar depois deste pedido (ex.: após uma mudança de rede)
+        
+        Returns:
+            Job que atenderá o pedido, ou None se a fila estiver cheia
+        """
+        return self.executor.submit(
+            COLLECTION_JOB,
+            self._run_collection_job,
+            options={
+                'manual': manual,
+                'stream': stream,
+                'allow_switch_reuse': allow_switch_reuse,
+                'fresh': fresh
+            },
+            priority=PRIORITY_MANUAL if manual else PRIORITY_AUTO,
+            callback=self._on_collection_done,
+            merge=self._merge_collection_options,
+            running_covers=self._collection_covers
+        )
+    
+    def _merge_collection_options(self, current, new):
+        """Combina dois pedidos de coleta agrupados em uma única execução"""
+        return {
+            'manual': current.get('manual') or new.get('manual'),
+            'stream': current.get('stream') or new.get('stream'),
+            'allow_switch_reuse': current.get('allow_switch_reuse') and new.get('allow_switch_reuse'),
+            'fresh': current.get('fresh') or new.get('fresh')
+        }
+    
+    def _collection_covers(self, running, new):
+        """True se a coleta em execução atende o novo pedido"""
+        if new.get('fresh'):
+            return False
+        # Uma coleta completa atende qualquer pedido; uma que reaproveita o switch
+        # só atende pedidos que também aceitam reaproveitar
+        return not running.get('allow_switch_reuse') or new.get('allow_switch_reuse')
+    
+    def _run_collection_job(self, options):
+        """Executa uma coleta (thread do executor)"""
+        on_event = self._on_collection_event if options.get('stream') else None
+        network_info = self._collect_network_info(
+            on_event=on_event,
+            allow_switch_reuse=options.get('allow_switch_reuse', False)
+        )
         
-        self.is_collecting = True
-        self.is_manual_refresh = False  # Marca como atualização automática/inicial
+        # Debug: verifica se coletou algo
+        adapters = network_info.get('adapters', [])
+        if not adapters:
+            # Tenta método alternativo
+            alt_info = self._collect_network_info_alternative()
+            if alt_info.get('adapters'):
+                network_info = alt_info
+            else:
+                # Se ainda não tem adaptadores, pelo menos mostra informações básicas
+                hostname, fqdn = self.resolver.local_names()
+                if not network_info.get('hostname'):
+                    network_info['hostname'] = hostname
+                if not network_info.get('fqdn'):
+                    network_info['fqdn'] = fqdn
+        return network_info
+    
+    def _on_collection_done(self, job):
+        """Entrega o resultado de uma coleta à interface (thread do executor)"""
+        print(f"Executor: coleta atendeu {job.requests} pedido(s), espera "
+              f"{job.wait_time:.2f}s, execução {job.run_time:.2f}s; {self.executor.stats()}")  # Debug
+        if not self.root_window:
+            return
         
-        def collect_in_thread():
-            try:
-                # Coleta informações
-                network_info = self._collect_network_info()
-                
-                # Debug: verifica se coletou algo
-                adapters = network_info.get('adapters', [])
-                if not adapters:
-                    # Tenta método alternativo
-                    alt_info = self._collect_network_info_alternative()
-                    if alt_info.get('adapters'):
-                        network_info = alt_info
-                    else:
-                        # Se ainda não tem adaptadores, pelo menos mostra informações básicas
-                        if not network_info.get('hostname'):
-                            network_info['hostname'] = socket.gethostname()
-                        if not network_info.get('fqdn'):
-                            network_info['fqdn'] = socket.getfqdn()
-                
-                # Atualiza na thread principal
-                if self.root_window:
-                    self.network_info = network_info
-                    self.root_window.after(0, self._update_ui)
-                    # Não esconde o indicador do botão se não foi atualização manual
-                    if not self.is_manual_refresh:
-                        # Apenas limpa o indicador interno se necessário
-                        pass
-                    
-            except Exception as e:
+        try:
+            if job.error is not None:
                 import traceback
-                error_msg = f"Erro ao coletar informações de rede: {str(e)}\n\n{traceback.format_exc()}"
-                if self.root_window:
-                    self.root_window.after(0, lambda: messagebox.showerror("Erro", error_msg))
-            finally:
-                self.is_collecting = False
-                self.is_manual_refresh = False
+                details = ''.join(traceback.format_exception(
+                    type(job.error), job.error, job.error.__traceback__
+                ))
+                error_msg = f"Erro ao coletar informações de rede: {str(job.error)}\n\n{details}"
+                self.root_window.after(0, lambda: messagebox.showerror("Erro", error_msg))
+            else:
+                # Snapshot tipado e diferenças em relação à coleta anterior
+                snapshot = NetworkSnapshot.from_network_info(job.result)
+                self.last_snapshot_changes = snapshot.diff(self.snapshot)
+                if self.snapshot is not None and self.last_snapshot_changes:
+                    print(f"Mudanças na rede: {self.last_snapshot_changes}")  # Debug
+                self.snapshot = snapshot
+                if self.monitor and self.monitor.running:
+                    # O gateway e os servidores DNS monitorados acompanham a rede atual
+                    self.monitor.set_targets(self._monitor_targets())
+                # Atualiza na thread principal
+                self.network_info = job.result
+                self.root_window.after(0, self._update_ui)
+            if job.options.get('manual'):
+                self.root_window.after(0, self._hide_refresh_loading)
+        except (tk.TclError, RuntimeError):
+            pass
+    
+    def _explain_route(self):
+        """Explica a rota até o destino digitado (ação da interface)"""
+        destination = self.route_destination_var.get().strip() if self.route_destination_var else ''
+        if not destination:
+            messagebox.showwarning("Explicar Rota", "Informe um endereço IP ou nome de host de destino.")
+            return
+        self.executor.submit(
+            ROUTE_EXPLAIN_JOB,
+            self._explain_route_job,
+            options={'destination': destination},
+            priority=PRIORITY_MANUAL,
+            callback=self._on_route_explained
+        )
+    
+    def _explain_route_job(self, options):
+        """Resolve o destino e consulta o índice de rotas (thread do executor)"""
+        destination = options['destination']
+        try:
+            address = str(ipaddress.ip_address(destination))
+        except ValueError:
+            address = socket.getaddrinfo(destination, None)[0][4][0]
+        if not self.routing_table.loaded:
+            self._refresh_routing_table()
+        return destination, address, self.routing_table.explain(address)
+    
+    def _on_route_explained(self, job):
+        """Agenda a exibição da explicação da rota"""
+        if not self.root_window:
+            return
+        if job.error is not None:
+            text = f"Não foi possível consultar a rota até {job.options['destination']}:\n{job.error}"
+            self.root_window.after(0, lambda: messagebox.showerror("Explicar Rota", text))
+            return
         
-        self.collect_thread = threading.Thread(target=collect_in_thread, daemon=True)
-        self.collect_thread.start()
+        destination, address, explanation = job.result
+        target = destination if destination == address else f"{destination} ({address})"
+        if explanation is None:
+            text = f"Nenhuma rota alcança {target}."
+        else:
+            next_hop = explanation['next_hop']
+            if next_hop == 'on-link':
+                next_hop = "entrega direta (rede local)"
+            lines = [
+                f"Destino: {target}",
+                f"Rota usada: {explanation['prefix']}",
+                f"Próximo salto: {next_hop}",
+                f"Interface: {explanation['interface'] or 'N/A'}",
+                f"Métrica: {explanation['metric']}",
+            ]
+            if explanation['protocol']:
+                lines.append(f"Origem da rota: {explanation['protocol']}")
+            for route in explanation['alternatives']:
+                lines.append(f"Alternativa: via {route.next_hop or 'rede local'} "
+                             f"({route.interface_name or route.interface_index}, métrica {route.metric})")
+            text = "\n".join(lines)
+        self.root_window.after(0, lambda: messagebox.showinfo("Explicar Rota", text))
     
-    def _refresh_network_info(self):
-        """Atualiza as informações de rede (versão síncrona para auto-refresh)"""
-        if self.is_collecting:
+    def _benchmark_dns(self):
+        """Compara a resposta dos servidores DNS da última coleta (ação da interface)"""
+        snapshot = self.snapshot
+        adapter = snapshot.active_adapter if snapshot else None
+        servers = [str(server) for server in ((adapter.dns_servers if adapter else ()) or
+                                              (snapshot.dns_servers if snapshot else ())) if known(server)]
+        if not servers:
+            messagebox.showwarning("Servidores DNS", "Nenhum servidor DNS conhecido. Atualize as informações de rede.")
+            return
+        # Consultas do próprio domínio: nome da máquina, SRV do AD e DNS reverso do IP e do gateway
+        addresses = [str(address) for address in (
+            adapter.ipv4_address if adapter else None,
+            (adapter.default_gateway if adapter else None) or snapshot.default_gateway
+        ) if known(address)]
+        fqdn = text(snapshot.fqdn, '') or text(snapshot.hostname, '')
+        queries = build_query_set(fqdn, addresses)
+        if not queries:
+            messagebox.showwarning("Servidores DNS", "Nome e endereço da máquina desconhecidos. Atualize as informações de rede.")
+            return
+        self.executor.submit(
+            DNS_BENCHMARK_JOB,
+            self._benchmark_dns_job,
+            options={'servers': servers, 'queries': queries},
+            priority=PRIORITY_MANUAL,
+            callback=self._on_dns_benchmarked
+        )
+    
+    def _benchmark_dns_job(self, options):
+        """Envia as consultas a todos os servidores ao mesmo tempo (thread do executor)"""
+        benchmark = DnsBenchmark(options['servers'], options['queries'])
+        reports = benchmark.run()
+        return format_report(reports, benchmark.elapsed)
+    
+    def _on_dns_benchmarked(self, job):
+        """Agenda a exibição do resultado do teste dos servidores DNS"""
+        if not self.root_window:
+            return
+        if job.error is not None:
+            result = f"Não foi possível testar os servidores DNS:\n{job.error}"
+            self.root_window.after(0, lambda: messagebox.showerror("Servidores DNS", result))
+            return
+        result = f"{len(job.options['queries'])} consultas por rodada\n\n{job.result}"
+        self.root_window.after(0, lambda: messagebox.showinfo("Servidores DNS", result))
+    
+    def _create_inventory_ui(self, parent):
+        """Cria os controles e a tabela do inventário da rede local"""
+        parent.columnconfigure(1, weight=1)
+        parent.rowconfigure(1, weight=1)
+        self.inventory_button = ttk.Button(
+            parent,
+            text="Varrer Rede Local",
+            command=self._toggle_inventory,
+            width=25
+        )
+        self.inventory_button.grid(row=0, column=0, sticky=tk.W, padx=(0, 10), pady=(0, 10))
+        self.inventory_status = ttk.Label(
+            parent,
+            text="Descobre os demais hosts do segmento do adaptador ativo",
+            font=("Segoe UI", 9)
+        )
+        self.inventory_status.grid(row=0, column=1, sticky=tk.W, pady=(0, 10))
+        
+        columns = [key for key, _, _ in INVENTORY_COLUMNS]
+        self.inventory_tree = ttk.Treeview(parent, columns=columns, show='headings', height=8)
+        for key, title, width in INVENTORY_COLUMNS:
+            self.inventory_tree.heading(key, text=title)
+            self.inventory_tree.column(key, width=width, anchor=tk.W)
+        scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.inventory_tree.yview)
+        self.inventory_tree.configure(yscrollcommand=scrollbar.set)
+        self.inventory_tree.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar.grid(row=1, column=2, sticky=(tk.N, tk.S))
+    
+    def _toggle_inventory(self):
+        """Inicia a varredura da rede local ou interrompe a que está em andamento (ação da interface)"""
+        if self.inventory_running:
+            self.inventory.cancel()
+            self._set_inventory_running(False, "Varredura interrompida; " + self._inventory_count_text())
             return
         
-        self.is_collecting = True
-        self.is_manual_refresh = True  # Marca como atualização manual
+        # O prefixo vem do adaptador ativo da última coleta
+        adapter = self.snapshot.active_adapter if self.snapshot else None
+        interface = adapter.ipv4_interface if adapter else None
+        if interface is None:
+            messagebox.showwarning(
+                "Inventário da Rede",
+                "Nenhum adaptador ativo com endereço IPv4 e máscara. Atualize as informações de rede."
+            )
+            return
+        if self.inventory is None:
+            self.inventory = LanInventory(
+                neighbor_table=self.neighbor_table, resolver=self.resolver, netbios_client=self.netbios_client
+            )
         
-        # Mostra indicador de carregamento e desabilita botão
-        self._show_refresh_loading()
+        self.inventory_tree.delete(*self.inventory_tree.get_children())
+        self.inventory_keys = []
+        self._set_inventory_running(True, f"Varrendo {interface.network} ({adapter.name})...")
+        # Entregas atrasadas de uma varredura interrompida não entram na tabela da nova
+        self.inventory_generation += 1
+        generation = self.inventory_generation
+        self.inventory.start(
+            interface,
+            on_host=lambda host: self._on_inventory_host(host, generation),
+            on_done=lambda sweep: self._on_inventory_done(sweep, generation)
+        )
+    
+    def _set_inventory_running(self, running, status):
+        self.inventory_running = running
+        self.inventory_button.config(text="Parar Varredura" if running else "Varrer Rede Local")
+        self.inventory_status.config(text=status)
+    
+    def _inventory_count_text(self):
+        return f"{len(self.inventory_keys)} host(s) encontrado(s)"
+    
+    def _on_inventory_host(self, host, generation):
+        """Recebe um host encontrado ou enriquecido (thread do loop de rede)"""
+        if not self.root_window:
+            return
+        values = (
+            host.address,
+            host.mac,
+            host.vendor,
+            host.hostname,
+            ' / '.join(name for name in (host.netbios_name, host.workgroup) if name),
+            '/'.join(sorted(host.methods)).upper(),
+            f"{host.rtt_ms:.1f} ms" if host.rtt_ms is not None else '',
+        )
+        try:
+            self.root_window.after(0, lambda: self._show_inventory_host(generation, host.address, host.sort_key, values))
+        except (tk.TclError, RuntimeError):
+            pass
+    
+    def _show_inventory_host(self, generation, address, sort_key, values):
+        """Insere (em ordem de IP) ou atualiza a linha do host na tabela (thread principal)"""
+        if generation != self.inventory_generation or not self.inventory_running:
+            return
+        if not self.inventory_tree or not self.inventory_tree.winfo_exists():
+            return
+        if self.inventory_tree.exists(address):
+            self.inventory_tree.item(address, values=values)
+            return
+        index = bisect.bisect(self.inventory_keys, sort_key)
+        self.inventory_keys.insert(index, sort_key)
+        self.inventory_tree.insert('', index, iid=address, values=values)
+        self.inventory_status.config(text=f"Varrendo... {self._inventory_count_text()}")
+    
+    def _on_inventory_done(self, sweep, generation):
+        """Agenda a exibição do resumo da varredura"""
+        print(f"Inventário: {sweep.summary()}")  # Debug
+        if not self.root_window:
+            return
+        try:
+            self.root_window.after(0, lambda: self._finish_inventory(sweep, generation))
+        except (tk.TclError, RuntimeError):
+            pass
+    
+    def _finish_inventory(self, sweep, generation):
+        if generation != self.inventory_generation or not self.inventory_running:
+            return
+        if self.inventory_status and self.inventory_status.winfo_exists():
+            self._set_inventory_running(False, sweep.summary())
+    
+    def _create_monitor_ui(self, parent):
+        """Cria os controles e a tabela do monitor de conectividade"""
+        parent.columnconfigure(0, weight=1)
+        parent.rowconfigure(1, weight=1)
+        controls = ttk.Frame(parent)
+        controls.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
+        self.monitor_button = ttk.Button(
+            controls,
+            text="Iniciar Monitor",
+            command=self._toggle_monitor,
+            width=20
+        )
+        self.monitor_button.grid(row=0, column=0, padx=(0, 10))
+        ttk.Label(controls, text="Frequência:", font=("Segoe UI", 9)).grid(row=0, column=1, padx=(0, 5))
+        self.monitor_rate_var = tk.StringVar(value=f"{MONITOR_RATES[0]} Hz")
+        rate_combo = ttk.Combobox(
+            controls,
+            textvariable=self.monitor_rate_var,
+            values=[f"{rate} Hz" for rate in MONITOR_RATES],
+            state='readonly',
+            width=7
+        )
+        rate_combo.grid(row=0, column=2, padx=(0, 10))
+        rate_combo.bind('<<ComboboxSelected>>', lambda event: self._on_monitor_rate_changed())
+        ttk.Label(controls, text="Alvos adicionais:", font=("Segoe UI", 9)).grid(row=0, column=3, padx=(0, 5))
+        self.monitor_targets_var = tk.StringVar()
+        ttk.Entry(controls, textvariable=self.monitor_targets_var, width=30).grid(row=0, column=4, padx=(0, 10))
+        self.monitor_status = ttk.Label(
+            controls,
+            text="Gateway e servidores DNS são incluídos automaticamente",
+            font=("Segoe UI", 9)
+        )
+        self.monitor_status.grid(row=0, column=5, sticky=tk.W)
+        
+        columns = [key for key, _, _ in MONITOR_COLUMNS]
+        self.monitor_tree = ttk.Treeview(parent, columns=columns, show='headings', height=5)
+        for key, title, width in MONITOR_COLUMNS:
+            self.monitor_tree.heading(key, text=title)
+            self.monitor_tree.column(key, width=width, anchor=tk.W)
+        self.monitor_tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+    
+    def _monitor_rate(self):
+        try:
+            return float(self.monitor_rate_var.get().split()[0])
+        except (ValueError, IndexError, AttributeError):
+            return MONITOR_RATES[0]
+    
+    def _monitor_targets(self):
+        """Gateway e servidores DNS da última coleta, seguidos dos alvos digitados"""
+        targets = []
+        snapshot = self.snapshot
+        if snapshot is not None:
+            adapter = snapshot.active_adapter
+            gateway = (adapter.default_gateway if adapter else None) or snapshot.default_gateway
+            if gateway:
+                targets.append((str(gateway), TARGET_GATEWAY))
+            dns_servers = (adapter.dns_servers if adapter else ()) or snapshot.dns_servers
+            targets.extend((str(server), TARGET_DNS) for server in dns_servers if known(server))
+        targets.extend((target, TARGET_MANUAL) for target in self.monitor_manual_targets)
+        return targets
+    
+    def _toggle_monitor(self):
+        """Inicia ou para o monitor de conectividade (ação da interface)"""
+        if self.monitor and self.monitor.running:
+            self.monitor.stop()
+            self.monitor_button.config(text="Iniciar Monitor")
+            self.monitor_status.config(text="Monitor parado (o histórico continua na tabela)")
+            return
         
-        def collect_in_thread():
-            try:
-                # Coleta informações
-                network_info = self._collect_network_info()
-                
-                # Debug: verifica se coletou algo
-                adapters = network_info.get('adapters', [])
-                if not adapters:
-                    # Tenta método alternativo
-                    alt_info = self._collect_network_info_alternative()
-                    if alt_info.get('adapters'):
-                        network_info = alt_info
-                    else:
-                        # Se ainda não tem adaptadores, pelo menos mostra informações básicas
-                        if not network_info.get('hostname'):
-                            network_info['hostname'] = socket.gethostname()
-                        if not network_info.get('fqdn'):
-                            network_info['fqdn'] = socket.getfqdn()
-                
-                # Atualiza na thread principal
-                if self.root_window:
-                    self.network_info = network_info
-                    self.root_window.after(0, self._update_ui)
-                    self.root_window.after(0, self._hide_refresh_loading)
-                    
-            except Exception as e:
-                import traceback
-                error_msg = f"Erro ao coletar informações de rede: {str(e)}\n\n{traceback.format_exc()}"
-                if self.root_window:
-                    self.root_window.after(0, lambda: messagebox.showerror("Erro", error_msg))
-                    self.root_window.after(0, self._hide_refresh_loading)
-            finally:
-                self.is_collecting = False
-                self.is_manual_refresh = False
-        
-        thread = threading.Thread(target=collect_in_thread, daemon=True)
-        thread.start()
-    
-    def _collect_network_info(self):
-        """Coleta todas as informações de rede"""
+        self.monitor_manual_targets = [
+            target for target in re.split(r'[\s,;]+', self.monitor_targets_var.get().strip()) if target
+        ]
+        targets = self._monitor_targets()
+        if not targets:
+            messagebox.showwarning(
+                "Monitor de Conectividade",
+                "Nenhum gateway ou servidor DNS conhecido. Atualize as informações de rede "
+                "ou informe alvos adicionais."
+            )
+            return
+        if self.monitor is None:
+            self.monitor = LatencyMonitor(rate_hz=self._monitor_rate())
+        self.monitor.set_rate(self._monitor_rate())
+        self.monitor.set_targets(targets)
+        self.monitor.start()
+        self.monitor_button.config(text="Parar Monitor")
+        if self.monitor_refresh_id:
+            self.root_window.after_cancel(self.monitor_refresh_id)
+        self._refresh_monitor_view()
+    
+    def _on_monitor_rate_changed(self):
+        if self.monitor:
+            self.monitor.set_rate(self._monitor_rate())
+    
+    def _refresh_monitor_view(self):
+        """Redesenha a tabela do monitor e agenda a próxima atualização enquanto ele roda (thread principal)"""
+        if not self.monitor_tree or not self.monitor_tree.winfo_exists() or not self.monitor:
+            return
+        
+        def ms(value):
+            return f"{value:.1f} ms" if value is not None else '-'
+        
+        rows = self.monitor.snapshot(MONITOR_WINDOW)
+        addresses = [target.address for target, _ in rows]
+        for item in self.monitor_tree.get_children():
+            if item not in addresses:
+                self.monitor_tree.delete(item)
+        for index, (target, stats) in enumerate(rows):
+            if stats.last is None:
+                last = '-'
+            elif stats.last == stats.last:
+                last = ms(stats.last)
+            else:
+                last = "perdida"
+            values = (
+                target.address,
+                target.kind,
+                last,
+                ms(stats.p50),
+                ms(stats.p95),
+                ms(stats.jitter),
+                f"{stats.loss:.1%}" if stats.loss is not None else '-',
+                target.outage_count,
+                target.sparkline(40),
+            )
+            if self.monitor_tree.exists(target.address):
+                self.monitor_tree.item(target.address, values=values)
+                self.monitor_tree.move(target.address, '', index)
+            else:
+                self.monitor_tree.insert('', index, iid=target.address, values=values)
+        
+        if self.monitor.running:
+            elapsed = int(time.monotonic() - self.monitor.started_at)
+            self.monitor_status.config(
+                text=f"Monitorando {len(rows)} alvo(s) a {self.monitor.rate_hz:g} Hz há "
+                     f"{elapsed // 3600}h{elapsed // 60 % 60:02d}m{elapsed % 60:02d}s"
+            )
+            self.monitor_refresh_id = self.root_window.after(MONITOR_REFRESH_MS, self._refresh_monitor_view)
+        else:
+            self.monitor_refresh_id = None
+    
+    def _run_command(self, args, timeout=5):
+        """Executa um comando, reaproveitando o resultado dentro da mesma coleta"""
+        # Sonda descartada não executa mais comandos nem grava no cache da coleta seguinte
+        cache = self.collection_cache
+        check_cancelled()
+        if cache is None:
+            return run_command(args, timeout=timeout)
+        return cache.get_or_compute(
+            ('cmd',) + tuple(args),
+            lambda: run_command(args, timeout=timeout)
+        )
+    
+    def _run_powershell(self, script, timeout=10):
+        """Executa um script PowerShell, reaproveitando o resultado dentro da mesma coleta"""
+        cache = self.collection_cache
+        check_cancelled()
+        if cache is None:
+            return run_powershell(script, timeout=timeout)
+        return cache.get_or_compute(
+            ('ps', script),
+            lambda: run_powershell(script, timeout=timeout)
+        )
+    
+    def _collect_network_info(self, on_event=None, allow_switch_reuse=False):
+        """
+        Coleta todas as informações de rede
+        
+        Args:
+            on_event: Função opcional chamada como on_event(evento, info_parcial, pendentes)
+                sempre que uma fonte termina (ver COLLECTION_EVENTS); pendentes é o
+                conjunto de fontes de COLLECTION_SOURCES que ainda não terminaram
+            allow_switch_reuse: Reaproveita as informações do switch da coleta anterior
+                se a impressão digital dos enlaces não mudou e o TTL não expirou
+        """
+        fingerprint = collect_link_fingerprint()
+        reuse_switch_info = None
+        previous_switch_info = (self.network_info or {}).get('switch_info')
+        if allow_switch_reuse and previous_switch_info and self.switch_change_detector.is_fresh(fingerprint):
+            reuse_switch_info = previous_switch_info
+            print("Enlace sem mudanças: reaproveitando informações do switch")  # Debug
+        
+        # Cada comando/sonda idêntico roda no máximo uma vez nesta coleta
+        self.collection_cache = CollectionCache()
+        try:
+            info = self._collect_network_info_cached(on_event, reuse_switch_info)
+            if reuse_switch_info is None:
+                self.switch_change_detector.mark_refreshed(fingerprint)
+            return info
+        finally:
+            self.last_cache_stats = self.collection_cache.stats()
+            self.collection_cache = None
+            print(f"Cache da coleta: {self.last_cache_stats}")  # Debug
+    
+    def _collect_network_info_cached(self, on_event=None, reuse_switch_info=None):
+        """
+        Coleta todas as informações de rede (com o cache da coleta ativo)
+        
+        Se reuse_switch_info for informado, as sondas do switch não são executadas
+        e essas informações são usadas no lugar delas.
+        """
+        # FQDN resolvido com prazo e guardado em cache (getfqdn pode travar sem DNS)
+        hostname, fqdn = self.resolver.local_names()
         info = {
             'interfaces': [],
             'default_gateway': None,
             'dns_servers': [],
-            'hostname': socket.gethostname(),
-            'fqdn': socket.getfqdn()
+            'hostname': hostname,
+            'fqdn': fqdn
         }
         
-        # Obtém informações via netsh e ipconfig
-        try:
-            # Obtém informações detalhadas via netsh
-            netsh_info = self._get_netsh_info()
-            info.update(netsh_info)
-            
-            # Obtém informações via ipconfig
-            ipconfig_info = self._get_ipconfig_info()
-            if ipconfig_info:
-                info.update(ipconfig_info)
-            
-            # Obtém informações via WMI (se disponível)
-            wmi_info = self._get_wmi_info()
-            if wmi_info:
-                info['wmi_info'] = wmi_info
-            
-            # Obtém gateway padrão via route
-            gateway = self._get_default_gateway()
-            if gateway:
-                info['default_gateway'] = gateway
+        # Armazena temporariamente o network_info para uso nos métodos de switch
+        # Ele é atualizado a cada fonte concluída, antes de liberar as sondas dependentes
+        temp_network_info = self.network_info.copy() if hasattr(self, 'network_info') else {}
+        temp_network_info.update(info)
+        original_network_info = self.network_info
+        self.network_info = temp_network_info
+        
+        switch_results = {}
+        pending = set(COLLECTION_SOURCES)
+        if reuse_switch_info is not None:
+            info['switch_info'] = dict(reuse_switch_info)
+            pending.discard('switch')
+        
+        def on_result(name, result):
+            if name == 'netsh':
+                info.update(result or {})
+            elif name == 'ipconfig':
+                if result:
+                    info.update(result)
+            elif name == 'wmi':
+                if result:
+                    info['wmi_info'] = result
+            elif name == 'gateway':
+                if result:
+                    info['default_gateway'] = result
+            elif name == 'dns':
+                if result:
+                    info['dns_servers'] = result
+            else:
+                switch_results[name] = result
+            self.network_info.update(info)
             
-            # Obtém DNS via ipconfig
-            dns_servers = self._get_dns_servers()
-            if dns_servers:
-                info['dns_servers'] = dns_servers
+            event = COLLECTION_EVENTS.get(name, 'switch')
+            if event != 'switch':
+                # As sondas do switch só terminam juntas, no fim da coleta
+                pending.discard(event)
+            if on_event:
+                partial_info = dict(info)
+                if reuse_switch_info is not None:
+                    partial_info['switch_info'] = dict(reuse_switch_info)
+                elif switch_results:
+                    partial_switch_info = self._new_switch_info()
+                    self._merge_switch_info(partial_switch_info, switch_results)
+                    partial_info['switch_info'] = partial_switch_info
+                on_event(event, partial_info, frozenset(pending))
+        
+        try:
+            # Fontes independentes rodam em paralelo; as sondas do switch esperam
+            # apenas pelas fontes de que dependem (adaptadores e/ou gateway)
+            scheduler = ProbeScheduler(max_workers=COLLECTION_PROBE_WORKERS, skip_covered=True)
+            scheduler.run(self._build_collection_probes(include_switch=reuse_switch_info is None),
+                          on_result=on_result)
+            self.last_probe_stats = {
+                'skipped': len(scheduler.last_skipped),
+                'skipped_probes': list(scheduler.last_skipped),
+                'timings': dict(scheduler.last_timings)
+            }
+            print(f"Sondas da coleta: {self.last_probe_stats}")  # Debug
             
-            # Armazena temporariamente o network_info para uso nos métodos de switch
-            # Isso permite que os métodos acessem o gateway recém-obtido
-            temp_network_info = self.network_info.copy() if hasattr(self, 'network_info') else {}
-            temp_network_info.update(info)
-            original_network_info = self.network_info
-            self.network_info = temp_network_info
+            if reuse_switch_info is not None:
+                return info
             
-            try:
-                # Obtém informações do switch (agora com acesso ao gateway)
-                switch_info = self._get_switch_info()
-                if switch_info:
-                    info['switch_info'] = switch_info
-            finally:
-                # Restaura o network_info original
-                self.network_info = original_network_info
+            # Obtém informações do switch (com a precedência entre as fontes)
+            lldp_info = switch_results.get('lldp')
+            if lldp_info:
+                print(f"LLDP retornou: {lldp_info}")  # Debug
+            else:
+                print("LLDP não retornou informações")  # Debug
+            switch_info = self._new_switch_info()
+            self._merge_switch_info(switch_info, switch_results)
+            print(f"Switch info final: {switch_info}")  # Debug
+            info['switch_info'] = switch_info
             
         except Exception as e:
             print(f"Erro ao coletar informações: {e}")
+            import traceback
+            traceback.print_exc()
+        finally:
+            # Restaura o network_info original
+            self.network_info = original_network_info
         
         return info
     
+    def _build_collection_probes(self, include_switch=True):
+        """Declara o grafo de sondas de uma coleta (completa ou sem as sondas do switch)"""
+        probes = [
+            Probe('ipconfig', lambda deps: self._get_adapters_info()),
+            Probe('gateway', lambda deps: self._get_default_gateway()),
+            Probe('dns', lambda deps: self._get_dns_servers()),
+            Probe('netsh', lambda deps: self._get_netsh_info()),
+            Probe('wmi', lambda deps: self._get_wmi_info()),
+        ]
+        if include_switch:
+            probes += self._build_switch_probes()
+        return probes
+    
     def _get_netsh_info(self):
         """Obtém informações via netsh"""
         info = {}
         try:
             # Obtém interfaces de rede
-            result = subprocess.run(
-                ["netsh", "interface", "show", "interface"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
+            result = self._run_command(["netsh", "interface", "show", "interface"], timeout=5)
             
             if result.returncode == 0:
-                interfaces = []
-                lines = result.stdout.strip().split('\n')
-                for line in lines[3:]:  # Pula cabeçalho
-                    if line.strip():
-                        parts = line.split()
-                        if len(parts) >= 4:
-                            state = parts[0]
-                            interface_type = parts[1]
-                            name = ' '.join(parts[3:])
-                            interfaces.append({
-                                'name': name,
-                                'state': state,
-                                'type': interface_type
-                            })
-                info['interfaces'] = interfaces
+                info['interfaces'] = [interface.as_dict() for interface in parse_netsh_interfaces(result.stdout)]
         except Exception:
             pass
         
         return info
     
+    @cached_probe('native_adapters')
+    def _get_native_adapters(self):
+        """Enumera os adaptadores pela API do sistema (None se indisponível)"""
+        try:
+            return get_adapters() or None
+        except Exception as e:
+            print(f"Erro na enumeração nativa de adaptadores: {e}")
+            return None
+    
+    def _get_adapters_info(self):
+        """Obtém os adaptadores pela API do sistema; usa o ipconfig /all se ela falhar"""
+        adapters = self._get_native_adapters()
+        if adapters:
+            return {'adapters': [dict(adapter) for adapter in adapters]}
+        return self._get_ipconfig_info()
+    
     def _get_ipconfig_info(self):
         """Obtém informações via ipconfig /all"""
         info = {}
         try:
-            result = subprocess.run(
-                ["ipconfig", "/all"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
+            result = self._run_command(["ipconfig", "/all"], timeout=5)
             
             if result.returncode == 0:
-                output = result.stdout
-                
-                # Parse das informações - método mais robusto
-                current_adapter = None
-                adapters = []
-                
-                for line in output.split('\n'):
-                    line = line.rstrip()
-                    
-                    # Detecta novo adaptador
-                    # Formato típico: "Adaptador de Ethernet Ethernet:" ou "Ethernet adapter Ethernet:"
-                    # ou simplesmente "Ethernet:"
-                    if line:
-                        # Verifica se é início de adaptador (não começa com espaço/tab e tem ':')
-                        is_adapter_start = (
-                            ':' in line and 
-                            not line[0].isspace() and
-                            not line.startswith('   ') and
-                            ('adaptador' in line.lower() or 'adapter' in line.lower() or 
-                             len(line.split(':')) == 2 and len(line.split(':')[0].strip()) < 50)
-                        )
-                        
-                        if is_adapter_start:
-                            # É um novo adaptador
-                            if current_adapter:
-                                adapters.append(current_adapter)
-                            
-                            # Extrai nome do adaptador
-                            if ':' in line:
-                                # Remove "Adaptador de" ou "adapter" e pega o nome
-                                adapter_name = line.split(':')[0].strip()
-                                # Limpa prefixos comuns
-                                for prefix in ['Adaptador de', 'adapter', 'Adapter']:
-                                    if prefix.lower() in adapter_name.lower():
-                                        parts = adapter_name.split()
-                                        # Pega a última parte como nome
-                                        adapter_name = parts[-1] if len(parts) > 1 else adapter_name
-                                        break
-                            else:
-                                adapter_name = line.strip()
-                            
-                            current_adapter = {
-                                'name': adapter_name,
-                                'description': '',
-                                'physical_address': '',
-                                'dhcp_enabled': False,
-                                'ipv4_address': '',
-                                'ipv4_subnet': '',
-                                'ipv6_address': '',
-                                'default_gateway': '',
-                                'dns_servers': []
-                            }
-                            continue
-                    
-                    # Se não estamos em um adaptador, pula
-                    if not current_adapter:
-                        continue
-                    
-                    # Linhas que fazem parte do adaptador atual (começam com espaço ou têm ':')
-                    if line and (line[0].isspace() or '\t' in line or ':' in line):
-                        # Descrição
-                        if 'Descrição' in line or 'Description' in line:
-                            match = re.search(r':\s*(.+)', line)
-                            if match:
-                                current_adapter['description'] = match.group(1).strip()
-                        
-                        # Endereço físico
-                        if 'Endereço Físico' in line or 'Physical Address' in line:
-                            match = re.search(r':\s*([0-9A-Fa-f\-:]+)', line)
-                            if match:
-                                current_adapter['physical_address'] = match.group(1).strip()
-                        
-                        # DHCP
-                        if 'DHCP' in line and ('Habilitado' in line or 'Enabled' in line):
-                            current_adapter['dhcp_enabled'] = 'Sim' in line or 'Yes' in line or 'Habilitado' in line
-                        
-                        # IPv4
-                        if 'Endereço IPv4' in line or 'IPv4 Address' in line:
-                            match = re.search(r':\s*([0-9.]+)', line)
-                            if match:
-                                ipv4 = match.group(1).strip()
-                                if ipv4 and ipv4 != '0.0.0.0':
-                                    current_adapter['ipv4_address'] = ipv4
-                        
-                        # IPv6
-                        if 'Endereço IPv6' in line or 'IPv6 Address' in line:
-                            match = re.search(r':\s*([0-9a-fA-F:]+)', line)
-                            if match:
-                                ipv6 = match.group(1).strip()
-                                # Remove sufixos como (Preferred) ou (Temporary)
-                                ipv6 = re.sub(r'\s*\([^)]+\)', '', ipv6)
-                                if ipv6 and not ipv6.startswith('fe80') and ipv6 != '::1':  # Ignora link-local e loopback
-                                    current_adapter['ipv6_address'] = ipv6
-                        
-                        # Máscara de sub-rede
-                        if 'Máscara de Sub-rede' in line or 'Subnet Mask' in line:
-                            match = re.search(r':\s*([0-9.]+)', line)
-                            if match:
-                                current_adapter['ipv4_subnet'] = match.group(1).strip()
-                        
-                        # Gateway padrão
-                        if 'Gateway Padrão' in line or 'Default Gateway' in line:
-                            match = re.search(r':\s*([0-9.:a-fA-F]+)', line)
-                            if match:
-                                gateway = match.group(1).strip()
-                                if gateway and gateway != '' and gateway.lower() != 'none':
-                                    current_adapter['default_gateway'] = gateway
-                        
-                        # DNS
-                        if 'Servidores DNS' in line or 'DNS Servers' in line:
-                            match = re.search(r':\s*(.+)', line)
-                            if match:
-                                dns = match.group(1).strip()
-                                if dns and dns.lower() != 'none':
-                                    current_adapter['dns_servers'].append(dns)
-                
-                # Adiciona o último adaptador
-                if current_adapter:
-                    adapters.append(current_adapter)
-                
-                info['adapters'] = adapters
+                report = parse_ipconfig(result.stdout)
+                info['adapters'] = [adapter.as_dict() for adapter in report.adapters]
                 
         except Exception as e:
             print(f"Erro ao obter ipconfig: {e}")
@@ -678,26 +1209,28 @@ class NetworkDiagnosticModule:
         
         return info if info else None
     
+    def _refresh_routing_table(self):
+        """Atualiza o índice de rotas com a tabela atual do sistema (False se indisponível)"""
+        try:
+            changes = self.routing_table.refresh()
+            if changes['added'] or changes['removed']:
+                print(f"Tabela de rotas: {changes}")  # Debug
+            return True
+        except Exception as e:
+            print(f"Erro ao ler tabela de rotas: {e}")
+            return False
+    
+    @cached_probe('default_gateway')
     def _get_default_gateway(self):
-        """Obtém gateway padrão via route"""
+        """Obtém gateway padrão pela tabela de rotas do sistema (ou via route print)"""
+        if self._refresh_routing_table() and len(self.routing_table):
+            return self.routing_table.default_gateway() or None
+        
         try:
-            result = subprocess.run(
-                ["route", "print", "0.0.0.0"],
-                capture_output=True,
-                text=True,
-                timeout=3,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
+            result = self._run_command(["route", "print", "0.0.0.0"], timeout=3)
             
             if result.returncode == 0:
-                lines = result.stdout.split('\n')
-                for line in lines:
-                    if '0.0.0.0' in line and 'On-link' not in line:
-                        parts = line.split()
-                        if len(parts) >= 3:
-                            gateway = parts[2]
-                            if re.match(r'^\d+\.\d+\.\d+\.\d+$', gateway):
-                                return gateway
+                return default_gateway_from_routes(parse_route_print(result.stdout))
         except Exception:
             pass
         
@@ -706,32 +1239,27 @@ class NetworkDiagnosticModule:
     def _get_dns_servers(self):
         """Obtém servidores DNS"""
         dns_servers = []
+        adapters = self._get_native_adapters()
+        if adapters:
+            for adapter in adapters:
+                for dns in adapter.get('dns_servers', []):
+                    if dns not in dns_servers:
+                        dns_servers.append(dns)
+            return dns_servers
+        
         try:
-            result = subprocess.run(
-                ["ipconfig", "/all"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
+            result = self._run_command(["ipconfig", "/all"], timeout=5)
             
             if result.returncode == 0:
-                output = result.stdout
-                for line in output.split('\n'):
-                    if 'Servidores DNS' in line or 'DNS Servers' in line:
-                        match = re.search(r':\s*([0-9.]+)', line)
-                        if match:
-                            dns = match.group(1).strip()
-                            if dns and dns not in dns_servers:
-                                dns_servers.append(dns)
+                dns_servers = parse_ipconfig(result.stdout).dns_servers()
         except Exception:
             pass
         
         return dns_servers
     
-    def _get_switch_info(self):
-        """Obtém informações do switch conectado"""
-        switch_info = {
+    def _new_switch_info(self):
+        """Retorna as informações do switch com todos os campos não resolvidos"""
+        return {
             'switch_name': 'N/A',
             'port_id': 'N/A',
             'vlan_id': 'N/A',
@@ -741,105 +1269,93 @@ class NetworkDiagnosticModule:
             'vtp_domain': 'N/A',
             'status': 'N/A'
         }
-        
-        try:
-            # Primeiro, tenta obter informações básicas do gateway (que geralmente é o switch)
-            gateway_info = self._get_switch_info_from_gateway()
-            if gateway_info:
-                switch_info.update(gateway_info)
-            
-            # Tenta obter via adaptadores ativos (port_id e VLAN)
-            adapter_port_info = self._get_port_info_from_adapters()
-            if adapter_port_info:
-                for key, value in adapter_port_info.items():
-                    if switch_info.get(key) == 'N/A' and value != 'N/A':
-                        switch_info[key] = value
-            
-            # Tenta obter VLAN via netsh interface (método alternativo)
-            vlan_info = self._get_vlan_info_from_netsh()
-            if vlan_info:
-                for key, value in vlan_info.items():
-                    if switch_info.get(key) == 'N/A' and value != 'N/A':
-                        switch_info[key] = value
-            
-            # Tenta obter via WMI (informações de porta) - mais confiável no Windows
-            wmi_port_info = self._get_wmi_port_info()
-            if wmi_port_info:
-                for key, value in wmi_port_info.items():
-                    if switch_info.get(key) == 'N/A' and value != 'N/A':
-                        switch_info[key] = value
-            
-            # Tenta obter via ARP e outras fontes
-            arp_info = self._get_switch_info_from_arp()
-            if arp_info:
-                for key, value in arp_info.items():
-                    if switch_info.get(key) == 'N/A' and value != 'N/A':
-                        switch_info[key] = value
-            
-            # Tenta obter via LLDP (Link Layer Discovery Protocol) - PRIORIDADE ALTA
-            # LLDP geralmente tem as informações mais completas (porta, VLAN, modelo)
-            lldp_info = self._get_lldp_info()
-            if lldp_info:
-                print(f"LLDP retornou: {lldp_info}")  # Debug
-                for key, value in lldp_info.items():
-                    if switch_info.get(key) == 'N/A' and value != 'N/A':
-                        switch_info[key] = value
-                    # Se LLDP trouxe informações, prioriza elas
-                    elif value != 'N/A' and switch_info.get(key) != value:
-                        switch_info[key] = value
-            else:
-                print("LLDP não retornou informações")  # Debug
-            
-            # Tenta obter via SNMP (se disponível)
-            snmp_info = self._get_snmp_info()
-            if snmp_info:
-                # Atualiza apenas campos que não foram preenchidos
-                for key, value in snmp_info.items():
-                    if switch_info.get(key) == 'N/A' and value != 'N/A':
-                        switch_info[key] = value
-            
-            # Tenta obter via PowerShell Get-NetAdapterStatistics
-            ps_info = self._get_switch_info_from_powershell()
-            if ps_info:
-                for key, value in ps_info.items():
-                    if switch_info.get(key) == 'N/A' and value != 'N/A':
-                        switch_info[key] = value
-            
-            # Se não tem IP do switch mas tem gateway, usa o gateway como IP do switch
-            if switch_info.get('switch_ip') == 'N/A' or not switch_info.get('switch_ip'):
-                gateway = None
-                if hasattr(self, 'network_info') and self.network_info:
-                    gateway = self.network_info.get('default_gateway')
-                if gateway and gateway != 'N/A' and gateway:
-                    switch_info['switch_ip'] = gateway
-            
-            # Se ainda não tem informações suficientes, tenta método alternativo via gateway
-            if (switch_info.get('switch_name') == 'N/A' or 
-                switch_info.get('port_id') == 'N/A' or 
-                switch_info.get('vlan_id') == 'N/A' or
-                switch_info.get('switch_model') == 'N/A'):
-                # Tenta obter mais informações via métodos alternativos
-                alt_info = self._get_switch_info_alternative()
-                if alt_info:
-                    for key, value in alt_info.items():
-                        if switch_info.get(key) == 'N/A' and value != 'N/A':
-                            switch_info[key] = value
-            
-            # Define status baseado nas informações coletadas
-            if switch_info.get('switch_ip') != 'N/A' or switch_info.get('switch_name') != 'N/A':
-                if switch_info.get('status') == 'N/A':
-                    switch_info['status'] = 'Conectado'
-            elif switch_info.get('status') == 'N/A':
-                switch_info['status'] = 'Desconectado'
-            
-            print(f"Switch info final: {switch_info}")  # Debug
-            
-        except Exception as e:
-            print(f"Erro ao obter informações do switch: {e}")
-            import traceback
-            traceback.print_exc()
-        
-        return switch_info
+    
+    def _build_switch_probes(self):
+        """Declara as sondas usadas para descobrir o switch (dependem de 'ipconfig' e 'gateway')"""
+        # A ordem define a prioridade de início quando não há workers livres e,
+        # exceto para o LLDP (que sobrescreve), a precedência em _merge_switch_info.
+        # provides lista os campos que cada sonda pode preencher: quando todos já
+        # foram resolvidos por uma fonte de maior prioridade, a sonda é descartada.
+        return [
+            Probe('lldp', lambda deps: self._get_lldp_info(),
+                  provides=['switch_name', 'port_id', 'vlan_id', 'switch_ip', 'switch_model', 'port_duplex',
+                            'vtp_domain'],
+                  override=True),
+            # Community SNMP do gateway: só roda enquanto a FDB ou o SNMP ainda forem necessários
+            Probe('snmp_community', lambda deps: self._find_snmp_community(), deps=['gateway'], auxiliary=True),
+            Probe('bridge_fdb', lambda deps: self._get_switch_port_from_fdb(deps),
+                  deps=['ipconfig', 'gateway', 'snmp_community'], provides=['port_id', 'vlan_id']),
+            Probe('gateway_info', lambda deps: self._get_switch_info_from_gateway(), deps=['gateway'],
+                  provides=['switch_ip', 'switch_name', 'status']),
+            Probe('adapters', lambda deps: self._get_port_info_from_adapters(), deps=['ipconfig'],
+                  provides=['port_id', 'switch_ip']),
+            Probe('netsh_vlan', lambda deps: self._get_vlan_info_from_netsh(),
+                  provides=['vlan_id']),
+            Probe('wmi_port', lambda deps: self._get_wmi_port_info(),
+                  provides=['port_duplex', 'port_id', 'status']),
+            Probe('arp', lambda deps: self._get_switch_info_from_arp(), deps=['gateway'],
+                  provides=['switch_ip', 'status']),
+            Probe('snmp', lambda deps: self._get_snmp_info(), deps=['gateway', 'snmp_community'],
+                  provides=['switch_model', 'switch_name', 'switch_ip']),
+            Probe('powershell', lambda deps: self._get_switch_info_from_powershell(),
+                  provides=['port_id', 'port_duplex']),
+            Probe('alternative', lambda deps: self._get_switch_info_alternative(), deps=['gateway'],
+                  provides=['port_id', 'switch_model', 'switch_name', 'switch_ip']),
+        ]
+    
+    def _merge_switch_info(self, switch_info, results):
+        """Combina os resultados das sondas respeitando a precedência entre as fontes"""
+        def fill_gaps(source_info):
+            # Atualiza apenas campos que não foram preenchidos
+            for key, value in (source_info or {}).items():
+                if switch_info.get(key) == 'N/A' and value != 'N/A':
+                    switch_info[key] = value
+        
+        # Primeiro, informações básicas do gateway (que geralmente é o switch)
+        gateway_info = results.get('gateway_info')
+        if gateway_info:
+            switch_info.update(gateway_info)
+        
+        # FDB do switch (porta real), adaptadores ativos, netsh (VLAN), WMI (porta) e ARP preenchem lacunas
+        for name in ('bridge_fdb', 'adapters', 'netsh_vlan', 'wmi_port', 'arp'):
+            fill_gaps(results.get(name))
+        
+        # LLDP (Link Layer Discovery Protocol) - PRIORIDADE ALTA
+        # LLDP geralmente tem as informações mais completas (porta, VLAN, modelo)
+        lldp_info = results.get('lldp')
+        if lldp_info:
+            for key, value in lldp_info.items():
+                if switch_info.get(key) == 'N/A' and value != 'N/A':
+                    switch_info[key] = value
+                # Se LLDP trouxe informações, prioriza elas
+                elif value != 'N/A' and switch_info.get(key) != value:
+                    switch_info[key] = value
+        
+        # SNMP e PowerShell Get-NetAdapterStatistics
+        for name in ('snmp', 'powershell'):
+            fill_gaps(results.get(name))
+        
+        # Se não tem IP do switch mas tem gateway, usa o gateway como IP do switch
+        if switch_info.get('switch_ip') == 'N/A' or not switch_info.get('switch_ip'):
+            gateway = None
+            if hasattr(self, 'network_info') and self.network_info:
+                gateway = self.network_info.get('default_gateway')
+            if gateway and gateway != 'N/A' and gateway:
+                switch_info['switch_ip'] = gateway
+        
+        # Se ainda não tem informações suficientes, usa o método alternativo via gateway
+        if (switch_info.get('switch_name') == 'N/A' or 
+            switch_info.get('port_id') == 'N/A' or 
+            switch_info.get('vlan_id') == 'N/A' or
+            switch_info.get('switch_model') == 'N/A'):
+            fill_gaps(results.get('alternative'))
+        
+        # Define status baseado nas informações coletadas
+        if switch_info.get('switch_ip') != 'N/A' or switch_info.get('switch_name') != 'N/A':
+            if switch_info.get('status') == 'N/A':
+                switch_info['status'] = 'Conectado'
+        elif switch_info.get('status') == 'N/A':
+            switch_info['status'] = 'Desconectado'
     
     def _get_switch_info_alternative(self):
         """Método alternativo para obter informações do switch quando LLDP não está disponível"""
@@ -883,13 +1399,7 @@ try {{
     # Ignora erros
 }}
 '''
-            result = subprocess.run(
-                ["powershell", "-Command", ps_command],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
+            result = self._run_powershell(ps_command, timeout=5)
             
             if result.returncode == 0 and result.stdout.strip():
                 import json
@@ -909,8 +1419,16 @@ try {{
         return info
     
     def _get_lldp_info(self):
-        """Obtém informações via LLDP/CDP usando PowerShell Get-NetLldpNeighbor"""
+        """Obtém informações via LLDP/CDP: anúncios capturados ou PowerShell Get-NetLldpNeighbor"""
         info = {}
+        # Vizinho já anunciado e ainda dentro do TTL: dispensa o PowerShell e o netsh
+        self.lldp_listener.start()
+        neighbors = self.lldp_listener.cache.neighbors()
+        if neighbors:
+            info = merge_switch_info(neighbors)
+            print(f"LLDP/CDP capturado em {neighbors[0]['interface']}: {info}")  # Debug
+            return info
+        
         try:
             # Primeiro verifica se LLDP está habilitado
             ps_check_command = '''
@@ -925,13 +1443,7 @@ try {
     $false
 }
 '''
-            check_result = subprocess.run(
-                ["powershell", "-Command", ps_check_command],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
+            check_result = self._run_powershell(ps_check_command, timeout=5)
             
             lldp_enabled = False
             if check_result.returncode == 0 and check_result.stdout.strip():
@@ -1011,13 +1523,7 @@ try {
     } catch {}
 }
 '''
-            result = subprocess.run(
-                ["powershell", "-Command", ps_command],
-                capture_output=True,
-                text=True,
-                timeout=10,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
+            result = self._run_powershell(ps_command, timeout=10)
             
             # Debug: verifica o que foi retornado
             if result.stdout:
@@ -1120,13 +1626,7 @@ try {
                 # Se não retornou nada, tenta netsh diretamente
                 print("LLDP PowerShell não retornou dados, tentando netsh...")  # Debug
                 try:
-                    result = subprocess.run(
-                        ["netsh", "lldp", "show", "neighbors", "verbose"],
-                        capture_output=True,
-                        text=True,
-                        timeout=5,
-                        creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                    )
+                    result = self._run_command(["netsh", "lldp", "show", "neighbors", "verbose"], timeout=5)
                     if result.returncode == 0 and result.stdout:
                         print(f"netsh LLDP output: {result.stdout[:500]}")  # Debug
                         self._parse_netsh_lldp_output(result.stdout, info)
@@ -1138,13 +1638,7 @@ try {
             traceback.print_exc()
             # Tenta fallback para netsh
             try:
-                result = subprocess.run(
-                    ["netsh", "lldp", "show", "neighbors", "verbose"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                    creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                )
+                result = self._run_command(["netsh", "lldp", "show", "neighbors", "verbose"], timeout=5)
                 if result.returncode == 0 and result.stdout:
                     self._parse_netsh_lldp_output(result.stdout, info)
             except Exception:
@@ -1154,123 +1648,26 @@ try {
         return info
     
     def _parse_netsh_lldp_output(self, output, info):
-        """Parseia saída do netsh lldp show neighbors"""
+        """Parseia saída do netsh lldp show neighbors (preenche apenas campos ausentes)"""
         try:
-            lines = output.split('\n')
-            current_section = None
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # System Name
-                if 'System Name:' in line or 'SystemName:' in line:
-                    parts = line.split(':', 1)
-                    if len(parts) > 1:
-                        name = parts[1].strip()
-                        if name and not info.get('switch_name'):
-                            info['switch_name'] = name
-                
-                # Port ID - pode aparecer em diferentes linhas
-                elif 'Port ID:' in line or 'PortID:' in line:
-                    parts = line.split(':', 1)
-                    if len(parts) > 1:
-                        port_id = parts[1].strip()
-                        if port_id:
-                            # Armazena PortID separadamente
-                            if not info.get('_port_id_temp'):
-                                info['_port_id_temp'] = port_id
-                
-                # Port Description
-                elif 'Port Description:' in line or 'PortDescription:' in line:
-                    parts = line.split(':', 1)
-                    if len(parts) > 1:
-                        port_desc = parts[1].strip()
-                        if port_desc:
-                            # Armazena PortDescription separadamente
-                            if not info.get('_port_desc_temp'):
-                                info['_port_desc_temp'] = port_desc
-                
-                # Após processar todas as linhas, combina PortDescription e PortID
-                # Isso será feito no final do método
-                
-                # System Description (modelo)
-                elif 'System Description:' in line or 'SystemDescription:' in line:
-                    parts = line.split(':', 1)
-                    if len(parts) > 1:
-                        desc = parts[1].strip()
-                        if desc and not info.get('switch_model'):
-                            info['switch_model'] = desc
-                
-                # Management Address (IP)
-                elif 'Management Address:' in line or 'ManagementAddress:' in line:
-                    parts = line.split(':', 1)
-                    if len(parts) > 1:
-                        addr = parts[1].strip()
-                        # Tenta extrair IP
-                        ip_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', addr)
-                        if ip_match:
-                            if not info.get('switch_ip'):
-                                info['switch_ip'] = ip_match.group(1)
-                
-                # VLAN ID
-                elif 'VLAN ID:' in line or 'VlanID:' in line or 'VLAN:' in line:
-                    parts = line.split(':', 1)
-                    if len(parts) > 1:
-                        vlan = parts[1].strip()
-                        # Extrai número da VLAN
-                        vlan_match = re.search(r'(\d+)', vlan)
-                        if vlan_match:
-                            if not info.get('vlan_id'):
-                                info['vlan_id'] = vlan_match.group(1)
-                
-                # TLV que pode conter VLAN
-                elif 'TLV Type:' in line and ('127' in line or '8' in line):
-                    # Próxima linha pode ter VLAN
-                    pass
-                
-                # Chassis ID (pode ser o nome do switch)
-                elif 'Chassis ID:' in line or 'ChassisId:' in line:
-                    parts = line.split(':', 1)
-                    if len(parts) > 1:
-                        chassis_id = parts[1].strip()
-                        if chassis_id and not info.get('switch_name'):
-                            # Se parece com um nome (não é só MAC), usa como nome
-                            if not re.match(r'^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$', chassis_id):
-                                info['switch_name'] = chassis_id
-            
-            # Após processar todas as linhas, combina PortDescription e PortID
-            port_desc_temp = info.get('_port_desc_temp', '').strip()
-            port_id_temp = info.get('_port_id_temp', '').strip()
-            
-            if port_desc_temp and port_id_temp:
-                # Formato: "MES (GE1/0/17)"
-                if f"({port_id_temp})" not in port_desc_temp:
-                    info['port_id'] = f"{port_desc_temp} ({port_id_temp})"
-                else:
-                    info['port_id'] = port_desc_temp
-            elif port_id_temp:
-                info['port_id'] = port_id_temp
-            elif port_desc_temp:
-                info['port_id'] = port_desc_temp
-            
-            # Remove variáveis temporárias
-            if '_port_desc_temp' in info:
-                del info['_port_desc_temp']
-            if '_port_id_temp' in info:
-                del info['_port_id_temp']
-                
+            for key, value in parse_netsh_lldp(output).items():
+                if not info.get(key):
+                    info[key] = value
         except Exception as e:
             print(f"Erro ao parsear saída netsh LLDP: {e}")
             import traceback
             traceback.print_exc()
     
-    def _get_snmp_info(self):
-        """Obtém informações do switch via SNMP"""
-        info = {}
+    @cached_probe('snmp_community')
+    def _find_snmp_community(self):
+        """
+        Descobre a community SNMP aceita pelo gateway
+        
+        Returns:
+            Dict com gateway, community e os valores de sysDescr/sysName lidos na
+            descoberta, ou {} se o gateway não respondeu a nenhuma community
+        """
         try:
-            # Primeiro, tenta obter o IP do switch do gateway
             gateway = None
             if hasattr(self, 'network_info') and self.network_info:
                 gateway = self.network_info.get('default_gateway')
@@ -1278,104 +1675,74 @@ try {
                 gateway = self._get_default_gateway()
             
             if not gateway or gateway == 'N/A':
+                return {}
+            
+            # Testa todas as communities ao mesmo tempo (um único PDU com sysDescr e sysName)
+            community, values = self.snmp_client.find_community(gateway, self.snmp_communities)
+            if community is None:
+                return {}
+            return {'gateway': gateway, 'community': community, 'values': values}
+        except Exception as e:
+            print(f"Erro ao descobrir community SNMP: {e}")
+            return {}
+    
+    @cached_probe('snmp_info')
+    def _get_snmp_info(self):
+        """Obtém informações do switch via SNMP"""
+        info = {}
+        try:
+            found = self._find_snmp_community()
+            if not found:
                 return info
             
-            # Tenta SNMP com diferentes community strings comuns
-            communities = ['public', 'private', 'community']
+            values = found['values']
+            desc = as_text(values.get(OID_SYS_DESCR))
+            if desc:
+                info['switch_model'] = desc
+            name = as_text(values.get(OID_SYS_NAME))
+            if name:
+                info['switch_name'] = name
             
-            for community in communities:
-                try:
-                    # Obtém System Description (modelo do switch)
-                    result = subprocess.run(
-                        ["snmpget", "-v", "2c", "-c", community, gateway, "1.3.6.1.2.1.1.1.0"],
-                        capture_output=True,
-                        text=True,
-                        timeout=3,
-                        creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                    )
-                    if result.returncode == 0 and result.stdout:
-                        # Extrai System Description
-                        match = re.search(r'STRING:\s*(.+)', result.stdout)
-                        if match:
-                            desc = match.group(1).strip()
-                            if desc and not info.get('switch_model'):
-                                info['switch_model'] = desc
-                    
-                    # Obtém System Name
-                    result = subprocess.run(
-                        ["snmpget", "-v", "2c", "-c", community, gateway, "1.3.6.1.2.1.1.5.0"],
-                        capture_output=True,
-                        text=True,
-                        timeout=3,
-                        creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                    )
-                    if result.returncode == 0 and result.stdout:
-                        match = re.search(r'STRING:\s*(.+)', result.stdout)
-                        if match:
-                            name = match.group(1).strip()
-                            if name and not info.get('switch_name'):
-                                info['switch_name'] = name
-                    
-                    # Se conseguiu obter informações, define o IP
-                    if info.get('switch_model') or info.get('switch_name'):
-                        info['switch_ip'] = gateway
-                        break
-                        
-                except FileNotFoundError:
-                    # snmpget não está instalado, tenta via PowerShell
-                    break
-                except Exception:
-                    continue
-            
-            # Se snmpget não está disponível, tenta via PowerShell
-            if not info.get('switch_model') and not info.get('switch_name'):
-                try:
-                    ps_command = f'''
-$target = "{gateway}"
-try {{
-    $snmp = New-Object -ComObject oleprn.OleSNMP
-    $snmp.Open($target, "public", 2, 2000)
-    
-    $sysDesc = $snmp.Get(".1.3.6.1.2.1.1.1.0")
-    $sysName = $snmp.Get(".1.3.6.1.2.1.1.5.0")
-    
-    $result = @{{
-        SwitchModel = $sysDesc
-        SwitchName = $sysName
-        SwitchIP = $target
-    }}
-    $result | ConvertTo-Json -Compress
-    $snmp.Close()
-}} catch {{
-    # Se falhar, retorna vazio
-}}
-'''
-                    result = subprocess.run(
-                        ["powershell", "-Command", ps_command],
-                        capture_output=True,
-                        text=True,
-                        timeout=5,
-                        creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                    )
-                    if result.returncode == 0 and result.stdout.strip():
-                        import json
-                        try:
-                            ps_data = json.loads(result.stdout.strip())
-                            if ps_data.get('SwitchModel'):
-                                info['switch_model'] = ps_data['SwitchModel']
-                            if ps_data.get('SwitchName'):
-                                info['switch_name'] = ps_data['SwitchName']
-                            if ps_data.get('SwitchIP'):
-                                info['switch_ip'] = ps_data['SwitchIP']
-                        except json.JSONDecodeError:
-                            pass
-                except Exception:
-                    pass
+            # Se conseguiu obter informações, define o IP
+            if info.get('switch_model') or info.get('switch_name'):
+                info['switch_ip'] = found['gateway']
                     
         except Exception as e:
             print(f"Erro ao obter informações SNMP: {e}")
         return info
     
+    def _get_switch_port_from_fdb(self, deps):
+        """Obtém a porta e a VLAN reais do switch procurando o MAC desta máquina na FDB (SNMP)"""
+        info = {}
+        try:
+            gateway = deps.get('gateway')
+            # A FDB só é consultada se o gateway respondeu ao SNMP com alguma community
+            found = deps.get('snmp_community')
+            if not gateway or not found or found['gateway'] != gateway:
+                return info
+            
+            # Adaptador que alcança o gateway (pela tabela de rotas) ou que o tem como gateway
+            adapters = (deps.get('ipconfig') or {}).get('adapters', [])
+            route = self.routing_table.lookup(gateway) if len(self.routing_table) else None
+            adapter = next((item for item in adapters
+                            if route and item.get('interface_index') == route.interface_index), None)
+            if adapter is None:
+                adapter = next((item for item in adapters if item.get('default_gateway') == gateway), None)
+            mac = adapter.get('physical_address') if adapter else ''
+            if not mac:
+                return info
+            
+            result = self.switch_port_locator.locate(gateway, mac, found['community'])
+            stats = self.switch_port_locator.last_stats
+            print(f"FDB de {gateway}: {result} ({stats})")  # Debug
+            if result:
+                info['port_id'] = result['port_id']
+                if result['vlan_id'] != 'N/A':
+                    info['vlan_id'] = result['vlan_id']
+        except Exception as e:
+            print(f"Erro ao consultar FDB do switch: {e}")
+        return info
+    
     def _get_switch_info_from_gateway(self):
         """Obtém informações do switch a partir do gateway padrão"""
         info = {}
@@ -1391,42 +1758,24 @@ try {{
             if gateway and gateway != 'N/A' and gateway != 'None' and gateway:
                 info['switch_ip'] = gateway
                 
-                # Tenta resolver nome via DNS reverso
-                try:
-                    hostname, _, _ = socket.gethostbyaddr(gateway)
-                    if hostname:
-                        # Remove domínio se houver e limpa o nome
-                        switch_name = hostname.split('.')[0].strip()
-                        if switch_name:
-                            info['switch_name'] = switch_name
-                        info['status'] = "Conectado"
-                        print(f"Gateway nome resolvido via DNS: {switch_name}")  # Debug
-                except (socket.herror, socket.gaierror, OSError):
-                    # Se não conseguiu resolver, tenta via nbtstat
+                # Tenta resolver nome via DNS reverso (com prazo e cache, inclusive negativo)
+                hostname = self.resolver.reverse(gateway)
+                if hostname:
+                    # Remove domínio se houver e limpa o nome
+                    switch_name = hostname.split('.')[0].strip()
+                    if switch_name:
+                        info['switch_name'] = switch_name
+                    info['status'] = "Conectado"
+                    print(f"Gateway nome resolvido via DNS: {switch_name}")  # Debug
+                else:
+                    # Se não conseguiu resolver, consulta a tabela de nomes NetBIOS (UDP/137, com cache)
                     try:
-                        result = subprocess.run(
-                            ["nbtstat", "-A", gateway],
-                            capture_output=True,
-                            text=True,
-                            timeout=3,
-                            creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                        )
-                        if result.returncode == 0:
-                            print(f"nbtstat output: {result.stdout[:300]}")  # Debug
-                            # Procura por nome na saída do nbtstat
-                            for line in result.stdout.split('\n'):
-                                if 'UNIQUE' in line or 'GROUP' in line:
-                                    parts = line.split()
-                                    if len(parts) > 0:
-                                        name = parts[0].strip()
-                                        # Remove caracteres especiais
-                                        name = name.replace('<', '').replace('>', '').strip()
-                                        if name and name != '00' and len(name) > 1:
-                                            info['switch_name'] = name
-                                            print(f"Switch nome via nbtstat: {name}")  # Debug
-                                            break
+                        node_status = self.netbios_client.node_status(gateway)
+                        if node_status and node_status.computer_name:
+                            info['switch_name'] = node_status.computer_name
+                            print(f"Switch nome via NetBIOS: {node_status}")  # Debug
                     except Exception as e:
-                        print(f"Erro nbtstat: {e}")  # Debug
+                        print(f"Erro NetBIOS: {e}")  # Debug
                     
                     # Mesmo sem resolver nome, se tem gateway, está conectado
                     if info.get('status') != 'Conectado':
@@ -1439,7 +1788,7 @@ try {{
         return info
     
     def _get_switch_info_from_arp(self):
-        """Tenta obter informações do switch via ARP e outras fontes"""
+        """Tenta obter informações do switch pela tabela de vizinhos (ARP/NDP) do sistema"""
         info = {}
         try:
             # Obtém gateway que pode ser o switch
@@ -1448,82 +1797,32 @@ try {{
                 gateway = self._get_default_gateway()
             
             if gateway and gateway != 'N/A' and gateway != 'None':
-                # Tenta pingar o gateway para garantir que está na tabela ARP
-                try:
-                    subprocess.run(
-                        ["ping", "-n", "1", "-w", "500", gateway],
-                        capture_output=True,
-                        timeout=1,
-                        creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                    )
-                except Exception:
-                    pass
-                
-                # Obtém tabela ARP
-                try:
-                    result = subprocess.run(
-                        ["arp", "-a", gateway],
-                        capture_output=True,
-                        text=True,
-                        timeout=2,
-                        creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                    )
-                    if result.returncode == 0:
-                        # Procura pelo gateway na tabela ARP
-                        for line in result.stdout.split('\n'):
-                            if gateway in line:
-                                parts = line.split()
-                                if len(parts) >= 2:
-                                    # Pode ter informações adicionais
-                                    mac = parts[1] if len(parts) > 1 else None
-                                    if mac and mac != 'ff-ff-ff-ff-ff-ff':
-                                        # MAC encontrado, switch está acessível
-                                        if not info.get('switch_ip'):
-                                            info['switch_ip'] = gateway
-                                        if not info.get('status'):
-                                            info['status'] = "Conectado"
-                                        break
-                except Exception:
-                    pass
-        except Exception:
-            pass
+                # Lê a tabela inteira de uma vez; se o gateway ainda não tiver MAC,
+                # dispara a solicitação ARP sem criar processos (sem ping/arp -a).
+                # resolve() bloqueia até 0,5 s: roda na thread da sonda, fora do Tk
+                self.neighbor_table.refresh()
+                neighbor = self.neighbor_table.resolve(gateway, timeout=0.5)
+                if neighbor:
+                    # MAC encontrado, switch está acessível
+                    info['switch_ip'] = gateway
+                    info['status'] = "Conectado"
+        except Exception as e:
+            print(f"Erro ao consultar tabela de vizinhos: {e}")  # Debug
         return info
     
     def _get_port_info_from_adapters(self):
         """Obtém informações de porta a partir dos adaptadores de rede"""
         info = {}
         try:
-            # Obtém adaptadores do network_info
-            adapters = []
-            if hasattr(self, 'network_info') and self.network_info:
-                adapters = self.network_info.get('adapters', [])
-            
-            # Procura por adaptador Ethernet ativo (com IP)
-            for adapter in adapters:
-                adapter_name = adapter.get('name', '').lower()
-                adapter_desc = adapter.get('description', '').lower()
+            # Adaptador Ethernet ativo (com IP), já classificado pelo snapshot
+            adapter = NetworkSnapshot.from_network_info(self.network_info or {}).connected_ethernet
+            if adapter:
+                if adapter.name or adapter.description:
+                    info['port_id'] = adapter.name or adapter.description
                 
-                # Verifica se é adaptador Ethernet (não Wi-Fi, não loopback, não virtual)
-                is_ethernet = (
-                    'ethernet' in adapter_name or 'ethernet' in adapter_desc or
-                    'lan' in adapter_name or 'local area' in adapter_desc
-                ) and not any(x in adapter_name or x in adapter_desc for x in [
-                    'wireless', 'wi-fi', 'wifi', 'bluetooth', 'loopback', 'virtual', 'vmware', 'virtualbox'
-                ])
-                
-                if is_ethernet and (adapter.get('ipv4_address') or adapter.get('ipv6_address')):
-                    # Encontrou adaptador Ethernet ativo
-                    if adapter.get('name'):
-                        info['port_id'] = adapter.get('name')
-                    elif adapter.get('description'):
-                        info['port_id'] = adapter.get('description')
-                    
-                    # Se tem gateway, pode ser o IP do switch
-                    if adapter.get('default_gateway'):
-                        if not info.get('switch_ip'):
-                            info['switch_ip'] = adapter.get('default_gateway')
-                    
-                    break
+                # Se tem gateway, pode ser o IP do switch
+                if adapter.default_gateway:
+                    info['switch_ip'] = adapter.default_gateway
         except Exception as e:
             print(f"Erro ao obter informações de porta dos adaptadores: {e}")
         return info
@@ -1533,13 +1832,7 @@ try {{
         info = {}
         try:
             # Tenta obter VLAN via netsh interface
-            result = subprocess.run(
-                ["netsh", "interface", "show", "interface"],
-                capture_output=True,
-                text=True,
-                timeout=3,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
+            result = self._run_command(["netsh", "interface", "show", "interface"], timeout=3)
             
             if result.returncode == 0:
                 # Tenta obter VLAN via PowerShell Get-NetAdapter
@@ -1557,13 +1850,7 @@ ForEach-Object {
     }
 }
 '''
-                result = subprocess.run(
-                    ["powershell", "-Command", ps_command],
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                    creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                )
+                result = self._run_powershell(ps_command, timeout=5)
                 
                 if result.returncode == 0 and result.stdout.strip():
                     import json
@@ -1663,13 +1950,7 @@ ForEach-Object {
     $result | ConvertTo-Json -Compress
 }
 '''
-            result = subprocess.run(
-                ["powershell", "-Command", ps_command],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
+            result = self._run_powershell(ps_command, timeout=5)
             
             if result.returncode == 0 and result.stdout.strip():
                 import json
@@ -1691,18 +1972,18 @@ ForEach-Object {
     
     def _collect_network_info_alternative(self):
         """Método alternativo para coletar informações de rede usando socket"""
+        hostname, fqdn = self.resolver.local_names()
         info = {
             'interfaces': [],
             'default_gateway': None,
             'dns_servers': [],
-            'hostname': socket.gethostname(),
-            'fqdn': socket.getfqdn(),
+            'hostname': hostname,
+            'fqdn': fqdn,
             'adapters': []
         }
         
         try:
             # Obtém IP local via socket
-            hostname = socket.gethostname()
             try:
                 local_ip = socket.gethostbyname(hostname)
                 if local_ip and local_ip != '127.0.0.1':
@@ -1725,530 +2006,281 @@ ForEach-Object {
         
         return info
     
-    def _display_switch_info(self):
+    def _display_switch_info(self, snapshot=None, pending=frozenset()):
         """Exibe informações do switch no frame dedicado"""
         # Verifica se o frame ainda existe
-        if not hasattr(self, 'switch_frame') or not self.switch_frame or not self.switch_frame.winfo_exists():
+        if not self.switch_grid or not self.switch_grid.parent.winfo_exists():
             return
         
-        switch_info = self.network_info.get('switch_info', {})
-        
-        if not switch_info:
+        if snapshot is None:
+            snapshot = NetworkSnapshot.from_network_info(self.network_info)
+        switch = snapshot.switch
+        
+        # Enquanto as sondas do switch não terminam, campos desconhecidos aparecem como pendentes
+        if 'switch' in pending:
+            switch = switch or SwitchInfo()
+            unknown_text = PENDING_TEXT
+        elif switch is None:
+            self.switch_grid.update([
+                message('unavailable', "Informações do switch não disponíveis", foreground="gray")
+            ])
+            return
+        else:
+            unknown_text = 'N/A'
+        
+        status = text(switch.status, unknown_text)
+        status_color = "green" if switch.status and switch.status.lower() != 'desconectado' else "gray"
+        
+        self.switch_grid.update([
+            field('switch_name', "Nome do Switch:", text(switch.switch_name, unknown_text)),
+            field('port_id', "Identificador de Porta:", text(switch.port_id, unknown_text)),
+            field('vlan_id', "Identificador de VLAN:", text(switch.vlan_id, unknown_text)),
+            field('switch_ip', "Endereço IP Switch:", text(switch.switch_ip, unknown_text)),
+            field('switch_model', "Modelo do Switch:", text(switch.switch_model, unknown_text)),
+            field('port_duplex', "Port Duplex:", text(switch.port_duplex, unknown_text)),
+            field('vtp_domain', "VTP Mgmt Domain:", text(switch.vtp_domain, unknown_text)),
+            field('status', "Status:", status, foreground=status_color),
+        ])
+    
+    def _on_collection_event(self, event, partial_info, pending):
+        """Recebe um resultado parcial da coleta (thread de coleta) e agenda sua exibição"""
+        if not self.root_window:
+            return
+        print(f"Coleta: {event} pronto")  # Debug
+        self.partial_network_info = (partial_info, pending)
+        if not self.partial_render_scheduled:
+            # Eventos em rajada são agrupados em um único redesenho
+            self.partial_render_scheduled = True
             try:
-                ttk.Label(
-                    self.switch_frame,
-                    text="Informações do switch não disponíveis",
-                    font=("Segoe UI", 9),
-                    foreground="gray"
-                ).grid(row=0, column=0, columnspan=2, pady=20)
-            except (tk.TclError, AttributeError):
-                pass
+                self.root_window.after(0, self._render_partial_network_info)
+            except (tk.TclError, RuntimeError):
+                self.partial_render_scheduled = False
+    
+    def _render_partial_network_info(self):
+        """Exibe o resultado parcial mais recente (thread principal)"""
+        self.partial_render_scheduled = False
+        if self.partial_network_info is None:
             return
-        
-        row = 0
-        
-        # Nome do Switch
-        switch_name = switch_info.get('switch_name', 'N/A')
-        ttk.Label(self.switch_frame, text="Nome do Switch:", font=("Segoe UI", 9, "bold")).grid(
-            row=row, column=0, sticky=tk.W, pady=5
-        )
-        ttk.Label(self.switch_frame, text=switch_name, font=("Segoe UI", 9)).grid(
-            row=row, column=1, sticky=tk.W, padx=(10, 0), pady=5
-        )
-        row += 1
-        
-        # Identificador de Porta
-        port_id = switch_info.get('port_id', 'N/A')
-        ttk.Label(self.switch_frame, text="Identificador de Porta:", font=("Segoe UI", 9, "bold")).grid(
-            row=row, column=0, sticky=tk.W, pady=5
-        )
-        ttk.Label(self.switch_frame, text=port_id, font=("Segoe UI", 9)).grid(
-            row=row, column=1, sticky=tk.W, padx=(10, 0), pady=5
-        )
-        row += 1
-        
-        # Identificador de VLAN
-        vlan_id = switch_info.get('vlan_id', 'N/A')
-        ttk.Label(self.switch_frame, text="Identificador de VLAN:", font=("Segoe UI", 9, "bold")).grid(
-            row=row, column=0, sticky=tk.W, pady=5
-        )
-        ttk.Label(self.switch_frame, text=vlan_id, font=("Segoe UI", 9)).grid(
-            row=row, column=1, sticky=tk.W, padx=(10, 0), pady=5
-        )
-        row += 1
-        
-        # Endereço IP Switch
-        switch_ip = switch_info.get('switch_ip', 'N/A')
-        ttk.Label(self.switch_frame, text="Endereço IP Switch:", font=("Segoe UI", 9, "bold")).grid(
-            row=row, column=0, sticky=tk.W, pady=5
-        )
-        ttk.Label(self.switch_frame, text=switch_ip, font=("Segoe UI", 9)).grid(
-            row=row, column=1, sticky=tk.W, padx=(10, 0), pady=5
-        )
-        row += 1
-        
-        # Modelo do Switch
-        switch_model = switch_info.get('switch_model', 'N/A')
-        ttk.Label(self.switch_frame, text="Modelo do Switch:", font=("Segoe UI", 9, "bold")).grid(
-            row=row, column=0, sticky=tk.W, pady=5
-        )
-        ttk.Label(self.switch_frame, text=switch_model, font=("Segoe UI", 9)).grid(
-            row=row, column=1, sticky=tk.W, padx=(10, 0), pady=5
-        )
-        row += 1
-        
-        # Port Duplex
-        port_duplex = switch_info.get('port_duplex', 'N/A')
-        ttk.Label(self.switch_frame, text="Port Duplex:", font=("Segoe UI", 9, "bold")).grid(
-            row=row, column=0, sticky=tk.W, pady=5
-        )
-        ttk.Label(self.switch_frame, text=port_duplex, font=("Segoe UI", 9)).grid(
-            row=row, column=1, sticky=tk.W, padx=(10, 0), pady=5
-        )
-        row += 1
-        
-        # VTP Mgmt Domain
-        vtp_domain = switch_info.get('vtp_domain', 'N/A')
-        ttk.Label(self.switch_frame, text="VTP Mgmt Domain:", font=("Segoe UI", 9, "bold")).grid(
-            row=row, column=0, sticky=tk.W, pady=5
-        )
-        ttk.Label(self.switch_frame, text=vtp_domain, font=("Segoe UI", 9)).grid(
-            row=row, column=1, sticky=tk.W, padx=(10, 0), pady=5
-        )
-        row += 1
-        
-        # Status
-        status = switch_info.get('status', 'N/A')
-        status_color = "green" if status and status.lower() not in ['n/a', 'desconectado'] else "gray"
-        ttk.Label(self.switch_frame, text="Status:", font=("Segoe UI", 9, "bold")).grid(
-            row=row, column=0, sticky=tk.W, pady=5
-        )
-        status_label = ttk.Label(self.switch_frame, text=status, font=("Segoe UI", 9), foreground=status_color)
-        status_label.grid(row=row, column=1, sticky=tk.W, padx=(10, 0), pady=5)
-        row += 1
+        partial_info, pending = self.partial_network_info
+        self._render_network_info(partial_info, pending)
     
     def _update_ui(self):
         """Atualiza a interface com as informações coletadas"""
-        # Verifica se os frames ainda existem (podem ter sido destruídos se o módulo foi trocado)
-        if not hasattr(self, 'left_frame') or not self.left_frame or not self.left_frame.winfo_exists():
-            return
-        if not hasattr(self, 'right_frame') or not self.right_frame or not self.right_frame.winfo_exists():
-            return
-        if not hasattr(self, 'switch_frame') or not self.switch_frame or not self.switch_frame.winfo_exists():
+        # Resultado final: descarta parciais que ainda estejam na fila
+        self.partial_network_info = None
+        self._render_network_info(self.network_info, snapshot=self.snapshot)
+    
+    def _render_network_info(self, network_info, pending=frozenset(), snapshot=None):
+        """
+        Exibe as informações de rede nos três painéis
+        
+        Os painéis são grades persistentes: cada atualização só altera os
+        rótulos cujo texto ou cor mudou, sem recriar widgets.
+        
+        Args:
+            network_info: Informações coletadas (completas ou parciais)
+            pending: Fontes de COLLECTION_SOURCES ainda em andamento; os campos que
+                dependem delas e ainda não têm valor aparecem como pendentes
+            snapshot: NetworkSnapshot já montado a partir de network_info, se houver
+        """
+        if not self._grids_exist():
             return
         
-        # Remove indicador de carregamento se existir
-        if self.loading_label:
-            try:
-                if self.loading_label.winfo_exists():
-                    self.loading_label.destroy()
-            except (tk.TclError, AttributeError):
-                pass
-            self.loading_label = None
-        
-        # Limpa frames
-        try:
-            for widget in self.left_frame.winfo_children():
-                try:
-                    widget.destroy()
-                except (tk.TclError, AttributeError):
-                    pass
-        except (tk.TclError, AttributeError):
-            pass
-        
-        try:
-            for widget in self.right_frame.winfo_children():
-                try:
-                    widget.destroy()
-                except (tk.TclError, AttributeError):
-                    pass
-        except (tk.TclError, AttributeError):
-            pass
-        
-        try:
-            for widget in self.switch_frame.winfo_children():
-                try:
-                    widget.destroy()
-                except (tk.TclError, AttributeError):
-                    pass
-        except (tk.TclError, AttributeError):
-            pass
-        
-        # Obtém adaptadores ativos
-        adapters = self.network_info.get('adapters', [])
-        wmi_info = self.network_info.get('wmi_info', {})
-        wmi_adapters = wmi_info.get('adapters', []) if wmi_info else []
-        wmi_ip_configs = wmi_info.get('ip_configs', []) if wmi_info else []
+        # Adaptadores já classificados e combinados com o WMI; o ativo é escolhido na construção
+        if snapshot is None:
+            snapshot = NetworkSnapshot.from_network_info(network_info)
+        adapters = snapshot.adapters
+        active_adapter = snapshot.active_adapter
         
-        # Encontra adaptador Ethernet ativo (prioriza adaptadores com IP)
-        active_adapter = None
-        ethernet_adapters = []
-        
-        for adapter in adapters:
-            adapter_name = adapter.get('name', '').lower()
-            adapter_desc = adapter.get('description', '').lower()
-            
-            # Verifica se é adaptador Ethernet (não Wi-Fi, não loopback, não virtual)
-            is_ethernet = (
-                'ethernet' in adapter_name or 'ethernet' in adapter_desc or
-                'lan' in adapter_name or 'local area' in adapter_desc
-            ) and not any(x in adapter_name or x in adapter_desc for x in [
-                'wireless', 'wi-fi', 'wifi', 'bluetooth', 'loopback', 'virtual', 'vmware', 'virtualbox'
-            ])
-            
-            if is_ethernet:
-                ethernet_adapters.append(adapter)
-                if adapter.get('ipv4_address') or adapter.get('ipv6_address'):
-                    active_adapter = adapter
-                    break
-        
-        # Se não encontrou Ethernet com IP, usa o primeiro Ethernet
-        if not active_adapter and ethernet_adapters:
-            active_adapter = ethernet_adapters[0]
-        
-        # Se ainda não encontrou, usa qualquer adaptador com IP
-        if not active_adapter:
-            for adapter in adapters:
-                if adapter.get('ipv4_address') or adapter.get('ipv6_address'):
-                    active_adapter = adapter
-                    break
-        
-        # Se ainda não encontrou, usa qualquer adaptador (mesmo sem IP)
-        if not active_adapter and adapters:
-            # Prioriza adaptadores que não são loopback
-            for adapter in adapters:
-                adapter_name = adapter.get('name', '').lower()
-                if 'loopback' not in adapter_name and 'lo' not in adapter_name:
-                    active_adapter = adapter
-                    break
-            
-            # Último recurso: primeiro adaptador disponível
-            if not active_adapter:
-                active_adapter = adapters[0]
+        # === FRAME ESQUERDO - Informações Básicas ===
         
-        row = 0
+        adapters_pending = 'adapters' in pending and not active_adapter
         
-        # === FRAME ESQUERDO - Informações Básicas ===
+        def pending_or(value, *sources):
+            """Retorna o marcador de pendente se o valor depende de fontes em andamento"""
+            if not known(value) and any(source in pending for source in sources):
+                return PENDING_TEXT
+            return text(value)
         
         # Se não há adaptadores, mostra informações básicas disponíveis
-        if not adapters and not active_adapter:
+        if not adapters and not active_adapter and 'adapters' not in pending:
             # Mostra pelo menos hostname e informações básicas
-            hostname = self.network_info.get('hostname', 'N/A')
-            fqdn = self.network_info.get('fqdn', 'N/A')
-            
-            ttk.Label(
-                self.left_frame,
-                text="Nenhuma interface de rede ativa detectada",
-                font=("Segoe UI", 10, "bold"),
-                foreground="orange"
-            ).grid(row=row, column=0, columnspan=2, pady=20)
-            row += 1
-            
-            ttk.Label(self.left_frame, text="Hostname:", font=("Segoe UI", 9, "bold")).grid(
-                row=row, column=0, sticky=tk.W, pady=5
-            )
-            ttk.Label(self.left_frame, text=hostname, font=("Segoe UI", 9)).grid(
-                row=row, column=1, sticky=tk.W, padx=(10, 0), pady=5
-            )
-            row += 1
-            
-            ttk.Label(self.left_frame, text="FQDN:", font=("Segoe UI", 9, "bold")).grid(
-                row=row, column=0, sticky=tk.W, pady=5
-            )
-            ttk.Label(self.left_frame, text=fqdn, font=("Segoe UI", 9)).grid(
-                row=row, column=1, sticky=tk.W, padx=(10, 0), pady=5
-            )
-            row += 1
-            
-            ttk.Label(
-                self.left_frame,
-                text="Tente executar 'ipconfig /all' no prompt de comando para verificar",
-                font=("Segoe UI", 8),
-                foreground="gray"
-            ).grid(row=row, column=0, columnspan=2, pady=20)
+            self.left_grid.update([
+                message('no_adapter', "Nenhuma interface de rede ativa detectada",
+                        foreground="orange", font=("Segoe UI", 10, "bold")),
+                field('hostname', "Hostname:", text(snapshot.hostname)),
+                field('fqdn', "FQDN:", text(snapshot.fqdn)),
+                message('no_adapter_hint', "Tente executar 'ipconfig /all' no prompt de comando para verificar",
+                        foreground="gray", font=("Segoe UI", 8)),
+            ])
+            self.right_grid.clear()
+            self.switch_grid.clear()
             return
         
+        left_rows = []
+        
         # Status da conexão
         status_text = "Desconectado"
         status_color = "red"
-        if active_adapter:
-            if active_adapter.get('ipv4_address') or active_adapter.get('ipv6_address'):
-                status_text = "Conectado"
-                status_color = "green"
-        
-        ttk.Label(self.left_frame, text="Status da Conexão:", font=("Segoe UI", 9, "bold")).grid(
-            row=row, column=0, sticky=tk.W, pady=5
-        )
-        status_label = ttk.Label(
-            self.left_frame,
-            text=status_text,
-            font=("Segoe UI", 9, "bold"),
-            foreground=status_color
-        )
-        status_label.grid(row=row, column=1, sticky=tk.W, padx=(10, 0), pady=5)
-        row += 1
+        if adapters_pending:
+            status_text = PENDING_TEXT
+            status_color = "gray"
+        if active_adapter and active_adapter.has_address:
+            status_text = "Conectado"
+            status_color = "green"
+        left_rows.append(field('status', "Status da Conexão:", status_text, foreground=status_color,
+                               value_font=("Segoe UI", 9, "bold")))
         
         # Nome da interface
-        interface_name = active_adapter.get('name', 'N/A') if active_adapter else 'N/A'
-        ttk.Label(self.left_frame, text="Interface de Rede:", font=("Segoe UI", 9, "bold")).grid(
-            row=row, column=0, sticky=tk.W, pady=5
-        )
-        ttk.Label(self.left_frame, text=interface_name, font=("Segoe UI", 9)).grid(
-            row=row, column=1, sticky=tk.W, padx=(10, 0), pady=5
-        )
-        row += 1
+        interface_name = active_adapter.name if active_adapter else UNKNOWN
+        left_rows.append(field('interface', "Interface de Rede:", pending_or(interface_name, 'adapters')))
         
         # Descrição/Fabricante
-        description = active_adapter.get('description', 'N/A') if active_adapter else 'N/A'
-        if wmi_adapters and active_adapter:
-            for wmi_adapter in wmi_adapters:
-                if wmi_adapter.get('name') == interface_name or wmi_adapter.get('connection_id') == interface_name:
-                    if wmi_adapter.get('manufacturer'):
-                        description = f"{description} ({wmi_adapter.get('manufacturer')})"
-                    break
-        
-        ttk.Label(self.left_frame, text="Descrição/Fabricante:", font=("Segoe UI", 9, "bold")).grid(
-            row=row, column=0, sticky=tk.W, pady=5
-        )
-        desc_label = ttk.Label(self.left_frame, text=description, font=("Segoe UI", 9), wraplength=250)
-        desc_label.grid(row=row, column=1, sticky=tk.W, padx=(10, 0), pady=5)
-        row += 1
+        description = text(active_adapter.description) if active_adapter else 'N/A'
+        if active_adapter and active_adapter.manufacturer:
+            description = f"{description} ({active_adapter.manufacturer})"
+        left_rows.append(field('description', "Descrição/Fabricante:", pending_or(description, 'adapters'),
+                               wraplength=250))
         
         # Endereço MAC
-        mac_address = active_adapter.get('physical_address', 'N/A') if active_adapter else 'N/A'
-        ttk.Label(self.left_frame, text="Endereço MAC:", font=("Segoe UI", 9, "bold")).grid(
-            row=row, column=0, sticky=tk.W, pady=5
-        )
-        ttk.Label(self.left_frame, text=mac_address, font=("Segoe UI", 9)).grid(
-            row=row, column=1, sticky=tk.W, padx=(10, 0), pady=5
-        )
-        row += 1
+        mac_address = active_adapter.mac if active_adapter else UNKNOWN
+        left_rows.append(field('mac', "Endereço MAC:", pending_or(mac_address, 'adapters')))
         
         # Velocidade do link
         speed_text = "N/A"
-        if wmi_adapters and active_adapter:
-            for wmi_adapter in wmi_adapters:
-                if wmi_adapter.get('name') == interface_name or wmi_adapter.get('connection_id') == interface_name:
-                    speed = wmi_adapter.get('speed', 0)
-                    if speed:
-                        if speed >= 1000000000:  # 1 Gbps
-                            speed_text = f"{speed / 1000000000:.0f} Gbps"
-                        elif speed >= 1000000:  # 1 Mbps
-                            speed_text = f"{speed / 1000000:.0f} Mbps"
-                        else:
-                            speed_text = f"{speed} bps"
-                    break
-        
-        ttk.Label(self.left_frame, text="Velocidade do Link:", font=("Segoe UI", 9, "bold")).grid(
-            row=row, column=0, sticky=tk.W, pady=5
-        )
-        ttk.Label(self.left_frame, text=speed_text, font=("Segoe UI", 9)).grid(
-            row=row, column=1, sticky=tk.W, padx=(10, 0), pady=5
-        )
-        row += 1
+        speed = active_adapter.speed_bps if active_adapter else UNKNOWN
+        if speed:
+            if speed >= 1000000000:  # 1 Gbps
+                speed_text = f"{speed / 1000000000:.0f} Gbps"
+            elif speed >= 1000000:  # 1 Mbps
+                speed_text = f"{speed / 1000000:.0f} Mbps"
+            else:
+                speed_text = f"{speed} bps"
+        left_rows.append(field('speed', "Velocidade do Link:", pending_or(speed_text, 'wmi', 'adapters')))
         
-        # Separador
-        ttk.Separator(self.left_frame, orient='horizontal').grid(
-            row=row, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=10
-        )
-        row += 1
+        left_rows.append(separator('sep_ip'))
         
-        # Endereço IPv4
-        ipv4 = active_adapter.get('ipv4_address', 'N/A') if active_adapter else 'N/A'
-        ttk.Label(self.left_frame, text="Endereço IPv4:", font=("Segoe UI", 9, "bold")).grid(
-            row=row, column=0, sticky=tk.W, pady=5
-        )
-        ttk.Label(self.left_frame, text=ipv4, font=("Segoe UI", 9)).grid(
-            row=row, column=1, sticky=tk.W, padx=(10, 0), pady=5
-        )
-        row += 1
-        
-        # Máscara de sub-rede
-        subnet = active_adapter.get('ipv4_subnet', 'N/A') if active_adapter else 'N/A'
-        ttk.Label(self.left_frame, text="Máscara de Sub-rede:", font=("Segoe UI", 9, "bold")).grid(
-            row=row, column=0, sticky=tk.W, pady=5
-        )
-        ttk.Label(self.left_frame, text=subnet, font=("Segoe UI", 9)).grid(
-            row=row, column=1, sticky=tk.W, padx=(10, 0), pady=5
-        )
-        row += 1
-        
-        # Endereço IPv6 (se disponível)
-        ipv6 = active_adapter.get('ipv6_address', '') if active_adapter else ''
-        if not ipv6 and wmi_ip_configs:
-            for ip_config in wmi_ip_configs:
-                if ip_config.get('mac_address') == mac_address.replace('-', ':') or \
-                   ip_config.get('description') == description:
-                    ip_addresses = ip_config.get('ip_addresses', [])
-                    for addr in ip_addresses:
-                        if ':' in addr and not addr.startswith('fe80'):
-                            ipv6 = addr
-                            break
-                    if ipv6:
-                        break
+        # Endereço IPv4 e máscara de sub-rede
+        ipv4 = active_adapter.ipv4_address if active_adapter else UNKNOWN
+        left_rows.append(field('ipv4', "Endereço IPv4:", pending_or(ipv4, 'adapters')))
+        subnet = active_adapter.ipv4_subnet if active_adapter else UNKNOWN
+        left_rows.append(field('subnet', "Máscara de Sub-rede:", pending_or(subnet, 'adapters')))
         
+        # Endereço IPv6 (se disponível; o WMI completa o que a enumeração não trouxe)
+        ipv6 = active_adapter.ipv6_address if active_adapter else UNKNOWN
         if ipv6:
-            ttk.Label(self.left_frame, text="Endereço IPv6:", font=("Segoe UI", 9, "bold")).grid(
-                row=row, column=0, sticky=tk.W, pady=5
-            )
-            ipv6_label = ttk.Label(self.left_frame, text=ipv6, font=("Segoe UI", 9), wraplength=250)
-            ipv6_label.grid(row=row, column=1, sticky=tk.W, padx=(10, 0), pady=5)
-            row += 1
+            left_rows.append(field('ipv6', "Endereço IPv6:", ipv6, wraplength=250))
         
         # Gateway padrão
-        gateway = active_adapter.get('default_gateway', '') if active_adapter else ''
-        if not gateway:
-            gateway = self.network_info.get('default_gateway', 'N/A')
-        if not gateway:
-            gateway = 'N/A'
-        
-        ttk.Label(self.left_frame, text="Gateway Padrão:", font=("Segoe UI", 9, "bold")).grid(
-            row=row, column=0, sticky=tk.W, pady=5
-        )
-        ttk.Label(self.left_frame, text=gateway, font=("Segoe UI", 9)).grid(
-            row=row, column=1, sticky=tk.W, padx=(10, 0), pady=5
-        )
-        row += 1
+        gateway = text((active_adapter.default_gateway if active_adapter else UNKNOWN) or snapshot.default_gateway)
+        left_rows.append(field('gateway', "Gateway Padrão:", pending_or(gateway, 'gateway', 'adapters')))
         
-        # === FRAME DIREITO - Informações Detalhadas ===
+        self.left_grid.update(left_rows)
         
-        right_row = 0
-        
-        # Hostname
-        hostname = self.network_info.get('hostname', 'N/A')
-        ttk.Label(self.right_frame, text="Hostname:", font=("Segoe UI", 9, "bold")).grid(
-            row=right_row, column=0, sticky=tk.W, pady=5
-        )
-        ttk.Label(self.right_frame, text=hostname, font=("Segoe UI", 9)).grid(
-            row=right_row, column=1, sticky=tk.W, padx=(10, 0), pady=5
-        )
-        right_row += 1
+        # === FRAME DIREITO - Informações Detalhadas ===
         
-        # FQDN
-        fqdn = self.network_info.get('fqdn', 'N/A')
-        ttk.Label(self.right_frame, text="FQDN:", font=("Segoe UI", 9, "bold")).grid(
-            row=right_row, column=0, sticky=tk.W, pady=5
-        )
-        ttk.Label(self.right_frame, text=fqdn, font=("Segoe UI", 9)).grid(
-            row=right_row, column=1, sticky=tk.W, padx=(10, 0), pady=5
-        )
-        right_row += 1
+        right_rows = [
+            field('hostname', "Hostname:", text(snapshot.hostname)),
+            field('fqdn', "FQDN:", text(snapshot.fqdn)),
+        ]
         
         # DHCP
-        dhcp_enabled = active_adapter.get('dhcp_enabled', False) if active_adapter else False
+        dhcp_enabled = active_adapter.dhcp_enabled if active_adapter else UNKNOWN
         dhcp_text = "Sim" if dhcp_enabled else "Não"
-        ttk.Label(self.right_frame, text="DHCP Habilitado:", font=("Segoe UI", 9, "bold")).grid(
-            row=right_row, column=0, sticky=tk.W, pady=5
-        )
-        ttk.Label(self.right_frame, text=dhcp_text, font=("Segoe UI", 9)).grid(
-            row=right_row, column=1, sticky=tk.W, padx=(10, 0), pady=5
-        )
-        right_row += 1
+        if adapters_pending:
+            dhcp_text = PENDING_TEXT
+        right_rows.append(field('dhcp', "DHCP Habilitado:", dhcp_text))
         
-        # Separador
-        ttk.Separator(self.right_frame, orient='horizontal').grid(
-            row=right_row, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=10
-        )
-        right_row += 1
+        right_rows.append(separator('sep_dns'))
         
         # Servidores DNS
-        dns_servers = active_adapter.get('dns_servers', []) if active_adapter else []
-        if not dns_servers:
-            dns_servers = self.network_info.get('dns_servers', [])
-        
-        ttk.Label(self.right_frame, text="Servidores DNS:", font=("Segoe UI", 9, "bold")).grid(
-            row=right_row, column=0, sticky=tk.W, pady=5
-        )
+        dns_servers = (active_adapter.dns_servers if active_adapter else ()) or snapshot.dns_servers
         if dns_servers:
-            dns_text = "\n".join(dns_servers) if isinstance(dns_servers, list) else str(dns_servers)
-            dns_label = ttk.Label(self.right_frame, text=dns_text, font=("Segoe UI", 9))
-            dns_label.grid(row=right_row, column=1, sticky=tk.W, padx=(10, 0), pady=5)
+            dns_text = "\n".join(dns_servers)
         else:
-            ttk.Label(self.right_frame, text="N/A", font=("Segoe UI", 9)).grid(
-                row=right_row, column=1, sticky=tk.W, padx=(10, 0), pady=5
-            )
-        right_row += 1
-        
-        # Separador
-        ttk.Separator(self.right_frame, orient='horizontal').grid(
-            row=right_row, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=10
-        )
-        right_row += 1
+            dns_text = pending_or('N/A', 'dns', 'adapters')
+        right_rows.append(field('dns', "Servidores DNS:", dns_text))
         
-        # Informações adicionais
-        ttk.Label(self.right_frame, text="Informações Adicionais:", font=("Segoe UI", 9, "bold")).grid(
-            row=right_row, column=0, columnspan=2, sticky=tk.W, pady=5
-        )
-        right_row += 1
-        
-        # Teste de conectividade básico (executado em thread separada para não travar)
-        ttk.Label(self.right_frame, text="Conectividade:", font=("Segoe UI", 9)).grid(
-            row=right_row, column=0, sticky=tk.W, pady=2
-        )
-        connectivity_label = ttk.Label(self.right_frame, text="Testando...", font=("Segoe UI", 9))
-        connectivity_label.grid(row=right_row, column=1, sticky=tk.W, padx=(10, 0), pady=2)
-        right_row += 1
+        right_rows.append(separator('sep_extra'))
+        right_rows.append(heading('extra', "Informações Adicionais:"))
         
-        # Executa teste em thread separada
-        def test_and_update_connectivity():
-            try:
-                # Testa conectividade com gateway
-                if gateway and gateway != 'N/A':
-                    result = subprocess.run(
-                        ["ping", "-n", "1", "-w", "1000", gateway],
-                        capture_output=True,
-                        timeout=2,
-                        creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                    )
-                    if result.returncode == 0:
-                        result_text = "Gateway acessível"
-                    else:
-                        result_text = "Gateway não acessível"
-                else:
-                    result_text = "Gateway não configurado"
-            except Exception:
-                result_text = "Não testado"
-            
-            # Atualiza label na thread principal
-            if self.root_window:
-                # Usa uma função lambda com valor capturado corretamente
-                def update_label(text=result_text):
-                    connectivity_label.config(text=text)
-                self.root_window.after(0, update_label)
-        
-        # Inicia teste em background
-        threading.Thread(target=test_and_update_connectivity, daemon=True).start()
+        # Conectividade: mantém o último resultado do mesmo gateway até o novo teste
+        # terminar, evitando que o texto pisque a cada atualização automática
+        if self.connectivity_result and self.connectivity_result[0] == gateway:
+            connectivity_text = self.connectivity_result[1]
+        else:
+            connectivity_text = PENDING_TEXT if pending else "Testando..."
+        right_rows.append(field('connectivity', "Conectividade:", connectivity_text,
+                                label_font=("Segoe UI", 9), pady=2))
         
         # Status da interface (se disponível via WMI)
-        if wmi_adapters and active_adapter:
-            for wmi_adapter in wmi_adapters:
-                if wmi_adapter.get('name') == interface_name or wmi_adapter.get('connection_id') == interface_name:
-                    status_code = wmi_adapter.get('status', 0)
-                    status_map = {
-                        0: "Desconectado",
-                        1: "Conectando",
-                        2: "Conectado",
-                        3: "Desconectando",
-                        4: "Hardware não presente",
-                        5: "Hardware desabilitado",
-                        6: "Hardware com falha",
-                        7: "Mídia desconectada",
-                        8: "Autenticando",
-                        9: "Autenticação bem-sucedida",
-                        10: "Autenticação falhou",
-                        11: "Endereço IP inválido",
-                        12: "Credenciais necessárias"
-                    }
-                    interface_status = status_map.get(status_code, f"Status {status_code}")
-                    
-                    ttk.Label(self.right_frame, text="Status da Interface:", font=("Segoe UI", 9)).grid(
-                        row=right_row, column=0, sticky=tk.W, pady=2
-                    )
-                    ttk.Label(self.right_frame, text=interface_status, font=("Segoe UI", 9)).grid(
-                        row=right_row, column=1, sticky=tk.W, padx=(10, 0), pady=2
-                    )
-                    break
+        if active_adapter and active_adapter.status_code is not UNKNOWN:
+            status_code = active_adapter.status_code
+            status_map = {
+                0: "Desconectado",
+                1: "Conectando",
+                2: "Conectado",
+                3: "Desconectando",
+                4: "Hardware não presente",
+                5: "Hardware desabilitado",
+                6: "Hardware com falha",
+                7: "Mídia desconectada",
+                8: "Autenticando",
+                9: "Autenticação bem-sucedida",
+                10: "Autenticação falhou",
+                11: "Endereço IP inválido",
+                12: "Credenciais necessárias"
+            }
+            interface_status = status_map.get(status_code, f"Status {status_code}")
+            right_rows.append(field('interface_status', "Status da Interface:", interface_status,
+                                    label_font=("Segoe UI", 9), pady=2))
+        
+        self.right_grid.update(right_rows)
+        
+        # Teste de conectividade básico (executado em thread separada para não travar),
+        # apenas com o resultado final da coleta
+        if not pending:
+            self.executor.submit(
+                CONNECTIVITY_JOB,
+                self._test_connectivity,
+                options={'gateway': gateway},
+                priority=PRIORITY_BACKGROUND,
+                callback=self._on_connectivity_tested
+            )
         
         # === FRAME DO SWITCH - Informações do Switch ===
-        self._display_switch_info()
-
+        self._display_switch_info(snapshot, pending)
+    
+    def _test_connectivity(self, options):
+        """Testa a conectividade com o gateway (thread do executor)"""
+        gateway = options.get('gateway')
+        try:
+            # Testa conectividade com gateway (ICMP no próprio processo, sem ping.exe)
+            if gateway and gateway != 'N/A':
+                result = get_prober().probe_one(
+                    gateway, count=CONNECTIVITY_PROBE_COUNT, timeout=1.0, interval=0.1
+                )
+                if result.reachable:
+                    return f"Gateway acessível ({result.summary()})"
+                return "Gateway não acessível"
+            return "Gateway não configurado"
+        except Exception as e:
+            print(f"Erro ao testar conectividade: {e}")  # Debug
+            return "Não testado"
+    
+    def _on_connectivity_tested(self, job):
+        """Agenda a exibição do resultado do teste de conectividade"""
+        if not self.root_window:
+            return
+        gateway = job.options.get('gateway')
+        text = job.result if job.error is None else "Não testado"
+        try:
+            self.root_window.after(0, lambda: self._set_connectivity(gateway, text))
+        except (tk.TclError, RuntimeError):
+            pass
+    
+    def _set_connectivity(self, gateway, text):
+        """Exibe o resultado do teste de conectividade (thread principal)"""
+        self.connectivity_result = (gateway, text)
+        if self.right_grid and self.right_grid.parent.winfo_exists():
+            self.right_grid.set_value('connectivity', text)
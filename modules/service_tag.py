@@ -4,11 +4,13 @@ Módulo para coleta e exibição de Service Tag / Número de Série
 
 import tkinter as tk
 from tkinter import ttk
-import subprocess
 import platform
 import socket
 import os
 
+from utils.command_runner import run_command
+from utils.powershell_host import run_powershell
+
 
 class ServiceTagModule:
     """Módulo para obter Service Tag do dispositivo Windows"""
@@ -131,12 +133,7 @@ class ServiceTagModule:
         """Obtém Service Tag via comando do sistema"""
         try:
             # Método 1: wmic bios get serialnumber
-            result = subprocess.run(
-                ["wmic", "bios", "get", "serialnumber"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_command(["wmic", "bios", "get", "serialnumber"], timeout=5)
             
             if result.returncode == 0:
                 lines = result.stdout.strip().split('\n')
@@ -147,20 +144,13 @@ class ServiceTagModule:
             
             # Método 2: PowerShell
             ps_command = "Get-WmiObject Win32_BIOS | Select-Object -ExpandProperty SerialNumber"
-            result = subprocess.run(
-                ["powershell", "-Command", ps_command],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_powershell(ps_command, timeout=5)
             
             if result.returncode == 0:
                 serial = result.stdout.strip()
                 if serial:
                     return serial
                     
-        except subprocess.TimeoutExpired:
-            pass
         except Exception:
             pass
         
@@ -214,13 +204,7 @@ class ServiceTagModule:
             try:
                 # Método 1: PowerShell - Win32_ComputerSystem (mais confiável para domínio real)
                 ps_command = "(Get-WmiObject -Class Win32_ComputerSystem).Domain"
-                result = subprocess.run(
-                    ["powershell", "-NoProfile", "-Command", ps_command],
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                    creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                )
+                result = run_powershell(ps_command, timeout=5)
                 if result.returncode == 0 and result.stdout.strip():
                     domain_value = result.stdout.strip()
                     if domain_value:
@@ -228,13 +212,7 @@ class ServiceTagModule:
                 
                 # Método 2: WMI direto com /value
                 if domain_workgroup == "Não disponível" or domain_workgroup.upper() == "WORKGROUP":
-                    result = subprocess.run(
-                        ["wmic", "computersystem", "get", "domain", "/value"],
-                        capture_output=True,
-                        text=True,
-                        timeout=5,
-                        creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                    )
+                    result = run_command(["wmic", "computersystem", "get", "domain", "/value"], timeout=5)
                     if result.returncode == 0 and result.stdout:
                         for line in result.stdout.split('\n'):
                             line = line.strip()
@@ -247,13 +225,7 @@ class ServiceTagModule:
                 # Método 3: PowerShell - Get-ADDomain (se estiver em domínio Active Directory)
                 if domain_workgroup == "Não disponível" or domain_workgroup.upper() == "WORKGROUP":
                     ps_command = "try { (Get-ADDomain).DNSRoot } catch { $null }"
-                    result = subprocess.run(
-                        ["powershell", "-NoProfile", "-Command", ps_command],
-                        capture_output=True,
-                        text=True,
-                        timeout=5,
-                        creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                    )
+                    result = run_powershell(ps_command, timeout=5)
                     if result.returncode == 0 and result.stdout.strip():
                         domain_value = result.stdout.strip()
                         if domain_value:
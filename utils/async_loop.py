@@ -0,0 +1,79 @@
+"""
+Loop asyncio compartilhado para a E/S de rede feita dentro do processo
+Sondagem ICMP/TCP, SNMP e demais clientes UDP registram seus sockets no mesmo
+loop, executado em uma única thread em segundo plano, em vez de cada um
+criar a sua.
+"""
+
+import asyncio
+import threading
+
+
+class AsyncLoopThread:
+    """Loop de eventos executado em uma thread dedicada"""
+
+    def __init__(self, name="rede"):
+        """
+        Args:
+            name: Nome da thread do loop
+        """
+        self.name = name
+        self.loop = None
+        self.lock = threading.Lock()
+
+    def submit(self, coroutine):
+        """
+        Agenda uma corrotina no loop e retorna imediatamente
+
+        Returns:
+            concurrent.futures.Future com o resultado da corrotina
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.ensure_loop())
+
+    def run(self, coroutine, timeout=None):
+        """Executa uma corrotina no loop e aguarda o resultado (bloqueia a thread chamadora)"""
+        return self.submit(coroutine).result(timeout)
+
+    def call_soon(self, callback, *args):
+        """Agenda uma função no loop (seguro a partir de outras threads)"""
+        self.ensure_loop().call_soon_threadsafe(callback, *args)
+
+    def ensure_loop(self):
+        """Inicia o loop em uma thread dedicada, se necessário"""
+        with self.lock:
+            if self.loop is not None:
+                return self.loop
+            # Os sockets ICMP/UDP usam add_reader, que exige o loop baseado em select
+            loop = asyncio.SelectorEventLoop()
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(loop)
+                ready.set()
+                loop.run_forever()
+
+            threading.Thread(target=run_loop, name=self.name, daemon=True).start()
+            ready.wait()
+            self.loop = loop
+            return loop
+
+    def close(self):
+        """Encerra o loop de eventos"""
+        with self.lock:
+            loop = self.loop
+            self.loop = None
+        if loop:
+            loop.call_soon_threadsafe(loop.stop)
+
+
+_shared_loop = None
+_shared_loop_lock = threading.Lock()
+
+
+def get_network_loop():
+    """Retorna o loop de rede compartilhado pelo aplicativo"""
+    global _shared_loop
+    with _shared_loop_lock:
+        if _shared_loop is None:
+            _shared_loop = AsyncLoopThread()
+        return _shared_loop
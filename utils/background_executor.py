@@ -0,0 +1,277 @@
+"""
+Executor de tarefas em segundo plano com uma única thread de trabalho
+Substitui a criação de uma thread por atualização: as tarefas entram em uma
+fila limitada com prioridade, e pedidos repetidos para a mesma chave são
+agrupados em uma única execução.
+
+Verificação: python -m utils.background_executor
+"""
+
+import itertools
+import threading
+import time
+
+
+# Prioridades (menor valor executa primeiro)
+PRIORITY_MANUAL = 0
+PRIORITY_AUTO = 1
+PRIORITY_BACKGROUND = 2
+
+
+class Job:
+    """Tarefa agendada no executor"""
+
+    def __init__(self, key, func, options, priority, sequence):
+        self.key = key
+        self.func = func
+        self.options = options
+        self.priority = priority
+        self.sequence = sequence
+        self.callbacks = []
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.requests = 1
+
+    @property
+    def wait_time(self):
+        """Tempo (segundos) entre o pedido e o início da execução"""
+        if self.started_at is None:
+            return None
+        return self.started_at - self.submitted_at
+
+    @property
+    def run_time(self):
+        """Tempo (segundos) de execução"""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def __repr__(self):
+        return f"Job(key={self.key!r}, priority={self.priority}, requests={self.requests})"
+
+
+class BackgroundExecutor:
+    """Fila limitada de tarefas executadas uma de cada vez, com agrupamento por chave"""
+
+    def __init__(self, max_queue=8, name="executor"):
+        """
+        Args:
+            max_queue: Número máximo de tarefas aguardando (pedidos além disso são recusados)
+            name: Nome da thread de trabalho
+        """
+        self.max_queue = max_queue
+        self.name = name
+        self.queue = []
+        self.running = None
+        self.condition = threading.Condition()
+        self.thread = None
+        self.closed = False
+        self.sequence = itertools.count()
+        self.counters = {'submitted': 0, 'coalesced': 0, 'rejected': 0, 'completed': 0, 'failed': 0}
+        self.last_latency = {}
+
+    def submit(self, key, func, options=None, priority=PRIORITY_AUTO, callback=None,
+               merge=None, running_covers=None):
+        """
+        Agenda uma tarefa, agrupando-a com um pedido equivalente se houver
+
+        Args:
+            key: Identifica pedidos equivalentes (um por chave na fila)
+            func: Função chamada na thread de trabalho como func(options)
+            options: Dicionário de opções da tarefa
+            priority: PRIORITY_MANUAL, PRIORITY_AUTO ou PRIORITY_BACKGROUND
+            callback: Chamada como callback(job) na thread de trabalho ao terminar
+                (o mesmo callback não é registrado duas vezes na mesma tarefa)
+            merge: Função merge(opções_atuais, opções_novas) que combina os pedidos
+                agrupados (padrão: as novas opções substituem as atuais)
+            running_covers: Função running_covers(opções_em_execução, opções_novas);
+                se retornar True, o pedido é atendido pela tarefa já em execução
+
+        Returns:
+            Job que atenderá o pedido, ou None se a fila estiver cheia
+        """
+        options = dict(options or {})
+        with self.condition:
+            if self.closed:
+                return None
+            self.counters['submitted'] += 1
+
+            job = next((queued for queued in self.queue if queued.key == key), None)
+            if job is None and self.running is not None and self.running.key == key and \
+                    running_covers and running_covers(self.running.options, options):
+                job = self.running
+
+            if job is not None:
+                self.counters['coalesced'] += 1
+                job.requests += 1
+                job.options = merge(job.options, options) if merge else options
+                if job is not self.running:
+                    job.func = func
+                    job.priority = min(job.priority, priority)
+                if callback and callback not in job.callbacks:
+                    job.callbacks.append(callback)
+                self.condition.notify()
+                return job
+
+            if len(self.queue) >= self.max_queue:
+                self.counters['rejected'] += 1
+                print(f"Fila do {self.name} cheia; pedido {key!r} descartado")  # Debug
+                return None
+
+            job = Job(key, func, options, priority, next(self.sequence))
+            if callback:
+                job.callbacks.append(callback)
+            self.queue.append(job)
+            self._ensure_worker()
+            self.condition.notify()
+            return job
+
+    def cancel_pending(self, key=None):
+        """Remove da fila as tarefas ainda não iniciadas (todas ou só as da chave)"""
+        with self.condition:
+            kept = [job for job in self.queue if key is not None and job.key != key]
+            removed = len(self.queue) - len(kept)
+            self.queue = kept
+            return removed
+
+    def stats(self):
+        """Retorna profundidade da fila, tarefa em execução, contadores e latências"""
+        with self.condition:
+            return {
+                'queue_depth': len(self.queue),
+                'running': self.running.key if self.running else None,
+                'counters': dict(self.counters),
+                'last_latency': dict(self.last_latency)
+            }
+
+    def shutdown(self):
+        """Descarta a fila e encerra a thread de trabalho após a tarefa atual"""
+        with self.condition:
+            self.closed = True
+            self.queue = []
+            self.condition.notify_all()
+
+    def _ensure_worker(self):
+        """Inicia a thread de trabalho, se necessário (chamado com o lock)"""
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._worker, name=self.name, daemon=True)
+            self.thread.start()
+
+    def _next_job(self):
+        """Aguarda e retira a tarefa de maior prioridade (None ao encerrar)"""
+        with self.condition:
+            while not self.queue and not self.closed:
+                self.condition.wait()
+            if self.closed:
+                return None
+            job = min(self.queue, key=lambda queued: (queued.priority, queued.sequence))
+            self.queue.remove(job)
+            job.started_at = time.monotonic()
+            self.running = job
+            return job
+
+    def _worker(self):
+        """Executa as tarefas da fila, uma de cada vez"""
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                job.result = job.func(job.options)
+            except Exception as e:
+                print(f"Erro na tarefa {job.key!r}: {e}")
+                job.error = e
+            job.finished_at = time.monotonic()
+
+            with self.condition:
+                self.running = None
+                self.counters['failed' if job.error else 'completed'] += 1
+                self.last_latency[job.key] = {
+                    'wait': job.wait_time,
+                    'run': job.run_time,
+                    'requests': job.requests
+                }
+                callbacks = list(job.callbacks)
+
+            for callback in callbacks:
+                try:
+                    callback(job)
+                except Exception as e:
+                    print(f"Erro ao concluir a tarefa {job.key!r}: {e}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    failures = 0
+
+    def check(description, condition):
+        global failures
+        if not condition:
+            failures += 1
+            print(f"  FALHOU: {description}")
+
+    executed = []
+    gate = threading.Event()
+    started = threading.Event()
+
+    def blocking(options):
+        started.set()
+        gate.wait(5)
+        executed.append(('bloqueio', options))
+
+    def record(key):
+        return lambda options: executed.append((key, options))
+
+    def merge(current, new):
+        return {'manual': current.get('manual') or new.get('manual'),
+                'adapters': sorted(set(current.get('adapters', [])) | set(new.get('adapters', [])))}
+
+    done = []
+    executor = BackgroundExecutor(max_queue=3)
+    executor.submit('bloqueio', blocking)
+    started.wait(5)
+
+    # Cinco pedidos de coleta enquanto o executor está ocupado: uma única tarefa
+    jobs = [executor.submit('coleta', record('coleta'), {'adapters': [name]}, callback=done.append, merge=merge)
+            for name in ('eth0', 'eth1', 'eth0', 'wlan0', 'eth1')]
+    check("pedidos da mesma chave agrupados", all(job is jobs[0] for job in jobs) and jobs[0].requests == 5)
+    check("opções combinadas", jobs[0].options == {'manual': None, 'adapters': ['eth0', 'eth1', 'wlan0']})
+    check("callback registrado uma vez", jobs[0].callbacks == [done.append])
+
+    # Prioridade: a tarefa manual passa na frente das automáticas e de fundo
+    executor.submit('inventario', record('inventario'), priority=PRIORITY_BACKGROUND)
+    executor.submit('switch', record('switch'), priority=PRIORITY_MANUAL)
+    check("fila cheia recusa", executor.submit('extra', record('extra')) is None)
+    check("agrupamento aceito com a fila cheia",
+          executor.submit('coleta', record('coleta'), {'manual': True}, merge=merge) is jobs[0])
+    gate.set()
+    deadline = time.monotonic() + 5
+    while len(executed) < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    check(f"ordem por prioridade ({[key for key, _ in executed]})",
+          [key for key, _ in executed] == ['bloqueio', 'switch', 'coleta', 'inventario'])
+    check("coleta executada uma vez com as opções combinadas",
+          executed[2][1] == {'manual': True, 'adapters': ['eth0', 'eth1', 'wlan0']} and len(done) == 1)
+
+    # running_covers: pedido atendido pela tarefa já em execução, ou enfileirado se ela não cobre
+    gate.clear()
+    started.clear()
+    running = executor.submit('coleta', blocking, {'adapters': ['eth0']})
+    started.wait(5)
+    covered = executor.submit('coleta', record('coleta'), {'adapters': ['eth0']},
+                              running_covers=lambda current, new: set(new['adapters']) <= set(current['adapters']))
+    uncovered = executor.submit('coleta', record('coleta'), {'adapters': ['wlan0']},
+                                running_covers=lambda current, new: set(new['adapters']) <= set(current['adapters']))
+    check("pedido coberto pela tarefa em execução", covered is running and running.requests == 2)
+    check("pedido não coberto enfileirado", uncovered is not running and executor.stats()['queue_depth'] == 1)
+    gate.set()
+    executor.shutdown()
+    counters = executor.stats()['counters']
+    check(f"contadores ({counters})", counters['coalesced'] == 6 and counters['rejected'] == 1)
+
+    print("Verificações concluídas" if not failures else f"{failures} verificações falharam")
+    sys.exit(1 if failures else 0)
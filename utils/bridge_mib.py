@@ -0,0 +1,187 @@
+"""
+Localização da porta do switch pela tabela de encaminhamento (BRIDGE-MIB / Q-BRIDGE-MIB)
+Encontra em qual porta (e VLAN) o switch aprendeu o MAC desta máquina,
+mesmo com LLDP/CDP desligados:
+
+1. dot1dTpFdbPort.<mac>: consulta direta (um GET) nas bridges sem VLAN
+2. dot1qTpFdbPort: percorrida com GETBULK, em fluxo, até achar o MAC
+   (o índice é <fdbId>.<mac>, e o fdbId não é conhecido de antemão)
+3. dot1dBasePortIfIndex + dot1qPvid: porta da bridge -> ifIndex e VLAN nativa
+4. ifName / ifDescr: nome da porta como o switch o exibe (ex.: Gi1/0/12)
+
+A tabela é filtrada à medida que chega, sem ser acumulada: FDBs com dezenas
+de milhares de entradas são percorridas em memória constante.
+"""
+
+import sys
+import time
+
+from utils.async_loop import get_network_loop
+from utils.snmp import SnmpClient, SnmpError, StandInAgent, as_text
+
+
+OID_DOT1D_TP_FDB_PORT = '1.3.6.1.2.1.17.4.3.1.2'
+OID_DOT1D_BASE_PORT_IFINDEX = '1.3.6.1.2.1.17.1.4.1.2'
+OID_DOT1Q_TP_FDB_PORT = '1.3.6.1.2.1.17.7.1.2.2.1.2'
+OID_DOT1Q_VLAN_FDB_ID = '1.3.6.1.2.1.17.7.1.4.2.1.3'
+OID_DOT1Q_PVID = '1.3.6.1.2.1.17.7.1.4.5.1.1'
+OID_IF_NAME = '1.3.6.1.2.1.31.1.1.1.1'
+OID_IF_DESCR = '1.3.6.1.2.1.2.2.1.2'
+
+# Linhas pedidas por GETBULK (a resposta continua cabendo em um datagrama comum)
+FDB_BULK_SIZE = 50
+
+
+def mac_to_oid_suffix(mac):
+    """Converte AA-BB-CC-DD-EE-FF (ou AA:BB:...) no sufixo de índice '170.187.204.221.238.255'"""
+    digits = mac.replace('-', '').replace(':', '').replace('.', '')
+    if len(digits) != 12:
+        raise ValueError(f"MAC inválido: {mac}")
+    return '.'.join(str(int(digits[index:index + 2], 16)) for index in range(0, 12, 2))
+
+
+def _integer(value):
+    """Valor inteiro de um varbind (None para exceções/ausente)"""
+    return value if isinstance(value, int) else None
+
+
+class SwitchPortLocator:
+    """Descobre a porta e a VLAN do switch em que um MAC foi aprendido"""
+
+    def __init__(self, client=None, bulk_size=FDB_BULK_SIZE, deadline=8.0):
+        """
+        Args:
+            client: SnmpClient usado nas consultas (padrão: um novo, no loop compartilhado)
+            bulk_size: Linhas pedidas por GETBULK ao percorrer a FDB
+            deadline: Tempo máximo (segundos) percorrendo a FDB de um switch
+        """
+        self.client = client or SnmpClient()
+        self.bulk_size = bulk_size
+        self.deadline = deadline
+        self.last_stats = {}
+
+    def locate(self, host, mac, community='public'):
+        """Versão síncrona de locate_async (bloqueia a thread chamadora)"""
+        return self.client.loop_thread.run(self.locate_async(host, mac, community))
+
+    async def locate_async(self, host, mac, community='public'):
+        """
+        Procura o MAC na FDB do switch
+
+        Returns:
+            Dicionário com port_id, vlan_id, bridge_port, if_index e source
+            ('dot1d' ou 'dot1q'), ou None se o MAC não for encontrado
+        """
+        started = time.monotonic()
+        suffix = mac_to_oid_suffix(mac)
+        self.last_stats = {'entries_scanned': 0, 'source': None}
+
+        bridge_port, fdb_id, source = await self._find_in_dot1d(host, suffix, community)
+        if bridge_port is None:
+            bridge_port, fdb_id = await self._find_in_dot1q(host, suffix, community, started)
+            source = 'dot1q'
+        self.last_stats['elapsed'] = time.monotonic() - started
+        if bridge_port is None:
+            return None
+        self.last_stats['source'] = source
+
+        # Porta da bridge -> ifIndex e VLAN nativa da porta em um único PDU
+        oids = [f'{OID_DOT1D_BASE_PORT_IFINDEX}.{bridge_port}', f'{OID_DOT1Q_PVID}.{bridge_port}']
+        values = await self.client.get_async(host, oids, community)
+        if_index = _integer(values.get(oids[0]))
+        pvid = _integer(values.get(oids[1]))
+        vlan = await self._vlan_for_fdb(host, fdb_id, community) if fdb_id is not None else None
+
+        port_name = ''
+        if if_index:
+            names = await self.client.get_async(
+                host, [f'{OID_IF_NAME}.{if_index}', f'{OID_IF_DESCR}.{if_index}'], community
+            )
+            port_name = as_text(names.get(f'{OID_IF_NAME}.{if_index}')) or \
+                as_text(names.get(f'{OID_IF_DESCR}.{if_index}'))
+
+        self.last_stats['elapsed'] = time.monotonic() - started
+        vlan = vlan or pvid
+        return {
+            'port_id': port_name or f"Porta {bridge_port}",
+            'vlan_id': str(vlan) if vlan else 'N/A',
+            'bridge_port': bridge_port,
+            'if_index': if_index,
+            'source': source
+        }
+
+    async def _find_in_dot1d(self, host, suffix, community):
+        """GET direto de dot1dTpFdbPort.<mac>; retorna (porta, None, 'dot1d') ou (None, None, None)"""
+        oid = f'{OID_DOT1D_TP_FDB_PORT}.{suffix}'
+        try:
+            values = await self.client.get_async(host, [oid], community)
+        except SnmpError:
+            return None, None, None
+        port = _integer(values.get(oid))
+        if port:
+            return port, None, 'dot1d'
+        return None, None, None
+
+    async def _find_in_dot1q(self, host, suffix, community, started):
+        """Percorre dot1qTpFdbPort em fluxo até a linha <fdbId>.<mac>; retorna (porta, fdbId)"""
+        ending = '.' + suffix
+        scanned = 0
+        try:
+            async for oid, value in self.client.walk_iter_async(
+                    host, OID_DOT1Q_TP_FDB_PORT, community, self.bulk_size):
+                scanned += 1
+                if oid.endswith(ending):
+                    fdb_id = int(oid[len(OID_DOT1Q_TP_FDB_PORT) + 1:-len(ending)].split('.')[-1])
+                    port = _integer(value)
+                    if port:
+                        return port, fdb_id
+                if time.monotonic() - started > self.deadline:
+                    print(f"FDB de {host}: prazo esgotado após {scanned} entradas")  # Debug
+                    break
+        except SnmpError as e:
+            print(f"Erro ao percorrer a FDB de {host}: {e}")  # Debug
+        finally:
+            self.last_stats['entries_scanned'] = scanned
+        return None, None
+
+    async def _vlan_for_fdb(self, host, fdb_id, community):
+        """VLAN cujo dot1qVlanFdbId é fdb_id (na maioria dos switches são iguais)"""
+        try:
+            async for oid, value in self.client.walk_iter_async(
+                    host, OID_DOT1Q_VLAN_FDB_ID, community, self.bulk_size):
+                if _integer(value) == fdb_id:
+                    return int(oid.rsplit('.', 1)[1])
+        except SnmpError:
+            pass
+        return fdb_id
+
+
+if __name__ == "__main__":
+    # Benchmark: FDB Q-BRIDGE com 50 mil MACs, o desta máquina perto do fim
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    target = '00-1A-2B-3C-4D-5E'
+    mib = {}
+    for index in range(entries):
+        vlan = 10 + index % 20
+        mac = (0x020000000000 + index).to_bytes(6, 'big')
+        mib[f"{OID_DOT1Q_TP_FDB_PORT}.{vlan}.{'.'.join(str(byte) for byte in mac)}"] = 1 + index % 48
+    mib[f"{OID_DOT1Q_TP_FDB_PORT}.29.{mac_to_oid_suffix(target)}"] = 12
+    for vlan in range(10, 30):
+        mib[f"{OID_DOT1Q_VLAN_FDB_ID}.0.{vlan}"] = vlan
+    for port in range(1, 49):
+        mib[f"{OID_DOT1D_BASE_PORT_IFINDEX}.{port}"] = 10100 + port
+        mib[f"{OID_DOT1Q_PVID}.{port}"] = 1
+        mib[f"{OID_IF_NAME}.{10100 + port}"] = f"Gi1/0/{port}".encode()
+
+    async def benchmark():
+        agent = StandInAgent(mib, communities=('public',))
+        port = await agent.start()
+        locator = SwitchPortLocator(SnmpClient(port=port, timeout=1.0, loop_thread=network_loop))
+        started = time.perf_counter()
+        result = await locator.locate_async('127.0.0.1', target)
+        print(f"{result} em {(time.perf_counter() - started) * 1000:.0f} ms, "
+              f"{locator.last_stats['entries_scanned']} entradas, {agent.requests} pedidos")
+        agent.close()
+
+    network_loop = get_network_loop()
+    network_loop.run(benchmark())
@@ -0,0 +1,215 @@
+"""
+Decodificador de CDP (Cisco Discovery Protocol) dirigido por tabela
+Em redes Cisco o CDP é a única fonte do domínio VTP e, muitas vezes, da VLAN
+nativa e do duplex da porta. Os quadros chegam pela mesma escuta passiva do
+LLDP (utils.lldp.LldpListener) ou por reprodução de pcap, e o vizinho é
+devolvido no mesmo formato de dicionário do LLDP.
+
+Benchmark: python -m utils.cdp [quadros] gera um pcap com milhares de quadros
+CDP/LLDP/outros e mede a vazão do decodificador.
+"""
+
+import socket
+import struct
+import sys
+import time
+
+from utils.iphlpapi import format_mac
+
+
+CDP_MULTICAST = b'\x01\x00\x0c\xcc\xcc\xcc'
+# Cabeçalho LLC/SNAP do CDP: DSAP/SSAP 0xAA, controle 0x03, OUI Cisco, PID 0x2000
+CDP_SNAP_HEADER = b'\xaa\xaa\x03\x00\x00\x0c\x20\x00'
+
+CDP_CAPABILITY_NAMES = ('Router', 'Trans Bridge', 'Source Route Bridge', 'Switch', 'Host', 'IGMP', 'Repeater',
+                        'Phone', 'Remote', 'CVTA', 'Two-port Mac Relay')
+
+
+def _text(data):
+    return data.decode('utf-8', errors='replace').strip('\0').strip()
+
+
+def _decode_addresses(value):
+    """Lista de endereços do TLV Addresses/Management Addresses (apenas IPv4/IPv6)"""
+    count = struct.unpack_from('!I', value)[0]
+    offset = 4
+    addresses = []
+    for _ in range(count):
+        protocol_type, protocol_length = value[offset], value[offset + 1]
+        protocol = value[offset + 2:offset + 2 + protocol_length]
+        offset += 2 + protocol_length
+        length = struct.unpack_from('!H', value, offset)[0]
+        address = value[offset + 2:offset + 2 + length]
+        offset += 2 + length
+        # NLPID 0xCC = IPv4; SNAP com ethertype 0x86DD = IPv6
+        if protocol_type == 1 and protocol == b'\xcc' and length == 4:
+            addresses.append(socket.inet_ntop(socket.AF_INET, address))
+        elif protocol_type == 2 and protocol.endswith(b'\x86\xdd') and length == 16:
+            addresses.append(socket.inet_ntop(socket.AF_INET6, address))
+    return addresses
+
+
+# === Decodificadores de TLV: cada um recebe (valor, vizinho) e preenche o vizinho ===
+
+def _text_field(name):
+    def decode(value, neighbor):
+        neighbor[name] = _text(value)
+    return decode
+
+
+def _decode_device_id(value, neighbor):
+    neighbor['chassis_id'] = neighbor['system_name'] = _text(value)
+
+
+def _decode_address_list(value, neighbor):
+    neighbor.setdefault('addresses', []).extend(_decode_addresses(value))
+
+
+def _decode_management_addresses(value, neighbor):
+    neighbor.setdefault('management_addresses', []).extend(_decode_addresses(value))
+
+
+def _decode_capabilities(value, neighbor):
+    bits = struct.unpack_from('!I', value)[0]
+    neighbor['capabilities'] = [name for bit, name in enumerate(CDP_CAPABILITY_NAMES) if bits & (1 << bit)]
+
+
+def _decode_native_vlan(value, neighbor):
+    neighbor['pvid'] = struct.unpack_from('!H', value)[0]
+
+
+def _decode_duplex(value, neighbor):
+    neighbor['duplex'] = 'Full' if value[0] else 'Half'
+
+
+# Tipo do TLV CDP -> decodificador (tipos desconhecidos são ignorados)
+TLV_DECODERS = {
+    0x0001: _decode_device_id,
+    0x0002: _decode_address_list,
+    0x0003: _text_field('port_id'),
+    0x0004: _decode_capabilities,
+    0x0005: _text_field('system_description'),
+    0x0006: _text_field('platform'),
+    0x0009: _text_field('vtp_domain'),
+    0x000a: _decode_native_vlan,
+    0x000b: _decode_duplex,
+    0x0016: _decode_management_addresses,
+}
+
+
+def decode_cdp(payload):
+    """
+    Decodifica um pacote CDP (após o cabeçalho LLC/SNAP)
+
+    Returns:
+        Dicionário do vizinho (chassis_id/system_name, port_id, ttl e os campos
+        opcionais presentes), ou None se não houver Device ID e Port ID
+    """
+    if len(payload) < 4:
+        return None
+    version, ttl = payload[0], payload[1]
+    neighbor = {'protocol': 'cdp', 'cdp_version': version, 'ttl': ttl}
+    offset = 4
+    while offset + 4 <= len(payload):
+        tlv_type, length = struct.unpack_from('!HH', payload, offset)
+        if length < 4:
+            break
+        value = payload[offset + 4:offset + length]
+        offset += length
+        if len(value) < length - 4:
+            break
+        decoder = TLV_DECODERS.get(tlv_type)
+        if decoder and value:
+            try:
+                decoder(value, neighbor)
+            except (IndexError, struct.error):
+                # TLV truncado: os demais continuam válidos
+                continue
+    if 'chassis_id' not in neighbor or 'port_id' not in neighbor:
+        return None
+    # Sem Management Addresses, o endereço da interface serve para gerência
+    if not neighbor.get('management_addresses') and neighbor.get('addresses'):
+        neighbor['management_addresses'] = list(neighbor['addresses'])
+    return neighbor
+
+
+def decode_frame(frame):
+    """Decodifica um quadro Ethernet 802.3 com CDP; retorna o vizinho ou None"""
+    if len(frame) < 22 or frame[:6] != CDP_MULTICAST or frame[14:22] != CDP_SNAP_HEADER:
+        return None
+    length = struct.unpack_from('!H', frame, 12)[0]
+    neighbor = decode_cdp(frame[22:14 + length] if length <= 1500 else frame[22:])
+    if neighbor is not None:
+        neighbor['source_mac'] = format_mac(frame[6:12])
+    return neighbor
+
+
+# === Construção de quadros (para testes e benchmarks) ===
+
+def encode_tlv(tlv_type, value):
+    """Codifica um TLV CDP (o comprimento inclui o cabeçalho de 4 bytes)"""
+    return struct.pack('!HH', tlv_type, len(value) + 4) + value
+
+
+def build_cdp_frame(device_id, port_id, ttl=180, platform='', software='', management_ip='',
+                    vtp_domain='', native_vlan=None, full_duplex=None, source_mac='00-11-22-33-44-55'):
+    """Monta um quadro Ethernet CDPv2 com os TLVs informados"""
+    tlvs = [encode_tlv(0x0001, device_id.encode())]
+    if management_ip:
+        address = struct.pack('!IBBBH', 1, 1, 1, 0xcc, 4) + socket.inet_aton(management_ip)
+        tlvs.append(encode_tlv(0x0002, address))
+    tlvs.append(encode_tlv(0x0003, port_id.encode()))
+    tlvs.append(encode_tlv(0x0004, struct.pack('!I', 0x28)))
+    if software:
+        tlvs.append(encode_tlv(0x0005, software.encode()))
+    if platform:
+        tlvs.append(encode_tlv(0x0006, platform.encode()))
+    if vtp_domain:
+        tlvs.append(encode_tlv(0x0009, vtp_domain.encode()))
+    if native_vlan is not None:
+        tlvs.append(encode_tlv(0x000a, struct.pack('!H', native_vlan)))
+    if full_duplex is not None:
+        tlvs.append(encode_tlv(0x000b, b'\x01' if full_duplex else b'\x00'))
+    payload = CDP_SNAP_HEADER + bytes((2, ttl)) + b'\x00\x00' + b''.join(tlvs)
+    source = bytes.fromhex(source_mac.replace('-', '').replace(':', ''))
+    return CDP_MULTICAST + source + struct.pack('!H', len(payload)) + payload
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    from utils.lldp import LldpListener, build_lldp_frame, merge_switch_info, write_pcap
+
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    frames = []
+    for index in range(total):
+        kind = index % 3
+        if kind == 0:
+            frame = build_cdp_frame(
+                f'sw-{index % 40}.lab', f'GigabitEthernet1/0/{index % 48 + 1}',
+                platform='cisco WS-C2960X-48FPD-L', software='Cisco IOS Software, C2960X Software',
+                management_ip=f'10.0.{index % 40}.1', vtp_domain='LAB', native_vlan=10 + index % 4,
+                full_duplex=True
+            )
+        elif kind == 1:
+            frame = build_lldp_frame(f'00:11:22:33:44:{index % 40:02x}', f'Gi1/0/{index % 48 + 1}',
+                                     system_name=f'sw-{index % 40}', pvid=10, mau_type=30)
+        else:
+            # Tráfego que não é de descoberta (ARP), descartado pelo decodificador
+            frame = b'\xff' * 6 + b'\x00\x11\x22\x33\x44\x55\x08\x06' + b'\x00' * 28
+        frames.append((1700000000 + index * 0.01, frame))
+
+    handle, path = tempfile.mkstemp(suffix='.pcap')
+    os.close(handle)
+    try:
+        write_pcap(path, frames)
+        listener = LldpListener()
+        started = time.perf_counter()
+        neighbors = listener.replay(path)
+        elapsed = time.perf_counter() - started
+        print(f"{total} quadros ({len(neighbors)} de descoberta) em {elapsed * 1000:.1f} ms "
+              f"= {total / elapsed:,.0f} quadros/s")
+        print(merge_switch_info(listener.cache.neighbors()))
+    finally:
+        os.remove(path)
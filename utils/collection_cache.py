@@ -0,0 +1,193 @@
+"""
+Cache com escopo de uma coleta (um refresh)
+Garante que cada comando ou sonda idêntico rode no máximo uma vez por coleta,
+mesmo quando pedido por várias threads ao mesmo tempo (single-flight)
+
+Verificação: python -m utils.collection_cache
+"""
+
+import functools
+import threading
+
+from utils.probe_scheduler import ProbeCancelled, check_cancelled
+
+
+class _CacheEntry:
+    """Valor (ou erro) de uma chave, com espera para quem chegou depois"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.cancelled = False
+
+
+class CollectionCache:
+    """Memoização single-flight com contagem de acertos e falhas"""
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute):
+        """
+        Retorna o valor da chave, calculando-o apenas na primeira vez
+
+        Args:
+            key: Chave hashable que identifica o comando ou sonda
+            compute: Função sem argumentos que produz o valor
+
+        Returns:
+            Valor calculado (ou compartilhado com a execução em andamento)
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            owner = entry is None
+            if owner:
+                entry = _CacheEntry()
+                self.entries[key] = entry
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if owner:
+            try:
+                entry.value = compute()
+            except ProbeCancelled:
+                # A sonda dona foi descartada: quem estava esperando calcula de novo
+                with self.lock:
+                    if self.entries.get(key) is entry:
+                        del self.entries[key]
+                entry.cancelled = True
+                raise
+            except Exception as e:
+                entry.error = e
+                raise
+            finally:
+                entry.done.set()
+            return entry.value
+
+        entry.done.wait()
+        if entry.cancelled:
+            return self.get_or_compute(key, compute)
+        if entry.error is not None:
+            raise entry.error
+        return entry.value
+
+    def stats(self):
+        """Retorna os contadores de acertos e falhas"""
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries)}
+
+
+def cached_probe(name):
+    """
+    Decorador para métodos de sonda: reaproveita o resultado durante a coleta
+
+    O objeto deve expor o atributo collection_cache (None fora de uma coleta).
+    Resultados dict são copiados para que o chamador possa alterá-los. Uma
+    sonda descartada pelo agendador para aqui (ProbeCancelled).
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args):
+            # O cache é lido antes da verificação: o agendador cancela as sondas
+            # antes de a coleta seguinte trocar o cache
+            cache = getattr(self, 'collection_cache', None)
+            check_cancelled()
+            if cache is None:
+                return method(self, *args)
+            value = cache.get_or_compute(('probe', name) + args, lambda: method(self, *args))
+            return dict(value) if isinstance(value, dict) else value
+        return wrapper
+    return decorator
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from utils.probe_scheduler import Probe, ProbeScheduler
+
+    failures = 0
+
+    def check(description, condition):
+        global failures
+        if not condition:
+            failures += 1
+            print(f"  FALHOU: {description}")
+
+    def concurrent_requests(cache, key, compute, threads=8):
+        """threads pedem a mesma chave ao mesmo tempo; retorna os valores (ou erros) obtidos"""
+        outputs = []
+        barrier = threading.Barrier(threads)
+
+        def request():
+            barrier.wait()
+            try:
+                outputs.append(cache.get_or_compute(key, compute))
+            except OSError as e:
+                outputs.append(e)
+        workers = [threading.Thread(target=request) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return outputs
+
+    # Single-flight: 8 threads pedem o mesmo comando e ele roda uma vez
+    cache = CollectionCache()
+    computed = []
+    outputs = concurrent_requests(cache, ('cmd', 'ipconfig', '/all'),
+                                  lambda: computed.append(1) or time.sleep(0.1) or 'saída')
+    check(f"comando calculado uma vez ({len(computed)})", len(computed) == 1)
+    check("todos recebem o mesmo valor", outputs == ['saída'] * 8)
+    check(f"contadores ({cache.stats()})", cache.stats() == {'hits': 7, 'misses': 1, 'entries': 1})
+
+    # O erro também é compartilhado (sem nova tentativa na mesma coleta)
+    def failing():
+        computed.append(1)
+        time.sleep(0.05)
+        raise OSError("falhou")
+    computed.clear()
+    outputs = concurrent_requests(cache, ('cmd', 'arp', '-a'), failing)
+    check("erro calculado uma vez e repassado a todos",
+          len(computed) == 1 and all(isinstance(output, OSError) for output in outputs))
+    check(f"contadores após erro ({cache.stats()})", cache.stats() == {'hits': 14, 'misses': 2, 'entries': 2})
+
+    class Collector:
+        def __init__(self):
+            self.collection_cache = CollectionCache()
+            self.runs = 0
+
+        @cached_probe('lenta')
+        def slow(self):
+            self.runs += 1
+            for _ in range(30):
+                check_cancelled()
+                time.sleep(0.01)
+            return 'valor'
+
+        @cached_probe('rapida')
+        def fast(self):
+            return 'valor'
+
+    # 'a' calcula a sonda lenta e é descartada no meio; 'b' esperava pelo mesmo
+    # resultado e calcula de novo. 'c' é descartada antes de chegar ao cache.
+    collector = Collector()
+    scheduler = ProbeScheduler(skip_covered=True)
+    results = scheduler.run([
+        Probe('lldp', lambda deps: time.sleep(0.05) or {'x': 1}, provides=['x'], override=True),
+        Probe('a', lambda deps: {'x': collector.slow()}, provides=['x']),
+        Probe('b', lambda deps: time.sleep(0.01) or collector.slow()),
+        Probe('c', lambda deps: time.sleep(0.1) or {'x': collector.fast()}, provides=['x']),
+    ])
+    time.sleep(0.2)
+    check(f"espera recalcula após cancelamento da dona ({results['b']!r})", results['b'] == 'valor')
+    check(f"sonda lenta calculada duas vezes ({collector.runs})", collector.runs == 2)
+    check("sonda descartada não grava no cache", ('probe', 'rapida') not in collector.collection_cache.entries)
+
+    print("Verificações concluídas" if not failures else f"{failures} verificações falharam")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,902 @@
+"""
+Parsers das saídas de texto do ipconfig, route print, arp -a e netsh
+Cada saída é lida em uma única passagem: os rótulos de todos os idiomas
+suportados (pt-BR, en-US, es-ES) ficam em tabelas normalizadas montadas uma
+vez na importação, e as expressões regulares são pré-compiladas. O resultado
+é tipado (IpconfigReport, IpconfigAdapter, RouteEntry, ArpEntry,
+NetshInterface) em vez de dicionários montados linha a linha.
+
+Usados quando a API nativa (iphlpapi/netlink) não está disponível.
+
+Benchmark: python -m utils.command_parsers [repetições] valida o corpus de
+exemplo de cada idioma (incluindo uma máquina com 64 adaptadores virtuais) e
+mede a vazão de cada parser.
+"""
+
+import re
+import sys
+import time
+
+
+# === Tabelas de rótulos por idioma ===
+
+# ipconfig /all: rótulo exibido -> campo
+IPCONFIG_LABELS = {
+    'pt-BR': {
+        'Nome do host': 'host_name',
+        'Sufixo DNS primário': 'primary_dns_suffix',
+        'Sufixo DNS específico de conexão': 'dns_suffix',
+        'Descrição': 'description',
+        'Endereço Físico': 'physical_address',
+        'DHCP Habilitado': 'dhcp_enabled',
+        'Estado da mídia': 'media_state',
+        'Endereço IPv4': 'ipv4_addresses',
+        'Endereço IP': 'ipv4_addresses',
+        'Máscara de Sub-rede': 'ipv4_subnets',
+        'Endereço IPv6': 'ipv6_addresses',
+        'Endereço IPv6 de link local': 'link_local_ipv6',
+        'Gateway Padrão': 'gateways',
+        'Servidor DHCP': 'dhcp_server',
+        'Servidores DNS': 'dns_servers',
+    },
+    'en-US': {
+        'Host Name': 'host_name',
+        'Primary Dns Suffix': 'primary_dns_suffix',
+        'Connection-specific DNS Suffix': 'dns_suffix',
+        'Description': 'description',
+        'Physical Address': 'physical_address',
+        'DHCP Enabled': 'dhcp_enabled',
+        'Media State': 'media_state',
+        'IPv4 Address': 'ipv4_addresses',
+        'IP Address': 'ipv4_addresses',
+        'Subnet Mask': 'ipv4_subnets',
+        'IPv6 Address': 'ipv6_addresses',
+        'Link-local IPv6 Address': 'link_local_ipv6',
+        'Default Gateway': 'gateways',
+        'DHCP Server': 'dhcp_server',
+        'DNS Servers': 'dns_servers',
+    },
+    'es-ES': {
+        'Nombre de host': 'host_name',
+        'Sufijo DNS principal': 'primary_dns_suffix',
+        'Sufijo DNS específico para la conexión': 'dns_suffix',
+        'Descripción': 'description',
+        'Dirección física': 'physical_address',
+        'DHCP habilitado': 'dhcp_enabled',
+        'Estado de los medios': 'media_state',
+        'Dirección IPv4': 'ipv4_addresses',
+        'Dirección IP': 'ipv4_addresses',
+        'Máscara de subred': 'ipv4_subnets',
+        'Dirección IPv6': 'ipv6_addresses',
+        'Vínculo: dirección IPv6 local': 'link_local_ipv6',
+        'Puerta de enlace predeterminada': 'gateways',
+        'Servidor DHCP': 'dhcp_server',
+        'Servidores DNS': 'dns_servers',
+    },
+}
+
+# Cabeçalho do adaptador ("<prefixo> <nome>:") -> tipo do adaptador
+ADAPTER_HEADERS = {
+    'pt-BR': {
+        'Adaptador Ethernet': 'ethernet',
+        'Adaptador de Rede sem Fio': 'wireless',
+        'Adaptador desconhecido': 'unknown',
+        'Adaptador PPP': 'ppp',
+        'Adaptador de Túnel': 'tunnel',
+    },
+    'en-US': {
+        'Ethernet adapter': 'ethernet',
+        'Wireless LAN adapter': 'wireless',
+        'Unknown adapter': 'unknown',
+        'PPP adapter': 'ppp',
+        'Tunnel adapter': 'tunnel',
+    },
+    'es-ES': {
+        'Adaptador de Ethernet': 'ethernet',
+        'Adaptador de LAN inalámbrica': 'wireless',
+        'Adaptador desconocido': 'unknown',
+        'Adaptador PPP': 'ppp',
+        'Adaptador de túnel': 'tunnel',
+    },
+}
+
+# Palavras que o Windows usa para valores booleanos e estados
+YES_WORDS = ('Yes', 'Sim', 'Sí', 'Si')
+MEDIA_DISCONNECTED = ('Media disconnected', 'Mídia desconectada', 'Medios desconectados')
+ON_LINK = {'pt-BR': 'No vínculo', 'en-US': 'On-link', 'es-ES': 'En vínculo'}
+ARP_TYPES = {
+    'pt-BR': {'dinâmico': 'dynamic', 'estático': 'static'},
+    'en-US': {'dynamic': 'dynamic', 'static': 'static'},
+    'es-ES': {'dinámico': 'dynamic', 'estático': 'static'},
+}
+NETSH_STATES = {
+    'pt-BR': {'Habilitado': 'enabled', 'Desabilitado': 'disabled',
+              'Conectado': 'connected', 'Desconectado': 'disconnected'},
+    'en-US': {'Enabled': 'enabled', 'Disabled': 'disabled',
+              'Connected': 'connected', 'Disconnected': 'disconnected'},
+    'es-ES': {'Habilitado': 'enabled', 'Deshabilitado': 'disabled',
+              'Conectado': 'connected', 'Desconectado': 'disconnected'},
+}
+
+# netsh lldp show neighbors verbose: rótulo -> campo
+NETSH_LLDP_LABELS = {
+    'pt-BR': {
+        'Nome do sistema': 'system_name',
+        'ID do chassi': 'chassis_id',
+        'ID da porta': 'port_id',
+        'Descrição da porta': 'port_description',
+        'Descrição do sistema': 'system_description',
+        'Endereço de gerenciamento': 'management_address',
+        'ID da VLAN': 'vlan_id',
+    },
+    'en-US': {
+        'System Name': 'system_name',
+        'Chassis ID': 'chassis_id',
+        'Port ID': 'port_id',
+        'Port Description': 'port_description',
+        'System Description': 'system_description',
+        'Management Address': 'management_address',
+        'VLAN ID': 'vlan_id',
+        'Port VLAN ID': 'vlan_id',
+        'VLAN': 'vlan_id',
+    },
+    'es-ES': {
+        'Nombre del sistema': 'system_name',
+        'Id. del chasis': 'chassis_id',
+        'Id. de puerto': 'port_id',
+        'Descripción del puerto': 'port_description',
+        'Descripción del sistema': 'system_description',
+        'Dirección de administración': 'management_address',
+        'Id. de VLAN': 'vlan_id',
+    },
+}
+
+
+def _normalize_label(label):
+    """Forma canônica de um rótulo: sem pontos de preenchimento, espaços nem caixa"""
+    return label.strip().rstrip(' .').replace(' ', '').casefold()
+
+
+def _build_keys(tables):
+    """
+    Junta as tabelas de todos os idiomas em um único dicionário
+
+    Returns:
+        {rótulo normalizado: (valor, idioma)}; o idioma é None quando o rótulo
+        é igual em mais de um idioma (não serve para detectar o idioma)
+    """
+    keys = {}
+    for locale_name, table in tables.items():
+        for label, value in table.items():
+            key = _normalize_label(label)
+            keys[key] = (value, None) if key in keys else (value, locale_name)
+    return keys
+
+
+_IPCONFIG_KEYS = _build_keys(IPCONFIG_LABELS)
+_LLDP_KEYS = _build_keys(NETSH_LLDP_LABELS)
+_YES = frozenset(word.casefold() for word in YES_WORDS)
+_DISCONNECTED = frozenset(word.casefold() for word in MEDIA_DISCONNECTED)
+_ON_LINK = {word.casefold(): locale_name for locale_name, word in ON_LINK.items()}
+_ARP_TYPES = {word.casefold(): kind for table in ARP_TYPES.values() for word, kind in table.items()}
+_NETSH_STATES = {word.casefold(): state for table in NETSH_STATES.values() for word, state in table.items()}
+
+# Prefixos mais longos primeiro: "Adaptador de Ethernet" antes de "Adaptador Ethernet"
+_HEADER_KINDS = {prefix.casefold(): kind for table in ADAPTER_HEADERS.values() for prefix, kind in table.items()}
+_ADAPTER_HEADER = re.compile(
+    '^(' + '|'.join(re.escape(prefix) for prefix in sorted(_HEADER_KINDS, key=len, reverse=True)) + ') (.+):$',
+    re.IGNORECASE
+)
+_ADDRESS_NOTE = re.compile(r'\(.*?\)\s*$')
+_IPV4 = r'\d{1,3}(?:\.\d{1,3}){3}'
+_IPV4_ONLY = re.compile(f'^{_IPV4}$')
+_ROUTE_ROW = re.compile(rf'^\s*({_IPV4})\s+({_IPV4})\s+(\S+(?: \S+)?)\s+({_IPV4})\s+(\d+)\s*$')
+_ARP_INTERFACE = re.compile(rf'^\S[^:]*:\s+({_IPV4})\s+---\s+0x([0-9a-fA-F]+)')
+_ARP_ROW = re.compile(rf'^\s+({_IPV4})\s+([0-9a-fA-F]{{2}}(?:-[0-9a-fA-F]{{2}}){{5}})\s+(\S+)\s*$')
+_MAC_ADDRESS = re.compile(r'^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$')
+
+
+def _clean_address(value):
+    """Remove a anotação "(Preferred)"/"(Preferencial)" e o índice de zona (%12)"""
+    return _ADDRESS_NOTE.sub('', value).split('%', 1)[0].strip()
+
+
+# === ipconfig /all ===
+
+class IpconfigAdapter:
+    """Adaptador lido do ipconfig /all"""
+
+    __slots__ = ('name', 'kind', 'description', 'physical_address', 'dhcp_enabled', 'media_connected',
+                 'dns_suffix', 'dhcp_server', 'ipv4_addresses', 'ipv4_subnets', 'ipv6_addresses',
+                 'link_local_ipv6', 'gateways', 'dns_servers')
+
+    def __init__(self, name, kind=''):
+        self.name = name
+        self.kind = kind
+        self.description = ''
+        self.physical_address = ''
+        self.dhcp_enabled = False
+        self.media_connected = True
+        self.dns_suffix = ''
+        self.dhcp_server = ''
+        self.ipv4_addresses = []
+        self.ipv4_subnets = []
+        self.ipv6_addresses = []
+        self.link_local_ipv6 = []
+        self.gateways = []
+        self.dns_servers = []
+
+    @property
+    def ipv4_address(self):
+        return self.ipv4_addresses[0] if self.ipv4_addresses else ''
+
+    @property
+    def ipv4_subnet(self):
+        return self.ipv4_subnets[0] if self.ipv4_subnets else ''
+
+    @property
+    def ipv6_address(self):
+        """Primeiro endereço IPv6 global (link-local e loopback ficam de fora)"""
+        for address in self.ipv6_addresses:
+            if not address.lower().startswith('fe80') and address != '::1':
+                return address
+        return ''
+
+    @property
+    def default_gateway(self):
+        """Gateway IPv4, se houver; senão o primeiro listado"""
+        for gateway in self.gateways:
+            if _IPV4_ONLY.match(gateway):
+                return gateway
+        return self.gateways[0] if self.gateways else ''
+
+    def as_dict(self):
+        """Dicionário no formato usado pelo diagnóstico de rede"""
+        return {
+            'name': self.name,
+            'description': self.description,
+            'physical_address': self.physical_address,
+            'dhcp_enabled': self.dhcp_enabled,
+            'ipv4_address': self.ipv4_address,
+            'ipv4_subnet': self.ipv4_subnet,
+            'ipv6_address': self.ipv6_address,
+            'default_gateway': self.default_gateway,
+            'dns_servers': list(self.dns_servers)
+        }
+
+    def __repr__(self):
+        return f"IpconfigAdapter({self.name!r}, kind={self.kind!r}, ipv4={self.ipv4_address!r})"
+
+
+class IpconfigReport:
+    """Resultado do ipconfig /all: dados globais e adaptadores na ordem exibida"""
+
+    __slots__ = ('host_name', 'primary_dns_suffix', 'adapters', 'locale')
+
+    def __init__(self):
+        self.host_name = ''
+        self.primary_dns_suffix = ''
+        self.adapters = []
+        self.locale = None
+
+    def dns_servers(self):
+        """Servidores DNS de todos os adaptadores, sem repetição e na ordem exibida"""
+        servers = []
+        for adapter in self.adapters:
+            for server in adapter.dns_servers:
+                if server not in servers:
+                    servers.append(server)
+        return servers
+
+    def adapter(self, name):
+        """Adaptador pelo nome da conexão (None se não existir)"""
+        for adapter in self.adapters:
+            if adapter.name == name:
+                return adapter
+        return None
+
+
+def _apply_ipconfig_field(adapter, field, value):
+    """Grava um valor do ipconfig no campo do adaptador"""
+    if field == 'dhcp_enabled':
+        adapter.dhcp_enabled = value.casefold() in _YES
+    elif field == 'media_state':
+        adapter.media_connected = value.casefold() not in _DISCONNECTED
+    elif field in ('description', 'physical_address', 'dns_suffix', 'dhcp_server'):
+        if not getattr(adapter, field):
+            setattr(adapter, field, value)
+    elif field == 'ipv4_addresses':
+        address = _clean_address(value)
+        if address and address != '0.0.0.0':
+            adapter.ipv4_addresses.append(address)
+    elif field in ('ipv4_subnets', 'dns_servers'):
+        getattr(adapter, field).append(value)
+    elif field in ('ipv6_addresses', 'link_local_ipv6', 'gateways'):
+        address = _clean_address(value)
+        if address:
+            getattr(adapter, field).append(address)
+
+
+def parse_ipconfig(text):
+    """
+    Interpreta a saída do ipconfig /all (qualquer idioma das tabelas)
+
+    Returns:
+        IpconfigReport
+    """
+    report = IpconfigReport()
+    adapter = None
+    field = None
+    for line in text.splitlines():
+        if not line or line.isspace():
+            continue
+        if not line[0].isspace():
+            # Cabeçalho: "Ethernet adapter Ethernet 2:" ou "Windows IP Configuration"
+            field = None
+            header = line.rstrip()
+            if not header.endswith(':'):
+                continue
+            match = _ADAPTER_HEADER.match(header)
+            if match:
+                adapter = IpconfigAdapter(match.group(2).strip(), _HEADER_KINDS[match.group(1).casefold()])
+            else:
+                adapter = IpconfigAdapter(header[:-1].strip())
+            report.adapters.append(adapter)
+            continue
+
+        label, separator, value = line.partition(' : ')
+        if separator:
+            entry = _IPCONFIG_KEYS.get(_normalize_label(label))
+        elif line.rstrip().endswith(' :'):
+            # Rótulo sem valor ("Default Gateway . . . :")
+            entry, value = _IPCONFIG_KEYS.get(_normalize_label(line.rstrip()[:-2])), ''
+        else:
+            # Continuação (servidores DNS e gateways adicionais)
+            if field and adapter is not None:
+                _apply_ipconfig_field(adapter, field, line.strip())
+            continue
+
+        field = None
+        if entry is None:
+            continue
+        field, locale_name = entry
+        if report.locale is None and locale_name:
+            report.locale = locale_name
+        value = value.strip()
+        if field in ('host_name', 'primary_dns_suffix'):
+            setattr(report, field, value)
+            field = None
+        elif adapter is not None and value:
+            _apply_ipconfig_field(adapter, field, value)
+    return report
+
+
+# === route print ===
+
+class RouteEntry:
+    """Linha da tabela IPv4 de rotas ativas do route print"""
+
+    __slots__ = ('destination', 'netmask', 'gateway', 'interface', 'metric')
+
+    def __init__(self, destination, netmask, gateway, interface, metric):
+        self.destination = destination
+        self.netmask = netmask
+        self.gateway = gateway  # '' quando a rota é "On-link"
+        self.interface = interface
+        self.metric = metric
+
+    @property
+    def on_link(self):
+        return not self.gateway
+
+    @property
+    def is_default(self):
+        return self.destination == '0.0.0.0' and self.netmask == '0.0.0.0'
+
+    def __repr__(self):
+        return (f"RouteEntry({self.destination}/{self.netmask} via {self.gateway or 'on-link'} "
+                f"if {self.interface} metric {self.metric})")
+
+
+def parse_route_print(text):
+    """
+    Interpreta as rotas IPv4 ativas do route print
+
+    As rotas persistentes (4 colunas) e a tabela IPv6 não casam com o formato
+    de 5 colunas e são ignoradas.
+
+    Returns:
+        Lista de RouteEntry
+    """
+    routes = []
+    for line in text.splitlines():
+        match = _ROUTE_ROW.match(line)
+        if not match:
+            continue
+        destination, netmask, gateway, interface, metric = match.groups()
+        if not _IPV4_ONLY.match(gateway):
+            if gateway.casefold() not in _ON_LINK:
+                continue
+            gateway = ''
+        routes.append(RouteEntry(destination, netmask, gateway, interface, int(metric)))
+    return routes
+
+
+def default_gateway_from_routes(routes):
+    """Gateway da rota padrão de menor métrica (None se não houver)"""
+    defaults = [route for route in routes if route.is_default and route.gateway]
+    if not defaults:
+        return None
+    return min(defaults, key=lambda route: route.metric).gateway
+
+
+# === arp -a ===
+
+class ArpEntry:
+    """Entrada da tabela ARP exibida pelo arp -a"""
+
+    __slots__ = ('ip', 'mac', 'kind', 'interface_address', 'interface_index')
+
+    def __init__(self, ip, mac, kind, interface_address='', interface_index=None):
+        self.ip = ip
+        self.mac = mac
+        self.kind = kind  # 'dynamic', 'static' ou o texto original
+        self.interface_address = interface_address
+        self.interface_index = interface_index
+
+    def __repr__(self):
+        return f"ArpEntry({self.ip} -> {self.mac}, {self.kind}, if {self.interface_index})"
+
+
+def parse_arp(text):
+    """
+    Interpreta a saída do arp -a
+
+    Returns:
+        Lista de ArpEntry (MAC no formato AA-BB-CC-DD-EE-FF)
+    """
+    entries = []
+    interface_address, interface_index = '', None
+    for line in text.splitlines():
+        match = _ARP_ROW.match(line)
+        if match:
+            ip, mac, kind = match.groups()
+            entries.append(ArpEntry(ip, mac.upper(), _ARP_TYPES.get(kind.casefold(), kind),
+                                    interface_address, interface_index))
+            continue
+        match = _ARP_INTERFACE.match(line)
+        if match:
+            interface_address, interface_index = match.group(1), int(match.group(2), 16)
+    return entries
+
+
+# === netsh ===
+
+class NetshInterface:
+    """Linha do netsh interface show interface"""
+
+    __slots__ = ('name', 'admin_state', 'state', 'type')
+
+    def __init__(self, name, admin_state, state, interface_type):
+        self.name = name
+        self.admin_state = admin_state
+        self.state = state
+        self.type = interface_type
+
+    @property
+    def enabled(self):
+        return _NETSH_STATES.get(self.admin_state.casefold()) == 'enabled'
+
+    @property
+    def connected(self):
+        return _NETSH_STATES.get(self.state.casefold()) == 'connected'
+
+    def as_dict(self):
+        return {'name': self.name, 'admin_state': self.admin_state, 'state': self.state, 'type': self.type}
+
+    def __repr__(self):
+        return f"NetshInterface({self.name!r}, {self.admin_state}, {self.state}, {self.type})"
+
+
+def parse_netsh_interfaces(text):
+    """
+    Interpreta o netsh interface show interface
+
+    As colunas são estado administrativo, estado, tipo e nome (que pode ter
+    espaços); as linhas só começam depois da linha de traços do cabeçalho.
+
+    Returns:
+        Lista de NetshInterface
+    """
+    interfaces = []
+    in_table = False
+    for line in text.splitlines():
+        if not in_table:
+            in_table = line.startswith('---')
+            continue
+        parts = line.split(None, 3)
+        if len(parts) == 4:
+            interfaces.append(NetshInterface(parts[3].strip(), parts[0], parts[1], parts[2]))
+    return interfaces
+
+
+def parse_netsh_lldp(text):
+    """
+    Interpreta o netsh lldp show neighbors verbose
+
+    Returns:
+        Dicionário com switch_name, port_id ("Descrição (ID)"), switch_model,
+        switch_ip e vlan_id, apenas com os campos encontrados
+    """
+    fields = {}
+    for line in text.splitlines():
+        label, separator, value = line.partition(':')
+        if not separator:
+            continue
+        entry = _LLDP_KEYS.get(_normalize_label(label))
+        value = value.strip()
+        if entry and value:
+            # O primeiro vizinho listado prevalece
+            fields.setdefault(entry[0], value)
+
+    info = {}
+    name = fields.get('system_name')
+    chassis_id = fields.get('chassis_id', '')
+    if not name and chassis_id and not _MAC_ADDRESS.match(chassis_id):
+        # Chassis ID que não é MAC costuma ser o nome do switch
+        name = chassis_id
+    if name:
+        info['switch_name'] = name
+
+    port_id = fields.get('port_id', '')
+    port_description = fields.get('port_description', '')
+    if port_description and port_id and f"({port_id})" not in port_description:
+        info['port_id'] = f"{port_description} ({port_id})"
+    elif port_description or port_id:
+        info['port_id'] = port_description or port_id
+
+    if fields.get('system_description'):
+        info['switch_model'] = fields['system_description']
+    address = re.search(_IPV4, fields.get('management_address', ''))
+    if address:
+        info['switch_ip'] = address.group(0)
+    vlan = re.search(r'\d+', fields.get('vlan_id', ''))
+    if vlan:
+        info['vlan_id'] = vlan.group(0)
+    return info
+
+
+if __name__ == "__main__":
+    IPCONFIG_SAMPLES = {
+        'en-US': """
+Windows IP Configuration
+
+   Host Name . . . . . . . . . . . . : DESKTOP-01
+   Primary Dns Suffix  . . . . . . . : corp.example.com
+   Node Type . . . . . . . . . . . . : Hybrid
+   IP Routing Enabled. . . . . . . . : No
+
+Ethernet adapter Ethernet 2:
+
+   Connection-specific DNS Suffix  . : corp.example.com
+   Description . . . . . . . . . . . : Intel(R) Ethernet Connection (7) I219-LM
+   Physical Address. . . . . . . . . : 00-15-5D-01-02-03
+   DHCP Enabled. . . . . . . . . . . : Yes
+   Autoconfiguration Enabled . . . . : Yes
+   IPv6 Address. . . . . . . . . . . : 2804:14c:1:2::10(Preferred)
+   Link-local IPv6 Address . . . . . : fe80::1c2d:3e4f:5a6b:7c8d%12(Preferred)
+   IPv4 Address. . . . . . . . . . . : 192.168.10.25(Preferred)
+   Subnet Mask . . . . . . . . . . . : 255.255.255.0
+   Lease Obtained. . . . . . . . . . : Monday, October 12, 2026 8:01:02 AM
+   Default Gateway . . . . . . . . . : fe80::1%12
+                                       192.168.10.1
+   DHCP Server . . . . . . . . . . . : 192.168.10.1
+   DNS Servers . . . . . . . . . . . : 192.168.10.2
+                                       8.8.8.8
+   NetBIOS over Tcpip. . . . . . . . : Enabled
+
+Wireless LAN adapter Wi-Fi:
+
+   Media State . . . . . . . . . . . : Media disconnected
+   Connection-specific DNS Suffix  . :
+   Description . . . . . . . . . . . : Intel(R) Wi-Fi 6 AX201 160MHz
+   Physical Address. . . . . . . . . : 3C-A9-F4-11-22-33
+   DHCP Enabled. . . . . . . . . . . : Yes
+""",
+        'pt-BR': """
+Configuração de IP do Windows
+
+   Nome do host. . . . . . . . . . . . . . . . : DESKTOP-01
+   Sufixo DNS primário . . . . . . . . . . . . : corp.example.com
+   Tipo de nó. . . . . . . . . . . . . . . . . : híbrido
+
+Adaptador Ethernet Ethernet 2:
+
+   Sufixo DNS específico de conexão. . . . . . : corp.example.com
+   Descrição . . . . . . . . . . . . . . . . . : Intel(R) Ethernet Connection (7) I219-LM
+   Endereço Físico . . . . . . . . . . . . . . : 00-15-5D-01-02-03
+   DHCP Habilitado . . . . . . . . . . . . . . : Sim
+   Configuração Automática Habilitada. . . . . : Sim
+   Endereço IPv6 . . . . . . . . . . . . . . . : 2804:14c:1:2::10(Preferencial)
+   Endereço IPv6 de link local . . . . . . . . : fe80::1c2d:3e4f:5a6b:7c8d%12(Preferencial)
+   Endereço IPv4. . . . . . . . . . . . . . . : 192.168.10.25(Preferencial)
+   Máscara de Sub-rede . . . . . . . . . . . . : 255.255.255.0
+   Concessão Obtida. . . . . . . . . . . . . . : segunda-feira, 12 de outubro de 2026 08:01:02
+   Gateway Padrão. . . . . . . . . . . . . . . : fe80::1%12
+                                                 192.168.10.1
+   Servidor DHCP . . . . . . . . . . . . . . . : 192.168.10.1
+   Servidores DNS. . . . . . . . . . . . . . . : 192.168.10.2
+                                                 8.8.8.8
+   NetBIOS em Tcpip. . . . . . . . . . . . . . : Habilitado
+
+Adaptador de Rede sem Fio Wi-Fi:
+
+   Estado da mídia. . . . . . . . . . . . . . : Mídia desconectada
+   Sufixo DNS específico de conexão. . . . . . :
+   Descrição . . . . . . . . . . . . . . . . . : Intel(R) Wi-Fi 6 AX201 160MHz
+   Endereço Físico . . . . . . . . . . . . . . : 3C-A9-F4-11-22-33
+   DHCP Habilitado . . . . . . . . . . . . . . : Sim
+""",
+        'es-ES': """
+Configuración IP de Windows
+
+   Nombre de host. . . . . . . . . : DESKTOP-01
+   Sufijo DNS principal  . . . . . : corp.example.com
+   Tipo de nodo. . . . . . . . . . : híbrido
+
+Adaptador de Ethernet Ethernet 2:
+
+   Sufijo DNS específico para la conexión. . : corp.example.com
+   Descripción . . . . . . . . . . . . . . . : Intel(R) Ethernet Connection (7) I219-LM
+   Dirección física. . . . . . . . . . . . . : 00-15-5D-01-02-03
+   DHCP habilitado . . . . . . . . . . . . . : sí
+   Configuración automática habilitada . . . : sí
+   Dirección IPv6 . . . . . . . . . . . . . : 2804:14c:1:2::10(Preferido)
+   Vínculo: dirección IPv6 local. . . : fe80::1c2d:3e4f:5a6b:7c8d%12(Preferido)
+   Dirección IPv4. . . . . . . . . . . . . . : 192.168.10.25(Preferido)
+   Máscara de subred . . . . . . . . . . . . : 255.255.255.0
+   Concesión obtenida. . . . . . . . . . . . : lunes, 12 de octubre de 2026 8:01:02
+   Puerta de enlace predeterminada . . . . . : fe80::1%12
+                                               192.168.10.1
+   Servidor DHCP . . . . . . . . . . . . . . : 192.168.10.1
+   Servidores DNS. . . . . . . . . . . . . . : 192.168.10.2
+                                               8.8.8.8
+   NetBIOS sobre TCP/IP. . . . . . . . . . . : habilitado
+
+Adaptador de LAN inalámbrica Wi-Fi:
+
+   Estado de los medios. . . . . . . . . . . : medios desconectados
+   Sufijo DNS específico para la conexión. . :
+   Descripción . . . . . . . . . . . . . . . : Intel(R) Wi-Fi 6 AX201 160MHz
+   Dirección física. . . . . . . . . . . . . : 3C-A9-F4-11-22-33
+   DHCP habilitado . . . . . . . . . . . . . : sí
+""",
+    }
+
+    # Bloco de adaptador virtual (Hyper-V/WSL/VPN) repetido para simular máquinas com dezenas deles
+    VIRTUAL_ADAPTER = {
+        'en-US': """
+Ethernet adapter vEthernet (Switch {n}):
+
+   Connection-specific DNS Suffix  . :
+   Description . . . . . . . . . . . : Hyper-V Virtual Ethernet Adapter #{n}
+   Physical Address. . . . . . . . . : 00-15-5D-00-{n:02X}-01
+   DHCP Enabled. . . . . . . . . . . : No
+   Link-local IPv6 Address . . . . . : fe80::{n:x}:1%{n}(Preferred)
+   IPv4 Address. . . . . . . . . . . : 172.20.{n}.1(Preferred)
+   Subnet Mask . . . . . . . . . . . : 255.255.255.0
+   Default Gateway . . . . . . . . . :
+   NetBIOS over Tcpip. . . . . . . . : Enabled
+""",
+        'pt-BR': """
+Adaptador Ethernet vEthernet (Switch {n}):
+
+   Sufixo DNS específico de conexão. . . . . . :
+   Descrição . . . . . . . . . . . . . . . . . : Hyper-V Virtual Ethernet Adapter #{n}
+   Endereço Físico . . . . . . . . . . . . . . : 00-15-5D-00-{n:02X}-01
+   DHCP Habilitado . . . . . . . . . . . . . . : Não
+   Endereço IPv6 de link local . . . . . . . . : fe80::{n:x}:1%{n}(Preferencial)
+   Endereço IPv4. . . . . . . . . . . . . . . : 172.20.{n}.1(Preferencial)
+   Máscara de Sub-rede . . . . . . . . . . . . : 255.255.255.0
+   Gateway Padrão. . . . . . . . . . . . . . . :
+   NetBIOS em Tcpip. . . . . . . . . . . . . . : Habilitado
+""",
+        'es-ES': """
+Adaptador de Ethernet vEthernet (Switch {n}):
+
+   Sufijo DNS específico para la conexión. . :
+   Descripción . . . . . . . . . . . . . . . : Hyper-V Virtual Ethernet Adapter #{n}
+   Dirección física. . . . . . . . . . . . . : 00-15-5D-00-{n:02X}-01
+   DHCP habilitado . . . . . . . . . . . . . : no
+   Vínculo: dirección IPv6 local. . . : fe80::{n:x}:1%{n}(Preferido)
+   Dirección IPv4. . . . . . . . . . . . . . : 172.20.{n}.1(Preferido)
+   Máscara de subred . . . . . . . . . . . . : 255.255.255.0
+   Puerta de enlace predeterminada . . . . . :
+   NetBIOS sobre TCP/IP. . . . . . . . . . . : habilitado
+""",
+    }
+
+    ROUTE_SAMPLES = {
+        'en-US': """
+===========================================================================
+Interface List
+ 12...00 15 5d 01 02 03 ......Intel(R) Ethernet Connection (7) I219-LM
+  1...........................Software Loopback Interface 1
+===========================================================================
+
+IPv4 Route Table
+===========================================================================
+Active Routes:
+Network Destination        Netmask          Gateway       Interface  Metric
+          0.0.0.0          0.0.0.0     192.168.10.1    192.168.10.25     25
+          0.0.0.0          0.0.0.0      10.8.0.1         10.8.0.6      50
+        127.0.0.0        255.0.0.0         On-link         127.0.0.1    331
+     192.168.10.0    255.255.255.0         On-link     192.168.10.25    281
+===========================================================================
+Persistent Routes:
+  Network Address          Netmask  Gateway Address  Metric
+          0.0.0.0          0.0.0.0     192.168.10.1  Default
+===========================================================================
+
+IPv6 Route Table
+===========================================================================
+Active Routes:
+ If Metric Network Destination      Gateway
+  1    331 ::1/128                  On-link
+""",
+        'pt-BR': """
+===========================================================================
+Lista de interfaces
+ 12...00 15 5d 01 02 03 ......Intel(R) Ethernet Connection (7) I219-LM
+===========================================================================
+
+Tabela de rotas IPv4
+===========================================================================
+Rotas ativas:
+Endereço de rede             Máscara     Ender. gateway    Interface  Custo
+          0.0.0.0          0.0.0.0     192.168.10.1    192.168.10.25     25
+          0.0.0.0          0.0.0.0      10.8.0.1         10.8.0.6      50
+        127.0.0.0        255.0.0.0      No vínculo         127.0.0.1    331
+     192.168.10.0    255.255.255.0      No vínculo     192.168.10.25    281
+===========================================================================
+Rotas persistentes:
+  Nenhum
+""",
+        'es-ES': """
+===========================================================================
+Lista de interfaces
+ 12...00 15 5d 01 02 03 ......Intel(R) Ethernet Connection (7) I219-LM
+===========================================================================
+
+IPv4 Tabla de enrutamiento
+===========================================================================
+Rutas activas:
+Destino de red        Máscara de red   Puerta de enlace   Interfaz  Métrica
+          0.0.0.0          0.0.0.0     192.168.10.1    192.168.10.25     25
+          0.0.0.0          0.0.0.0      10.8.0.1         10.8.0.6      50
+        127.0.0.0        255.0.0.0      En vínculo         127.0.0.1    331
+     192.168.10.0    255.255.255.0      En vínculo     192.168.10.25    281
+===========================================================================
+Rutas persistentes:
+  Ninguno
+""",
+    }
+
+    ARP_SAMPLES = {
+        'en-US': """
+Interface: 192.168.10.25 --- 0xc
+  Internet Address      Physical Address      Type
+  192.168.10.1          00-11-22-33-44-55     dynamic
+  192.168.10.255        ff-ff-ff-ff-ff-ff     static
+""",
+        'pt-BR': """
+Interface: 192.168.10.25 --- 0xc
+  Endereço IP           Endereço físico       Tipo
+  192.168.10.1          00-11-22-33-44-55     dinâmico
+  192.168.10.255        ff-ff-ff-ff-ff-ff     estático
+""",
+        'es-ES': """
+Interfaz: 192.168.10.25 --- 0xc
+  Dirección de Internet          Dirección física      Tipo
+  192.168.10.1          00-11-22-33-44-55     dinámico
+  192.168.10.255        ff-ff-ff-ff-ff-ff     estático
+""",
+    }
+
+    NETSH_SAMPLES = {
+        'en-US': """
+Admin State    State          Type             Interface Name
+-------------------------------------------------------------------------
+Enabled        Connected      Dedicated        Ethernet 2
+Enabled        Disconnected   Dedicated        Wi-Fi
+""",
+        'pt-BR': """
+Estado Admin    Estado         Tipo             Nome da interface
+-------------------------------------------------------------------------
+Habilitado      Conectado      Dedicado         Ethernet 2
+Habilitado      Desconectado   Dedicado         Wi-Fi
+""",
+        'es-ES': """
+Estado de admin.  Estado          Tipo             Nombre de interfaz
+-------------------------------------------------------------------------
+Habilitado        Conectado       Dedicado         Ethernet 2
+Habilitado        Desconectado    Dedicado         Wi-Fi
+""",
+    }
+
+    LLDP_SAMPLE = """
+Chassis ID: 00:11:22:33:44:55
+Port ID: GE1/0/17
+Port Description: MES
+System Name: SW-ANDAR2
+System Description: Huawei S5720-28X-LI-AC
+Management Address: 10.0.0.2
+Port VLAN ID: 20
+"""
+
+    failures = 0
+
+    def check(description, condition):
+        global failures
+        if not condition:
+            failures += 1
+            print(f"  FALHOU: {description}")
+
+    for locale_name, sample in IPCONFIG_SAMPLES.items():
+        report = parse_ipconfig(sample)
+        ethernet, wifi = report.adapters
+        check(f"{locale_name}: idioma", report.locale == locale_name)
+        check(f"{locale_name}: host", report.host_name == 'DESKTOP-01')
+        check(f"{locale_name}: adaptadores", (ethernet.name, ethernet.kind, wifi.kind) ==
+              ('Ethernet 2', 'ethernet', 'wireless'))
+        check(f"{locale_name}: endereços", ethernet.as_dict() == {
+            'name': 'Ethernet 2', 'description': 'Intel(R) Ethernet Connection (7) I219-LM',
+            'physical_address': '00-15-5D-01-02-03', 'dhcp_enabled': True,
+            'ipv4_address': '192.168.10.25', 'ipv4_subnet': '255.255.255.0',
+            'ipv6_address': '2804:14c:1:2::10', 'default_gateway': '192.168.10.1',
+            'dns_servers': ['192.168.10.2', '8.8.8.8']
+        })
+        check(f"{locale_name}: mídia", ethernet.media_connected and not wifi.media_connected)
+        routes = parse_route_print(ROUTE_SAMPLES[locale_name])
+        check(f"{locale_name}: rotas", len(routes) == 4 and routes[2].on_link)
+        check(f"{locale_name}: gateway padrão", default_gateway_from_routes(routes) == '192.168.10.1')
+        arp = parse_arp(ARP_SAMPLES[locale_name])
+        check(f"{locale_name}: arp", [(entry.kind, entry.interface_index) for entry in arp] ==
+              [('dynamic', 12), ('static', 12)])
+        interfaces = parse_netsh_interfaces(NETSH_SAMPLES[locale_name])
+        check(f"{locale_name}: netsh", [(item.name, item.enabled, item.connected) for item in interfaces] ==
+              [('Ethernet 2', True, True), ('Wi-Fi', True, False)])
+    check("lldp", parse_netsh_lldp(LLDP_SAMPLE) == {
+        'switch_name': 'SW-ANDAR2', 'port_id': 'MES (GE1/0/17)', 'switch_model': 'Huawei S5720-28X-LI-AC',
+        'switch_ip': '10.0.0.2', 'vlan_id': '20'
+    })
+
+    # Máquinas com 64 adaptadores virtuais além dos físicos
+    corpus = {}
+    for locale_name, sample in IPCONFIG_SAMPLES.items():
+        virtual = ''.join(VIRTUAL_ADAPTER[locale_name].format(n=n) for n in range(1, 65))
+        corpus[locale_name] = sample + virtual
+        report = parse_ipconfig(corpus[locale_name])
+        check(f"{locale_name}: 66 adaptadores", len(report.adapters) == 66 and
+              report.adapters[-1].name == 'vEthernet (Switch 64)' and
+              report.adapters[-1].ipv4_address == '172.20.64.1' and not report.adapters[-1].default_gateway)
+    print("Corpus validado" if not failures else f"{failures} verificações falharam")
+
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    benchmarks = [
+        ('ipconfig /all (66 adaptadores)', parse_ipconfig, corpus),
+        ('route print', parse_route_print, ROUTE_SAMPLES),
+        ('arp -a', parse_arp, ARP_SAMPLES),
+        ('netsh interface', parse_netsh_interfaces, NETSH_SAMPLES),
+    ]
+    for name, parser, samples in benchmarks:
+        texts = list(samples.values())
+        size = sum(len(text) for text in texts)
+        lines = sum(text.count('\n') for text in texts)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for text in texts:
+                parser(text)
+        elapsed = time.perf_counter() - started
+        print(f"{name:32} {repeat * len(texts) / elapsed:10,.0f} saídas/s "
+              f"{repeat * lines / elapsed:12,.0f} linhas/s {repeat * size / elapsed / 1e6:7.1f} MB/s")
@@ -0,0 +1,396 @@
+"""
+Executor central de comandos do sistema
+Substitui as chamadas espalhadas de subprocess.run por um serviço assíncrono com
+limite global e por comando de execuções simultâneas, timeout e encerramento
+da árvore de processos. O backend é plugável: FakeBackend devolve saídas
+pré-definidas com latência simulada para testes e benchmarks em Linux.
+
+Verificação: python -m utils.command_runner
+"""
+
+import asyncio
+import locale
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+
+class CommandResult:
+    """Resultado estruturado da execução de um comando"""
+
+    def __init__(self, args, returncode=None, stdout='', stderr='', duration=0.0,
+                 timed_out=False, error=None):
+        self.args = list(args)
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.duration = duration
+        self.timed_out = timed_out
+        self.error = error
+
+    @property
+    def ok(self):
+        """True se o comando terminou normalmente com código 0"""
+        return self.returncode == 0 and not self.timed_out and self.error is None
+
+    @property
+    def not_found(self):
+        """True se o executável não existe nesta máquina"""
+        return isinstance(self.error, FileNotFoundError)
+
+    def __repr__(self):
+        return (f"CommandResult(args={self.args!r}, returncode={self.returncode!r}, "
+                f"duration={self.duration:.3f}, timed_out={self.timed_out!r}, error={self.error!r})")
+
+
+def _decode(data, encoding):
+    """Decodifica a saída do processo como subprocess.run(text=True) faria"""
+    if data is None:
+        return ''
+    return data.decode(encoding, errors='replace').replace('\r\n', '\n')
+
+
+class SubprocessBackend:
+    """Backend real: cria processos do sistema operacional"""
+
+    async def execute(self, args, timeout, encoding):
+        """Executa o comando e retorna um CommandResult"""
+        started = time.monotonic()
+        kwargs = {}
+        if sys.platform == "win32":
+            kwargs['creationflags'] = (
+                getattr(subprocess, 'CREATE_NO_WINDOW', 0) |
+                getattr(subprocess, 'CREATE_NEW_PROCESS_GROUP', 0)
+            )
+        else:
+            # Novo grupo de processos para poder encerrar a árvore inteira
+            kwargs['start_new_session'] = True
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *args,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                **kwargs
+            )
+        except OSError as e:
+            return CommandResult(args, duration=time.monotonic() - started, error=e)
+
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            await self._kill_tree(process)
+            return CommandResult(args, duration=time.monotonic() - started, timed_out=True)
+        except asyncio.CancelledError:
+            await self._kill_tree(process)
+            raise
+
+        return CommandResult(
+            args,
+            returncode=process.returncode,
+            stdout=_decode(stdout, encoding),
+            stderr=_decode(stderr, encoding),
+            duration=time.monotonic() - started
+        )
+
+    async def _kill_tree(self, process):
+        """Encerra o processo e todos os seus filhos"""
+        if process.returncode is not None:
+            return
+        try:
+            if sys.platform == "win32":
+                killer = await asyncio.create_subprocess_exec(
+                    "taskkill", "/T", "/F", "/PID", str(process.pid),
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+                )
+                await killer.wait()
+            else:
+                os.killpg(process.pid, signal.SIGKILL)
+        except (OSError, ProcessLookupError):
+            pass
+        try:
+            process.kill()
+        except (OSError, ProcessLookupError):
+            pass
+        try:
+            await asyncio.wait_for(process.wait(), 2)
+        except asyncio.TimeoutError:
+            pass
+
+
+class FakeBackend:
+    """Backend simulado com saídas pré-definidas e latência configurável"""
+
+    def __init__(self):
+        self.responses = []
+        self.calls = []
+        # Execuções simultâneas: atuais e máximas, no total e por executável
+        self.running = 0
+        self.peak = 0
+        self.running_by_command = {}
+        self.peak_by_command = {}
+
+    def add(self, args, stdout='', stderr='', returncode=0, latency=0.0):
+        """
+        Registra uma resposta simulada
+
+        Args:
+            args: Prefixo da linha de comando a casar (ex.: ["route", "print"])
+            stdout: Saída padrão simulada
+            stderr: Saída de erro simulada
+            returncode: Código de saída simulado
+            latency: Tempo de execução simulado (segundos)
+        """
+        self.responses.append((tuple(args), stdout, stderr, returncode, latency))
+
+    async def execute(self, args, timeout, encoding):
+        """Procura a resposta cujo prefixo casa com args (a mais longa vence)"""
+        self.calls.append(list(args))
+        started = time.monotonic()
+        match = None
+        for response in self.responses:
+            prefix = response[0]
+            if tuple(args[:len(prefix)]) == prefix:
+                if match is None or len(prefix) > len(match[0]):
+                    match = response
+        if match is None:
+            return CommandResult(
+                args,
+                error=FileNotFoundError(2, "Comando não simulado", args[0] if args else '')
+            )
+
+        _, stdout, stderr, returncode, latency = match
+        command = args[0]
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        self.running_by_command[command] = self.running_by_command.get(command, 0) + 1
+        self.peak_by_command[command] = max(self.peak_by_command.get(command, 0), self.running_by_command[command])
+        try:
+            if latency > timeout:
+                await asyncio.sleep(timeout)
+                return CommandResult(args, duration=time.monotonic() - started, timed_out=True)
+            await asyncio.sleep(latency)
+        finally:
+            self.running -= 1
+            self.running_by_command[command] -= 1
+        return CommandResult(
+            args,
+            returncode=returncode,
+            stdout=stdout,
+            stderr=stderr,
+            duration=time.monotonic() - started
+        )
+
+
+class CommandRunner:
+    """Serviço de execução de comandos com orçamento de concorrência"""
+
+    def __init__(self, backend=None, max_concurrency=8, per_command_limit=2, encoding=None):
+        """
+        Args:
+            backend: Backend de execução (padrão: SubprocessBackend)
+            max_concurrency: Máximo de comandos simultâneos no total
+            per_command_limit: Máximo de execuções simultâneas do mesmo executável
+            encoding: Codificação da saída (padrão: a mesma de subprocess.run(text=True))
+        """
+        self.backend = backend or SubprocessBackend()
+        self.max_concurrency = max_concurrency
+        self.per_command_limit = per_command_limit
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        self.loop = None
+        self.loop_thread = None
+        # Semáforos de cada loop: {loop: (global, {executável: semáforo})}. Um
+        # semáforo fica preso ao loop em que foi usado, e close() recria o loop
+        self.semaphores = {}
+        self.lock = threading.Lock()
+
+    def submit(self, args, timeout=5):
+        """
+        Agenda um comando e retorna imediatamente
+
+        Returns:
+            concurrent.futures.Future que resolve para um CommandResult
+        """
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self.run_async(args, timeout), loop)
+
+    def run(self, args, timeout=5):
+        """Executa um comando e aguarda o resultado (bloqueia a thread chamadora)"""
+        return self.submit(args, timeout).result()
+
+    async def run_async(self, args, timeout=5):
+        """Corrotina de execução; deve rodar no loop do runner"""
+        args = [str(arg) for arg in args]
+        global_semaphore, command_semaphore = self._semaphores_for(args)
+        async with global_semaphore:
+            async with command_semaphore:
+                try:
+                    return await self.backend.execute(args, timeout, self.encoding)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    return CommandResult(args, error=e)
+
+    def close(self):
+        """Encerra o loop de eventos do runner"""
+        with self.lock:
+            loop = self.loop
+            self.loop = None
+        if loop:
+            self.semaphores.pop(loop, None)
+            loop.call_soon_threadsafe(loop.stop)
+
+    def _semaphores_for(self, args):
+        """Retorna os semáforos global e do executável do loop atual (criados nele)"""
+        loop = asyncio.get_running_loop()
+        limits = self.semaphores.get(loop)
+        if limits is None:
+            limits = (asyncio.Semaphore(self.max_concurrency), {})
+            self.semaphores[loop] = limits
+        global_semaphore, command_semaphores = limits
+        command = os.path.basename(args[0]).lower() if args else ''
+        if command.endswith('.exe'):
+            command = command[:-4]
+        semaphore = command_semaphores.get(command)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_command_limit)
+            command_semaphores[command] = semaphore
+        return global_semaphore, semaphore
+
+    def _ensure_loop(self):
+        """Inicia o loop de eventos em uma thread dedicada, se necessário"""
+        with self.lock:
+            if self.loop is not None:
+                return self.loop
+            if sys.platform == "win32":
+                # Python 3.7 no Windows só suporta subprocessos no ProactorEventLoop
+                loop = asyncio.ProactorEventLoop()
+            else:
+                loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(loop)
+                ready.set()
+                loop.run_forever()
+
+            self.loop_thread = threading.Thread(target=run_loop, daemon=True)
+            self.loop_thread.start()
+            ready.wait()
+            self.loop = loop
+            return loop
+
+
+_shared_runner = None
+_shared_runner_lock = threading.Lock()
+
+
+def get_command_runner():
+    """Retorna o runner compartilhado pelo aplicativo"""
+    global _shared_runner
+    with _shared_runner_lock:
+        if _shared_runner is None:
+            _shared_runner = CommandRunner()
+        return _shared_runner
+
+
+def set_command_runner(runner):
+    """Substitui o runner compartilhado (ex.: por um com FakeBackend)"""
+    global _shared_runner
+    with _shared_runner_lock:
+        previous = _shared_runner
+        _shared_runner = runner
+    if previous and previous is not runner:
+        previous.close()
+
+
+def run_command(args, timeout=5):
+    """Executa um comando no runner compartilhado e aguarda o resultado"""
+    return get_command_runner().run(args, timeout=timeout)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    failures = 0
+
+    def check(description, condition):
+        global failures
+        if not condition:
+            failures += 1
+            print(f"  FALHOU: {description}")
+
+    def run_batch(runner, commands, timeout=5):
+        """Envia todos os comandos de uma vez e aguarda os resultados"""
+        started = time.monotonic()
+        futures = [runner.submit(args, timeout=timeout) for args in commands]
+        results = [future.result() for future in futures]
+        return results, time.monotonic() - started
+
+    backend = FakeBackend()
+    for name in ('ipconfig', 'route', 'arp', 'netsh', 'wmic', 'getmac', 'netsh.exe', 'NETSH.EXE'):
+        backend.add([name], stdout=f'saída de {name}', latency=0.1)
+    backend.add(['ping'], latency=2.0)
+
+    # Limite global: 12 comandos de 100 ms, 4 por vez -> 3 levas
+    runner = CommandRunner(backend=backend, max_concurrency=4, per_command_limit=12)
+    commands = [[name] for name in ('ipconfig', 'route', 'arp', 'netsh', 'wmic', 'getmac')] * 2
+    results, elapsed = run_batch(runner, commands)
+    check(f"limite global (pico {backend.peak})", backend.peak == 4)
+    check(f"limite global: 3 levas ({elapsed:.2f} s)", 0.28 < elapsed < 0.5)
+    check("saídas simuladas", [result.stdout for result in results[:2]] == ['saída de ipconfig', 'saída de route'])
+    runner.close()
+
+    # Limite por executável: 6 arp e 2 route com 8 vagas no total
+    backend.peak = 0
+    backend.peak_by_command = {}
+    runner = CommandRunner(backend=backend, max_concurrency=8, per_command_limit=2)
+    results, elapsed = run_batch(runner, [['arp', '-a']] * 6 + [['route', 'print']] * 2)
+    check(f"limite por executável (picos {backend.peak_by_command})",
+          backend.peak_by_command == {'arp': 2, 'route': 2} and backend.peak == 4)
+    check(f"arp em 3 levas ({elapsed:.2f} s)", 0.28 < elapsed < 0.5)
+
+    # netsh e netsh.exe contam como o mesmo executável
+    backend.peak = 0
+    run_batch(runner, [['netsh'], ['netsh.exe'], ['netsh'], ['NETSH.EXE']])
+    check(f"extensão .exe ignorada no limite (pico {backend.peak})", backend.peak == 2)
+
+    # Timeout: resultado com timed_out, e a vaga é liberada para os próximos
+    results, elapsed = run_batch(runner, [['ping', '10.0.0.1']] * 2 + [['ping', '10.0.0.2']], timeout=0.2)
+    check("timeout como resultado", all(result.timed_out and not result.ok for result in results))
+    check(f"vagas liberadas após timeout ({elapsed:.2f} s)", elapsed < 0.6)
+    check("comando não simulado", runner.run(['inexistente']).not_found)
+
+    # close() recria o loop: os semáforos do loop antigo não são reaproveitados
+    runner.close()
+    results, elapsed = run_batch(runner, [['arp', '-a']] * 6)
+    check(f"limites após close ({elapsed:.2f} s)", all(result.ok for result in results) and 0.28 < elapsed < 0.5)
+    check("semáforos só do loop atual", list(runner.semaphores) == [runner.loop])
+    runner.close()
+
+    # Encerramento da árvore de processos: o neto também morre no timeout
+    if sys.platform != "win32":
+        runner = CommandRunner()
+        with tempfile.TemporaryDirectory() as directory:
+            pid_file = os.path.join(directory, 'neto')
+            result = runner.run(['sh', '-c', f'sleep 30 & echo $! > {pid_file}; wait'], timeout=0.5)
+            check("timeout do processo real", result.timed_out)
+            with open(pid_file) as handle:
+                grandchild = int(handle.read())
+            time.sleep(0.2)
+            try:
+                with open(f'/proc/{grandchild}/stat') as handle:
+                    alive = handle.read().split(') ', 1)[1][0] != 'Z'
+            except OSError:
+                alive = False
+            check(f"processo neto {grandchild} encerrado", not alive)
+        runner.close()
+
+    print("Verificações concluídas" if not failures else f"{failures} verificações falharam")
+    sys.exit(1 if failures else 0)
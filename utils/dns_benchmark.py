@@ -0,0 +1,257 @@
+"""
+Teste de resposta dos servidores DNS configurados
+Envia o mesmo conjunto de consultas (A, AAAA, SRV e PTR do próprio domínio da
+máquina) a todos os servidores ao mesmo tempo, em algumas rodadas, e compara:
+latência p50/p95 de cada servidor, consultas sem resposta, falhas
+(SERVFAIL/REFUSED) e respostas diferentes das dos demais servidores. Um DNS
+secundário lento ou inativo é causa frequente de "a rede está lenta".
+
+Benchmark: python -m utils.dns_benchmark
+"""
+
+import asyncio
+import collections
+import ipaddress
+import sys
+import time
+
+from utils.async_loop import get_network_loop
+from utils.dns_client import (
+    DNS_PORT, RCODE_NAMES, RCODE_NOERROR, RCODE_NXDOMAIN, TYPE_A, TYPE_AAAA, TYPE_NAMES, TYPE_PTR,
+    TYPE_SRV, DnsClient, DnsTimeout, reverse_name
+)
+from utils.latency_monitor import percentile
+
+
+ROUNDS = 3
+TIMEOUT = 1.0
+
+# Servidor lento: p95 acima disto (ms) ou alguma consulta sem resposta
+SLOW_THRESHOLD_MS = 100
+
+# Registros SRV do Active Directory consultados no domínio
+DOMAIN_SRV_RECORDS = ('_ldap._tcp', '_kerberos._tcp', '_ldap._tcp.dc._msdcs')
+
+VERDICT_OK = 'OK'
+VERDICT_SLOW = 'Lento'
+VERDICT_MISMATCH = 'Respostas divergentes'
+VERDICT_DEAD = 'Sem resposta'
+
+
+def build_query_set(fqdn, addresses=(), domain=None):
+    """
+    Consultas do teste a partir do nome e dos endereços da máquina
+
+    Args:
+        fqdn: Nome completo da máquina (o domínio é o que vem após o primeiro ponto)
+        addresses: Endereços cujo DNS reverso é consultado (ex.: o próprio IP e o gateway)
+        domain: Domínio consultado (padrão: o do fqdn)
+
+    Returns:
+        Lista de (nome, tipo)
+    """
+    fqdn = (fqdn or '').strip('.')
+    if domain is None and '.' in fqdn:
+        domain = fqdn.split('.', 1)[1]
+    queries = []
+    if fqdn:
+        queries += [(fqdn, TYPE_A), (fqdn, TYPE_AAAA)]
+    if domain:
+        queries += [(domain, TYPE_A)]
+        queries += [(f'{record}.{domain}', TYPE_SRV) for record in DOMAIN_SRV_RECORDS]
+    for address in addresses:
+        try:
+            queries.append((reverse_name(str(ipaddress.ip_address(address))), TYPE_PTR))
+        except ValueError:
+            continue
+    return list(dict.fromkeys(queries))
+
+
+def _answer_key(response):
+    """Resposta comparável entre servidores: código e valores sem ordem nem caixa"""
+    values = tuple(sorted(
+        value.lower().rstrip('.') if isinstance(value, str) else str(value) for value in response.values()
+    ))
+    return response.rcode, values
+
+
+class ServerReport:
+    """Resultado de um servidor no teste"""
+
+    def __init__(self, server):
+        self.server = server
+        self.latencies = []
+        self.sent = 0
+        self.timeouts = 0
+        self.failures = collections.Counter()
+        self.mismatches = []
+
+    @property
+    def answered(self):
+        return len(self.latencies)
+
+    @property
+    def p50(self):
+        return percentile(sorted(self.latencies), 0.50) if self.latencies else None
+
+    @property
+    def p95(self):
+        return percentile(sorted(self.latencies), 0.95) if self.latencies else None
+
+    @property
+    def verdict(self):
+        if not self.latencies:
+            return VERDICT_DEAD
+        if self.timeouts or self.p95 > SLOW_THRESHOLD_MS:
+            return VERDICT_SLOW
+        if self.mismatches:
+            return VERDICT_MISMATCH
+        return VERDICT_OK
+
+    def summary(self):
+        if not self.latencies:
+            return f"{self.server}: {VERDICT_DEAD} ({self.timeouts}/{self.sent} consultas expiraram)"
+        parts = [f"{self.server}: {self.verdict}", f"p50 {self.p50:.1f} ms", f"p95 {self.p95:.1f} ms"]
+        if self.timeouts:
+            parts.append(f"{self.timeouts}/{self.sent} sem resposta")
+        if self.failures:
+            parts.append(', '.join(f"{count} {RCODE_NAMES.get(rcode, rcode)}" for rcode, count in self.failures.items()))
+        if self.mismatches:
+            parts.append(f"{len(self.mismatches)} resposta(s) divergente(s)")
+        return "; ".join(parts)
+
+    def __repr__(self):
+        return f"ServerReport({self.summary()})"
+
+
+class DnsBenchmark:
+    """Envia as mesmas consultas a todos os servidores ao mesmo tempo e compara os resultados"""
+
+    def __init__(self, servers, queries, rounds=ROUNDS, timeout=TIMEOUT, port=DNS_PORT, loop_thread=None):
+        """
+        Args:
+            servers: Servidores DNS testados
+            queries: Lista de (nome, tipo), ver build_query_set
+            rounds: Repetições do conjunto de consultas (a primeira costuma preencher o cache do servidor)
+            timeout: Espera por resposta de cada consulta (segundos), sem reenvio
+            port: Porta UDP dos servidores
+            loop_thread: AsyncLoopThread em que as consultas rodam
+        """
+        self.servers = list(dict.fromkeys(servers))
+        self.queries = list(queries)
+        self.rounds = rounds
+        self.timeout = timeout
+        self.loop_thread = loop_thread or get_network_loop()
+        self.client = DnsClient(port=port, timeout=timeout, retries=0, loop_thread=self.loop_thread)
+        self.elapsed = None
+
+    def run(self):
+        """Executa o teste (bloqueia a thread chamadora); retorna a lista de ServerReport"""
+        try:
+            return self.loop_thread.run(self.run_async())
+        finally:
+            self.client.close()
+
+    async def run_async(self):
+        reports = collections.OrderedDict((server, ServerReport(server)) for server in self.servers)
+        # Última resposta de cada servidor a cada consulta, para a comparação
+        answers = collections.defaultdict(dict)
+        started = time.perf_counter()
+        for _ in range(self.rounds):
+            await asyncio.gather(*(
+                self._query(reports[server], name, qtype, answers)
+                for server in self.servers for name, qtype in self.queries
+            ))
+        self.elapsed = time.perf_counter() - started
+        self._compare(reports, answers)
+        return list(reports.values())
+
+    async def _query(self, report, name, qtype, answers):
+        report.sent += 1
+        try:
+            response = await self.client.query_async(name, qtype, server=report.server)
+        except DnsTimeout:
+            report.timeouts += 1
+            return
+        except OSError as e:
+            print(f"Erro ao consultar {report.server}: {e}")  # Debug
+            report.timeouts += 1
+            return
+        report.latencies.append(response.elapsed * 1000)
+        if response.rcode not in (RCODE_NOERROR, RCODE_NXDOMAIN):
+            report.failures[response.rcode] += 1
+            return
+        answers[(name, qtype)][report.server] = _answer_key(response)
+
+    @staticmethod
+    def _compare(reports, answers):
+        """Marca as respostas que diferem da resposta da maioria dos servidores"""
+        for (name, qtype), by_server in answers.items():
+            if len(by_server) < 2:
+                continue
+            counts = collections.Counter(by_server.values())
+            expected, votes = counts.most_common(1)[0]
+            # Sem maioria (ex.: dois servidores discordando) não há como apontar o errado
+            if votes * 2 <= len(by_server):
+                expected = None
+            for server, answer in by_server.items():
+                if expected is not None and answer != expected:
+                    reports[server].mismatches.append((name, TYPE_NAMES.get(qtype, qtype), answer, expected))
+                elif expected is None and len(counts) > 1:
+                    reports[server].mismatches.append((name, TYPE_NAMES.get(qtype, qtype), answer, None))
+
+
+def format_report(reports, elapsed=None):
+    """Texto do resultado, com os servidores em ordem de latência"""
+    ordered = sorted(reports, key=lambda report: (report.p50 is None, report.p50 or 0))
+    lines = [report.summary() for report in ordered]
+    for report in ordered:
+        for name, type_name, answer, expected in report.mismatches[:3]:
+            got = ', '.join(answer[1]) or RCODE_NAMES.get(answer[0], answer[0])
+            if expected is None:
+                lines.append(f"  {report.server} {name} {type_name}: {got} (sem maioria entre os servidores)")
+            else:
+                wanted = ', '.join(expected[1]) or RCODE_NAMES.get(expected[0], expected[0])
+                lines.append(f"  {report.server} {name} {type_name}: {got} (demais: {wanted})")
+    if elapsed is not None:
+        lines.append(f"Teste concluído em {elapsed:.1f} s")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    from utils.dns_client import StandInDnsServer
+
+    # Quatro servidores locais: rápido, lento, inativo e um com registros divergentes
+    domain = 'corp.local'
+    records = {
+        (f'pc01.{domain}', TYPE_A): ['10.0.0.15'],
+        (domain, TYPE_A): ['10.0.0.2', '10.0.0.3'],
+        (f'_ldap._tcp.{domain}', TYPE_SRV): [(0, 100, 389, f'dc1.{domain}')],
+        (f'_kerberos._tcp.{domain}', TYPE_SRV): [(0, 100, 88, f'dc1.{domain}')],
+        (reverse_name('10.0.0.15'), TYPE_PTR): [f'pc01.{domain}'],
+        (reverse_name('10.0.0.1'), TYPE_PTR): [f'gw.{domain}'],
+    }
+    stale = dict(records)
+    stale[(f'pc01.{domain}', TYPE_A)] = ['10.0.0.99']
+    network_loop = get_network_loop()
+    servers = [
+        ('rápido', StandInDnsServer(records, delay=0.005)),
+        ('lento', StandInDnsServer(records, delay=0.25)),
+        ('inativo', StandInDnsServer(records, delay=None)),
+        ('divergente', StandInDnsServer(stale, delay=0.01)),
+    ]
+    # Cada servidor escuta em um endereço do loopback, todos na mesma porta
+    port = 0
+    addresses = []
+    for index, (label, server) in enumerate(servers):
+        address = f'127.0.0.{index + 2}'
+        port = network_loop.run(server.start(host=address, port=port))
+        addresses.append(address)
+        print(f"{address}: servidor {label}")
+
+    queries = build_query_set(f'pc01.{domain}', ['10.0.0.15', '10.0.0.1'])
+    print(f"{len(queries)} consultas: {[(name, TYPE_NAMES[qtype]) for name, qtype in queries]}")
+    benchmark = DnsBenchmark(addresses, queries, rounds=int(sys.argv[1]) if len(sys.argv) > 1 else ROUNDS,
+                             timeout=0.5, port=port)
+    reports = benchmark.run()
+    print(format_report(reports, benchmark.elapsed))
@@ -0,0 +1,522 @@
+"""
+Cliente DNS assíncrono em Python puro (consultas UDP, RFC 1035)
+Consulta servidores específicos com timeout próprio, sem passar pelo
+resolvedor do sistema: as consultas usam um socket UDP por família no loop de
+rede compartilhado e muitas podem ficar pendentes ao mesmo tempo. Trata os
+tipos A, AAAA, PTR, CNAME, NS, SRV e SOA (este último para o TTL negativo).
+
+StandInDnsServer é um servidor UDP local, com registros pré-definidos e
+atraso simulado, para testes e benchmarks sem depender da rede.
+"""
+
+import asyncio
+import ipaddress
+import random
+import socket
+import struct
+import sys
+import time
+
+from utils.async_loop import get_network_loop
+
+
+DNS_PORT = 53
+
+TYPE_A = 1
+TYPE_NS = 2
+TYPE_CNAME = 5
+TYPE_SOA = 6
+TYPE_PTR = 12
+TYPE_AAAA = 28
+TYPE_SRV = 33
+TYPE_NAMES = {
+    TYPE_A: 'A', TYPE_NS: 'NS', TYPE_CNAME: 'CNAME', TYPE_SOA: 'SOA',
+    TYPE_PTR: 'PTR', TYPE_AAAA: 'AAAA', TYPE_SRV: 'SRV'
+}
+CLASS_IN = 1
+
+RCODE_NOERROR = 0
+RCODE_FORMERR = 1
+RCODE_SERVFAIL = 2
+RCODE_NXDOMAIN = 3
+RCODE_REFUSED = 5
+RCODE_NAMES = {
+    RCODE_NOERROR: 'NOERROR', RCODE_FORMERR: 'FORMERR', RCODE_SERVFAIL: 'SERVFAIL',
+    RCODE_NXDOMAIN: 'NXDOMAIN', RCODE_REFUSED: 'REFUSED'
+}
+
+FLAG_RESPONSE = 0x8000
+FLAG_AUTHORITATIVE = 0x0400
+FLAG_TRUNCATED = 0x0200
+FLAG_RECURSION_DESIRED = 0x0100
+FLAG_RECURSION_AVAILABLE = 0x0080
+
+# Buffer de recepção dos sockets: rajadas de centenas de respostas não podem ser descartadas
+RECEIVE_BUFFER = 1 << 20
+
+_HEADER = struct.Struct('!HHHHHH')
+_RECORD = struct.Struct('!HHIH')
+
+
+class DnsError(Exception):
+    """Resposta DNS inválida ou servidor indisponível"""
+
+
+class DnsTimeout(DnsError):
+    """Nenhum servidor respondeu dentro do tempo"""
+
+    def __init__(self, servers):
+        self.servers = list(servers)
+        super().__init__(f"Sem resposta DNS de {', '.join(self.servers) or 'nenhum servidor'}")
+
+
+def reverse_name(address):
+    """Nome PTR de um endereço (x.x.x.x.in-addr.arpa ou ...ip6.arpa)"""
+    return ipaddress.ip_address(address).reverse_pointer
+
+
+# === Codificação ===
+
+def encode_name(name):
+    """Codifica um nome de domínio em rótulos (sem compressão)"""
+    encoded = b''
+    for label in name.strip('.').split('.'):
+        if label:
+            data = label.encode('idna') if not label.isascii() else label.encode('ascii')
+            if len(data) > 63:
+                raise ValueError(f"Rótulo DNS longo demais: {label}")
+            encoded += bytes((len(data),)) + data
+    return encoded + b'\x00'
+
+
+def decode_name(data, offset):
+    """
+    Decodifica um nome (com ponteiros de compressão)
+
+    Returns:
+        (nome, posição logo após o nome no registro original)
+    """
+    labels = []
+    end = None
+    jumps = 0
+    while True:
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            jumps += 1
+            if jumps > 32:
+                raise ValueError("Laço de compressão no nome DNS")
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        if length == 0:
+            offset += 1
+            break
+        labels.append(data[offset + 1:offset + 1 + length].decode('ascii', errors='replace'))
+        offset += 1 + length
+    return '.'.join(labels), end if end is not None else offset
+
+
+def build_query(query_id, name, qtype, recursion=True):
+    """Monta uma consulta com uma pergunta"""
+    flags = FLAG_RECURSION_DESIRED if recursion else 0
+    return _HEADER.pack(query_id, flags, 1, 0, 0, 0) + encode_name(name) + struct.pack('!HH', qtype, CLASS_IN)
+
+
+def encode_rdata(qtype, value):
+    """Codifica o dado de um registro (para o servidor local)"""
+    if qtype == TYPE_A:
+        return socket.inet_pton(socket.AF_INET, value)
+    if qtype == TYPE_AAAA:
+        return socket.inet_pton(socket.AF_INET6, value)
+    if qtype in (TYPE_PTR, TYPE_CNAME, TYPE_NS):
+        return encode_name(value)
+    if qtype == TYPE_SRV:
+        priority, weight, port, target = value
+        return struct.pack('!HHH', priority, weight, port) + encode_name(target)
+    if qtype == TYPE_SOA:
+        mname, rname, serial, refresh, retry, expire, minimum = value
+        return encode_name(mname) + encode_name(rname) + struct.pack('!IIIII', serial, refresh, retry, expire, minimum)
+    return bytes(value)
+
+
+def encode_record(name, qtype, ttl, value):
+    rdata = encode_rdata(qtype, value)
+    return encode_name(name) + _RECORD.pack(qtype, CLASS_IN, ttl, len(rdata)) + rdata
+
+
+def build_response(query_id, name, qtype, answers=(), rcode=RCODE_NOERROR, authority=()):
+    """
+    Monta uma resposta
+
+    Args:
+        answers, authority: Listas de (nome, tipo, ttl, valor)
+    """
+    flags = FLAG_RESPONSE | FLAG_RECURSION_DESIRED | FLAG_RECURSION_AVAILABLE | rcode
+    message = _HEADER.pack(query_id, flags, 1, len(answers), len(authority), 0)
+    message += encode_name(name) + struct.pack('!HH', qtype, CLASS_IN)
+    for record in list(answers) + list(authority):
+        message += encode_record(*record)
+    return message
+
+
+# === Decodificação ===
+
+class DnsRecord:
+    """Registro de recurso decodificado"""
+
+    __slots__ = ('name', 'type', 'ttl', 'value')
+
+    def __init__(self, name, record_type, ttl, value):
+        self.name = name
+        self.type = record_type
+        self.ttl = ttl
+        # A/AAAA/PTR/CNAME/NS: texto; SRV: (prioridade, peso, porta, alvo);
+        # SOA: (mname, rname, serial, refresh, retry, expire, minimum); outros: bytes
+        self.value = value
+
+    def __repr__(self):
+        return f"DnsRecord({self.name} {self.ttl} {TYPE_NAMES.get(self.type, self.type)} {self.value!r})"
+
+
+def _decode_rdata(data, offset, length, record_type):
+    if record_type == TYPE_A and length == 4:
+        return socket.inet_ntop(socket.AF_INET, data[offset:offset + 4])
+    if record_type == TYPE_AAAA and length == 16:
+        return socket.inet_ntop(socket.AF_INET6, data[offset:offset + 16])
+    if record_type in (TYPE_PTR, TYPE_CNAME, TYPE_NS):
+        return decode_name(data, offset)[0]
+    if record_type == TYPE_SRV:
+        priority, weight, port = struct.unpack_from('!HHH', data, offset)
+        return priority, weight, port, decode_name(data, offset + 6)[0]
+    if record_type == TYPE_SOA:
+        mname, position = decode_name(data, offset)
+        rname, position = decode_name(data, position)
+        return (mname, rname) + struct.unpack_from('!IIIII', data, position)
+    return bytes(data[offset:offset + length])
+
+
+class DnsResponse:
+    """Mensagem DNS decodificada"""
+
+    __slots__ = ('id', 'flags', 'rcode', 'question', 'answers', 'authority', 'server', 'elapsed')
+
+    def __init__(self, message_id, flags, question, answers, authority):
+        self.id = message_id
+        self.flags = flags
+        self.rcode = flags & 0x000F
+        self.question = question  # (nome, tipo) ou None
+        self.answers = answers
+        self.authority = authority
+        self.server = None
+        self.elapsed = None
+
+    @property
+    def truncated(self):
+        return bool(self.flags & FLAG_TRUNCATED)
+
+    @property
+    def ok(self):
+        return self.rcode == RCODE_NOERROR
+
+    @property
+    def negative(self):
+        """NXDOMAIN ou NOERROR sem resposta do tipo pedido (NODATA)"""
+        return self.rcode == RCODE_NXDOMAIN or (self.ok and not self.values())
+
+    def values(self, record_type=None):
+        """Valores das respostas do tipo pedido (ou do tipo informado)"""
+        if record_type is None and self.question:
+            record_type = self.question[1]
+        return [record.value for record in self.answers if record_type is None or record.type == record_type]
+
+    def ttl(self):
+        """TTL da resposta positiva, ou o TTL negativo do SOA (RFC 2308); None se ausente"""
+        if not self.negative:
+            return min((record.ttl for record in self.answers), default=None)
+        for record in self.authority:
+            if record.type == TYPE_SOA:
+                return min(record.ttl, record.value[6])
+        return None
+
+    def __repr__(self):
+        return (f"DnsResponse({RCODE_NAMES.get(self.rcode, self.rcode)}, "
+                f"{self.question}, {len(self.answers)} respostas)")
+
+
+def parse_message(data):
+    """Decodifica uma mensagem DNS (consulta ou resposta)"""
+    if len(data) < _HEADER.size:
+        raise ValueError("Mensagem DNS curta demais")
+    message_id, flags, questions, answers, authorities, _ = _HEADER.unpack_from(data)
+    offset = _HEADER.size
+    question = None
+    for _ in range(questions):
+        name, offset = decode_name(data, offset)
+        qtype, _ = struct.unpack_from('!HH', data, offset)
+        offset += 4
+        if question is None:
+            question = (name, qtype)
+    sections = []
+    for count in (answers, authorities):
+        records = []
+        for _ in range(count):
+            name, offset = decode_name(data, offset)
+            record_type, _, ttl, length = _RECORD.unpack_from(data, offset)
+            offset += _RECORD.size
+            if offset + length > len(data):
+                raise ValueError("Registro DNS truncado")
+            records.append(DnsRecord(name, record_type, ttl, _decode_rdata(data, offset, length, record_type)))
+            offset += length
+        sections.append(records)
+    return DnsResponse(message_id, flags, question, sections[0], sections[1])
+
+
+# === Cliente ===
+
+def _enlarge_receive_buffer(transport):
+    try:
+        transport.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+    except (OSError, AttributeError):
+        pass
+
+
+class _ClientProtocol(asyncio.DatagramProtocol):
+    """Entrega as respostas à consulta pendente com o mesmo ID"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def datagram_received(self, data, address):
+        self.client._on_response(data, address)
+
+    def error_received(self, exc):
+        # ICMP port unreachable: o servidor não existe; a consulta expira normalmente
+        pass
+
+
+class DnsClient:
+    """Cliente DNS assíncrono sobre um único socket UDP por família"""
+
+    def __init__(self, servers=(), port=DNS_PORT, timeout=1.0, retries=1, loop_thread=None):
+        """
+        Args:
+            servers: Servidores consultados em ordem (o próximo só é tentado se o
+                anterior não responder ou responder SERVFAIL/REFUSED)
+            port: Porta UDP dos servidores (53)
+            timeout: Espera por resposta de cada tentativa (segundos)
+            retries: Reenvios ao mesmo servidor após a primeira tentativa sem resposta
+            loop_thread: AsyncLoopThread em que o socket é registrado
+                (padrão: o loop de rede compartilhado)
+        """
+        self.servers = list(servers)
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.loop_thread = loop_thread or get_network_loop()
+        self.transports = {}
+        self.transport_lock = None
+        self.pending = {}
+        self.stats = {'queries': 0, 'responses': 0, 'timeouts': 0}
+
+    # --- API síncrona (para as threads do aplicativo) ---
+
+    def query(self, name, qtype, server=None):
+        """Consulta (nome, tipo); retorna DnsResponse ou levanta DnsTimeout"""
+        return self.loop_thread.run(self.query_async(name, qtype, server))
+
+    def close(self):
+        """Fecha os sockets do cliente"""
+        def close_transports():
+            for transport in self.transports.values():
+                transport.close()
+            self.transports = {}
+        self.loop_thread.call_soon(close_transports)
+
+    # --- API assíncrona (no loop de rede) ---
+
+    async def query_async(self, name, qtype, server=None):
+        """
+        Consulta um servidor específico ou os servidores configurados, em ordem
+
+        Returns:
+            DnsResponse (NXDOMAIN também é uma resposta válida)
+        """
+        servers = [server] if server else self.servers
+        last_response = None
+        for address in servers:
+            try:
+                response = await self._query_server(address, name, qtype)
+            except DnsTimeout:
+                continue
+            if response.rcode in (RCODE_SERVFAIL, RCODE_REFUSED):
+                last_response = response
+                continue
+            return response
+        if last_response is not None:
+            return last_response
+        raise DnsTimeout(servers)
+
+    async def _query_server(self, server, name, qtype):
+        """Envia a consulta a um servidor (com reenvios) e aguarda a resposta correspondente"""
+        transport = await self._transport_for(server)
+        loop = asyncio.get_event_loop()
+        expected = (name.strip('.').lower(), qtype)
+        for _ in range(self.retries + 1):
+            query_id = self._new_id()
+            future = loop.create_future()
+            self.pending[query_id] = (future, expected)
+            self.stats['queries'] += 1
+            started = time.perf_counter()
+            try:
+                transport.sendto(build_query(query_id, name, qtype), (server, self.port))
+                response = await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError:
+                self.stats['timeouts'] += 1
+                continue
+            finally:
+                self.pending.pop(query_id, None)
+            response.server = server
+            response.elapsed = time.perf_counter() - started
+            return response
+        raise DnsTimeout([server])
+
+    def _new_id(self):
+        """ID de 16 bits aleatório e ainda não usado por uma consulta pendente"""
+        while True:
+            query_id = random.getrandbits(16)
+            if query_id not in self.pending:
+                return query_id
+
+    async def _transport_for(self, server):
+        """Socket UDP da família do servidor (um por família, compartilhado por todas as consultas)"""
+        family = socket.AF_INET6 if ':' in server else socket.AF_INET
+        if self.transport_lock is None:
+            self.transport_lock = asyncio.Lock()
+        # Consultas simultâneas esperam o mesmo socket em vez de abrir um cada
+        async with self.transport_lock:
+            transport = self.transports.get(family)
+            if transport is None or transport.is_closing():
+                loop = asyncio.get_event_loop()
+                transport, _ = await loop.create_datagram_endpoint(
+                    lambda: _ClientProtocol(self), family=family
+                )
+                _enlarge_receive_buffer(transport)
+                self.transports[family] = transport
+        return transport
+
+    def _on_response(self, data, address):
+        try:
+            response = parse_message(data)
+        except (ValueError, IndexError, struct.error):
+            return
+        pending = self.pending.get(response.id)
+        if not pending or not response.flags & FLAG_RESPONSE:
+            return
+        future, expected = pending
+        # A pergunta repetida na resposta precisa ser a da consulta (descarta respostas atrasadas/forjadas)
+        if response.question is None or (response.question[0].lower(), response.question[1]) != expected:
+            return
+        if not future.done():
+            self.stats['responses'] += 1
+            future.set_result(response)
+
+
+# === Servidor local para testes ===
+
+class _ServerProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, address):
+        self.server._on_query(self.transport, data, address)
+
+
+class StandInDnsServer:
+    """Servidor DNS local com registros pré-definidos e atraso simulado"""
+
+    def __init__(self, records, delay=0.0, ttl=300, negative_ttl=60, zone='local'):
+        """
+        Args:
+            records: Dicionário {(nome, tipo): [valores]} servido pelo servidor
+            delay: Atraso simulado de cada resposta (segundos); None = não responde
+            ttl: TTL das respostas positivas
+            negative_ttl: TTL negativo anunciado no SOA das respostas NXDOMAIN/NODATA
+            zone: Zona do registro SOA das respostas negativas
+        """
+        self.records = {(name.strip('.').lower(), qtype): list(values) for (name, qtype), values in records.items()}
+        self.names = {name for name, _ in self.records}
+        self.delay = delay
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.zone = zone
+        self.transport = None
+        self.requests = 0
+
+    async def start(self, host='127.0.0.1', port=0):
+        """Abre o socket do servidor; retorna a porta UDP em uso"""
+        loop = asyncio.get_event_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: _ServerProtocol(self), local_addr=(host, port)
+        )
+        _enlarge_receive_buffer(self.transport)
+        return self.transport.get_extra_info('sockname')[1]
+
+    def close(self):
+        if self.transport:
+            self.transport.close()
+
+    def _on_query(self, transport, data, address):
+        try:
+            query = parse_message(data)
+        except (ValueError, IndexError, struct.error):
+            return
+        self.requests += 1
+        if query.question is None or self.delay is None:
+            return
+        name, qtype = query.question
+        key = (name.lower(), qtype)
+        if key in self.records:
+            answers = [(name, qtype, self.ttl, value) for value in self.records[key]]
+            response = build_response(query.id, name, qtype, answers)
+        else:
+            soa = (self.zone, self.negative_ttl, TYPE_SOA,
+                   (f'ns.{self.zone}', f'admin.{self.zone}', 1, 3600, 600, 86400, self.negative_ttl))
+            rcode = RCODE_NOERROR if name.lower() in self.names else RCODE_NXDOMAIN
+            response = build_response(query.id, name, qtype, rcode=rcode,
+                                      authority=[(soa[0], soa[2], soa[1], soa[3])])
+        loop = asyncio.get_event_loop()
+        loop.call_later(self.delay, transport.sendto, response, address)
+
+
+if __name__ == "__main__":
+    # Benchmark contra um servidor local: 1000 PTR concorrentes, metade sem registro
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    records = {(reverse_name(f'10.0.{index // 256}.{index % 256}'), TYPE_PTR): [f'host-{index}.lab.local']
+               for index in range(0, total, 2)}
+    records[('gw.lab.local', TYPE_A)] = ['10.0.0.1']
+    records[('_ldap._tcp.lab.local', TYPE_SRV)] = [(0, 100, 389, 'dc1.lab.local')]
+
+    async def benchmark():
+        server = StandInDnsServer(records, delay=0.02)
+        port = await server.start()
+        client = DnsClient(['127.0.0.1'], port=port, timeout=1.0, loop_thread=network_loop)
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.query_async(reverse_name(f'10.0.{index // 256}.{index % 256}'), TYPE_PTR)
+            for index in range(total)
+        ))
+        elapsed = time.perf_counter() - started
+        found = sum(1 for response in responses if not response.negative)
+        print(f"{total} PTR em {elapsed * 1000:.0f} ms: {found} encontrados, "
+              f"{total - found} negativos (TTL {responses[1].ttl()} s)")
+        print((await client.query_async('gw.lab.local', TYPE_A)).values(),
+              (await client.query_async('_ldap._tcp.lab.local', TYPE_SRV)).values())
+        server.close()
+
+    network_loop = get_network_loop()
+    network_loop.run(benchmark())
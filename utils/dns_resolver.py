@@ -0,0 +1,332 @@
+"""
+Resolução de nomes (direta e reversa) com cache e prazo máximo
+Substitui as chamadas bloqueantes a socket.gethostbyaddr/getfqdn: as consultas
+rodam no loop de rede compartilhado, no máximo max_concurrency ao mesmo tempo,
+e cada uma tem um prazo rígido. Respostas positivas e negativas (NXDOMAIN,
+sem registro, sem resposta no prazo) ficam em cache pelo TTL, então as
+atualizações seguintes não esperam pelo DNS.
+
+Com servidores DNS conhecidos (adaptadores do sistema ou informados), as
+consultas vão direto a eles pelo utils.dns_client; sem servidores, o
+resolvedor do sistema é usado em um pool de threads limitado.
+
+Benchmark: python -m utils.dns_resolver [endereços]
+"""
+
+import asyncio
+import collections
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.async_loop import get_network_loop
+from utils.dns_client import TYPE_A, TYPE_AAAA, TYPE_PTR, DnsClient, DnsError, reverse_name
+
+
+POSITIVE_TTL = 300
+NEGATIVE_TTL = 60
+CACHE_SIZE = 4096
+
+
+def system_dns_servers():
+    """Servidores DNS configurados nos adaptadores do sistema (lista vazia se indisponível)"""
+    from utils.native_interfaces import get_adapters
+
+    servers = []
+    try:
+        for adapter in get_adapters():
+            for server in adapter.get('dns_servers', []):
+                if server not in servers:
+                    servers.append(server)
+    except Exception as e:
+        print(f"Erro ao obter servidores DNS do sistema: {e}")
+    return servers
+
+
+class ResolverCache:
+    """Cache LRU com validade por entrada; None representa uma resposta negativa"""
+
+    def __init__(self, max_entries=CACHE_SIZE, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'negative_hits': 0, 'misses': 0}
+
+    def get(self, key):
+        """Retorna (encontrado, valor); entradas vencidas contam como ausentes"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[1] <= self.clock():
+                if entry is not None:
+                    del self.entries[key]
+                self.stats['misses'] += 1
+                return False, None
+            self.entries.move_to_end(key)
+            self.stats['negative_hits' if entry[0] is None else 'hits'] += 1
+            return True, entry[0]
+
+    def put(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (value, self.clock() + ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class HostResolver:
+    """Resolução direta/reversa concorrente, com prazo e cache positivo/negativo"""
+
+    def __init__(self, servers=None, max_concurrency=8, deadline=1.0, positive_ttl=POSITIVE_TTL,
+                 negative_ttl=NEGATIVE_TTL, client=None, loop_thread=None, cache=None):
+        """
+        Args:
+            servers: Servidores DNS consultados (None = os dos adaptadores do sistema;
+                lista vazia = resolvedor do sistema)
+            max_concurrency: Consultas simultâneas (e threads do resolvedor do sistema)
+            deadline: Prazo máximo (segundos) de cada resolução
+            positive_ttl: Validade máxima de uma resposta positiva (o TTL do registro,
+                se menor, prevalece)
+            negative_ttl: Validade de uma resposta negativa ou sem resposta
+            client: DnsClient usado (padrão: um novo, com os servidores acima)
+            loop_thread: AsyncLoopThread em que as consultas rodam
+            cache: ResolverCache (padrão: um novo)
+        """
+        self.loop_thread = loop_thread or (client.loop_thread if client else get_network_loop())
+        self.servers = servers
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.deadline = deadline
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.cache = cache if cache is not None else ResolverCache()
+        self.pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="dns")
+        self.semaphore = None
+        self.in_flight = {}
+        self.stats = {'lookups': 0, 'timeouts': 0}
+
+    # --- API síncrona (para as threads do aplicativo) ---
+
+    def reverse(self, address, deadline=None):
+        """Nome do endereço pelo DNS reverso (PTR); None se não houver ou o prazo esgotar"""
+        cached, value = self.cache.get(('ptr', address))
+        if cached:
+            return value
+        return self._run(self.reverse_async(address, deadline), deadline)
+
+    def forward(self, name, deadline=None):
+        """Endereços IPv4 e IPv6 do nome (lista vazia se não houver ou o prazo esgotar)"""
+        cached, value = self.cache.get(('addr', name.lower()))
+        if cached:
+            return list(value or ())
+        return self._run(self.forward_async(name, deadline), deadline) or []
+
+    def reverse_many(self, addresses, deadline=None):
+        """Resolve vários endereços ao mesmo tempo; retorna {endereço: nome ou None}"""
+        return self._run(self.reverse_many_async(addresses, deadline), deadline) or {}
+
+    def local_names(self, deadline=None):
+        """(hostname, FQDN) desta máquina; o FQDN vem do cache ou é resolvido com prazo"""
+        hostname = socket.gethostname()
+        cached, value = self.cache.get(('fqdn', hostname))
+        if cached:
+            return hostname, value or hostname
+        fqdn = self._run(self._fqdn_async(hostname, deadline), deadline)
+        return hostname, fqdn or hostname
+
+    def invalidate(self):
+        """Esquece todas as respostas (ex.: a rede ou os servidores DNS mudaram)"""
+        self.cache.clear()
+        if self.servers is None and self.client is not None:
+            # Os servidores do sistema são redescobertos na próxima consulta
+            self.client.close()
+            self.client = None
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+        self.pool.shutdown(wait=False)
+
+    def _run(self, coroutine, deadline):
+        """Executa a corrotina no loop, com uma folga sobre o prazo para a entrega do resultado"""
+        try:
+            return self.loop_thread.run(coroutine, (deadline or self.deadline) * 2 + 1)
+        except Exception as e:
+            print(f"Erro na resolução de nomes: {e}")  # Debug
+            return None
+
+    # --- API assíncrona (no loop de rede) ---
+
+    async def reverse_async(self, address, deadline=None):
+        async def lookup():
+            client = self._client()
+            if client is None:
+                loop = asyncio.get_event_loop()
+                name = (await loop.run_in_executor(self.pool, _system_reverse, address))
+                return name, None
+            response = await client.query_async(reverse_name(address), TYPE_PTR)
+            names = response.values()
+            return (names[0].rstrip('.') if names else None), response.ttl()
+        return await self._lookup(('ptr', address), lookup, deadline)
+
+    async def forward_async(self, name, deadline=None):
+        async def lookup():
+            client = self._client()
+            if client is None:
+                loop = asyncio.get_event_loop()
+                addresses = await loop.run_in_executor(self.pool, _system_forward, name)
+                return (tuple(addresses) or None), None
+            responses = await asyncio.gather(
+                client.query_async(name, TYPE_A), client.query_async(name, TYPE_AAAA),
+                return_exceptions=True
+            )
+            addresses, ttls = [], []
+            for response in responses:
+                if isinstance(response, BaseException):
+                    continue
+                addresses += response.values()
+                if response.ttl() is not None:
+                    ttls.append(response.ttl())
+            if not addresses and all(isinstance(response, BaseException) for response in responses):
+                raise responses[0]
+            return (tuple(addresses) or None), (min(ttls) if ttls else None)
+        value = await self._lookup(('addr', name.lower()), lookup, deadline)
+        return list(value or ())
+
+    async def reverse_many_async(self, addresses, deadline=None):
+        addresses = list(dict.fromkeys(addresses))
+        names = await asyncio.gather(*(self.reverse_async(address, deadline) for address in addresses))
+        return dict(zip(addresses, names))
+
+    async def _fqdn_async(self, hostname, deadline=None):
+        async def lookup():
+            if '.' in hostname:
+                return hostname, None
+            loop = asyncio.get_event_loop()
+            return (await loop.run_in_executor(self.pool, socket.getfqdn, hostname)), None
+        return await self._lookup(('fqdn', hostname), lookup, deadline)
+
+    async def _lookup(self, key, lookup, deadline):
+        """
+        Consulta com cache, deduplicação, limite de concorrência e prazo
+
+        lookup() retorna (valor ou None, TTL do registro ou None); valor None,
+        erro e prazo esgotado são guardados como resposta negativa.
+        """
+        cached, value = self.cache.get(key)
+        if cached:
+            return value
+        # Pedidos simultâneos do mesmo nome aguardam a mesma consulta
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._resolve(key, lookup, deadline or self.deadline))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _resolve(self, key, lookup, deadline):
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        started = time.monotonic()
+        value, ttl = None, None
+        try:
+            async with self.semaphore:
+                # O prazo inclui a espera por uma vaga
+                remaining = deadline - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                self.stats['lookups'] += 1
+                value, ttl = await asyncio.wait_for(lookup(), remaining)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+        except (DnsError, OSError) as e:
+            print(f"Falha ao resolver {key[1]}: {e}")  # Debug
+        if value is None:
+            self.cache.put(key, None, self.negative_ttl if ttl is None else min(ttl, self.negative_ttl))
+        else:
+            self.cache.put(key, value, self.positive_ttl if ttl is None else min(ttl, self.positive_ttl))
+        return value
+
+    def _client(self):
+        """DnsClient com os servidores configurados (None = usar o resolvedor do sistema)"""
+        if self.client is None:
+            servers = self.servers if self.servers is not None else system_dns_servers()
+            if not servers:
+                return None
+            self.client = DnsClient(servers, timeout=min(1.0, self.deadline / 2), retries=1,
+                                    loop_thread=self.loop_thread)
+        return self.client if self.client.servers else None
+
+
+def _system_reverse(address):
+    """gethostbyaddr sem exceção (None se não houver nome)"""
+    try:
+        return socket.gethostbyaddr(address)[0] or None
+    except (socket.herror, socket.gaierror, OSError):
+        return None
+
+
+def _system_forward(name):
+    """Endereços do nome pelo resolvedor do sistema"""
+    try:
+        infos = socket.getaddrinfo(name, None, type=socket.SOCK_STREAM)
+    except (socket.gaierror, OSError):
+        return []
+    return list(dict.fromkeys(info[4][0] for info in infos))
+
+
+_shared_resolver = None
+_shared_resolver_lock = threading.Lock()
+
+
+def get_resolver():
+    """Retorna o resolvedor compartilhado pelo aplicativo"""
+    global _shared_resolver
+    with _shared_resolver_lock:
+        if _shared_resolver is None:
+            _shared_resolver = HostResolver()
+        return _shared_resolver
+
+
+if __name__ == "__main__":
+    from utils.dns_client import StandInDnsServer
+
+    # Servidor local lento (300 ms) em que só metade dos endereços tem PTR:
+    # a primeira rodada respeita o prazo, a segunda vem inteira do cache
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    addresses = [f'10.1.{index // 256}.{index % 256}' for index in range(total)]
+    records = {(reverse_name(address), TYPE_PTR): [f'host-{index}.lab.local']
+               for index, address in enumerate(addresses) if index % 2 == 0}
+    network_loop = get_network_loop()
+    server = StandInDnsServer(records, delay=0.3)
+    port = network_loop.run(server.start())
+
+    client = DnsClient(['127.0.0.1'], port=port, timeout=1.0, retries=0, loop_thread=network_loop)
+    resolver = HostResolver(client=client, max_concurrency=100, deadline=1.0)
+    for attempt in ('sem cache', 'com cache'):
+        started = time.perf_counter()
+        names = resolver.reverse_many(addresses)
+        elapsed = time.perf_counter() - started
+        found = sum(1 for name in names.values() if name)
+        print(f"{attempt}: {total} PTR em {elapsed * 1000:.0f} ms, {found} nomes, "
+              f"{server.requests} consultas ao servidor, cache {resolver.cache.stats}")
+
+    # Servidor que não responde: o prazo limita a espera e a falha fica no cache negativo
+    silent = StandInDnsServer({}, delay=None)
+    silent_port = network_loop.run(silent.start())
+    resolver = HostResolver(client=DnsClient(['127.0.0.1'], port=silent_port, timeout=1.0, loop_thread=network_loop),
+                            deadline=0.5)
+    for attempt in ('sem cache', 'com cache'):
+        started = time.perf_counter()
+        name = resolver.reverse('10.9.9.9')
+        print(f"servidor mudo, {attempt}: {name!r} em {(time.perf_counter() - started) * 1000:.0f} ms")
+    print("Este computador:", HostResolver(servers=[]).local_names())
@@ -0,0 +1,104 @@
+"""
+Estruturas e funções auxiliares da IP Helper API do Windows (iphlpapi.dll) via ctypes
+As estruturas podem ser declaradas em qualquer plataforma; a DLL só é
+carregada sob demanda, em load_iphlpapi().
+"""
+
+import ctypes
+import socket
+import struct
+
+
+AF_UNSPEC = 0
+AF_INET = 2
+AF_INET6 = 23
+
+ERROR_SUCCESS = 0
+ERROR_BUFFER_OVERFLOW = 111
+ERROR_NO_DATA = 232
+
+
+class SOCKADDR(ctypes.Structure):
+    _fields_ = [
+        ('sa_family', ctypes.c_ushort),
+        ('sa_data', ctypes.c_char * 14),
+    ]
+
+
+class SOCKET_ADDRESS(ctypes.Structure):
+    _fields_ = [
+        ('lpSockaddr', ctypes.POINTER(SOCKADDR)),
+        ('iSockaddrLength', ctypes.c_int),
+    ]
+
+
+class SOCKADDR_INET(ctypes.Union):
+    """SOCKADDR_IN, SOCKADDR_IN6 ou família (usada nas tabelas MIB_*_ROW2)"""
+    _fields_ = [
+        ('raw', ctypes.c_ubyte * 28),
+        ('si_family', ctypes.c_ushort),
+        ('_alignment', ctypes.c_uint32),
+    ]
+
+
+class IP_ADDRESS_PREFIX(ctypes.Structure):
+    _fields_ = [
+        ('Prefix', SOCKADDR_INET),
+        ('PrefixLength', ctypes.c_ubyte),
+    ]
+
+
+_lazy_dll = None
+
+
+def load_iphlpapi():
+    """Carrega iphlpapi.dll (somente Windows)"""
+    global _lazy_dll
+    if _lazy_dll is None:
+        _lazy_dll = ctypes.WinDLL('iphlpapi')
+    return _lazy_dll
+
+
+def ip_from_bytes(data):
+    """
+    Converte um sockaddr (IPv4 ou IPv6) em texto
+
+    Args:
+        data: Bytes do sockaddr, começando pelo campo de família
+
+    Returns:
+        Endereço em texto, ou '' se a família não for IPv4/IPv6
+    """
+    if len(data) < 2:
+        return ''
+    family = struct.unpack_from('<H', data)[0]
+    if family == AF_INET and len(data) >= 8:
+        return socket.inet_ntop(socket.AF_INET, bytes(data[4:8]))
+    if family == AF_INET6 and len(data) >= 24:
+        return socket.inet_ntop(socket.AF_INET6, bytes(data[8:24]))
+    return ''
+
+
+def socket_address_to_ip(address):
+    """Converte um SOCKET_ADDRESS em texto ('' se vazio)"""
+    if not address.lpSockaddr or address.iSockaddrLength <= 0:
+        return ''
+    return ip_from_bytes(ctypes.string_at(address.lpSockaddr, address.iSockaddrLength))
+
+
+def sockaddr_inet_to_ip(value):
+    """Converte um SOCKADDR_INET em texto ('' se não for IPv4/IPv6)"""
+    return ip_from_bytes(bytes(value.raw))
+
+
+def iterate_linked(first):
+    """Percorre uma lista encadeada de estruturas ligadas pelo campo Next"""
+    node = first
+    while node:
+        yield node.contents
+        node = node.contents.Next
+
+
+def format_mac(data):
+    """Formata um endereço físico como o ipconfig (AA-BB-CC-DD-EE-FF)"""
+    return '-'.join(f'{byte:02X}' for byte in data)
@@ -0,0 +1,430 @@
+"""
+Inventário da rede local: varredura concorrente do segmento do adaptador ativo
+A descoberta começa pelo ARP: cada endereço do prefixo recebe uma solicitação
+e a tabela de vizinhos é relida enquanto as respostas chegam. Os hosts que
+responderam são sondados por ICMP echo e, se não responderem, por conexão TCP
+(uma recusa também prova que o host está ativo), para medir a latência. Onde
+a tabela de vizinhos não pode ser lida, todos os endereços passam direto por
+ICMP e TCP. Os hosts encontrados são enriquecidos com DNS
+reverso, nome NetBIOS e fabricante do MAC, e entregues um a um ao chamador
+assim que aparecem e de novo quando o enriquecimento termina.
+
+As sondas passam por um limitador de taxa (sondas por segundo) e o número de
+hosts por varredura tem um teto rígido: prefixos maiores são reduzidos à
+maior sub-rede em torno do próprio endereço que caiba no teto.
+
+Benchmark: python -m utils.lan_inventory [rede]
+"""
+
+import asyncio
+import ipaddress
+import sys
+import threading
+import time
+
+from utils.async_loop import get_network_loop
+from utils.dns_resolver import get_resolver
+from utils.mac_vendor import get_vendor_lookup
+from utils.neighbor_table import NeighborTable, solicit
+from utils.netbios import get_netbios_client
+from utils.reachability import ReachabilityProber
+
+
+# Teto de hosts por varredura (um /22 tem 1022)
+MAX_HOSTS = 4094
+
+# Sondas por segundo e rajada inicial permitida
+PROBE_RATE = 1000
+PROBE_BURST = 64
+
+# Portas tentadas quando o host não responde ao ICMP (compartilhamento e RDP do
+# Windows, que bloqueia ping por padrão, e web)
+INVENTORY_TCP_PORTS = (445, 3389, 80, 443)
+
+# Sockets TCP abertos ao mesmo tempo pela varredura (hosts × portas). O loop de
+# rede compartilhado é um SelectorEventLoop (o ICMP usa add_reader) e, no
+# Windows, o select aceita no máximo 512 sockets no processo inteiro: a
+# varredura fica com metade, e o restante sobra para o monitor de latência, o
+# teste de DNS, o resolvedor, o SNMP e o NetBIOS, que usam o mesmo loop
+TCP_SOCKET_BUDGET = 256
+
+# Hosts sondados ao mesmo tempo por ICMP e, entre os que não responderam, por TCP
+ICMP_CONCURRENCY = 256
+TCP_CONCURRENCY = TCP_SOCKET_BUDGET // len(INVENTORY_TCP_PORTS)
+
+# Espera (segundos) pela conexão TCP: o ARP do host já foi resolvido pelo echo
+# anterior, e na rede local SYN-ACK ou RST chegam em milissegundos
+TCP_TIMEOUT = 0.3
+
+# Intervalo (segundos) de releitura da tabela de vizinhos durante a varredura
+NEIGHBOR_POLL_INTERVAL = 0.2
+
+METHOD_ARP = 'arp'
+METHOD_ICMP = 'icmp'
+METHOD_TCP = 'tcp'
+
+
+class RateLimiter:
+    """Balde de fichas assíncrono: no máximo rate liberações por segundo, com rajada limitada"""
+
+    def __init__(self, rate, burst=1, clock=time.monotonic):
+        self.rate = float(rate)
+        self.burst = max(1, burst)
+        self.clock = clock
+        self.tokens = float(self.burst)
+        self.updated = clock()
+        self.lock = None
+
+    async def acquire(self):
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        # Quem chega espera a vez, e a espera pela próxima ficha é feita segurando o lock
+        async with self.lock:
+            while True:
+                now = self.clock()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class InventoryHost:
+    """Host encontrado na varredura"""
+
+    __slots__ = ('address', 'methods', 'rtt_ms', 'mac', 'vendor', 'hostname', 'netbios_name',
+                 'workgroup', 'enriched')
+
+    def __init__(self, address):
+        self.address = address
+        self.methods = set()
+        self.rtt_ms = None
+        self.mac = ''
+        self.vendor = ''
+        self.hostname = ''
+        self.netbios_name = ''
+        self.workgroup = ''
+        self.enriched = False
+
+    @property
+    def sort_key(self):
+        return int(ipaddress.ip_address(self.address))
+
+    @property
+    def name(self):
+        """Melhor nome conhecido: DNS reverso, senão NetBIOS"""
+        return self.hostname or self.netbios_name
+
+    def __repr__(self):
+        return (f"InventoryHost({self.address}, {'/'.join(sorted(self.methods))}, mac={self.mac!r}, "
+                f"vendor={self.vendor!r}, name={self.name!r})")
+
+
+class InventorySweep:
+    """Resultado (parcial ou final) de uma varredura"""
+
+    def __init__(self, network, requested, own_address=None):
+        self.network = network
+        self.requested = requested
+        self.own_address = own_address
+        self.hosts = {}
+        self.probed = 0
+        self.started = time.monotonic()
+        self.elapsed = None
+        self.cancelled = False
+
+    @property
+    def truncated(self):
+        """True se o prefixo do adaptador foi reduzido para caber no teto de hosts"""
+        return self.network != self.requested
+
+    def sorted_hosts(self):
+        return sorted(self.hosts.values(), key=lambda host: host.sort_key)
+
+    def summary(self):
+        elapsed = self.elapsed if self.elapsed is not None else time.monotonic() - self.started
+        text = f"{len(self.hosts)} host(s) em {self.network} ({self.probed} sondados, {elapsed:.1f} s)"
+        if self.truncated:
+            text += f"; prefixo {self.requested} reduzido ao teto de {self.network.num_addresses - 2} hosts"
+        if self.cancelled:
+            text += "; interrompida"
+        return text
+
+
+def sweep_network(interface, max_hosts=MAX_HOSTS):
+    """
+    Rede a varrer a partir do endereço do adaptador (IPv4Interface ou 'ip/prefixo')
+
+    Se o prefixo tiver mais hosts que o teto, usa a maior sub-rede em torno do
+    próprio endereço que caiba nele.
+    """
+    interface = ipaddress.IPv4Interface(interface)
+    network = interface.network
+    prefix = network.prefixlen
+    while prefix < 30 and (2 ** (32 - prefix)) - 2 > max_hosts:
+        prefix += 1
+    if prefix != network.prefixlen:
+        network = ipaddress.IPv4Interface(f'{interface.ip}/{prefix}').network
+    return network
+
+
+class LanInventory:
+    """Varredura concorrente e limitada de um segmento IPv4, com enriquecimento dos hosts"""
+
+    def __init__(self, rate=PROBE_RATE, burst=PROBE_BURST, max_hosts=MAX_HOSTS, timeout=0.5,
+                 tcp_ports=INVENTORY_TCP_PORTS, tcp_timeout=TCP_TIMEOUT, icmp_concurrency=ICMP_CONCURRENCY,
+                 tcp_concurrency=TCP_CONCURRENCY, use_arp=None, enrich=True, neighbor_table=None, resolver=None,
+                 netbios_client=None, vendor_lookup=None, loop_thread=None):
+        """
+        Args:
+            rate: Sondas (ICMP ou TCP) por segundo
+            burst: Sondas liberadas de uma vez antes de o limite valer
+            max_hosts: Teto rígido de hosts por varredura
+            timeout: Espera pela resposta do echo ICMP (segundos)
+            tcp_ports: Portas tentadas nos hosts que não respondem ao ICMP (vazio = sem TCP)
+            tcp_timeout: Espera pela conexão TCP (segundos)
+            icmp_concurrency: Sondas ICMP pendentes ao mesmo tempo
+            tcp_concurrency: Hosts sondados por TCP ao mesmo tempo (reduzido para que
+                hosts × portas caiba em TCP_SOCKET_BUDGET)
+            use_arp: Solicita o ARP de cada endereço e só sonda por ICMP/TCP os que
+                responderem (padrão: onde a tabela de vizinhos pode ser lida)
+            enrich: False pula DNS reverso, NetBIOS e fabricante
+            neighbor_table, resolver, netbios_client, vendor_lookup: Fontes usadas
+                (padrão: as compartilhadas pelo aplicativo)
+            loop_thread: AsyncLoopThread em que a varredura roda
+        """
+        self.loop_thread = loop_thread or get_network_loop()
+        self.rate = rate
+        self.burst = burst
+        self.max_hosts = max_hosts
+        self.timeout = timeout
+        self.tcp_timeout = tcp_timeout
+        self.icmp_concurrency = icmp_concurrency
+        self.tcp_concurrency = max(1, min(tcp_concurrency, TCP_SOCKET_BUDGET // max(1, len(tcp_ports))))
+        self.use_arp = use_arp if use_arp is not None else (sys.platform == "win32" or sys.platform.startswith("linux"))
+        self.enrich = enrich
+        self.neighbor_table = neighbor_table if neighbor_table is not None else NeighborTable()
+        self.resolver = resolver if resolver is not None else get_resolver()
+        self.netbios_client = netbios_client if netbios_client is not None else get_netbios_client()
+        self.vendor_lookup = vendor_lookup if vendor_lookup is not None else get_vendor_lookup()
+        # No Windows cada echo pendente ocupa uma thread de IcmpSendEcho2
+        self.icmp_prober = ReachabilityProber(loop_thread=self.loop_thread, icmp_workers=icmp_concurrency)
+        self.tcp_prober = ReachabilityProber(tcp_ports, use_icmp=False, loop_thread=self.loop_thread) if tcp_ports else None
+        self.current = None
+        self.lock = threading.Lock()
+
+    # --- API síncrona (para as threads do aplicativo) ---
+
+    def sweep(self, interface, on_host=None):
+        """Varre a rede do adaptador e aguarda o fim; retorna o InventorySweep"""
+        return self.loop_thread.run(self.sweep_async(interface, on_host))
+
+    def start(self, interface, on_host=None, on_done=None):
+        """
+        Inicia a varredura em segundo plano (interrompe a anterior, se houver)
+
+        Args:
+            interface: Endereço do adaptador com prefixo (IPv4Interface ou 'ip/prefixo')
+            on_host: Chamada (thread do loop) com cada InventoryHost encontrado ou atualizado
+            on_done: Chamada (thread do loop) com o InventorySweep ao terminar
+
+        Returns:
+            concurrent.futures.Future da varredura
+        """
+        self.cancel()
+        future = self.loop_thread.submit(self.sweep_async(interface, on_host))
+        with self.lock:
+            self.current = future
+        if on_done:
+            def finished(done):
+                try:
+                    result = done.result()
+                except BaseException as e:
+                    print(f"Varredura do inventário falhou ou foi interrompida: {e!r}")  # Debug
+                    return
+                on_done(result)
+            future.add_done_callback(finished)
+        return future
+
+    def cancel(self):
+        """Interrompe a varredura em andamento (os hosts já entregues continuam válidos)"""
+        with self.lock:
+            future, self.current = self.current, None
+        if future is not None and not future.done():
+            future.cancel()
+
+    # --- API assíncrona (no loop de rede) ---
+
+    async def sweep_async(self, interface, on_host=None):
+        interface = ipaddress.IPv4Interface(interface)
+        network = sweep_network(interface, self.max_hosts)
+        sweep = InventorySweep(network, interface.network, str(interface.ip))
+        targets = [str(address) for address in network.hosts() if address != interface.ip]
+        limiter = RateLimiter(self.rate, self.burst)
+        icmp_slots = asyncio.Semaphore(self.icmp_concurrency)
+        tcp_slots = asyncio.Semaphore(self.tcp_concurrency)
+        arp_waiters = {}
+        enrichments = []
+        loop = asyncio.get_event_loop()
+
+        def found(address, method, rtt_ms=None):
+            host = sweep.hosts.get(address)
+            is_new = host is None
+            if is_new:
+                host = sweep.hosts[address] = InventoryHost(address)
+            changed = method not in host.methods or (rtt_ms is not None and host.rtt_ms is None)
+            host.methods.add(method)
+            if rtt_ms is not None and host.rtt_ms is None:
+                host.rtt_ms = rtt_ms
+            if changed:
+                _notify(on_host, host)
+            if is_new and self.enrich:
+                enrichments.append(asyncio.ensure_future(self._enrich(host, on_host)))
+
+        async def echo(address):
+            """ICMP e, se o host não responder, TCP; True se algum respondeu"""
+            async with icmp_slots:
+                await limiter.acquire()
+                result = (await self.icmp_prober.probe_async([address], 1, self.timeout))[address]
+            if result.reachable:
+                found(address, result.method, result.rtt_ms)
+                return True
+            if self.tcp_prober is not None:
+                async with tcp_slots:
+                    await limiter.acquire()
+                    result = (await self.tcp_prober.probe_async([address], 1, self.tcp_timeout))[address]
+                if result.reachable:
+                    found(address, METHOD_TCP, result.rtt_ms)
+                    return True
+            return False
+
+        async def probe(address):
+            if self.use_arp:
+                # Na rede local ICMP e TCP dependem do ARP: sem resposta a ele o host não
+                # existe, e o echo ficaria retido na fila do vizinho não resolvido
+                await limiter.acquire()
+                waiter = arp_waiters[address] = loop.create_future()
+                solicit(address)
+                try:
+                    await asyncio.wait_for(waiter, self.timeout)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    arp_waiters.pop(address, None)
+                # Latência e resposta a ICMP/TCP dos hosts presentes
+                if address in sweep.hosts:
+                    await echo(address)
+            else:
+                await echo(address)
+            sweep.probed += 1
+
+        async def poll_neighbors(final=False):
+            # Também acha os hosts que descartam ICMP e TCP mas respondem ao ARP disparado pelas sondas
+            while True:
+                try:
+                    await loop.run_in_executor(None, self.neighbor_table.refresh)
+                except Exception as e:
+                    print(f"Erro ao ler a tabela de vizinhos: {e}")  # Debug
+                for address in targets:
+                    if self.neighbor_table.mac_of(address):
+                        if address not in sweep.hosts:
+                            found(address, METHOD_ARP)
+                        waiter = arp_waiters.get(address)
+                        if waiter is not None and not waiter.done():
+                            waiter.set_result(True)
+                if final:
+                    return
+                await asyncio.sleep(NEIGHBOR_POLL_INTERVAL)
+
+        poller = asyncio.ensure_future(poll_neighbors())
+        try:
+            await asyncio.gather(*(probe(address) for address in targets))
+            poller.cancel()
+            await poll_neighbors(final=True)
+            # Enriquecimentos iniciados pela última leitura também são aguardados
+            while enrichments:
+                pending, enrichments[:] = list(enrichments), []
+                await asyncio.gather(*pending)
+        except asyncio.CancelledError:
+            sweep.cancelled = True
+            for task in enrichments:
+                task.cancel()
+            raise
+        finally:
+            poller.cancel()
+            sweep.elapsed = time.monotonic() - sweep.started
+        return sweep
+
+    async def _enrich(self, host, on_host):
+        """Completa MAC, fabricante, DNS reverso e NetBIOS de um host e o entrega de novo"""
+        mac = self.neighbor_table.mac_of(host.address)
+        names, node_status = await asyncio.gather(
+            self.resolver.reverse_async(host.address),
+            self.netbios_client.node_status_async(host.address),
+            return_exceptions=True
+        )
+        if isinstance(names, str):
+            host.hostname = names
+        if node_status is not None and not isinstance(node_status, BaseException):
+            host.netbios_name = node_status.computer_name or ''
+            host.workgroup = node_status.workgroup or ''
+            mac = mac or node_status.mac or ''
+        if not mac:
+            # A leitura da tabela de vizinhos pode ter sido anterior à resposta ARP
+            await asyncio.get_event_loop().run_in_executor(None, self.neighbor_table.refresh)
+            mac = self.neighbor_table.mac_of(host.address)
+        host.mac = mac
+        host.vendor = self.vendor_lookup.lookup(mac) if mac else ''
+        host.enriched = True
+        _notify(on_host, host)
+
+
+def _notify(on_host, host):
+    if on_host is None:
+        return
+    try:
+        on_host(host)
+    except Exception as e:
+        print(f"Erro ao entregar host do inventário: {e}")  # Debug
+
+
+if __name__ == "__main__":
+    from utils.dns_client import TYPE_PTR, DnsClient, StandInDnsServer, reverse_name
+    from utils.dns_resolver import HostResolver
+    from utils.neighbor_table import Neighbor, STATE_REACHABLE
+    from utils.netbios import NetbiosClient, StandInNetbiosResponder
+
+    # Benchmark em um /22 do loopback (127.0.0.0/8 inteiro responde no Linux):
+    # hosts em 127.0.x.y, todos respondem ao ICMP; os serviços de nome são substitutos locais
+    network = sys.argv[1] if len(sys.argv) > 1 else '127.0.0.1/22'
+    interface = ipaddress.IPv4Interface(network)
+    addresses = [str(address) for address in interface.network.hosts()][:64]
+    network_loop = get_network_loop()
+    dns = StandInDnsServer({(reverse_name(address), TYPE_PTR): [f'srv-{index}.lab.local']
+                            for index, address in enumerate(addresses) if index % 2 == 0}, delay=0.02)
+    dns_port = network_loop.run(dns.start())
+    responder = StandInNetbiosResponder({address: ([(f'PC-{index}', 0x00, False), ('LAB', 0x00, True)],
+                                                   bytes([0x00, 0x15, 0x5D, 0, 0, index]))
+                                         for index, address in enumerate(addresses[:16])}, delay=0.01)
+    netbios_port = network_loop.run(responder.start())
+    neighbors = NeighborTable(reader=lambda: [
+        Neighbor(address, f'00-50-56-00-00-{index:02X}', state=STATE_REACHABLE)
+        for index, address in enumerate(addresses[16:32])
+    ])
+
+    inventory = LanInventory(
+        timeout=0.3,
+        use_arp=False,
+        neighbor_table=neighbors,
+        resolver=HostResolver(client=DnsClient(['127.0.0.1'], port=dns_port, loop_thread=network_loop),
+                              max_concurrency=64),
+        netbios_client=NetbiosClient(port=netbios_port, timeout=0.3, retries=0),
+    )
+    deliveries = []
+    started = time.perf_counter()
+    sweep = inventory.sweep(interface, on_host=lambda host: deliveries.append(time.perf_counter() - started))
+    print(f"{sweep.summary()}; {len(deliveries)} entregas, a primeira em {deliveries[0] * 1000:.0f} ms")
+    for host in sweep.sorted_hosts()[:4] + sweep.sorted_hosts()[16:18]:
+        print(f"  {host}")
+    print("Teto de 254 hosts:", sweep_network('10.20.30.40/16', max_hosts=254))
@@ -0,0 +1,364 @@
+"""
+Monitor contínuo de latência, jitter e perda (até 10 sondas por segundo por alvo)
+Cada alvo guarda as amostras em um buffer circular de tamanho fixo (array de
+floats): a memória não cresce, não importa por quantos dias o monitor rode.
+As estatísticas (percentis, jitter, perda) são calculadas sobre o buffer com
+operações em bloco (fatias do array, sorted, filter, map), sem laços Python
+por amostra. Quedas curtas (várias perdas seguidas) ficam registradas num
+histórico também limitado, para flagrar micro-interrupções intermitentes.
+
+Benchmark: python -m utils.latency_monitor [segundos] [alvos]
+"""
+
+import asyncio
+import bisect
+import collections
+import math
+import operator
+import sys
+import threading
+import time
+from array import array
+
+from utils.async_loop import get_network_loop
+from utils.reachability import ReachabilityProber
+
+
+MAX_RATE_HZ = 10
+MAX_TARGETS = 16
+
+# Amostras guardadas por alvo (5 minutos a 10 Hz; 50 minutos a 1 Hz)
+DEFAULT_HISTORY = 3000
+
+# Perdas seguidas que caracterizam uma queda, e quedas guardadas por alvo
+OUTAGE_MIN_LOSSES = 3
+OUTAGE_LOG_SIZE = 50
+
+# Valores especiais no buffer: perda (NaN) e sonda ainda sem resposta (infinito)
+LOST = math.nan
+PENDING = math.inf
+
+SPARK_LEVELS = '▁▂▃▄▅▆▇█'
+SPARK_LOSS = '×'
+
+TARGET_GATEWAY = 'Gateway'
+TARGET_DNS = 'DNS'
+TARGET_MANUAL = 'Manual'
+
+
+class SampleRing:
+    """Buffer circular de RTTs (ms) e instantes de envio, com tamanho fixo"""
+
+    def __init__(self, capacity=DEFAULT_HISTORY):
+        self.capacity = capacity
+        self.rtts = array('d', [LOST]) * capacity
+        self.times = array('d', [0.0]) * capacity
+        self.sequence = 0
+
+    def reserve(self, timestamp):
+        """Ocupa a próxima posição com uma sonda pendente; retorna o número de sequência"""
+        sequence = self.sequence
+        slot = sequence % self.capacity
+        self.rtts[slot] = PENDING
+        self.times[slot] = timestamp
+        self.sequence = sequence + 1
+        return sequence
+
+    def resolve(self, sequence, rtt_ms):
+        """Registra o RTT (None = perda) da sonda; False se a posição já foi reaproveitada"""
+        if self.sequence - sequence > self.capacity:
+            return False
+        self.rtts[sequence % self.capacity] = LOST if rtt_ms is None else rtt_ms
+        return True
+
+    def __len__(self):
+        return min(self.sequence, self.capacity)
+
+    def chronological(self, seconds=None, now=None):
+        """
+        RTTs em ordem de envio (array), opcionalmente só os dos últimos segundos
+
+        Sondas ainda pendentes ficam como PENDING; perdas como LOST.
+        """
+        count = len(self)
+        start = self.sequence % self.capacity if self.sequence > self.capacity else 0
+        rtts = self.rtts[start:count] + self.rtts[:start]
+        if seconds is None:
+            return rtts
+        times = self.times[start:count] + self.times[:start]
+        cutoff = (time.monotonic() if now is None else now) - seconds
+        # Os instantes de envio são crescentes na ordem cronológica
+        first = bisect.bisect_left(times, cutoff)
+        return rtts[first:]
+
+
+def percentile(sorted_values, fraction):
+    """Percentil com interpolação linear (sorted_values já ordenado, não vazio)"""
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class LatencyStats:
+    """Estatísticas de uma janela de amostras"""
+
+    __slots__ = ('samples', 'lost', 'last', 'minimum', 'maximum', 'mean', 'p50', 'p95', 'p99', 'jitter')
+
+    def __init__(self, rtts):
+        """
+        Args:
+            rtts: RTTs em ordem cronológica (LOST para perdas; PENDING é ignorado)
+        """
+        resolved = list(filter(PENDING.__ne__, rtts))
+        successes = list(filter(math.isfinite, resolved))
+        self.samples = len(resolved)
+        self.lost = self.samples - len(successes)
+        self.last = resolved[-1] if resolved else None
+        if successes:
+            ordered = sorted(successes)
+            self.minimum = ordered[0]
+            self.maximum = ordered[-1]
+            self.mean = sum(ordered) / len(ordered)
+            self.p50 = percentile(ordered, 0.50)
+            self.p95 = percentile(ordered, 0.95)
+            self.p99 = percentile(ordered, 0.99)
+        else:
+            self.minimum = self.maximum = self.mean = self.p50 = self.p95 = self.p99 = None
+        # Jitter: média da variação entre respostas consecutivas (RFC 3550, sem suavização)
+        if len(successes) > 1:
+            self.jitter = sum(map(abs, map(operator.sub, successes[1:], successes))) / (len(successes) - 1)
+        else:
+            self.jitter = None
+
+    @property
+    def loss(self):
+        """Fração perdida (0 a 1); None sem amostras"""
+        return self.lost / self.samples if self.samples else None
+
+    def __repr__(self):
+        if self.p50 is None:
+            return f"LatencyStats({self.samples} amostras, todas perdidas)" if self.samples else "LatencyStats(vazio)"
+        return (f"LatencyStats(p50={self.p50:.1f} p95={self.p95:.1f} p99={self.p99:.1f} ms, "
+                f"jitter={self.jitter or 0:.1f} ms, perda={self.loss:.1%} de {self.samples})")
+
+
+class Outage:
+    """Sequência de perdas seguidas"""
+
+    __slots__ = ('started', 'ended', 'lost')
+
+    def __init__(self, started, lost):
+        self.started = started
+        self.ended = None
+        self.lost = lost
+
+    @property
+    def duration(self):
+        return None if self.ended is None else self.ended - self.started
+
+    def __repr__(self):
+        state = f"{self.duration:.1f} s" if self.ended is not None else "em andamento"
+        return f"Outage({self.lost} perdas, {state})"
+
+
+class MonitorTarget:
+    """Alvo monitorado: buffer de amostras, contadores acumulados e quedas"""
+
+    def __init__(self, address, kind=TARGET_MANUAL, history=DEFAULT_HISTORY):
+        self.address = address
+        self.kind = kind
+        self.ring = SampleRing(history)
+        self.sent = 0
+        self.lost = 0
+        self.consecutive_losses = 0
+        self.first_loss_at = None
+        self.current_outage = None
+        self.outages = collections.deque(maxlen=OUTAGE_LOG_SIZE)
+        self.outage_count = 0
+
+    def record(self, sequence, sent_at, rtt_ms):
+        """Registra o resultado de uma sonda (thread do loop)"""
+        self.ring.resolve(sequence, rtt_ms)
+        self.sent += 1
+        if rtt_ms is None:
+            self.lost += 1
+            self.consecutive_losses += 1
+            if self.consecutive_losses == 1:
+                self.first_loss_at = sent_at
+            if self.consecutive_losses == OUTAGE_MIN_LOSSES:
+                self.current_outage = Outage(self.first_loss_at, self.consecutive_losses)
+                self.outages.append(self.current_outage)
+                self.outage_count += 1
+            elif self.current_outage is not None:
+                self.current_outage.lost = self.consecutive_losses
+            return
+        if self.current_outage is not None:
+            self.current_outage.ended = sent_at
+            self.current_outage = None
+        self.consecutive_losses = 0
+
+    def stats(self, seconds=None):
+        """LatencyStats do buffer inteiro ou dos últimos segundos"""
+        return LatencyStats(self.ring.chronological(seconds))
+
+    def sparkline(self, width=40):
+        """Últimas amostras em blocos proporcionais ao RTT (perdas como ×)"""
+        rtts = list(filter(PENDING.__ne__, self.ring.chronological()[-width - 8:]))[-width:]
+        successes = list(filter(math.isfinite, rtts))
+        if not successes:
+            return SPARK_LOSS * len(rtts)
+        low, high = min(successes), max(successes)
+        span = (high - low) or 1.0
+        top = len(SPARK_LEVELS) - 1
+        return ''.join(
+            SPARK_LEVELS[int((rtt - low) / span * top)] if rtt == rtt else SPARK_LOSS
+            for rtt in rtts
+        )
+
+    def __repr__(self):
+        return f"MonitorTarget({self.address}, {self.kind}, {self.sent} sondas, {self.outage_count} quedas)"
+
+
+class LatencyMonitor:
+    """Sonda os alvos em intervalos fixos no loop de rede e guarda as amostras de cada um"""
+
+    def __init__(self, rate_hz=1.0, timeout=1.0, history=DEFAULT_HISTORY, prober=None, loop_thread=None):
+        """
+        Args:
+            rate_hz: Sondas por segundo por alvo (até MAX_RATE_HZ)
+            timeout: Espera por resposta de cada sonda (segundos); sondas mais lentas são perdas
+            history: Amostras guardadas por alvo (tamanho fixo dos buffers)
+            prober: ReachabilityProber usado (padrão: um próprio, com threads de ICMP
+                suficientes no Windows para MAX_TARGETS alvos a MAX_RATE_HZ)
+            loop_thread: AsyncLoopThread em que o monitor roda
+        """
+        self.loop_thread = loop_thread or get_network_loop()
+        self.rate_hz = min(max(rate_hz, 0.1), MAX_RATE_HZ)
+        self.timeout = timeout
+        self.history = history
+        self.prober = prober or ReachabilityProber(
+            loop_thread=self.loop_thread, icmp_workers=int(MAX_RATE_HZ * timeout * MAX_TARGETS) + MAX_TARGETS
+        )
+        self.targets = collections.OrderedDict()
+        self.task = None
+        self.lock = threading.Lock()
+        self.started_at = None
+
+    @property
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+    def set_targets(self, targets):
+        """
+        Define os alvos monitorados, mantendo o histórico dos que continuam
+
+        Args:
+            targets: Lista de (endereço, tipo), com tipo TARGET_*; no máximo MAX_TARGETS
+        """
+        with self.lock:
+            current = self.targets
+            updated = collections.OrderedDict()
+            for address, kind in list(targets)[:MAX_TARGETS]:
+                if address in updated:
+                    continue
+                target = current.get(address) or MonitorTarget(address, kind, self.history)
+                target.kind = kind
+                updated[address] = target
+            self.targets = updated
+
+    def set_rate(self, rate_hz):
+        """Altera a frequência (vale a partir do próximo intervalo)"""
+        self.rate_hz = min(max(rate_hz, 0.1), MAX_RATE_HZ)
+
+    def start(self):
+        """Inicia as sondagens em segundo plano (sem efeito se já estiver rodando)"""
+        if self.running:
+            return
+        self.started_at = time.monotonic()
+        self.task = self.loop_thread.submit(self._run())
+
+    def stop(self):
+        task, self.task = self.task, None
+        if task is not None:
+            task.cancel()
+
+    def snapshot(self, seconds=None):
+        """Lista de (MonitorTarget, LatencyStats) na ordem dos alvos (segura a partir de outras threads)"""
+        with self.lock:
+            targets = list(self.targets.values())
+        return [(target, target.stats(seconds)) for target in targets]
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        next_tick = loop.time()
+        probes = set()
+        try:
+            while True:
+                with self.lock:
+                    targets = list(self.targets.values())
+                for target in targets:
+                    # As sondas de um intervalo não esperam as do anterior (o timeout pode ser maior)
+                    probe = asyncio.ensure_future(self._probe(target))
+                    probes.add(probe)
+                    probe.add_done_callback(probes.discard)
+                next_tick += 1.0 / self.rate_hz
+                delay = next_tick - loop.time()
+                if delay < 0:
+                    # O loop atrasou (ex.: máquina suspensa): descarta os intervalos perdidos
+                    next_tick = loop.time()
+                    delay = 0
+                await asyncio.sleep(delay)
+        finally:
+            for probe in list(probes):
+                probe.cancel()
+
+    async def _probe(self, target):
+        sent_at = time.monotonic()
+        sequence = target.ring.reserve(sent_at)
+        rtt_ms = None
+        try:
+            result = (await self.prober.probe_async([target.address], 1, self.timeout))[target.address]
+            if result.reachable:
+                rtt_ms = result.rtts[0] * 1000
+        except asyncio.CancelledError:
+            # Sonda interrompida pelo stop(): a posição continua pendente e fica fora das estatísticas
+            raise
+        except Exception as e:
+            print(f"Erro ao sondar {target.address}: {e}")  # Debug
+        target.record(sequence, sent_at, rtt_ms)
+
+
+if __name__ == "__main__":
+    import tracemalloc
+
+    # Buffers: um milhão de amostras sem crescer a memória, e o custo das estatísticas
+    target = MonitorTarget('198.51.100.1', history=DEFAULT_HISTORY)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for index in range(1000000):
+        sequence = target.ring.reserve(index / 10)
+        lost = index % 997 < 4
+        target.record(sequence, index / 10, None if lost else 1.0 + (index % 50) / 10)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    started = time.perf_counter()
+    for _ in range(100):
+        stats = target.stats()
+    elapsed = (time.perf_counter() - started) / 100
+    print(f"1000000 amostras: memória {after - before:+d} bytes, {target.outage_count} quedas "
+          f"(guardadas {len(target.outages)}); estatísticas de {len(target.ring)} amostras em {elapsed * 1000:.2f} ms")
+    print(f"  {stats}")
+
+    # Monitor real: alvos da linha de comando (padrão: loopback e um endereço sem resposta)
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    addresses = sys.argv[2:] or ['127.0.0.1', '192.0.2.1']
+    monitor = LatencyMonitor(rate_hz=MAX_RATE_HZ, timeout=0.5)
+    monitor.set_targets([(address, TARGET_MANUAL) for address in addresses])
+    monitor.start()
+    time.sleep(seconds)
+    monitor.stop()
+    time.sleep(0.1)
+    for target, stats in monitor.snapshot():
+        print(f"{target.address:<15} {target.sent:>4} sondas, {stats}")
+        print(f"  {target.sparkline(60)}  {list(target.outages)}")
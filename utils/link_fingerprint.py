@@ -0,0 +1,320 @@
+"""
+Impressão digital barata do estado dos enlaces de rede
+Combina MACs, endereços IP, gateway, velocidade e estado da mídia dos
+adaptadores. Enquanto ela não muda (e o TTL não expira), as sondas caras de
+descoberta do switch (LLDP, SNMP, nbtstat, PowerShell...) não precisam rodar de novo.
+
+No Windows usa GetAdaptersAddresses (utils.native_interfaces), com uma
+consulta na sessão PowerShell persistente apenas como alternativa se a API
+falhar; no Linux lê /sys/class/net e /proc/net.
+
+Verificação: python -m utils.link_fingerprint
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+from utils.native_interfaces import get_adapters
+from utils.powershell_host import run_powershell
+
+
+# Alternativa ao GetAdaptersAddresses: uma linha JSON com os dados relevantes de cada adaptador e o gateway padrão
+_FINGERPRINT_SCRIPT = r'''
+$adapters = @(Get-NetAdapter -ErrorAction SilentlyContinue | ForEach-Object {
+    $ips = @(Get-NetIPAddress -InterfaceIndex $_.ifIndex -ErrorAction SilentlyContinue |
+        ForEach-Object { $_.IPAddress } | Sort-Object)
+    @{
+        mac = [string]$_.MacAddress
+        status = [string]$_.Status
+        media = [string]$_.MediaConnectionState
+        speed = [string]$_.LinkSpeed
+        ips = $ips
+    }
+})
+$gateways = @(Get-NetRoute -DestinationPrefix "0.0.0.0/0" -ErrorAction SilentlyContinue |
+    ForEach-Object { $_.NextHop } | Sort-Object)
+@{ adapters = $adapters; gateways = $gateways } | ConvertTo-Json -Compress -Depth 4
+'''
+
+_SYS_CLASS_NET = "/sys/class/net"
+
+
+def _read_text(path):
+    """Lê um arquivo pequeno do sysfs/procfs (vazio se não for possível)"""
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+
+def _adapters_fingerprint(adapters):
+    """Impressão digital a partir dos adaptadores de native_interfaces.get_adapters()"""
+    entries = []
+    gateways = set()
+    for adapter in adapters:
+        ipv4 = adapter['ipv4_address']
+        if ipv4:
+            ipv4 = f"{ipv4}/{adapter['ipv4_prefix_length']}"
+        entries.append((
+            adapter['physical_address'].upper(),
+            tuple(address for address in (ipv4, adapter['ipv6_address']) if address),
+            str(adapter['link_speed']),
+            adapter['oper_status']
+        ))
+        if adapter['default_gateway']:
+            gateways.add(adapter['default_gateway'])
+    return (tuple(sorted(entries)), tuple(sorted(gateways)))
+
+
+def _powershell_fingerprint():
+    """Impressão digital via Get-NetAdapter/Get-NetIPAddress/Get-NetRoute (bem mais lenta)"""
+    result = run_powershell(_FINGERPRINT_SCRIPT, timeout=5)
+    if result.returncode != 0 or not result.stdout.strip():
+        return None
+    try:
+        data = json.loads(result.stdout.strip())
+    except ValueError:
+        return None
+
+    adapters = data.get('adapters') or []
+    if isinstance(adapters, dict):
+        adapters = [adapters]
+    entries = []
+    for adapter in adapters:
+        ips = adapter.get('ips') or []
+        if isinstance(ips, str):
+            ips = [ips]
+        entries.append((
+            (adapter.get('mac') or '').upper(),
+            tuple(sorted(ips)),
+            adapter.get('speed') or '',
+            adapter.get('media') or adapter.get('status') or ''
+        ))
+    gateways = data.get('gateways') or []
+    if isinstance(gateways, str):
+        gateways = [gateways]
+    return (tuple(sorted(entries)), tuple(sorted(gateways)))
+
+
+def _windows_fingerprint():
+    """Impressão digital via GetAdaptersAddresses, com o PowerShell como alternativa"""
+    try:
+        return _adapters_fingerprint(get_adapters())
+    except OSError as e:
+        print(f"GetAdaptersAddresses falhou ({e}); usando PowerShell")  # Debug
+        return _powershell_fingerprint()
+
+
+def _local_ipv4_addresses():
+    """Endereços IPv4 locais a partir de /proc/net/fib_trie"""
+    addresses = set()
+    previous = ''
+    try:
+        with open("/proc/net/fib_trie") as f:
+            for line in f:
+                line = line.strip()
+                if line == '/32 host LOCAL':
+                    address = previous.split()[-1] if previous else ''
+                    if address and not address.startswith('127.'):
+                        addresses.add(address)
+                previous = line
+    except OSError:
+        pass
+    return addresses
+
+
+def _local_ipv6_addresses():
+    """Endereços IPv6 por interface a partir de /proc/net/if_inet6"""
+    addresses = {}
+    try:
+        with open("/proc/net/if_inet6") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 6:
+                    addresses.setdefault(parts[5], set()).add(parts[0])
+    except OSError:
+        pass
+    return addresses
+
+
+def _default_gateways():
+    """Gateways padrão IPv4 a partir de /proc/net/route"""
+    gateways = set()
+    try:
+        with open("/proc/net/route") as f:
+            next(f, None)
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 3 and parts[1] == '00000000':
+                    gateways.add((parts[0], parts[2]))
+    except OSError:
+        pass
+    return gateways
+
+
+def _linux_fingerprint():
+    """Impressão digital via sysfs e procfs"""
+    try:
+        names = sorted(os.listdir(_SYS_CLASS_NET))
+    except OSError:
+        return None
+
+    ipv6 = _local_ipv6_addresses()
+    entries = []
+    for name in names:
+        if name == 'lo':
+            continue
+        base = os.path.join(_SYS_CLASS_NET, name)
+        entries.append((
+            _read_text(os.path.join(base, 'address')).upper(),
+            tuple(sorted(ipv6.get(name, ()))),
+            _read_text(os.path.join(base, 'speed')),
+            _read_text(os.path.join(base, 'operstate')) + '/' + _read_text(os.path.join(base, 'carrier'))
+        ))
+    # fib_trie não associa o endereço à interface; o conjunto basta para detectar mudanças
+    return (tuple(entries), tuple(sorted(_local_ipv4_addresses())), tuple(sorted(_default_gateways())))
+
+
+def collect_link_fingerprint():
+    """
+    Coleta a impressão digital do estado dos enlaces
+
+    Returns:
+        Tupla comparável com ==, ou None se não foi possível coletar
+    """
+    try:
+        if sys.platform == "win32":
+            return _windows_fingerprint()
+        return _linux_fingerprint()
+    except Exception as e:
+        print(f"Erro ao coletar impressão digital da rede: {e}")
+        return None
+
+
+class LinkChangeDetector:
+    """Decide se resultados caros ainda valem para o estado atual dos enlaces"""
+
+    def __init__(self, ttl=300.0):
+        """
+        Args:
+            ttl: Tempo máximo (segundos) para reaproveitar resultados mesmo sem mudanças
+        """
+        self.ttl = ttl
+        self.fingerprint = None
+        self.refreshed_at = None
+        self.lock = threading.Lock()
+        self.reused = 0
+        self.refreshed = 0
+
+    def is_fresh(self, fingerprint):
+        """True se o último resultado foi obtido com a mesma impressão digital dentro do TTL"""
+        with self.lock:
+            fresh = (
+                fingerprint is not None and
+                self.refreshed_at is not None and
+                fingerprint == self.fingerprint and
+                time.monotonic() - self.refreshed_at < self.ttl
+            )
+            if fresh:
+                self.reused += 1
+            return fresh
+
+    def mark_refreshed(self, fingerprint):
+        """Registra que os resultados caros foram recoletados com esta impressão digital"""
+        with self.lock:
+            self.refreshed += 1
+            if fingerprint is None:
+                # Sem impressão digital não há como validar a reutilização
+                self.fingerprint = None
+                self.refreshed_at = None
+                return
+            self.fingerprint = fingerprint
+            self.refreshed_at = time.monotonic()
+
+    def invalidate(self):
+        """Força a próxima verificação a pedir uma nova coleta"""
+        with self.lock:
+            self.fingerprint = None
+            self.refreshed_at = None
+
+    def stats(self):
+        """Retorna os contadores de reutilizações e recoletas"""
+        with self.lock:
+            return {'reused': self.reused, 'refreshed': self.refreshed}
+
+
+if __name__ == "__main__":
+    from utils.native_interfaces import _new_adapter
+    from utils.powershell_host import CommandResult
+
+    failures = 0
+
+    def check(description, condition):
+        global failures
+        if not condition:
+            failures += 1
+            print(f"  FALHOU: {description}")
+
+    ethernet = _new_adapter("Ethernet")
+    ethernet.update(physical_address='aa-bb-cc-00-11-22', ipv4_address='192.168.1.10', ipv4_prefix_length=24,
+                    default_gateway='192.168.1.1', oper_status='up', link_speed=1000000000)
+    wifi = _new_adapter("Wi-Fi")
+    wifi.update(physical_address='aa-bb-cc-00-11-33', oper_status='down')
+    adapters = [ethernet, wifi]
+    powershell_calls = []
+
+    def fake_powershell(script, timeout=None):
+        powershell_calls.append(script)
+        return CommandResult(["powershell"], 0, json.dumps({
+            'adapters': {'mac': 'AA-BB-CC-00-11-22', 'status': 'Up', 'media': 'Connected',
+                         'speed': '1 Gbps', 'ips': '192.168.1.10'},
+            'gateways': '192.168.1.1'
+        }), '')
+
+    def failing_adapters():
+        raise OSError(87, "GetAdaptersAddresses falhou")
+
+    get_adapters = lambda: [dict(adapter) for adapter in adapters]
+    run_powershell = fake_powershell
+
+    baseline = _windows_fingerprint()
+    check("impressão digital nativa", baseline == (
+        (('AA-BB-CC-00-11-22', ('192.168.1.10/24',), '1000000000', 'up'),
+         ('AA-BB-CC-00-11-33', (), '0', 'down')),
+        ('192.168.1.1',)))
+    check("mesmo estado, mesma impressão digital", _windows_fingerprint() == baseline)
+    check("PowerShell não é usado quando a API funciona", not powershell_calls)
+
+    for field, value in (('ipv4_address', '192.168.1.20'), ('default_gateway', '192.168.1.254'),
+                         ('oper_status', 'down'), ('link_speed', 100000000)):
+        original = ethernet[field]
+        ethernet[field] = value
+        check(f"mudança em {field} é detectada", _windows_fingerprint() != baseline)
+        ethernet[field] = original
+    wifi['oper_status'] = 'up'
+    check("adaptador que sobe é detectado", _windows_fingerprint() != baseline)
+    wifi['oper_status'] = 'down'
+
+    get_adapters = failing_adapters
+    fallback = _windows_fingerprint()
+    check("PowerShell usado quando a API falha", len(powershell_calls) == 1)
+    check("impressão digital do PowerShell", fallback == (
+        (('AA-BB-CC-00-11-22', ('192.168.1.10',), '1 Gbps', 'Connected'),), ('192.168.1.1',)))
+
+    detector = LinkChangeDetector(ttl=60.0)
+    check("sem coleta anterior não reaproveita", not detector.is_fresh(baseline))
+    detector.mark_refreshed(baseline)
+    check("mesma impressão digital reaproveita", detector.is_fresh(baseline))
+    check("impressão digital diferente recoleta", not detector.is_fresh(fallback))
+
+    if sys.platform != "win32":
+        current = collect_link_fingerprint()
+        print(f"Impressão digital desta máquina: {current}")
+        check("coleta local estável", current is not None and collect_link_fingerprint() == current)
+
+    print("Verificações concluídas" if not failures else f"{failures} verificações falharam")
+    sys.exit(1 if failures else 0)
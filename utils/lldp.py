@@ -0,0 +1,757 @@
+"""
+Escuta passiva de LLDP (IEEE 802.1AB) com decodificador de TLVs dirigido por tabela
+Em vez de depender do Get-NetLldpNeighbor (agente LLDP do Windows, muitas
+vezes desativado) ou de interpretar o texto do netsh, os quadros LLDP que o
+switch anuncia a cada ~30 s são capturados e decodificados diretamente. A
+mesma escuta recebe os quadros CDP (decodificados por utils.cdp). Cada
+vizinho fica em cache pelo TTL anunciado, então as informações do switch ficam
+disponíveis na hora a partir do primeiro anúncio.
+
+Captura:
+    Linux:   sockets AF_PACKET (ethertype 0x88CC e quadros 802.2 do CDP), com
+             inscrição nos destinos multicast do LLDP e do CDP
+    Windows: Npcap (wpcap.dll), se instalado
+Testes:  read_pcap() reproduz capturas .pcap no mesmo decodificador
+
+Verificação: python -m utils.lldp
+Reprodução:  python -m utils.lldp arquivo.pcap [...]
+Captura:     python -m utils.lldp --captura
+"""
+
+import ctypes
+import os
+import select
+import socket
+import struct
+import sys
+import threading
+import time
+
+from utils import cdp
+from utils.iphlpapi import format_mac
+
+
+ETH_P_LLDP = 0x88CC
+ETH_P_8021Q = 0x8100
+# Quadros 802.3 com cabeçalho LLC (como o CDP) chegam ao AF_PACKET com este protocolo
+ETH_P_802_2 = 0x0004
+
+# Destinos multicast usados pelo LLDP (nearest bridge, non-TPMR bridge, customer bridge)
+LLDP_MULTICAST = (b'\x01\x80\xc2\x00\x00\x0e', b'\x01\x80\xc2\x00\x00\x03', b'\x01\x80\xc2\x00\x00\x00')
+
+OUI_IEEE_8021 = b'\x00\x80\xc2'
+OUI_IEEE_8023 = b'\x00\x12\x0f'
+
+# Bits de capacidades do sistema (TLV 7)
+CAPABILITY_NAMES = ('Other', 'Repeater', 'Bridge', 'WLAN AP', 'Router', 'Telephone', 'DOCSIS', 'Station')
+
+# dot3MauType (RFC 4836) -> (velocidade em Mbps, duplex)
+MAU_TYPES = {
+    10: (10, 'Half'), 11: (10, 'Full'),
+    15: (100, 'Half'), 16: (100, 'Full'), 17: (100, 'Half'), 18: (100, 'Full'),
+    21: (1000, 'Half'), 22: (1000, 'Full'), 23: (1000, 'Half'), 24: (1000, 'Full'),
+    25: (1000, 'Half'), 26: (1000, 'Full'), 29: (1000, 'Half'), 30: (1000, 'Full'),
+    31: (10000, 'Full'), 32: (10000, 'Full'), 33: (10000, 'Full'), 34: (10000, 'Full'),
+    35: (10000, 'Full'), 36: (10000, 'Full'), 37: (10000, 'Full'), 38: (10000, 'Full'),
+    39: (10000, 'Full'), 40: (10000, 'Full'), 54: (10000, 'Full'),
+}
+
+
+def _text(data):
+    return data.decode('utf-8', errors='replace').strip('\0').strip()
+
+
+def _network_address(data):
+    """Endereço com prefixo de família IANA (1 = IPv4, 2 = IPv6)"""
+    if len(data) == 5 and data[0] == 1:
+        return socket.inet_ntop(socket.AF_INET, data[1:])
+    if len(data) == 17 and data[0] == 2:
+        return socket.inet_ntop(socket.AF_INET6, data[1:])
+    return data[1:].hex()
+
+
+# === Decodificadores de TLV: cada um recebe (valor, vizinho) e preenche o vizinho ===
+
+def _decode_chassis_id(value, neighbor):
+    subtype, data = value[0], value[1:]
+    if subtype == 4 and len(data) == 6:
+        neighbor['chassis_id'] = format_mac(data)
+    elif subtype == 5:
+        neighbor['chassis_id'] = _network_address(data)
+    else:
+        neighbor['chassis_id'] = _text(data)
+    neighbor['chassis_id_subtype'] = subtype
+
+
+def _decode_port_id(value, neighbor):
+    subtype, data = value[0], value[1:]
+    if subtype == 3 and len(data) == 6:
+        neighbor['port_id'] = format_mac(data)
+    elif subtype == 4:
+        neighbor['port_id'] = _network_address(data)
+    else:
+        neighbor['port_id'] = _text(data)
+    neighbor['port_id_subtype'] = subtype
+
+
+def _decode_ttl(value, neighbor):
+    neighbor['ttl'] = struct.unpack('!H', value[:2])[0]
+
+
+def _text_field(name):
+    def decode(value, neighbor):
+        neighbor[name] = _text(value)
+    return decode
+
+
+def _decode_capabilities(value, neighbor):
+    system, enabled = struct.unpack('!HH', value[:4])
+    neighbor['capabilities'] = [name for bit, name in enumerate(CAPABILITY_NAMES) if system & (1 << bit)]
+    neighbor['enabled_capabilities'] = [name for bit, name in enumerate(CAPABILITY_NAMES) if enabled & (1 << bit)]
+
+
+def _decode_management_address(value, neighbor):
+    length = value[0]
+    address = _network_address(value[1:1 + length])
+    neighbor.setdefault('management_addresses', []).append(address)
+
+
+def _decode_port_vlan_id(value, neighbor):
+    neighbor['pvid'] = struct.unpack('!H', value[:2])[0]
+
+
+def _decode_vlan_name(value, neighbor):
+    vlan_id, length = struct.unpack('!HB', value[:3])
+    neighbor.setdefault('vlans', []).append((vlan_id, _text(value[3:3 + length])))
+
+
+def _decode_mac_phy(value, neighbor):
+    autoneg, _, mau_type = struct.unpack('!BHH', value[:5])
+    neighbor['autonegotiation'] = bool(autoneg & 0x2)
+    neighbor['mau_type'] = mau_type
+    if mau_type in MAU_TYPES:
+        neighbor['speed_mbps'], neighbor['duplex'] = MAU_TYPES[mau_type]
+
+
+def _decode_max_frame_size(value, neighbor):
+    neighbor['max_frame_size'] = struct.unpack('!H', value[:2])[0]
+
+
+# TLVs organizacionais (tipo 127): (OUI, subtipo) -> decodificador
+ORGANIZATIONAL_DECODERS = {
+    (OUI_IEEE_8021, 1): _decode_port_vlan_id,
+    (OUI_IEEE_8021, 3): _decode_vlan_name,
+    (OUI_IEEE_8023, 1): _decode_mac_phy,
+    (OUI_IEEE_8023, 4): _decode_max_frame_size,
+}
+
+
+def _decode_organizational(value, neighbor):
+    decoder = ORGANIZATIONAL_DECODERS.get((value[:3], value[3]))
+    if decoder:
+        decoder(value[4:], neighbor)
+
+
+# TLVs básicos: tipo -> decodificador (tipos desconhecidos são ignorados)
+TLV_DECODERS = {
+    1: _decode_chassis_id,
+    2: _decode_port_id,
+    3: _decode_ttl,
+    4: _text_field('port_description'),
+    5: _text_field('system_name'),
+    6: _text_field('system_description'),
+    7: _decode_capabilities,
+    8: _decode_management_address,
+    127: _decode_organizational,
+}
+
+
+def decode_lldpdu(payload):
+    """
+    Decodifica os TLVs de uma LLDPDU
+
+    Args:
+        payload: Bytes após o cabeçalho Ethernet (ethertype 0x88CC)
+
+    Returns:
+        Dicionário do vizinho (chassis_id, port_id, ttl e os campos opcionais
+        presentes), ou None se faltar algum TLV obrigatório
+    """
+    neighbor = {'protocol': 'lldp'}
+    offset = 0
+    while offset + 2 <= len(payload):
+        header = (payload[offset] << 8) | payload[offset + 1]
+        tlv_type, length = header >> 9, header & 0x1ff
+        value = payload[offset + 2:offset + 2 + length]
+        offset += 2 + length
+        if tlv_type == 0:
+            break
+        if len(value) < length or not value:
+            continue
+        decoder = TLV_DECODERS.get(tlv_type)
+        if decoder:
+            try:
+                decoder(value, neighbor)
+            except (IndexError, struct.error):
+                # TLV truncado: os demais continuam válidos
+                continue
+    if 'chassis_id' not in neighbor or 'port_id' not in neighbor or 'ttl' not in neighbor:
+        return None
+    return neighbor
+
+
+def parse_ethernet(frame):
+    """
+    Separa o cabeçalho Ethernet (com ou sem tag 802.1Q)
+
+    Returns:
+        (MAC de origem, ethertype, payload) ou None se o quadro for curto demais
+    """
+    if len(frame) < 14:
+        return None
+    ethertype = struct.unpack_from('!H', frame, 12)[0]
+    offset = 14
+    if ethertype == ETH_P_8021Q and len(frame) >= 18:
+        ethertype = struct.unpack_from('!H', frame, 16)[0]
+        offset = 18
+    return format_mac(frame[6:12]), ethertype, frame[offset:]
+
+
+def decode_frame(frame):
+    """Decodifica um quadro Ethernet LLDP ou CDP; retorna o vizinho ou None"""
+    if frame[:6] == cdp.CDP_MULTICAST:
+        return cdp.decode_frame(frame)
+    parsed = parse_ethernet(frame)
+    if parsed is None or parsed[1] != ETH_P_LLDP:
+        return None
+    neighbor = decode_lldpdu(parsed[2])
+    if neighbor is not None:
+        neighbor['source_mac'] = parsed[0]
+    return neighbor
+
+
+# === Construção de quadros (para testes e benchmarks) ===
+
+def encode_tlv(tlv_type, value):
+    """Codifica um TLV LLDP (7 bits de tipo, 9 de comprimento)"""
+    return struct.pack('!H', (tlv_type << 9) | len(value)) + value
+
+
+def build_lldp_frame(chassis_mac, port_id, ttl=120, system_name='', system_description='',
+                     port_description='', management_ip='', pvid=None, vlan_names=(), mau_type=None,
+                     source_mac=None):
+    """Monta um quadro Ethernet LLDP com os TLVs informados (vlan_names: pares (VLAN, nome))"""
+    chassis = bytes.fromhex(chassis_mac.replace('-', '').replace(':', ''))
+    tlvs = [
+        encode_tlv(1, b'\x04' + chassis),
+        encode_tlv(2, b'\x05' + port_id.encode()),
+        encode_tlv(3, struct.pack('!H', ttl)),
+    ]
+    if port_description:
+        tlvs.append(encode_tlv(4, port_description.encode()))
+    if system_name:
+        tlvs.append(encode_tlv(5, system_name.encode()))
+    if system_description:
+        tlvs.append(encode_tlv(6, system_description.encode()))
+    tlvs.append(encode_tlv(7, struct.pack('!HH', 0x14, 0x04)))
+    if management_ip:
+        address = b'\x01' + socket.inet_aton(management_ip)
+        tlvs.append(encode_tlv(8, bytes((len(address),)) + address + b'\x02' + struct.pack('!I', 0) + b'\x00'))
+    if pvid is not None:
+        tlvs.append(encode_tlv(127, OUI_IEEE_8021 + b'\x01' + struct.pack('!H', pvid)))
+    for vlan_id, vlan_name in vlan_names:
+        name = vlan_name.encode()
+        tlvs.append(encode_tlv(127, OUI_IEEE_8021 + b'\x03' + struct.pack('!HB', vlan_id, len(name)) + name))
+    if mau_type is not None:
+        tlvs.append(encode_tlv(127, OUI_IEEE_8023 + b'\x01' + struct.pack('!BHH', 0x3, 0x6c00, mau_type)))
+    tlvs.append(encode_tlv(0, b''))
+    source = bytes.fromhex((source_mac or chassis_mac).replace('-', '').replace(':', ''))
+    return LLDP_MULTICAST[0] + source + struct.pack('!H', ETH_P_LLDP) + b''.join(tlvs)
+
+
+# === Arquivos pcap ===
+
+_PCAP_MAGIC = {
+    b'\xd4\xc3\xb2\xa1': ('<', 1e-6), b'\xa1\xb2\xc3\xd4': ('>', 1e-6),
+    b'\x4d\x3c\xb2\xa1': ('<', 1e-9), b'\xa1\xb2\x3c\x4d': ('>', 1e-9),
+}
+
+
+def read_pcap(path):
+    """
+    Lê um arquivo .pcap clássico (Ethernet)
+
+    Yields:
+        (timestamp, quadro) de cada pacote capturado
+    """
+    with open(path, 'rb') as f:
+        header = f.read(24)
+        if len(header) < 24 or header[:4] not in _PCAP_MAGIC:
+            raise ValueError(f"Arquivo pcap inválido: {path}")
+        endian, resolution = _PCAP_MAGIC[header[:4]]
+        record = struct.Struct(endian + 'IIII')
+        while True:
+            data = f.read(record.size)
+            if len(data) < record.size:
+                return
+            seconds, fraction, captured, _ = record.unpack(data)
+            frame = f.read(captured)
+            if len(frame) < captured:
+                return
+            yield seconds + fraction * resolution, frame
+
+
+def write_pcap(path, frames):
+    """Grava (timestamp, quadro) em um .pcap clássico (Ethernet, microssegundos)"""
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<IHHiIII', 0xa1b2c3d4, 2, 4, 0, 0, 65535, 1))
+        for timestamp, frame in frames:
+            seconds = int(timestamp)
+            f.write(struct.pack('<IIII', seconds, int((timestamp - seconds) * 1e6), len(frame), len(frame)))
+            f.write(frame)
+
+
+# === Cache de vizinhos ===
+
+class NeighborCache:
+    """Vizinhos LLDP vistos em cada interface, válidos pelo TTL anunciado"""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def update(self, interface, neighbor, received_at=None):
+        """
+        Registra um anúncio (TTL 0 remove o vizinho, como no shutdown do LLDP)
+
+        Returns:
+            True se o vizinho é novo ou mudou (além do TTL)
+        """
+        received_at = self.clock() if received_at is None else received_at
+        key = (interface, neighbor.get('chassis_id'), neighbor.get('port_id'))
+        with self.lock:
+            previous = self.entries.get(key)
+            if neighbor.get('ttl', 0) == 0:
+                self.entries.pop(key, None)
+                return previous is not None
+            neighbor = dict(neighbor, interface=interface, received_at=received_at,
+                            expires_at=received_at + neighbor['ttl'])
+            self.entries[key] = neighbor
+            if previous is None:
+                return True
+            ignored = ('received_at', 'expires_at', 'ttl')
+            return any(previous.get(name) != value for name, value in neighbor.items() if name not in ignored)
+
+    def neighbors(self, interface=None):
+        """Vizinhos ainda válidos (da interface, se informada), o mais recente primeiro"""
+        now = self.clock()
+        with self.lock:
+            for key in [key for key, entry in self.entries.items() if entry['expires_at'] <= now]:
+                del self.entries[key]
+            found = [dict(entry) for entry in self.entries.values()
+                     if interface is None or entry['interface'] == interface]
+        return sorted(found, key=lambda entry: entry['received_at'], reverse=True)
+
+    def best(self, interface=None):
+        """Vizinho válido mais recente (None se não houver)"""
+        found = self.neighbors(interface)
+        return found[0] if found else None
+
+
+# === Backends de captura ===
+
+SOL_PACKET = 263
+PACKET_ADD_MEMBERSHIP = 1
+PACKET_MR_MULTICAST = 0
+
+
+class AfPacketCapture:
+    """Captura LLDP e CDP no Linux com sockets AF_PACKET que atendem todas as interfaces"""
+
+    def __init__(self):
+        self.sockets = []
+
+    def open(self):
+        for protocol, address in ((ETH_P_LLDP, LLDP_MULTICAST[0]), (ETH_P_802_2, cdp.CDP_MULTICAST)):
+            sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(protocol))
+            self.sockets.append(sock)
+            # As placas descartam multicast não inscrito: inscreve o destino em cada interface
+            for index, name in socket.if_nameindex():
+                if name == 'lo':
+                    continue
+                membership = struct.pack('iHH8s', index, PACKET_MR_MULTICAST, len(address), address)
+                try:
+                    sock.setsockopt(SOL_PACKET, PACKET_ADD_MEMBERSHIP, membership)
+                except OSError:
+                    pass
+
+    def read(self):
+        """Retorna (interface, quadro) ou None se o tempo de espera acabar"""
+        readable, _, _ = select.select(self.sockets, [], [], 1.0)
+        if not readable:
+            return None
+        frame, address = readable[0].recvfrom(65535)
+        return address[0], frame
+
+    def close(self):
+        sockets = self.sockets
+        self.sockets = []
+        for sock in sockets:
+            sock.close()
+
+
+class _PcapPacketHeader(ctypes.Structure):
+    _fields_ = [
+        ('tv_sec', ctypes.c_long),
+        ('tv_usec', ctypes.c_long),
+        ('caplen', ctypes.c_uint32),
+        ('len', ctypes.c_uint32),
+    ]
+
+
+class _PcapInterface(ctypes.Structure):
+    pass
+
+
+_PcapInterface._fields_ = [
+    ('next', ctypes.POINTER(_PcapInterface)),
+    ('name', ctypes.c_char_p),
+    ('description', ctypes.c_char_p),
+    ('addresses', ctypes.c_void_p),
+    ('flags', ctypes.c_uint32),
+]
+
+PCAP_IF_LOOPBACK = 0x1
+
+
+class NpcapCapture:
+    """Captura LLDP e CDP no Windows pelo Npcap, em todas as placas não loopback"""
+
+    def __init__(self):
+        self.wpcap = None
+        self.handles = []
+        self.next_handle = 0
+
+    def open(self):
+        npcap_dir = os.path.join(os.environ.get('SystemRoot', r'C:\Windows'), 'System32', 'Npcap')
+        self.wpcap = ctypes.CDLL(os.path.join(npcap_dir, 'wpcap.dll'))
+        self.wpcap.pcap_open_live.restype = ctypes.c_void_p
+        self.wpcap.pcap_open_live.argtypes = [ctypes.c_char_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_char_p]
+        self.wpcap.pcap_next_ex.argtypes = [
+            ctypes.c_void_p, ctypes.POINTER(ctypes.POINTER(_PcapPacketHeader)), ctypes.POINTER(ctypes.c_void_p)
+        ]
+        self.wpcap.pcap_compile.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int, ctypes.c_uint32]
+        self.wpcap.pcap_setfilter.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        self.wpcap.pcap_close.argtypes = [ctypes.c_void_p]
+
+        errbuf = ctypes.create_string_buffer(256)
+        devices = ctypes.POINTER(_PcapInterface)()
+        if self.wpcap.pcap_findalldevs(ctypes.byref(devices), errbuf) != 0:
+            raise OSError(errbuf.value.decode(errors='replace'))
+        try:
+            device = devices
+            while device:
+                entry = device.contents
+                if not entry.flags & PCAP_IF_LOOPBACK:
+                    # Espera curta por pacote: as placas são lidas em rodízio
+                    handle = self.wpcap.pcap_open_live(entry.name, 1600, 0, 50, errbuf)
+                    if handle:
+                        program = ctypes.create_string_buffer(16)
+                        if self.wpcap.pcap_compile(handle, program, b'ether proto 0x88cc or ether dst 01:00:0c:cc:cc:cc', 1, 0) == 0:
+                            self.wpcap.pcap_setfilter(handle, program)
+                        self.handles.append((entry.name.decode(errors='replace'), handle))
+                device = entry.next
+        finally:
+            self.wpcap.pcap_freealldevs(devices)
+        if not self.handles:
+            raise OSError("Nenhuma placa disponível no Npcap")
+
+    def read(self):
+        """Retorna (interface, quadro) ou None se nenhuma placa tiver quadro agora"""
+        for _ in range(len(self.handles)):
+            name, handle = self.handles[self.next_handle]
+            self.next_handle = (self.next_handle + 1) % len(self.handles)
+            header = ctypes.POINTER(_PcapPacketHeader)()
+            data = ctypes.c_void_p()
+            if self.wpcap.pcap_next_ex(handle, ctypes.byref(header), ctypes.byref(data)) == 1:
+                return name, ctypes.string_at(data, header.contents.caplen)
+        return None
+
+    def close(self):
+        for _, handle in self.handles:
+            self.wpcap.pcap_close(handle)
+        self.handles = []
+
+
+def default_capture():
+    """Retorna o backend de captura da plataforma (None se não houver suporte)"""
+    if sys.platform == "win32":
+        return NpcapCapture()
+    if sys.platform.startswith("linux") and hasattr(socket, 'AF_PACKET'):
+        return AfPacketCapture()
+    return None
+
+
+class LldpListener:
+    """Escuta passiva de anúncios LLDP em segundo plano"""
+
+    def __init__(self, on_change=None, capture=None, cache=None):
+        """
+        Args:
+            on_change: Função chamada como on_change(vizinho) quando um vizinho
+                aparece ou muda (thread de captura)
+            capture: Backend de captura (padrão: o da plataforma)
+            cache: NeighborCache compartilhado (padrão: um novo)
+        """
+        self.on_change = on_change
+        self.capture = capture
+        self.cache = cache or NeighborCache()
+        self.running = False
+        self.unavailable = False
+        self.thread = None
+        self.frames_received = 0
+        self.frames_invalid = 0
+
+    def start(self):
+        """
+        Inicia a captura
+
+        Returns:
+            True se a captura está ativa; False sem suporte ou sem privilégio
+            (o chamador continua com as outras fontes de LLDP)
+        """
+        if self.running:
+            return True
+        if self.unavailable:
+            # Falhou antes (sem privilégio/Npcap): não tenta abrir a captura a cada coleta
+            return False
+        if self.capture is None:
+            self.capture = default_capture()
+        if self.capture is None:
+            self.unavailable = True
+            return False
+        try:
+            self.capture.open()
+        except (OSError, AttributeError) as e:
+            print(f"Captura LLDP indisponível: {e}")  # Debug
+            self.capture = None
+            self.unavailable = True
+            return False
+        self.running = True
+        self.thread = threading.Thread(target=self._read_loop, name="lldp", daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        """Encerra a captura (o cache continua válido até os TTLs expirarem)"""
+        self.running = False
+        capture = self.capture
+        self.capture = None
+        if capture:
+            try:
+                capture.close()
+            except OSError:
+                pass
+
+    def feed(self, interface, frame, received_at=None):
+        """Processa um quadro capturado (ou reproduzido de um pcap)"""
+        neighbor = decode_frame(frame)
+        if neighbor is None:
+            self.frames_invalid += 1
+            return None
+        self.frames_received += 1
+        if self.cache.update(interface, neighbor, received_at) and self.on_change:
+            try:
+                self.on_change(neighbor)
+            except Exception as e:
+                print(f"Erro ao notificar vizinho LLDP: {e}")
+        return neighbor
+
+    def replay(self, path, interface='pcap'):
+        """Reproduz um arquivo .pcap no decodificador e no cache; retorna os vizinhos decodificados"""
+        return [neighbor for neighbor in (self.feed(interface, frame) for _, frame in read_pcap(path)) if neighbor]
+
+    def _read_loop(self):
+        capture = self.capture
+        while self.running:
+            try:
+                packet = capture.read()
+            except OSError:
+                break
+            if packet:
+                self.feed(*packet)
+
+
+def neighbor_to_switch_info(neighbor):
+    """Converte um vizinho LLDP ou CDP nos campos de switch exibidos pelo diagnóstico"""
+    info = {}
+    name = neighbor.get('system_name') or neighbor.get('chassis_id')
+    if name:
+        info['switch_name'] = name
+    port_id = neighbor.get('port_id', '')
+    port_description = neighbor.get('port_description', '')
+    # Mesmo formato do caminho via PowerShell: "MES (GE1/0/17)"
+    if port_description and port_id and port_description != port_id:
+        info['port_id'] = f"{port_description} ({port_id})"
+    elif port_id or port_description:
+        info['port_id'] = port_id or port_description
+    if neighbor.get('pvid'):
+        info['vlan_id'] = str(neighbor['pvid'])
+    for address in neighbor.get('management_addresses', []):
+        if '.' in address:
+            info['switch_ip'] = address
+            break
+    # O CDP informa a plataforma (modelo) separada da versão do software
+    if neighbor.get('platform') or neighbor.get('system_description'):
+        info['switch_model'] = neighbor.get('platform') or neighbor['system_description']
+    if neighbor.get('vtp_domain'):
+        info['vtp_domain'] = neighbor['vtp_domain']
+    if neighbor.get('duplex'):
+        speed = neighbor.get('speed_mbps')
+        if speed:
+            speed_text = f"{speed // 1000} Gbps" if speed >= 1000 else f"{speed} Mbps"
+            info['port_duplex'] = f"{neighbor['duplex']} Duplex ({speed_text})"
+        else:
+            info['port_duplex'] = f"{neighbor['duplex']} Duplex"
+    return info
+
+
+def merge_switch_info(neighbors):
+    """
+    Combina os vizinhos LLDP e CDP da interface com o anúncio mais recente
+
+    O LLDP tem precedência; o CDP preenche o que faltar (domínio VTP, VLAN
+    nativa, duplex, plataforma).
+    """
+    if not neighbors:
+        return {}
+    interface = neighbors[0].get('interface')
+    same_link = [neighbor for neighbor in neighbors if neighbor.get('interface') == interface]
+    info = {}
+    for neighbor in sorted(same_link, key=lambda item: item.get('protocol') != 'lldp'):
+        for key, value in neighbor_to_switch_info(neighbor).items():
+            info.setdefault(key, value)
+    return info
+
+
+def check():
+    """
+    Verifica o decodificador ponta a ponta: quadros montados com
+    build_lldp_frame são gravados em um .pcap e reproduzidos pelo LldpListener
+
+    Returns:
+        Número de verificações que falharam
+    """
+    import tempfile
+
+    failures = []
+
+    def expect(description, condition):
+        if not condition:
+            failures.append(description)
+            print(f"  FALHOU: {description}")
+
+    access = build_lldp_frame(
+        '00:11:22:33:44:55', 'Gi1/0/17', ttl=120, system_name='sw-core',
+        system_description='Cisco IOS Software, C2960X', port_description='GE1/0/17',
+        management_ip='10.0.0.2', pvid=20, vlan_names=((20, 'VOZ'), (30, 'DADOS')), mau_type=30
+    )
+    uplink = build_lldp_frame('00:11:22:33:44:66', 'te1/0/1', ttl=60, mau_type=16,
+                              source_mac='00:11:22:33:44:67')
+    # Mesmo anúncio com tag 802.1Q (VLAN 20) entre o MAC de origem e o ethertype
+    tagged = access[:12] + struct.pack('!HH', ETH_P_8021Q, 20) + access[12:]
+    shutdown = build_lldp_frame('00:11:22:33:44:55', 'Gi1/0/17', ttl=0)
+    arp = b'\xff' * 6 + b'\x00\x11\x22\x33\x44\x55\x08\x06' + b'\x00' * 28
+    # Sem o TLV de TTL (obrigatório): descartado
+    incomplete = access[:14] + encode_tlv(1, b'\x04' + bytes.fromhex('001122334455')) + \
+        encode_tlv(2, b'\x05Gi1/0/17') + encode_tlv(0, b'')
+
+    changes = []
+    listener = LldpListener(on_change=changes.append, cache=NeighborCache(clock=lambda: 1000.0))
+    handle, path = tempfile.mkstemp(suffix='.pcap')
+    os.close(handle)
+    try:
+        write_pcap(path, [(1700000000.0 + index, frame)
+                          for index, frame in enumerate((access, uplink, arp, incomplete))])
+        neighbors = listener.replay(path)
+        expect("quadros de pcap relidos", len(list(read_pcap(path))) == 4)
+    finally:
+        os.remove(path)
+
+    expect("dois vizinhos decodificados", len(neighbors) == 2)
+    expect("ARP e LLDPDU incompleta descartados", listener.frames_invalid == 2)
+    expect("on_change para cada vizinho novo", len(changes) == 2)
+    neighbor = neighbors[0] if neighbors else {}
+    expect("chassis ID (MAC)", neighbor.get('chassis_id') == '00-11-22-33-44-55' and
+           neighbor.get('chassis_id_subtype') == 4)
+    expect("port ID (nome da interface)", neighbor.get('port_id') == 'Gi1/0/17' and
+           neighbor.get('port_id_subtype') == 5)
+    expect("MAC de origem", neighbor.get('source_mac') == '00-11-22-33-44-55')
+    expect("TTL", neighbor.get('ttl') == 120)
+    expect("nome e descrição do sistema", neighbor.get('system_name') == 'sw-core' and
+           neighbor.get('system_description') == 'Cisco IOS Software, C2960X')
+    expect("descrição da porta", neighbor.get('port_description') == 'GE1/0/17')
+    expect("capacidades", neighbor.get('capabilities') == ['Bridge', 'Router'] and
+           neighbor.get('enabled_capabilities') == ['Bridge'])
+    expect("endereço de gerência", neighbor.get('management_addresses') == ['10.0.0.2'])
+    expect("PVID", neighbor.get('pvid') == 20)
+    expect("nomes de VLAN", neighbor.get('vlans') == [(20, 'VOZ'), (30, 'DADOS')])
+    expect("MAC/PHY 802.3: 1000 Mbps Full", neighbor.get('speed_mbps') == 1000 and
+           neighbor.get('duplex') == 'Full' and neighbor.get('autonegotiation') is True)
+    second = neighbors[1] if len(neighbors) > 1 else {}
+    expect("MAC/PHY 802.3: 100 Mbps Full", second.get('speed_mbps') == 100 and second.get('duplex') == 'Full')
+    expect("port ID do uplink", second.get('port_id') == 'te1/0/1' and second.get('ttl') == 60)
+    expect("vizinho sem PVID", 'pvid' not in second and 'vlans' not in second)
+
+    info = neighbor_to_switch_info(neighbor)
+    expect("campos do switch", info == {
+        'switch_name': 'sw-core', 'port_id': 'GE1/0/17 (Gi1/0/17)', 'vlan_id': '20',
+        'switch_ip': '10.0.0.2', 'switch_model': 'Cisco IOS Software, C2960X',
+        'port_duplex': 'Full Duplex (1 Gbps)'
+    })
+
+    expect("quadro com tag 802.1Q decodificado", decode_frame(tagged) == neighbor)
+    expect("anúncio repetido não notifica", listener.feed('pcap', access) and len(changes) == 2)
+    expect("ambos no cache", len(listener.cache.neighbors('pcap')) == 2)
+    expect("TTL 0 notifica a remoção", listener.feed('pcap', shutdown) and len(changes) == 3)
+    remaining = listener.cache.neighbors('pcap')
+    expect("TTL 0 remove o vizinho", [entry['chassis_id'] for entry in remaining] == ['00-11-22-33-44-66'])
+    expect("TTL 0 de vizinho desconhecido não notifica",
+           listener.feed('pcap', shutdown) and len(changes) == 3)
+
+    cache = NeighborCache(clock=lambda: now)
+    now = 0.0
+    cache.update('eth0', decode_frame(uplink))
+    now = 59.0
+    expect("vizinho válido dentro do TTL", cache.best('eth0') is not None)
+    now = 60.0
+    expect("vizinho expira com o TTL", cache.best('eth0') is None)
+
+    return len(failures)
+
+
+if __name__ == "__main__":
+    arguments = sys.argv[1:]
+    if arguments == ['--captura']:
+        listener = LldpListener(on_change=lambda neighbor: print(neighbor_to_switch_info(neighbor)))
+        if not listener.start():
+            sys.exit("Captura LLDP indisponível (requer privilégio ou Npcap)")
+        print("Aguardando anúncios LLDP (Ctrl+C para sair)...")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            listener.stop()
+    elif arguments:
+        # Reproduz capturas: python -m utils.lldp arquivo.pcap
+        listener = LldpListener()
+        started = time.perf_counter()
+        neighbors = [neighbor for path in arguments for neighbor in listener.replay(path)]
+        print(f"{len(neighbors)} anúncio(s) decodificados em {(time.perf_counter() - started) * 1000:.1f} ms")
+        for neighbor in listener.cache.neighbors():
+            print(' ', neighbor['protocol'], neighbor_to_switch_info(neighbor))
+    else:
+        failed = check()
+        print("Verificações concluídas" if not failed else f"{failed} verificações falharam")
+        sys.exit(1 if failed else 0)
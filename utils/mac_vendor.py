@@ -0,0 +1,168 @@
+"""
+Fabricante da placa de rede a partir do MAC (OUI)
+Traz uma tabela embutida com os prefixos mais comuns em redes corporativas e,
+se o técnico tiver o Nmap ou o Wireshark instalados, carrega a lista completa
+deles na primeira consulta (também aceita o oui.txt do IEEE).
+
+Benchmark: python -m utils.mac_vendor [arquivo]
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+
+
+# Prefixos de 24 bits mais comuns (tabela embutida, usada sem nenhum arquivo)
+BUILTIN_VENDORS = {
+    '00000C': 'Cisco', '00253B': 'Cisco', '0025B5': 'Cisco',
+    '000585': 'Juniper', '000B86': 'Aruba', '00E0FC': 'Huawei',
+    '00090F': 'Fortinet', '000C42': 'MikroTik', '4C5E0C': 'MikroTik',
+    '002722': 'Ubiquiti', '24A43C': 'Ubiquiti', '50C7BF': 'TP-Link',
+    '001422': 'Dell', 'F8BC12': 'Dell', '000802': 'HP',
+    '001F29': 'HP', '3CD92B': 'HP', '003048': 'Supermicro', '002590': 'Supermicro',
+    '000393': 'Apple', '00E04C': 'Realtek', '001018': 'Broadcom', '00044B': 'NVIDIA',
+    '001B21': 'Intel',
+    '005056': 'VMware', '000C29': 'VMware', '000569': 'VMware',
+    '00155D': 'Microsoft (Hyper-V)', '000D3A': 'Microsoft', '0050F2': 'Microsoft',
+    '080027': 'VirtualBox', '001C42': 'Parallels', '00163E': 'Xen', '525400': 'QEMU/KVM',
+    'B827EB': 'Raspberry Pi', 'DCA632': 'Raspberry Pi', 'E45F01': 'Raspberry Pi',
+    '000048': 'Epson', '000085': 'Canon', '0000AA': 'Xerox', '000400': 'Lexmark',
+    '008077': 'Brother',
+}
+
+# Listas completas procuradas na primeira consulta (a primeira encontrada é usada)
+VENDOR_FILES = (
+    r'C:\Program Files (x86)\Nmap\nmap-mac-prefixes',
+    r'C:\Program Files\Nmap\nmap-mac-prefixes',
+    r'C:\Program Files\Wireshark\manuf',
+    '/usr/share/nmap/nmap-mac-prefixes',
+    '/usr/share/wireshark/manuf',
+    '/usr/share/ieee-data/oui.txt',
+)
+
+LOCALLY_ADMINISTERED = 'Endereço local (aleatório)'
+
+# Formatos aceitos, um prefixo por linha:
+#   IEEE oui.txt:       00-00-0C   (hex)		Cisco Systems, Inc
+#   Wireshark manuf:    00:00:0C	Cisco	Cisco Systems, Inc   (ou 00:1B:C5:00:00:00/36 ...)
+#   nmap-mac-prefixes:  00000C Cisco Systems
+_IEEE_LINE = re.compile(r'^([0-9A-F]{2})-([0-9A-F]{2})-([0-9A-F]{2})\s+\(hex\)\s+(.+)$', re.I)
+_MANUF_LINE = re.compile(r'^([0-9A-F:.\-]+)(?:/(\d+))?\s+(\S+)(?:\s+(.+))?$', re.I)
+_NMAP_LINE = re.compile(r'^([0-9A-F]{6,9})\s+(.+)$', re.I)
+
+
+def mac_digits(mac):
+    """Dígitos hexadecimais do MAC em maiúsculas, sem separadores"""
+    return re.sub(r'[^0-9A-Fa-f]', '', mac or '').upper()
+
+
+def parse_vendor_file(lines):
+    """
+    Lê uma lista de fabricantes (IEEE, Wireshark ou Nmap)
+
+    Returns:
+        Dicionário {prefixo hexadecimal: fabricante}; prefixos de 24, 28 ou 36 bits
+    """
+    vendors = {}
+    for line in lines:
+        line = line.strip()
+        # O oui.txt repete cada prefixo numa linha "(base 16)", ignorada
+        if not line or line.startswith('#') or '(base 16)' in line:
+            continue
+        match = _IEEE_LINE.match(line)
+        if match:
+            vendors[''.join(match.group(1, 2, 3)).upper()] = match.group(4).strip()
+            continue
+        match = _NMAP_LINE.match(line)
+        if match:
+            vendors[match.group(1).upper()] = match.group(2).strip()
+            continue
+        match = _MANUF_LINE.match(line)
+        if match:
+            digits = mac_digits(match.group(1))
+            bits = int(match.group(2) or 24)
+            if len(digits) * 4 >= bits and bits % 4 == 0:
+                vendors[digits[:bits // 4]] = (match.group(4) or match.group(3)).strip()
+    return vendors
+
+
+class MacVendorLookup:
+    """Consulta de fabricante por prefixo, do mais específico (36 bits) ao OUI (24 bits)"""
+
+    def __init__(self, paths=VENDOR_FILES):
+        """
+        Args:
+            paths: Arquivos procurados na primeira consulta (vazio = só a tabela embutida)
+        """
+        self.paths = paths
+        self.vendors = dict(BUILTIN_VENDORS)
+        self.source = 'embutida'
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def lookup(self, mac):
+        """Fabricante do MAC ('' se desconhecido)"""
+        digits = mac_digits(mac)
+        if len(digits) < 6:
+            return ''
+        if not self.loaded:
+            self._load()
+        for length in (9, 7, 6):
+            vendor = self.vendors.get(digits[:length])
+            if vendor:
+                return vendor
+        # Bit "administrado localmente": MAC aleatório (celulares, VMs, containers)
+        if int(digits[:2], 16) & 0x02:
+            return LOCALLY_ADMINISTERED
+        return ''
+
+    def _load(self):
+        with self.lock:
+            if self.loaded:
+                return
+            for path in self.paths:
+                if not os.path.isfile(path):
+                    continue
+                try:
+                    with open(path, encoding='utf-8', errors='replace') as vendor_file:
+                        vendors = parse_vendor_file(vendor_file)
+                except OSError as e:
+                    print(f"Erro ao ler lista de fabricantes {path}: {e}")  # Debug
+                    continue
+                if vendors:
+                    self.vendors.update(vendors)
+                    self.source = path
+                    break
+            self.loaded = True
+
+
+_shared_lookup = None
+_shared_lookup_lock = threading.Lock()
+
+
+def get_vendor_lookup():
+    """Retorna a consulta de fabricantes compartilhada pelo aplicativo"""
+    global _shared_lookup
+    with _shared_lookup_lock:
+        if _shared_lookup is None:
+            _shared_lookup = MacVendorLookup()
+        return _shared_lookup
+
+
+if __name__ == "__main__":
+    lookup = MacVendorLookup(sys.argv[1:] or VENDOR_FILES)
+    samples = ['00-50-56-AB-CD-EF', '00:15:5d:01:02:03', 'B8-27-EB-00-00-01', '3A-11-22-33-44-55', '10-20-30-40-50-60']
+    started = time.perf_counter()
+    lookup.lookup(samples[0])
+    loaded = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(10000):
+        for mac in samples:
+            lookup.lookup(mac)
+    elapsed = time.perf_counter() - started
+    print(f"Lista: {lookup.source} ({len(lookup.vendors)} prefixos, carregada em {loaded * 1000:.0f} ms); "
+          f"{10000 * len(samples)} consultas em {elapsed * 1000:.0f} ms")
+    for mac in samples:
+        print(f"  {mac}: {lookup.lookup(mac) or 'desconhecido'}")
@@ -0,0 +1,379 @@
+"""
+Enumeração nativa de adaptadores de rede, sem executar ipconfig
+Retorna a mesma estrutura de adaptador montada a partir do "ipconfig /all":
+    name, description, physical_address, dhcp_enabled, ipv4_address, ipv4_subnet,
+    ipv6_address, default_gateway, dns_servers
+e alguns campos extras (interface_index, ipv4_prefix_length, oper_status, link_speed).
+
+Windows: GetAdaptersAddresses (iphlpapi) via ctypes
+Linux:   netlink (RTM_GETLINK/RTM_GETADDR), /proc/net e /sys/class/net
+
+Para medir o tempo de enumeração nesta máquina:
+    python -m utils.native_interfaces
+"""
+
+import ctypes
+import ipaddress
+import os
+import socket
+import struct
+import sys
+import time
+
+from utils import netlink
+from utils.iphlpapi import (
+    AF_UNSPEC, ERROR_BUFFER_OVERFLOW, ERROR_NO_DATA, ERROR_SUCCESS, SOCKET_ADDRESS,
+    format_mac, iterate_linked, load_iphlpapi, socket_address_to_ip
+)
+
+
+# === Windows: GetAdaptersAddresses ===
+
+GAA_FLAG_SKIP_ANYCAST = 0x2
+GAA_FLAG_SKIP_MULTICAST = 0x4
+GAA_FLAG_INCLUDE_PREFIX = 0x10
+GAA_FLAG_INCLUDE_GATEWAYS = 0x80
+
+IP_ADAPTER_DHCP_ENABLED = 0x4
+IF_TYPE_SOFTWARE_LOOPBACK = 24
+IF_OPER_STATUS_UP = 1
+
+
+class IP_ADAPTER_UNICAST_ADDRESS(ctypes.Structure):
+    pass
+
+
+IP_ADAPTER_UNICAST_ADDRESS._fields_ = [
+    ('Length', ctypes.c_uint32),
+    ('Flags', ctypes.c_uint32),
+    ('Next', ctypes.POINTER(IP_ADAPTER_UNICAST_ADDRESS)),
+    ('Address', SOCKET_ADDRESS),
+    ('PrefixOrigin', ctypes.c_int),
+    ('SuffixOrigin', ctypes.c_int),
+    ('DadState', ctypes.c_int),
+    ('ValidLifetime', ctypes.c_uint32),
+    ('PreferredLifetime', ctypes.c_uint32),
+    ('LeaseLifetime', ctypes.c_uint32),
+    ('OnLinkPrefixLength', ctypes.c_ubyte),
+]
+
+
+class IP_ADAPTER_ADDRESS_ENTRY(ctypes.Structure):
+    """Formato comum de IP_ADAPTER_DNS_SERVER_ADDRESS e IP_ADAPTER_GATEWAY_ADDRESS"""
+    pass
+
+
+IP_ADAPTER_ADDRESS_ENTRY._fields_ = [
+    ('Length', ctypes.c_uint32),
+    ('Reserved', ctypes.c_uint32),
+    ('Next', ctypes.POINTER(IP_ADAPTER_ADDRESS_ENTRY)),
+    ('Address', SOCKET_ADDRESS),
+]
+
+
+class IP_ADAPTER_ADDRESSES(ctypes.Structure):
+    """IP_ADAPTER_ADDRESSES_LH (apenas os campos até as métricas são usados)"""
+    pass
+
+
+IP_ADAPTER_ADDRESSES._fields_ = [
+    ('Length', ctypes.c_uint32),
+    ('IfIndex', ctypes.c_uint32),
+    ('Next', ctypes.POINTER(IP_ADAPTER_ADDRESSES)),
+    ('AdapterName', ctypes.c_char_p),
+    ('FirstUnicastAddress', ctypes.POINTER(IP_ADAPTER_UNICAST_ADDRESS)),
+    ('FirstAnycastAddress', ctypes.c_void_p),
+    ('FirstMulticastAddress', ctypes.c_void_p),
+    ('FirstDnsServerAddress', ctypes.POINTER(IP_ADAPTER_ADDRESS_ENTRY)),
+    ('DnsSuffix', ctypes.c_wchar_p),
+    ('Description', ctypes.c_wchar_p),
+    ('FriendlyName', ctypes.c_wchar_p),
+    ('PhysicalAddress', ctypes.c_ubyte * 8),
+    ('PhysicalAddressLength', ctypes.c_uint32),
+    ('Flags', ctypes.c_uint32),
+    ('Mtu', ctypes.c_uint32),
+    ('IfType', ctypes.c_uint32),
+    ('OperStatus', ctypes.c_int),
+    ('Ipv6IfIndex', ctypes.c_uint32),
+    ('ZoneIndices', ctypes.c_uint32 * 16),
+    ('FirstPrefix', ctypes.c_void_p),
+    ('TransmitLinkSpeed', ctypes.c_uint64),
+    ('ReceiveLinkSpeed', ctypes.c_uint64),
+    ('FirstWinsServerAddress', ctypes.c_void_p),
+    ('FirstGatewayAddress', ctypes.POINTER(IP_ADAPTER_ADDRESS_ENTRY)),
+    ('Ipv4Metric', ctypes.c_uint32),
+    ('Ipv6Metric', ctypes.c_uint32),
+]
+
+
+def _new_adapter(name):
+    """Adaptador vazio no mesmo formato do parser do ipconfig"""
+    return {
+        'name': name,
+        'description': '',
+        'physical_address': '',
+        'dhcp_enabled': False,
+        'ipv4_address': '',
+        'ipv4_subnet': '',
+        'ipv6_address': '',
+        'default_gateway': '',
+        'dns_servers': [],
+        'interface_index': None,
+        'ipv4_prefix_length': None,
+        'oper_status': '',
+        'link_speed': 0
+    }
+
+
+def _prefix_to_mask(prefix_length):
+    """Converte o comprimento do prefixo IPv4 em máscara (ex.: 24 -> 255.255.255.0)"""
+    return str(ipaddress.IPv4Network(f'0.0.0.0/{prefix_length}').netmask)
+
+
+def _is_global_ipv6(address):
+    """True para IPv6 que o ipconfig exibe como "Endereço IPv6" (não link-local/loopback)"""
+    return ':' in address and not address.lower().startswith('fe80') and address != '::1'
+
+
+def _windows_adapters():
+    """Enumera os adaptadores com GetAdaptersAddresses"""
+    iphlpapi = load_iphlpapi()
+    flags = (GAA_FLAG_SKIP_ANYCAST | GAA_FLAG_SKIP_MULTICAST |
+             GAA_FLAG_INCLUDE_PREFIX | GAA_FLAG_INCLUDE_GATEWAYS)
+
+    size = ctypes.c_ulong(16 * 1024)
+    for _ in range(3):
+        buffer = ctypes.create_string_buffer(size.value)
+        result = iphlpapi.GetAdaptersAddresses(AF_UNSPEC, flags, None, buffer, ctypes.byref(size))
+        if result != ERROR_BUFFER_OVERFLOW:
+            break
+    if result == ERROR_NO_DATA:
+        return []
+    if result != ERROR_SUCCESS:
+        raise OSError(result, "GetAdaptersAddresses falhou")
+
+    adapters = []
+    first = ctypes.cast(buffer, ctypes.POINTER(IP_ADAPTER_ADDRESSES))
+    for entry in iterate_linked(first):
+        if entry.IfType == IF_TYPE_SOFTWARE_LOOPBACK:
+            continue
+        adapter = _new_adapter(entry.FriendlyName or '')
+        adapter['description'] = entry.Description or ''
+        adapter['physical_address'] = format_mac(entry.PhysicalAddress[:entry.PhysicalAddressLength])
+        adapter['dhcp_enabled'] = bool(entry.Flags & IP_ADAPTER_DHCP_ENABLED)
+        adapter['interface_index'] = entry.IfIndex or entry.Ipv6IfIndex
+        adapter['oper_status'] = 'up' if entry.OperStatus == IF_OPER_STATUS_UP else 'down'
+        adapter['link_speed'] = entry.TransmitLinkSpeed if entry.TransmitLinkSpeed < 2 ** 63 else 0
+
+        for unicast in iterate_linked(entry.FirstUnicastAddress):
+            address = socket_address_to_ip(unicast.Address)
+            if '.' in address and ':' not in address:
+                if not adapter['ipv4_address'] and address != '0.0.0.0':
+                    adapter['ipv4_address'] = address
+                    adapter['ipv4_prefix_length'] = unicast.OnLinkPrefixLength
+                    adapter['ipv4_subnet'] = _prefix_to_mask(unicast.OnLinkPrefixLength)
+            elif not adapter['ipv6_address'] and _is_global_ipv6(address):
+                adapter['ipv6_address'] = address
+
+        gateways = [socket_address_to_ip(gateway.Address) for gateway in iterate_linked(entry.FirstGatewayAddress)]
+        ipv4_gateways = [gateway for gateway in gateways if '.' in gateway and ':' not in gateway]
+        adapter['default_gateway'] = (ipv4_gateways or [g for g in gateways if g] or [''])[0]
+
+        for dns in iterate_linked(entry.FirstDnsServerAddress):
+            address = socket_address_to_ip(dns.Address)
+            # Servidores fec0::/10 são os padrões do Windows, não configurados
+            if address and not address.lower().startswith('fec0:') and address not in adapter['dns_servers']:
+                adapter['dns_servers'].append(address)
+
+        adapters.append(adapter)
+    return adapters
+
+
+# === Linux: netlink, /proc e /sys ===
+
+_SYS_CLASS_NET = "/sys/class/net"
+
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+IFA_FLAGS = 8
+IFA_F_PERMANENT = 0x80
+RTM_NEWLINK = 16
+RTM_NEWADDR = 20
+
+IFLA_ADDRESS = 1
+IFLA_IFNAME = 3
+IFLA_OPERSTATE = 16
+ARPHRD_LOOPBACK = 772
+
+_IFADDRMSG = struct.Struct('=BBBBI')
+_IFINFOMSG = struct.Struct('=BxHiII')
+
+_OPER_STATES = {
+    0: 'unknown', 1: 'notpresent', 2: 'down', 3: 'lowerlayerdown',
+    4: 'testing', 5: 'dormant', 6: 'up'
+}
+
+
+def _read_sys(name, attribute):
+    """Lê um atributo de /sys/class/net/<interface> ('' se não existir)"""
+    try:
+        with open(os.path.join(_SYS_CLASS_NET, name, attribute)) as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+
+def _linux_links():
+    """
+    Interfaces via netlink RTM_GETLINK
+
+    Returns:
+        Dicionário {índice: (nome, MAC, estado operacional)}, sem o loopback
+    """
+    links = {}
+    for message_type, body in netlink.dump(netlink.RTM_GETLINK, _IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)):
+        if message_type != RTM_NEWLINK or len(body) < _IFINFOMSG.size:
+            continue
+        _, link_type, index, _, _ = _IFINFOMSG.unpack_from(body)
+        if link_type == ARPHRD_LOOPBACK:
+            continue
+        attributes = netlink.parse_attributes(body, _IFINFOMSG.size)
+        name = attributes.get(IFLA_IFNAME, b'').split(b'\0', 1)[0].decode('utf-8', errors='replace')
+        mac = format_mac(attributes.get(IFLA_ADDRESS, b''))
+        state = attributes.get(IFLA_OPERSTATE, b'')
+        links[index] = (name, mac, _OPER_STATES.get(state[0], 'unknown') if state else '')
+    return links
+
+
+def _linux_addresses():
+    """
+    Endereços por interface via netlink RTM_GETADDR
+
+    Returns:
+        Lista de (índice, família, endereço, prefixo, permanente)
+    """
+    addresses = []
+    for message_type, body in netlink.dump(netlink.RTM_GETADDR, _IFADDRMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)):
+        if message_type != RTM_NEWADDR or len(body) < _IFADDRMSG.size:
+            continue
+        family, prefix_length, flags, _, index = _IFADDRMSG.unpack_from(body)
+        attributes = netlink.parse_attributes(body, _IFADDRMSG.size)
+        raw = attributes.get(IFA_LOCAL) or attributes.get(IFA_ADDRESS)
+        if not raw:
+            continue
+        if IFA_FLAGS in attributes and len(attributes[IFA_FLAGS]) >= 4:
+            flags = struct.unpack('=I', attributes[IFA_FLAGS][:4])[0]
+        try:
+            address = socket.inet_ntop(family, raw)
+        except (ValueError, OSError):
+            continue
+        addresses.append((index, family, address, prefix_length, bool(flags & IFA_F_PERMANENT)))
+    return addresses
+
+
+def _linux_gateways():
+    """Gateways padrão por interface a partir de /proc/net/route e /proc/net/ipv6_route"""
+    gateways = {}
+    try:
+        with open("/proc/net/route") as f:
+            next(f, None)
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 3 and parts[1] == '00000000' and parts[2] != '00000000':
+                    gateway = socket.inet_ntoa(struct.pack('<I', int(parts[2], 16)))
+                    gateways.setdefault(parts[0], gateway)
+    except OSError:
+        pass
+    try:
+        with open("/proc/net/ipv6_route") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 10 and parts[0] == '0' * 32 and parts[1] == '00' and parts[4] != '0' * 32:
+                    gateway = str(ipaddress.IPv6Address(bytes.fromhex(parts[4])))
+                    gateways.setdefault(parts[9], gateway)
+    except OSError:
+        pass
+    return gateways
+
+
+def _linux_dns_servers():
+    """Servidores DNS do /etc/resolv.conf"""
+    servers = []
+    try:
+        with open("/etc/resolv.conf") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == 'nameserver' and parts[1] not in servers:
+                    servers.append(parts[1])
+    except OSError:
+        pass
+    return servers
+
+
+def _linux_adapters():
+    """Enumera os adaptadores a partir do kernel"""
+    gateways = _linux_gateways()
+    dns_servers = _linux_dns_servers()
+
+    adapters = {}
+    for index, (name, mac, oper_status) in sorted(_linux_links().items()):
+        adapter = _new_adapter(name)
+        driver = os.path.basename(os.path.realpath(os.path.join(_SYS_CLASS_NET, name, 'device', 'driver')))
+        adapter['description'] = driver if driver and driver != 'driver' else name
+        adapter['physical_address'] = mac
+        adapter['interface_index'] = index
+        adapter['oper_status'] = oper_status
+        speed = _read_sys(name, 'speed')
+        adapter['link_speed'] = int(speed) * 1000000 if speed.isdigit() else 0
+        adapter['default_gateway'] = gateways.get(name, '')
+        adapters[index] = adapter
+
+    for index, family, address, prefix_length, permanent in _linux_addresses():
+        adapter = adapters.get(index)
+        if adapter is None:
+            continue
+        if family == socket.AF_INET and not adapter['ipv4_address']:
+            adapter['ipv4_address'] = address
+            adapter['ipv4_prefix_length'] = prefix_length
+            adapter['ipv4_subnet'] = _prefix_to_mask(prefix_length)
+            # Endereços obtidos por DHCP têm tempo de vida (não são permanentes)
+            adapter['dhcp_enabled'] = not permanent
+        elif family == socket.AF_INET6 and not adapter['ipv6_address'] and _is_global_ipv6(address):
+            adapter['ipv6_address'] = address
+
+    for adapter in adapters.values():
+        if adapter['ipv4_address'] or adapter['ipv6_address']:
+            adapter['dns_servers'] = list(dns_servers)
+    return list(adapters.values())
+
+
+def get_adapters():
+    """
+    Enumera os adaptadores de rede da máquina
+
+    Returns:
+        Lista de dicionários no formato do parser do ipconfig (vazia se não houver suporte)
+
+    Raises:
+        OSError: Se a API do sistema falhar
+    """
+    if sys.platform == "win32":
+        return _windows_adapters()
+    if sys.platform.startswith("linux") and netlink.is_available():
+        return _linux_adapters()
+    return []
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    adapters = get_adapters()
+    elapsed = time.perf_counter() - started
+    for adapter in adapters:
+        print(adapter)
+    runs = 200
+    started = time.perf_counter()
+    for _ in range(runs):
+        get_adapters()
+    average = (time.perf_counter() - started) / runs
+    print(f"{len(adapters)} adaptador(es); primeira chamada {elapsed * 1000:.2f} ms, "
+          f"média {average * 1000000:.0f} µs em {runs} chamadas")
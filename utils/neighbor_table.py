@@ -0,0 +1,376 @@
+"""
+Leitura nativa da tabela de vizinhos (ARP/NDP)
+Substitui "ping" + "arp -a": a tabela inteira é lida de uma vez, sem criar
+processos, e fica indexada por IP e por MAC para consultas O(1).
+
+Windows: GetIpNetTable2 (iphlpapi) via ctypes
+Linux:   netlink (RTM_GETNEIGH), com /proc/net/arp como alternativa (só IPv4)
+"""
+
+import ctypes
+import ipaddress
+import socket
+import struct
+import sys
+import threading
+import time
+
+from utils import netlink
+from utils.iphlpapi import AF_UNSPEC, ERROR_SUCCESS, SOCKADDR_INET, format_mac, load_iphlpapi, sockaddr_inet_to_ip
+
+
+# Estados normalizados (comuns ao Windows e ao Linux)
+STATE_INCOMPLETE = 'incomplete'
+STATE_REACHABLE = 'reachable'
+STATE_STALE = 'stale'
+STATE_DELAY = 'delay'
+STATE_PROBE = 'probe'
+STATE_UNREACHABLE = 'unreachable'
+STATE_PERMANENT = 'permanent'
+STATE_NOARP = 'noarp'
+
+# Porta "discard": o datagrama só serve para o sistema resolver o MAC do destino
+SOLICIT_PORT = 9
+
+
+def normalize_mac(mac):
+    """Normaliza um MAC para o formato do ipconfig (AA-BB-CC-DD-EE-FF)"""
+    return mac.replace(':', '-').replace('.', '').upper() if mac else ''
+
+
+class Neighbor:
+    """Uma entrada da tabela de vizinhos"""
+
+    __slots__ = ('ip', 'mac', 'interface_index', 'interface_name', 'state', 'is_router')
+
+    def __init__(self, ip, mac='', interface_index=None, interface_name='', state=STATE_INCOMPLETE, is_router=False):
+        """
+        Args:
+            ip: Endereço IPv4 ou IPv6 em texto
+            mac: Endereço físico no formato AA-BB-CC-DD-EE-FF ('' se ainda não resolvido)
+            interface_index: Índice da interface em que o vizinho foi visto
+            interface_name: Nome da interface (se conhecido)
+            state: Um dos estados STATE_*
+            is_router: True se o vizinho se anunciou como roteador (NDP)
+        """
+        self.ip = ip
+        self.mac = normalize_mac(mac)
+        self.interface_index = interface_index
+        self.interface_name = interface_name
+        self.state = state
+        self.is_router = is_router
+
+    @property
+    def has_mac(self):
+        """True se o MAC foi resolvido (nem vazio, nem zerado, nem broadcast)"""
+        return bool(self.mac) and self.mac not in ('00-00-00-00-00-00', 'FF-FF-FF-FF-FF-FF') and \
+            self.state not in (STATE_INCOMPLETE, STATE_UNREACHABLE)
+
+    def __repr__(self):
+        return f"Neighbor({self.ip} lladdr {self.mac or '-'} dev {self.interface_name or self.interface_index} {self.state})"
+
+
+class NeighborTable:
+    """Tabela de vizinhos indexada por IP e por MAC"""
+
+    def __init__(self, reader=None):
+        """
+        Args:
+            reader: Função sem argumentos que retorna a lista de Neighbor atual
+                (padrão: read_neighbors, da plataforma)
+        """
+        self.reader = reader or read_neighbors
+        self.by_ip = {}
+        self.by_mac = {}
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        """
+        Relê a tabela do sistema e reconstrói os índices
+
+        Returns:
+            Número de vizinhos lidos
+        """
+        by_ip = {}
+        by_mac = {}
+        for neighbor in self.reader():
+            # Um mesmo IP pode aparecer em mais de uma interface: prefere a entrada resolvida
+            current = by_ip.get(neighbor.ip)
+            if current is None or (neighbor.has_mac and not current.has_mac):
+                by_ip[neighbor.ip] = neighbor
+            if neighbor.has_mac:
+                by_mac.setdefault(neighbor.mac, []).append(neighbor)
+        with self.lock:
+            self.by_ip = by_ip
+            self.by_mac = by_mac
+            self.loaded = True
+            return len(by_ip)
+
+    def lookup_ip(self, address):
+        """Retorna o Neighbor do endereço (None se não estiver na tabela)"""
+        try:
+            address = str(ipaddress.ip_address(address))
+        except ValueError:
+            return None
+        with self.lock:
+            return self.by_ip.get(address)
+
+    def lookup_mac(self, mac):
+        """Retorna a lista de Neighbor com o MAC informado (vazia se nenhum)"""
+        with self.lock:
+            return list(self.by_mac.get(normalize_mac(mac), []))
+
+    def mac_of(self, address):
+        """MAC resolvido do endereço ('' se não houver)"""
+        neighbor = self.lookup_ip(address)
+        return neighbor.mac if neighbor and neighbor.has_mac else ''
+
+    def resolve(self, address, timeout=0.5, interval=0.05):
+        """
+        Garante que o endereço tenha MAC na tabela, solicitando-o se necessário
+
+        Consulta a tabela; se o MAC ainda não for conhecido, dispara uma
+        solicitação (solicit) e relê a tabela até o timeout.
+
+        Bloqueia a thread chamadora por até timeout segundos: não deve ser
+        chamado da thread da interface (Tk), só de tarefas em segundo plano
+        (sondas da coleta, executor). No loop de rede, use solicit() e releia a
+        tabela com run_in_executor, como a varredura do inventário.
+
+        Returns:
+            Neighbor resolvido, ou None se não responder dentro do timeout
+        """
+        if not self.loaded:
+            self.refresh()
+        neighbor = self.lookup_ip(address)
+        if neighbor and neighbor.has_mac:
+            return neighbor
+        if not solicit(address):
+            return None
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(interval)
+            self.refresh()
+            neighbor = self.lookup_ip(address)
+            if neighbor and neighbor.has_mac:
+                return neighbor
+        return None
+
+    def __len__(self):
+        with self.lock:
+            return len(self.by_ip)
+
+
+def solicit(address):
+    """
+    Dispara, sem bloquear, a resolução ARP/NDP do endereço
+
+    Envia um datagrama UDP vazio para a porta discard: para transmiti-lo o
+    sistema precisa do MAC do destino (ou do gateway), e faz a solicitação
+    ARP/NDP por conta própria. Não espera resposta nem cria processos.
+
+    Returns:
+        True se a solicitação foi enviada
+    """
+    try:
+        ip = ipaddress.ip_address(address)
+        family = socket.AF_INET if ip.version == 4 else socket.AF_INET6
+        with socket.socket(family, socket.SOCK_DGRAM) as sock:
+            sock.setblocking(False)
+            sock.sendto(b'', (str(ip), SOLICIT_PORT))
+        return True
+    except (OSError, ValueError) as e:
+        print(f"Erro ao solicitar ARP de {address}: {e}")  # Debug
+        return False
+
+
+# === Windows: GetIpNetTable2 ===
+
+class MIB_IPNET_ROW2(ctypes.Structure):
+    _fields_ = [
+        ('Address', SOCKADDR_INET),
+        ('InterfaceIndex', ctypes.c_uint32),
+        ('InterfaceLuid', ctypes.c_uint64),
+        ('PhysicalAddress', ctypes.c_ubyte * 32),
+        ('PhysicalAddressLength', ctypes.c_uint32),
+        ('State', ctypes.c_int),
+        ('Flags', ctypes.c_ubyte),
+        ('ReachabilityTime', ctypes.c_uint32),
+    ]
+
+
+class MIB_IPNET_TABLE2(ctypes.Structure):
+    _fields_ = [
+        ('NumEntries', ctypes.c_uint32),
+        ('Table', MIB_IPNET_ROW2 * 1),
+    ]
+
+
+# NL_NEIGHBOR_STATE
+_WINDOWS_STATES = {
+    0: STATE_UNREACHABLE, 1: STATE_INCOMPLETE, 2: STATE_PROBE, 3: STATE_DELAY,
+    4: STATE_STALE, 5: STATE_REACHABLE, 6: STATE_PERMANENT
+}
+
+
+def _windows_neighbors():
+    """Lê os vizinhos IPv4 e IPv6 com GetIpNetTable2"""
+    from utils.native_interfaces import get_adapters
+
+    iphlpapi = load_iphlpapi()
+    names = {adapter['interface_index']: adapter['name'] for adapter in get_adapters()}
+    table = ctypes.POINTER(MIB_IPNET_TABLE2)()
+    result = iphlpapi.GetIpNetTable2(AF_UNSPEC, ctypes.byref(table))
+    if result != ERROR_SUCCESS:
+        raise OSError(result, "GetIpNetTable2 falhou")
+    try:
+        count = table.contents.NumEntries
+        rows = ctypes.cast(
+            ctypes.addressof(table.contents.Table),
+            ctypes.POINTER(MIB_IPNET_ROW2 * count)
+        ).contents
+        neighbors = []
+        for row in rows:
+            ip = sockaddr_inet_to_ip(row.Address)
+            if not ip:
+                continue
+            length = min(row.PhysicalAddressLength, 32)
+            neighbors.append(Neighbor(
+                ip,
+                mac=format_mac(row.PhysicalAddress[:length]) if length else '',
+                interface_index=row.InterfaceIndex,
+                interface_name=names.get(row.InterfaceIndex, ''),
+                state=_WINDOWS_STATES.get(row.State, STATE_INCOMPLETE),
+                is_router=bool(row.Flags & 0x1)
+            ))
+        return neighbors
+    finally:
+        iphlpapi.FreeMibTable(table)
+
+
+def _windows_neighbors_arp():
+    """Lê os vizinhos IPv4 pelo arp -a (quando GetIpNetTable2 não está disponível)"""
+    from utils.command_parsers import parse_arp
+    from utils.command_runner import run_command
+
+    result = run_command(["arp", "-a"], timeout=5)
+    if not result.ok:
+        return []
+    return [
+        Neighbor(entry.ip, mac=entry.mac, interface_index=entry.interface_index,
+                 state=STATE_PERMANENT if entry.kind == 'static' else STATE_REACHABLE)
+        for entry in parse_arp(result.stdout)
+    ]
+
+
+# === Linux: netlink RTM_GETNEIGH e /proc/net/arp ===
+
+RTM_NEWNEIGH = 28
+NDA_DST = 1
+NDA_LLADDR = 2
+NTF_ROUTER = 0x80
+
+_NDMSG = struct.Struct('=BBHiHBB')
+# Bits NUD_* do kernel, do mais para o menos informativo
+_LINUX_STATES = (
+    (0x80, STATE_PERMANENT), (0x02, STATE_REACHABLE), (0x08, STATE_DELAY), (0x10, STATE_PROBE),
+    (0x04, STATE_STALE), (0x40, STATE_NOARP), (0x01, STATE_INCOMPLETE), (0x20, STATE_UNREACHABLE)
+)
+
+
+def _linux_state(bits):
+    """Converte os bits NUD_* no estado normalizado"""
+    for mask, state in _LINUX_STATES:
+        if bits & mask:
+            return state
+    return STATE_INCOMPLETE
+
+
+def _linux_neighbors_netlink():
+    """Lê os vizinhos IPv4 e IPv6 via netlink"""
+    names = dict(socket.if_nameindex())
+    neighbors = []
+    for message_type, body in netlink.dump(netlink.RTM_GETNEIGH, _NDMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0, 0, 0)):
+        if message_type != RTM_NEWNEIGH or len(body) < _NDMSG.size:
+            continue
+        family, _, _, index, state, flags, _ = _NDMSG.unpack_from(body)
+        if family not in (socket.AF_INET, socket.AF_INET6):
+            continue
+        attributes = netlink.parse_attributes(body, _NDMSG.size)
+        if NDA_DST not in attributes:
+            continue
+        lladdr = attributes.get(NDA_LLADDR, b'')
+        neighbors.append(Neighbor(
+            socket.inet_ntop(family, attributes[NDA_DST]),
+            mac=format_mac(lladdr) if lladdr else '',
+            interface_index=index,
+            interface_name=names.get(index, ''),
+            state=_linux_state(state),
+            is_router=bool(flags & NTF_ROUTER)
+        ))
+    return neighbors
+
+
+def _linux_neighbors_proc():
+    """Lê os vizinhos IPv4 de /proc/net/arp"""
+    names = {name: index for index, name in socket.if_nameindex()}
+    neighbors = []
+    try:
+        with open("/proc/net/arp") as f:
+            next(f, None)
+            for line in f:
+                parts = line.split()
+                if len(parts) < 6:
+                    continue
+                flags = int(parts[2], 16)
+                if flags & 0x4:
+                    state = STATE_PERMANENT
+                elif flags & 0x2:
+                    state = STATE_REACHABLE
+                else:
+                    state = STATE_INCOMPLETE
+                neighbors.append(Neighbor(
+                    parts[0],
+                    mac=parts[3],
+                    interface_index=names.get(parts[5]),
+                    interface_name=parts[5],
+                    state=state
+                ))
+    except OSError:
+        pass
+    return neighbors
+
+
+def read_neighbors():
+    """
+    Lê a tabela de vizinhos (ARP/NDP) do sistema
+
+    Returns:
+        Lista de Neighbor (vazia se não houver suporte)
+    """
+    if sys.platform == "win32":
+        try:
+            return _windows_neighbors()
+        except OSError as e:
+            print(f"GetIpNetTable2 indisponível: {e}")
+            return _windows_neighbors_arp()
+    if sys.platform.startswith("linux"):
+        if netlink.is_available():
+            try:
+                return _linux_neighbors_netlink()
+            except OSError as e:
+                print(f"Netlink indisponível para vizinhos: {e}")
+        return _linux_neighbors_proc()
+    return []
+
+
+if __name__ == "__main__":
+    table = NeighborTable()
+    started = time.perf_counter()
+    table.refresh()
+    print(f"{len(table)} vizinho(s) carregados em {(time.perf_counter() - started) * 1000:.2f} ms")
+    for neighbor in table.by_ip.values():
+        print(' ', neighbor)
+    for address in sys.argv[1:]:
+        print(address, '->', table.resolve(address))
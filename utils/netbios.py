@@ -0,0 +1,479 @@
+"""
+Consulta de status de nó NetBIOS (NBSTAT, RFC 1002) em Python puro
+Substitui o "nbtstat -A": a consulta é um datagrama UDP para a porta 137 do
+host e a resposta traz a tabela de nomes registrados e o endereço físico.
+Todas as consultas compartilham um único socket no loop de rede, então uma
+sub-rede inteira pode ser consultada ao mesmo tempo; os resultados (inclusive
+a falta de resposta) ficam em cache.
+
+StandInNetbiosResponder é um respondedor UDP local, com tabelas de nomes
+pré-definidas, para testes e benchmarks sem depender da rede.
+
+Benchmark: python -m utils.netbios [hosts]
+"""
+
+import asyncio
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+
+from utils.async_loop import get_network_loop
+from utils.dns_client import RECEIVE_BUFFER
+from utils.dns_resolver import ResolverCache
+from utils.iphlpapi import format_mac
+
+
+NETBIOS_NS_PORT = 137
+
+TYPE_NBSTAT = 0x0021
+CLASS_IN = 0x0001
+
+FLAG_RESPONSE = 0x8000
+FLAG_AUTHORITATIVE = 0x0400
+
+# Flags de cada nome da tabela
+NAME_GROUP = 0x8000
+NAME_DEREGISTERING = 0x1000
+NAME_CONFLICT = 0x0800
+NAME_ACTIVE = 0x0400
+NAME_PERMANENT = 0x0200
+
+# Sufixos (16º byte do nome) mais comuns
+SUFFIX_WORKSTATION = 0x00
+SUFFIX_MESSENGER = 0x03
+SUFFIX_SERVER = 0x20
+SUFFIX_DOMAIN_MASTER_BROWSER = 0x1B
+SUFFIX_DOMAIN_CONTROLLERS = 0x1C
+SUFFIX_MASTER_BROWSER = 0x1D
+SUFFIX_BROWSER_ELECTIONS = 0x1E
+SUFFIX_NAMES = {
+    SUFFIX_WORKSTATION: 'Estação de trabalho',
+    SUFFIX_MESSENGER: 'Mensageiro',
+    SUFFIX_SERVER: 'Servidor de arquivos',
+    SUFFIX_DOMAIN_MASTER_BROWSER: 'Navegador mestre do domínio',
+    SUFFIX_DOMAIN_CONTROLLERS: 'Controladores de domínio',
+    SUFFIX_MASTER_BROWSER: 'Navegador mestre',
+    SUFFIX_BROWSER_ELECTIONS: 'Eleições de navegador',
+}
+
+# Nomes NetBIOS usam a página de código OEM do Windows
+NAME_ENCODING = 'cp850'
+
+_HEADER = struct.Struct('!HHHHHH')
+_RECORD = struct.Struct('!HHIH')
+_NAME_ENTRY = struct.Struct('!15sBH')
+
+
+def encode_netbios_name(name, suffix=0x00):
+    """Codificação de primeiro nível: 16 bytes (nome + sufixo) viram 32 letras A-P"""
+    raw = name.upper().encode(NAME_ENCODING)[:15].ljust(15, b'\0' if name == '*' else b' ')
+    raw += bytes([suffix])
+    encoded = bytes(c for byte in raw for c in (0x41 + (byte >> 4), 0x41 + (byte & 0x0F)))
+    return bytes([len(encoded)]) + encoded + b'\0'
+
+
+def build_nbstat_query(transaction_id):
+    """Consulta de status de nó para o nome curinga '*'"""
+    return (_HEADER.pack(transaction_id, 0, 1, 0, 0, 0)
+            + encode_netbios_name('*') + struct.pack('!HH', TYPE_NBSTAT, CLASS_IN))
+
+
+def build_nbstat_response(transaction_id, names, mac):
+    """
+    Resposta de status de nó
+
+    Args:
+        names: Lista de (nome, sufixo, grupo)
+        mac: Endereço físico em bytes (6)
+    """
+    table = bytes([len(names)])
+    for name, suffix, group in names:
+        flags = NAME_ACTIVE | (NAME_GROUP if group else 0)
+        table += _NAME_ENTRY.pack(name.upper().encode(NAME_ENCODING)[:15].ljust(15, b' '), suffix, flags)
+    # Estatísticas: ID da unidade (MAC) + 40 bytes de contadores, zerados
+    rdata = table + bytes(mac) + bytes(40)
+    return (_HEADER.pack(transaction_id, FLAG_RESPONSE | FLAG_AUTHORITATIVE, 0, 1, 0, 0)
+            + encode_netbios_name('*') + _RECORD.pack(TYPE_NBSTAT, CLASS_IN, 0, len(rdata)) + rdata)
+
+
+def _skip_name(data, offset):
+    """Avança sobre um nome codificado (rótulos ou ponteiro de compressão)"""
+    while True:
+        length = data[offset]
+        if length == 0:
+            return offset + 1
+        if length & 0xC0 == 0xC0:
+            return offset + 2
+        offset += length + 1
+
+
+class NetbiosName:
+    """Nome registrado na tabela de um nó"""
+
+    __slots__ = ('name', 'suffix', 'flags')
+
+    def __init__(self, name, suffix, flags):
+        self.name = name
+        self.suffix = suffix
+        self.flags = flags
+
+    @property
+    def group(self):
+        return bool(self.flags & NAME_GROUP)
+
+    @property
+    def active(self):
+        return bool(self.flags & NAME_ACTIVE)
+
+    @property
+    def kind(self):
+        return SUFFIX_NAMES.get(self.suffix, f'<{self.suffix:02X}>')
+
+    def __repr__(self):
+        return f"NetbiosName({self.name}<{self.suffix:02X}> {'GROUP' if self.group else 'UNIQUE'})"
+
+
+class NodeStatus:
+    """Tabela de nomes e endereço físico de um nó"""
+
+    __slots__ = ('address', 'names', 'mac', 'elapsed')
+
+    def __init__(self, address, names, mac):
+        self.address = address
+        self.names = names
+        self.mac = mac
+        self.elapsed = None
+
+    @property
+    def computer_name(self):
+        """Nome do computador: o nome único de estação (<00>), ou o primeiro nome único"""
+        for entry in self.names:
+            if entry.suffix == SUFFIX_WORKSTATION and not entry.group:
+                return entry.name
+        for entry in self.names:
+            if not entry.group:
+                return entry.name
+        return self.names[0].name if self.names else None
+
+    @property
+    def workgroup(self):
+        """Grupo de trabalho ou domínio: o nome de grupo <00>"""
+        for entry in self.names:
+            if entry.suffix == SUFFIX_WORKSTATION and entry.group:
+                return entry.name
+        return None
+
+    @property
+    def is_domain_controller(self):
+        return any(entry.suffix == SUFFIX_DOMAIN_CONTROLLERS for entry in self.names)
+
+    def __repr__(self):
+        return f"NodeStatus({self.address}, {self.computer_name!r}, {self.workgroup!r}, {self.mac})"
+
+
+def parse_nbstat_response(data, address=None):
+    """
+    Decodifica uma resposta de status de nó
+
+    Returns:
+        (ID da transação, NodeStatus)
+
+    Raises:
+        ValueError: Se não for uma resposta NBSTAT
+    """
+    transaction_id, flags, _, ancount, _, _ = _HEADER.unpack_from(data, 0)
+    if not flags & FLAG_RESPONSE or ancount < 1:
+        raise ValueError("não é uma resposta de status de nó")
+    offset = _skip_name(data, _HEADER.size)
+    record_type, _, _, length = _RECORD.unpack_from(data, offset)
+    if record_type != TYPE_NBSTAT:
+        raise ValueError(f"tipo de registro inesperado: {record_type:#x}")
+    offset += _RECORD.size
+    end = offset + length
+    count = data[offset]
+    offset += 1
+    names = []
+    for _ in range(count):
+        if offset + _NAME_ENTRY.size > end:
+            break
+        raw, suffix, name_flags = _NAME_ENTRY.unpack_from(data, offset)
+        offset += _NAME_ENTRY.size
+        names.append(NetbiosName(raw.decode(NAME_ENCODING, 'replace').rstrip(' \0'), suffix, name_flags))
+    mac = None
+    if offset + 6 <= end:
+        unit_id = data[offset:offset + 6]
+        # Samba e alguns dispositivos informam um ID zerado
+        if any(unit_id):
+            mac = format_mac(unit_id)
+    return transaction_id, NodeStatus(address, names, mac)
+
+
+class _ClientProtocol(asyncio.DatagramProtocol):
+    """Entrega os datagramas recebidos ao cliente"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def datagram_received(self, data, address):
+        self.client._on_response(data, address)
+
+    def error_received(self, exc):
+        # ICMP de porta inalcançável (o Windows repassa ao socket): a consulta expira sozinha
+        pass
+
+
+class NetbiosClient:
+    """Consultas NBSTAT concorrentes sobre um único socket UDP, com cache"""
+
+    def __init__(self, port=NETBIOS_NS_PORT, timeout=1.0, retries=1, max_concurrency=256,
+                 positive_ttl=300, negative_ttl=60, loop_thread=None):
+        """
+        Args:
+            port: Porta UDP consultada nos hosts (137)
+            timeout: Espera por resposta de cada tentativa (segundos)
+            retries: Reenvios após a primeira tentativa sem resposta
+            max_concurrency: Consultas pendentes ao mesmo tempo (limita a rajada numa varredura)
+            positive_ttl: Validade no cache de uma tabela de nomes
+            negative_ttl: Validade no cache de um host que não respondeu
+            loop_thread: AsyncLoopThread em que o socket é registrado
+                (padrão: o loop de rede compartilhado)
+        """
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.max_concurrency = max_concurrency
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.loop_thread = loop_thread or get_network_loop()
+        self.cache = ResolverCache()
+        self.transport = None
+        self.transport_lock = None
+        self.semaphore = None
+        self.pending = {}
+        self.in_flight = {}
+        self.stats = {'queries': 0, 'responses': 0, 'timeouts': 0}
+
+    # --- API síncrona (para as threads do aplicativo) ---
+
+    def node_status(self, address):
+        """Tabela de nomes do host (NodeStatus) ou None se ele não responder"""
+        cached, status = self.cache.get(address)
+        if cached:
+            return status
+        return self.loop_thread.run(self.node_status_async(address))
+
+    def node_status_many(self, addresses):
+        """Consulta vários hosts ao mesmo tempo; retorna {endereço: NodeStatus ou None}"""
+        return self.loop_thread.run(self.node_status_many_async(addresses))
+
+    def invalidate(self):
+        """Esquece as tabelas em cache (ex.: a rede mudou)"""
+        self.cache.clear()
+
+    def close(self):
+        """Fecha o socket do cliente"""
+        def close_transport():
+            if self.transport is not None:
+                self.transport.close()
+                self.transport = None
+        self.loop_thread.call_soon(close_transport)
+
+    # --- API assíncrona (no loop de rede) ---
+
+    async def node_status_async(self, address):
+        cached, status = self.cache.get(address)
+        if cached:
+            return status
+        # Pedidos simultâneos do mesmo host aguardam a mesma consulta
+        task = self.in_flight.get(address)
+        if task is None:
+            task = asyncio.ensure_future(self._query(address))
+            self.in_flight[address] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(address, None))
+        return await asyncio.shield(task)
+
+    async def node_status_many_async(self, addresses):
+        addresses = list(dict.fromkeys(addresses))
+        results = await asyncio.gather(*(self.node_status_async(address) for address in addresses))
+        return dict(zip(addresses, results))
+
+    async def _query(self, address):
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        status = None
+        try:
+            async with self.semaphore:
+                status = await self._query_host(address)
+        except OSError as e:
+            print(f"Erro NBSTAT {address}: {e}")  # Debug
+        if status is None:
+            self.cache.put(address, None, self.negative_ttl)
+        else:
+            self.cache.put(address, status, self.positive_ttl)
+        return status
+
+    async def _query_host(self, address):
+        """Envia a consulta (com reenvios) e aguarda a resposta do próprio host"""
+        transport = await self._transport()
+        loop = asyncio.get_event_loop()
+        for _ in range(self.retries + 1):
+            transaction_id = self._new_id()
+            future = loop.create_future()
+            self.pending[transaction_id] = (future, address)
+            self.stats['queries'] += 1
+            started = time.perf_counter()
+            try:
+                transport.sendto(build_nbstat_query(transaction_id), (address, self.port))
+                status = await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError:
+                self.stats['timeouts'] += 1
+                continue
+            finally:
+                self.pending.pop(transaction_id, None)
+            status.elapsed = time.perf_counter() - started
+            return status
+        return None
+
+    def _new_id(self):
+        """ID de transação de 16 bits aleatório e ainda não usado por uma consulta pendente"""
+        while True:
+            transaction_id = random.getrandbits(16)
+            if transaction_id not in self.pending:
+                return transaction_id
+
+    async def _transport(self):
+        """Socket UDP IPv4 (NetBIOS não existe sobre IPv6), compartilhado por todas as consultas"""
+        if self.transport_lock is None:
+            self.transport_lock = asyncio.Lock()
+        async with self.transport_lock:
+            if self.transport is None or self.transport.is_closing():
+                loop = asyncio.get_event_loop()
+                self.transport, _ = await loop.create_datagram_endpoint(
+                    lambda: _ClientProtocol(self), family=socket.AF_INET
+                )
+                _enlarge_receive_buffer(self.transport)
+        return self.transport
+
+    def _on_response(self, data, source):
+        try:
+            transaction_id, status = parse_nbstat_response(data, source[0])
+        except (ValueError, IndexError, struct.error):
+            return
+        pending = self.pending.get(transaction_id)
+        # A resposta precisa vir do host consultado (descarta respostas atrasadas/forjadas)
+        if not pending or pending[1] != source[0]:
+            return
+        future = pending[0]
+        if not future.done():
+            self.stats['responses'] += 1
+            future.set_result(status)
+
+
+def _enlarge_receive_buffer(transport):
+    """Evita perder respostas numa rajada de consultas simultâneas"""
+    sock = transport.get_extra_info('socket')
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+    except OSError:
+        pass
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_netbios_client():
+    """Retorna o cliente NetBIOS compartilhado pelo aplicativo"""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = NetbiosClient()
+        return _shared_client
+
+
+# === Respondedor local para testes ===
+
+class _ResponderProtocol(asyncio.DatagramProtocol):
+    def __init__(self, responder, address):
+        self.responder = responder
+        self.address = address
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, source):
+        self.responder._on_query(self, data, source)
+
+
+class StandInNetbiosResponder:
+    """Respondedor NBSTAT local: um socket por endereço, cada um com sua tabela de nomes"""
+
+    def __init__(self, tables, delay=0.0):
+        """
+        Args:
+            tables: Dicionário {endereço: (nomes, mac)}, com nomes em (nome, sufixo, grupo)
+                e mac em bytes; os endereços precisam ser locais (ex.: 127.0.0.x)
+            delay: Atraso simulado de cada resposta (segundos); None = não responde
+        """
+        self.tables = tables
+        self.delay = delay
+        self.transports = []
+        self.requests = 0
+
+    async def start(self, port=0):
+        """Abre um socket por endereço, todos na mesma porta; retorna a porta UDP em uso"""
+        loop = asyncio.get_event_loop()
+        for address in self.tables:
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda address=address: _ResponderProtocol(self, address), local_addr=(address, port)
+            )
+            self.transports.append(transport)
+            port = transport.get_extra_info('sockname')[1]
+        return port
+
+    def close(self):
+        for transport in self.transports:
+            transport.close()
+        self.transports = []
+
+    def _on_query(self, protocol, data, source):
+        self.requests += 1
+        if self.delay is None or len(data) < _HEADER.size:
+            return
+        transaction_id = _HEADER.unpack_from(data, 0)[0]
+        names, mac = self.tables[protocol.address]
+        response = build_nbstat_response(transaction_id, names, mac)
+        loop = asyncio.get_event_loop()
+        loop.call_later(self.delay, protocol.transport.sendto, response, source)
+
+
+if __name__ == "__main__":
+    # Benchmark: uma sub-rede de hosts em 127.0.x.y, um terço sem respondedor
+    # (Linux e Windows atendem todo o 127.0.0.0/8 pela interface de loopback)
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 254
+    addresses = [f'127.0.{1 + index // 254}.{1 + index % 254}' for index in range(total)]
+    tables = {}
+    for index, address in enumerate(addresses):
+        if index % 3 == 2:
+            continue
+        names = [(f'HOST-{index}', SUFFIX_WORKSTATION, False), ('LAB', SUFFIX_WORKSTATION, True),
+                 (f'HOST-{index}', SUFFIX_SERVER, False)]
+        tables[address] = (names, bytes([0x00, 0x15, 0x5D, 0x00, index >> 8, index & 0xFF]))
+
+    network_loop = get_network_loop()
+    responder = StandInNetbiosResponder(tables, delay=0.01)
+    port = network_loop.run(responder.start())
+    client = NetbiosClient(port=port, timeout=0.5, retries=0, loop_thread=network_loop)
+    for attempt in ('sem cache', 'com cache'):
+        started = time.perf_counter()
+        results = client.node_status_many(addresses)
+        elapsed = time.perf_counter() - started
+        found = [status for status in results.values() if status]
+        print(f"{attempt}: {total} hosts em {elapsed * 1000:.0f} ms, {len(found)} responderam, "
+              f"{responder.requests} consultas recebidas; {client.stats}")
+    print(found[0], found[0].names)
+    responder.close()
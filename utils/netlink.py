@@ -0,0 +1,115 @@
+"""
+Acesso mínimo ao netlink de roteamento do Linux (NETLINK_ROUTE)
+Usado pelos leitores nativos de interfaces, rotas e vizinhos para obter as
+tabelas do kernel sem executar comandos (ip, route, arp).
+"""
+
+import itertools
+import os
+import socket
+import struct
+
+
+NLMSG_HEADER = struct.Struct('=LHHLL')
+RTATTR_HEADER = struct.Struct('=HH')
+
+NLM_F_REQUEST = 0x1
+NLM_F_ROOT = 0x100
+NLM_F_MATCH = 0x200
+NLM_F_DUMP = NLM_F_ROOT | NLM_F_MATCH
+
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+
+# Tipos de mensagem de rtnetlink usados nos pedidos de dump
+RTM_GETLINK = 18
+RTM_GETADDR = 22
+RTM_GETROUTE = 26
+RTM_GETNEIGH = 30
+
+_sequence = itertools.count(1)
+
+
+class NetlinkError(OSError):
+    """Erro retornado pelo kernel em resposta a um pedido netlink"""
+
+
+def _align(length):
+    """Alinhamento de 4 bytes das mensagens e atributos netlink"""
+    return (length + 3) & ~3
+
+
+def parse_attributes(data, offset=0):
+    """
+    Decodifica os atributos rtattr a partir de offset
+
+    Returns:
+        Dicionário {tipo: bytes}; em atributos repetidos prevalece o primeiro
+    """
+    attributes = {}
+    while offset + RTATTR_HEADER.size <= len(data):
+        length, attr_type = RTATTR_HEADER.unpack_from(data, offset)
+        if length < RTATTR_HEADER.size:
+            break
+        # Remove o bit NLA_F_NESTED/NLA_F_NET_BYTEORDER do tipo
+        attributes.setdefault(attr_type & 0x3fff, data[offset + RTATTR_HEADER.size:offset + length])
+        offset += _align(length)
+    return attributes
+
+
+def iter_messages(data):
+    """Percorre as mensagens de um datagrama netlink como (tipo, corpo)"""
+    offset = 0
+    while offset + NLMSG_HEADER.size <= len(data):
+        length, message_type, _, _, _ = NLMSG_HEADER.unpack_from(data, offset)
+        if length < NLMSG_HEADER.size:
+            break
+        yield message_type, data[offset + NLMSG_HEADER.size:offset + length]
+        offset += _align(length)
+
+
+def dump(message_type, payload, timeout=2.0):
+    """
+    Envia um pedido de dump e retorna as mensagens de resposta
+
+    Args:
+        message_type: RTM_GETLINK, RTM_GETADDR, RTM_GETROUTE ou RTM_GETNEIGH
+        payload: Corpo do pedido (ex.: ifaddrmsg com a família desejada)
+        timeout: Tempo máximo de espera pela resposta completa (segundos)
+
+    Returns:
+        Lista de (tipo, corpo) das mensagens recebidas até NLMSG_DONE
+
+    Raises:
+        NetlinkError: Se o kernel responder com erro
+        OSError: Se o netlink não estiver disponível
+    """
+    sequence = next(_sequence)
+    request = NLMSG_HEADER.pack(
+        NLMSG_HEADER.size + len(payload), message_type, NLM_F_REQUEST | NLM_F_DUMP, sequence, 0
+    ) + payload
+
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+    try:
+        sock.settimeout(timeout)
+        sock.bind((0, 0))
+        sock.send(request)
+        messages = []
+        while True:
+            data = sock.recv(65536)
+            for reply_type, body in iter_messages(data):
+                if reply_type == NLMSG_DONE:
+                    return messages
+                if reply_type == NLMSG_ERROR:
+                    error = struct.unpack_from('=i', body)[0] if len(body) >= 4 else 0
+                    if error == 0:
+                        continue
+                    raise NetlinkError(-error, os.strerror(-error))
+                messages.append((reply_type, body))
+    finally:
+        sock.close()
+
+
+def is_available():
+    """True se o netlink de roteamento pode ser usado nesta plataforma"""
+    return hasattr(socket, 'AF_NETLINK') and hasattr(socket, 'NETLINK_ROUTE')
@@ -0,0 +1,409 @@
+"""
+Modelo tipado do estado da rede coletado pelo diagnóstico
+Substitui os dicionários aninhados com o texto 'N/A' por objetos com __slots__:
+
+    NetworkSnapshot: hostname, FQDN, gateway, DNS, adaptadores e switch
+    AdapterInfo:     adaptador já combinado com os dados do WMI e classificado
+    SwitchInfo:      campos do switch exibidos no painel
+
+Valores não determinados são UNKNOWN (falso em contexto booleano, exibido como
+'N/A'). Os adaptadores ficam indexados por MAC, nome e ID da conexão, a
+classificação (Ethernet, Wi-Fi, virtual...) e a escolha do adaptador ativo são
+feitas uma única vez na construção, e diff() compara dois snapshots campo a
+campo para a exibição, o cache e o histórico.
+
+Benchmark: python -m utils.network_snapshot [adaptadores]
+"""
+
+import ipaddress
+import sys
+import time
+
+
+class _Unknown:
+    """Valor não determinado; há uma única instância (UNKNOWN)"""
+
+    __slots__ = ()
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __bool__(self):
+        return False
+
+    def __str__(self):
+        return 'N/A'
+
+    def __repr__(self):
+        return 'UNKNOWN'
+
+    def __reduce__(self):
+        return (_Unknown, ())
+
+
+UNKNOWN = _Unknown()
+
+
+def known(value):
+    """Converte None, '' e 'N/A' em UNKNOWN; outros valores são mantidos"""
+    if value is None or value == '' or value == 'N/A':
+        return UNKNOWN
+    return value
+
+
+def text(value, default='N/A'):
+    """Texto para exibição (default para valores desconhecidos)"""
+    return default if value is UNKNOWN or value is None or value == '' else str(value)
+
+
+# === Classificação dos adaptadores ===
+
+KIND_ETHERNET = 'ethernet'
+KIND_WIRELESS = 'wireless'
+KIND_VIRTUAL = 'virtual'
+KIND_LOOPBACK = 'loopback'
+KIND_OTHER = 'other'
+
+# Termos procurados no nome e na descrição, na ordem de prioridade
+_KIND_TERMS = (
+    (KIND_LOOPBACK, ('loopback',)),
+    (KIND_WIRELESS, ('wireless', 'wi-fi', 'wifi')),
+    (KIND_VIRTUAL, ('virtual', 'vmware', 'virtualbox')),
+    (KIND_OTHER, ('bluetooth',)),
+)
+
+
+def classify_adapter(name, description=''):
+    """
+    Classifica o adaptador pelo nome e pela descrição
+
+    Returns:
+        KIND_ETHERNET, KIND_WIRELESS, KIND_VIRTUAL, KIND_LOOPBACK ou KIND_OTHER
+    """
+    name = (name or '').lower()
+    description = (description or '').lower()
+    for kind, terms in _KIND_TERMS:
+        if any(term in name or term in description for term in terms):
+            return kind
+    if 'ethernet' in name or 'ethernet' in description or 'lan' in name or 'local area' in description:
+        return KIND_ETHERNET
+    return KIND_OTHER
+
+
+def _mac_key(mac):
+    """Chave de índice do MAC (sem separadores, maiúsculas)"""
+    return mac.replace('-', '').replace(':', '').replace('.', '').upper() if mac else ''
+
+
+# === Adaptador ===
+
+class AdapterInfo:
+    """Adaptador de rede com os dados do WMI já combinados"""
+
+    __slots__ = ('name', 'description', 'mac', 'interface_index', 'ipv4_address', 'ipv4_subnet',
+                 'ipv6_address', 'default_gateway', 'dns_servers', 'dhcp_enabled', 'kind',
+                 'manufacturer', 'speed_bps', 'connection_id', 'status_code')
+
+    def __init__(self, name, description=UNKNOWN, mac=UNKNOWN, interface_index=UNKNOWN,
+                 ipv4_address=UNKNOWN, ipv4_subnet=UNKNOWN, ipv6_address=UNKNOWN,
+                 default_gateway=UNKNOWN, dns_servers=(), dhcp_enabled=UNKNOWN,
+                 manufacturer=UNKNOWN, speed_bps=UNKNOWN, connection_id=UNKNOWN, status_code=UNKNOWN):
+        self.name = known(name)
+        self.description = known(description)
+        self.mac = known(mac)
+        self.interface_index = known(interface_index)
+        self.ipv4_address = known(ipv4_address)
+        self.ipv4_subnet = known(ipv4_subnet)
+        self.ipv6_address = known(ipv6_address)
+        self.default_gateway = known(default_gateway)
+        self.dns_servers = tuple(dns_servers or ())
+        self.dhcp_enabled = dhcp_enabled
+        self.kind = classify_adapter(text(self.name, ''), text(self.description, ''))
+        self.manufacturer = known(manufacturer)
+        self.speed_bps = known(speed_bps)
+        self.connection_id = known(connection_id)
+        self.status_code = status_code
+
+    @classmethod
+    def from_dict(cls, adapter):
+        """Cria a partir do dicionário de adaptador (API nativa ou ipconfig)"""
+        return cls(
+            adapter.get('name'),
+            description=adapter.get('description'),
+            mac=adapter.get('physical_address'),
+            interface_index=adapter.get('interface_index'),
+            ipv4_address=adapter.get('ipv4_address'),
+            ipv4_subnet=adapter.get('ipv4_subnet'),
+            ipv6_address=adapter.get('ipv6_address'),
+            default_gateway=adapter.get('default_gateway'),
+            dns_servers=adapter.get('dns_servers'),
+            dhcp_enabled=adapter.get('dhcp_enabled', UNKNOWN)
+        )
+
+    @property
+    def has_address(self):
+        return bool(self.ipv4_address or self.ipv6_address)
+
+    @property
+    def is_ethernet(self):
+        return self.kind == KIND_ETHERNET
+
+    @property
+    def ipv4_interface(self):
+        """Endereço IPv4 com o prefixo da máscara (IPv4Interface), ou None se incompleto"""
+        if not self.ipv4_address or not self.ipv4_subnet:
+            return None
+        try:
+            return ipaddress.IPv4Interface(f'{self.ipv4_address}/{self.ipv4_subnet}')
+        except ValueError:
+            return None
+
+    def key(self):
+        """Tupla com todos os campos (comparação estrutural)"""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return isinstance(other, AdapterInfo) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return f"AdapterInfo({self.name!r}, kind={self.kind}, ipv4={self.ipv4_address!r})"
+
+
+# === Switch ===
+
+SWITCH_FIELDS = ('switch_name', 'port_id', 'vlan_id', 'switch_ip', 'switch_model', 'port_duplex',
+                 'vtp_domain', 'status')
+
+
+class SwitchInfo:
+    """Informações do switch ao qual a máquina está conectada"""
+
+    __slots__ = SWITCH_FIELDS
+
+    def __init__(self, **values):
+        for name in SWITCH_FIELDS:
+            setattr(self, name, known(values.get(name)))
+
+    @classmethod
+    def from_dict(cls, switch_info):
+        return cls(**{name: value for name, value in (switch_info or {}).items() if name in SWITCH_FIELDS})
+
+    def key(self):
+        return tuple(getattr(self, name) for name in SWITCH_FIELDS)
+
+    def __eq__(self, other):
+        return isinstance(other, SwitchInfo) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        values = ', '.join(f"{name}={getattr(self, name)!r}" for name in SWITCH_FIELDS
+                           if getattr(self, name) is not UNKNOWN)
+        return f"SwitchInfo({values})"
+
+
+# === Snapshot ===
+
+class NetworkSnapshot:
+    """Estado da rede em um instante, com índices e adaptador ativo pré-calculados"""
+
+    __slots__ = ('hostname', 'fqdn', 'default_gateway', 'dns_servers', 'adapters', 'switch',
+                 'active_adapter', 'connected_ethernet', '_by_mac', '_by_name', '_by_connection_id')
+
+    def __init__(self, adapters=(), hostname=UNKNOWN, fqdn=UNKNOWN, default_gateway=UNKNOWN,
+                 dns_servers=(), switch=None):
+        self.hostname = known(hostname)
+        self.fqdn = known(fqdn)
+        self.default_gateway = known(default_gateway)
+        self.dns_servers = tuple(dns_servers or ())
+        self.adapters = tuple(adapters)
+        self.switch = switch  # None enquanto o switch não foi consultado
+
+        self._by_mac = {}
+        self._by_name = {}
+        self._by_connection_id = {}
+        for adapter in self.adapters:
+            if adapter.mac:
+                self._by_mac.setdefault(_mac_key(adapter.mac), adapter)
+            if adapter.name:
+                self._by_name.setdefault(adapter.name, adapter)
+            if adapter.connection_id:
+                self._by_connection_id.setdefault(adapter.connection_id, adapter)
+
+        self.connected_ethernet = next(
+            (adapter for adapter in self.adapters if adapter.is_ethernet and adapter.has_address), None
+        )
+        self.active_adapter = self._choose_active_adapter()
+
+    def _choose_active_adapter(self):
+        """Ethernet com IP > Ethernet > qualquer um com IP > qualquer um que não seja loopback"""
+        if self.connected_ethernet is not None:
+            return self.connected_ethernet
+        for candidates in (
+            (adapter for adapter in self.adapters if adapter.is_ethernet),
+            (adapter for adapter in self.adapters if adapter.has_address),
+            (adapter for adapter in self.adapters if adapter.kind != KIND_LOOPBACK and adapter.name != 'lo'),
+        ):
+            adapter = next(candidates, None)
+            if adapter is not None:
+                return adapter
+        return self.adapters[0] if self.adapters else None
+
+    @classmethod
+    def from_network_info(cls, network_info):
+        """
+        Monta o snapshot a partir do dicionário produzido pela coleta
+
+        Os adaptadores do WMI (fabricante, velocidade, status) e as
+        configurações de IP do WMI (IPv6 ausente) são combinados aos
+        adaptadores por dicionários de nome/ID da conexão e MAC/descrição.
+        """
+        wmi_info = network_info.get('wmi_info') or {}
+        wmi_adapters = {}
+        for wmi_adapter in wmi_info.get('adapters', []):
+            for key in (wmi_adapter.get('name'), wmi_adapter.get('connection_id')):
+                if key:
+                    wmi_adapters.setdefault(key, wmi_adapter)
+        ip_configs = {}
+        for ip_config in wmi_info.get('ip_configs', []):
+            for key in (_mac_key(ip_config.get('mac_address')), ip_config.get('description')):
+                if key:
+                    ip_configs.setdefault(key, ip_config)
+
+        adapters = []
+        for adapter_dict in network_info.get('adapters', []):
+            adapter = AdapterInfo.from_dict(adapter_dict)
+            wmi_adapter = wmi_adapters.get(adapter_dict.get('name'))
+            if wmi_adapter:
+                adapter.manufacturer = known(wmi_adapter.get('manufacturer'))
+                adapter.speed_bps = known(wmi_adapter.get('speed'))
+                adapter.connection_id = known(wmi_adapter.get('connection_id'))
+                adapter.status_code = wmi_adapter.get('status') or 0
+            if not adapter.ipv6_address:
+                ip_config = ip_configs.get(_mac_key(adapter_dict.get('physical_address'))) or \
+                    ip_configs.get(adapter_dict.get('description'))
+                if ip_config:
+                    adapter.ipv6_address = next(
+                        (address for address in ip_config.get('ip_addresses', [])
+                         if ':' in address and not address.startswith('fe80')), UNKNOWN
+                    )
+            adapters.append(adapter)
+
+        return cls(
+            adapters,
+            hostname=network_info.get('hostname'),
+            fqdn=network_info.get('fqdn'),
+            default_gateway=network_info.get('default_gateway'),
+            dns_servers=network_info.get('dns_servers'),
+            switch=SwitchInfo.from_dict(network_info['switch_info']) if network_info.get('switch_info') else None
+        )
+
+    def adapter_by_mac(self, mac):
+        """Adaptador pelo MAC (qualquer separador); None se não existir"""
+        return self._by_mac.get(_mac_key(mac))
+
+    def adapter_by_name(self, name):
+        return self._by_name.get(name)
+
+    def adapter_by_connection_id(self, connection_id):
+        return self._by_connection_id.get(connection_id)
+
+    def diff(self, other):
+        """
+        Diferenças estruturais em relação a outro snapshot (self é o mais novo)
+
+        Returns:
+            Dicionário {caminho: (valor antigo, valor novo)}, por exemplo
+            {'default_gateway': (...), 'adapters[Ethernet].ipv4_address': (...),
+            'switch.port_id': (...)}; adaptador que surgiu ou sumiu aparece como
+            'adapters[nome]' com None no lado ausente. Vazio se forem iguais.
+        """
+        changes = {}
+        if other is None:
+            other = NetworkSnapshot()
+        for name in ('hostname', 'fqdn', 'default_gateway', 'dns_servers'):
+            old, new = getattr(other, name), getattr(self, name)
+            if old != new:
+                changes[name] = (old, new)
+
+        old_adapters = {adapter.name: adapter for adapter in other.adapters}
+        new_adapters = {adapter.name: adapter for adapter in self.adapters}
+        for name, adapter in new_adapters.items():
+            previous = old_adapters.get(name)
+            if previous is None:
+                changes[f'adapters[{name}]'] = (None, adapter)
+            elif previous.key() != adapter.key():
+                for slot in AdapterInfo.__slots__:
+                    old, new = getattr(previous, slot), getattr(adapter, slot)
+                    if old != new:
+                        changes[f'adapters[{name}].{slot}'] = (old, new)
+        for name, adapter in old_adapters.items():
+            if name not in new_adapters:
+                changes[f'adapters[{name}]'] = (adapter, None)
+
+        old_switch, new_switch = other.switch or SwitchInfo(), self.switch or SwitchInfo()
+        if old_switch.key() != new_switch.key():
+            for name in SWITCH_FIELDS:
+                old, new = getattr(old_switch, name), getattr(new_switch, name)
+                if old != new:
+                    changes[f'switch.{name}'] = (old, new)
+        return changes
+
+    def __repr__(self):
+        active = self.active_adapter.name if self.active_adapter else None
+        return f"NetworkSnapshot({len(self.adapters)} adaptadores, ativo={active!r}, gateway={self.default_gateway!r})"
+
+
+if __name__ == "__main__":
+    # Benchmark: coleta com muitos adaptadores virtuais + WMI, construção e diff
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    adapters = [{
+        'name': f'vEthernet (Switch {index})', 'description': f'Hyper-V Virtual Ethernet Adapter #{index}',
+        'physical_address': f'00-15-5D-00-{index % 256:02X}-{index // 256:02X}',
+        'ipv4_address': f'172.20.{index % 256}.1', 'ipv4_subnet': '255.255.255.0',
+        'ipv6_address': '', 'default_gateway': '', 'dns_servers': [], 'dhcp_enabled': False
+    } for index in range(count)]
+    adapters.append({
+        'name': 'Ethernet 2', 'description': 'Intel(R) Ethernet Connection (7) I219-LM',
+        'physical_address': '00-15-5D-01-02-03', 'ipv4_address': '192.168.10.25',
+        'ipv4_subnet': '255.255.255.0', 'ipv6_address': '', 'default_gateway': '192.168.10.1',
+        'dns_servers': ['192.168.10.2'], 'dhcp_enabled': True
+    })
+    wmi_info = {
+        'adapters': [{'name': adapter['description'], 'connection_id': adapter['name'], 'manufacturer': 'Intel',
+                      'speed': 1000000000, 'status': 2} for adapter in adapters],
+        'ip_configs': [{'description': adapter['description'],
+                        'mac_address': adapter['physical_address'].replace('-', ':'),
+                        'ip_addresses': [adapter['ipv4_address'], '2804:14c::10']} for adapter in adapters]
+    }
+    network_info = {
+        'hostname': 'DESKTOP-01', 'fqdn': 'DESKTOP-01.corp.example.com', 'default_gateway': '192.168.10.1',
+        'dns_servers': ['192.168.10.2'], 'adapters': adapters, 'wmi_info': wmi_info,
+        'switch_info': {'switch_name': 'SW-ANDAR2', 'port_id': 'Gi1/0/17', 'vlan_id': 'N/A'}
+    }
+
+    repeat = 2000
+    started = time.perf_counter()
+    for _ in range(repeat):
+        snapshot = NetworkSnapshot.from_network_info(network_info)
+    build = (time.perf_counter() - started) / repeat
+    print(snapshot, snapshot.switch)
+    print(f"Ativo: {snapshot.active_adapter.name}, {snapshot.active_adapter.ipv6_address}, "
+          f"{snapshot.active_adapter.speed_bps} bps; VLAN: {snapshot.switch.vlan_id}")
+
+    changed = dict(network_info, switch_info=dict(network_info['switch_info'], vlan_id='20'))
+    changed['adapters'] = adapters[:-1] + [dict(adapters[-1], ipv4_address='192.168.10.26')]
+    other = NetworkSnapshot.from_network_info(changed)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        changes = other.diff(snapshot)
+    compare = (time.perf_counter() - started) / repeat
+    print(f"Mudanças: {changes}")
+    print(f"{len(adapters)} adaptadores: construção {build * 1e6:.0f} µs, diff {compare * 1e6:.0f} µs")
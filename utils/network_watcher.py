@@ -0,0 +1,396 @@
+"""
+Observador de mudanças de rede do sistema operacional
+Em vez de recoletar tudo periodicamente, recebe notificações do sistema quando
+interfaces, endereços ou rotas mudam e avisa (com debounce) quem precisa recoletar.
+
+Backends:
+    Windows: NotifyIpInterfaceChange, NotifyUnicastIpAddressChange e NotifyRouteChange2 (iphlpapi)
+    Linux:   socket netlink (RTMGRP_LINK, RTMGRP_IPV4_IFADDR, RTMGRP_IPV6_IFADDR, RTMGRP_IPV4_ROUTE)
+
+Verificação: python -m utils.network_watcher --teste
+    (no Linux cria um par veth em um namespace de rede isolado, via unshare -rn)
+"""
+
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from utils import netlink
+
+
+# Tipos de mudança repassados ao callback
+CHANGE_LINK = 'link'
+CHANGE_ADDRESS = 'address'
+CHANGE_ROUTE = 'route'
+
+# Grupos multicast do netlink (linux/rtnetlink.h)
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_IFADDR = 0x100
+
+# Tipos de mensagem do netlink e a mudança correspondente
+_NETLINK_MESSAGE_KINDS = {
+    16: CHANGE_LINK,      # RTM_NEWLINK
+    17: CHANGE_LINK,      # RTM_DELLINK
+    20: CHANGE_ADDRESS,   # RTM_NEWADDR
+    21: CHANGE_ADDRESS,   # RTM_DELADDR
+    24: CHANGE_ROUTE,     # RTM_NEWROUTE
+    25: CHANGE_ROUTE,     # RTM_DELROUTE
+}
+
+
+def parse_netlink_changes(data):
+    """
+    Extrai os tipos de mudança de um datagrama netlink
+
+    Returns:
+        Conjunto com CHANGE_LINK, CHANGE_ADDRESS e/ou CHANGE_ROUTE
+    """
+    kinds = set()
+    for message_type, _ in netlink.iter_messages(data):
+        kind = _NETLINK_MESSAGE_KINDS.get(message_type)
+        if kind:
+            kinds.add(kind)
+    return kinds
+
+
+class NetlinkBackend:
+    """Recebe notificações de rede do kernel Linux via netlink"""
+
+    groups = RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV6_IFADDR | RTMGRP_IPV4_ROUTE
+
+    def __init__(self):
+        self.sock = None
+        self.thread = None
+        self.running = False
+
+    def start(self, notify):
+        """Abre o socket netlink e inicia a thread de leitura"""
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+        self.sock.bind((0, self.groups))
+        self.sock.settimeout(1.0)
+        self.running = True
+        self.thread = threading.Thread(target=self._read_loop, args=(notify,), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Encerra a leitura e fecha o socket"""
+        self.running = False
+        sock = self.sock
+        self.sock = None
+        if sock:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def _read_loop(self, notify):
+        """Lê datagramas netlink até stop()"""
+        sock = self.sock
+        while self.running:
+            try:
+                data = sock.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            for kind in parse_netlink_changes(data):
+                notify(kind)
+
+
+class WindowsNotifyBackend:
+    """Recebe notificações de rede do Windows via iphlpapi"""
+
+    registrations = (
+        ('NotifyIpInterfaceChange', CHANGE_LINK),
+        ('NotifyUnicastIpAddressChange', CHANGE_ADDRESS),
+        ('NotifyRouteChange2', CHANGE_ROUTE),
+    )
+
+    def __init__(self, library=None, callback_type=None):
+        """
+        Args:
+            library, callback_type: iphlpapi e o tipo dos callbacks (padrão: os do
+                Windows; substituíveis para a verificação em outras plataformas)
+        """
+        self.iphlpapi = library
+        self.callback_type = callback_type
+        self.handles = []
+        self.callbacks = []
+
+    def start(self, notify):
+        """Registra os callbacks de interface, endereço e rota"""
+        import ctypes
+        from ctypes import wintypes
+
+        # Atribuído antes dos registros: se um deles falhar, stop() cancela os anteriores
+        if self.iphlpapi is None:
+            self.iphlpapi = ctypes.WinDLL('iphlpapi')
+        if self.callback_type is None:
+            self.callback_type = ctypes.WINFUNCTYPE(None, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int)
+        af_unspec = 0
+
+        for function_name, kind in self.registrations:
+            # Os callbacks rodam em threads do sistema; precisam ficar referenciados
+            callback = self.callback_type(lambda context, row, notification_type, kind=kind: notify(kind))
+            handle = wintypes.HANDLE()
+            function = getattr(self.iphlpapi, function_name)
+            result = function(af_unspec, callback, None, False, ctypes.byref(handle))
+            if result != 0:
+                self.stop()
+                raise OSError(result, f"{function_name} falhou")
+            self.callbacks.append(callback)
+            self.handles.append(handle)
+
+    def stop(self):
+        """
+        Cancela os registros
+
+        O callback de cada registro só é liberado depois que o cancelamento dá
+        certo: se o sistema ainda puder chamá-lo, ele continua referenciado (a
+        thread do sistema chamaria código já liberado e derrubaria o processo).
+        """
+        handles, callbacks = self.handles, self.callbacks
+        self.handles, self.callbacks = [], []
+        for handle, callback in zip(handles, callbacks):
+            try:
+                result = self.iphlpapi.CancelMibChangeNotify2(handle)
+            except OSError as e:
+                result = e
+            if result != 0:
+                print(f"Erro ao cancelar notificação de rede: {result}")  # Debug
+                self.handles.append(handle)
+                self.callbacks.append(callback)
+
+
+def default_backend():
+    """Retorna o backend da plataforma atual (None se não houver suporte)"""
+    if sys.platform == "win32":
+        return WindowsNotifyBackend()
+    if sys.platform.startswith("linux") and hasattr(socket, 'AF_NETLINK'):
+        return NetlinkBackend()
+    return None
+
+
+class NetworkChangeWatcher:
+    """Agrupa notificações em rajada e chama o callback uma vez por rajada"""
+
+    def __init__(self, callback, debounce=1.0, max_delay=5.0, backend=None):
+        """
+        Args:
+            callback: Função chamada como callback(tipos) com o conjunto de tipos de
+                mudança acumulados (thread do observador)
+            debounce: Silêncio (segundos) exigido antes de disparar o callback
+            max_delay: Atraso máximo (segundos) desde a primeira notificação da rajada
+            backend: Fonte de notificações (padrão: a da plataforma)
+        """
+        self.callback = callback
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.backend = backend
+        self.condition = threading.Condition()
+        self.pending = set()
+        self.first_event = None
+        self.last_event = None
+        self.running = False
+        self.thread = None
+        self.events_received = 0
+        self.callbacks_fired = 0
+
+    def start(self):
+        """
+        Inicia o observador
+
+        Returns:
+            True se as notificações do sistema estão ativas; False se não há suporte
+            (o chamador deve continuar com a consulta periódica)
+        """
+        if self.running:
+            return True
+        if self.backend is None:
+            self.backend = default_backend()
+        if self.backend is None:
+            return False
+        try:
+            self.backend.start(self.notify)
+        except Exception as e:
+            print(f"Observador de rede indisponível: {e}")
+            return False
+
+        self.running = True
+        self.thread = threading.Thread(target=self._debounce_loop, daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        """Para o observador e descarta notificações pendentes"""
+        with self.condition:
+            if not self.running:
+                return
+            self.running = False
+            self.pending = set()
+            self.condition.notify_all()
+        try:
+            self.backend.stop()
+        except Exception:
+            pass
+
+    def notify(self, kind):
+        """Registra uma notificação (pode ser chamado de qualquer thread)"""
+        with self.condition:
+            if not self.running:
+                return
+            now = time.monotonic()
+            if not self.pending:
+                self.first_event = now
+            self.pending.add(kind)
+            self.last_event = now
+            self.events_received += 1
+            self.condition.notify_all()
+
+    def _debounce_loop(self):
+        """Dispara o callback após o silêncio de debounce (ou max_delay)"""
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                now = time.monotonic()
+                fire_at = min(self.last_event + self.debounce, self.first_event + self.max_delay)
+                if now < fire_at:
+                    self.condition.wait(fire_at - now)
+                    continue
+                kinds = self.pending
+                self.pending = set()
+                self.callbacks_fired += 1
+            try:
+                self.callback(frozenset(kinds))
+            except Exception as e:
+                print(f"Erro ao tratar mudança de rede: {e}")
+
+
+if __name__ == "__main__":
+    failures = 0
+
+    def check(description, condition):
+        global failures
+        if not condition:
+            failures += 1
+            print(f"  FALHOU: {description}")
+
+    class FakeIphlpapi:
+        """iphlpapi simulado: registra handles numerados e pode falhar um registro ou os cancelamentos"""
+
+        def __init__(self, failing=None, cancel_result=0):
+            self.failing = failing
+            self.cancel_result = cancel_result
+            self.registered = 0
+            self.cancelled = []
+
+        def __getattr__(self, name):
+            if not name.startswith('Notify'):
+                raise AttributeError(name)
+
+            def register(family, callback, context, initial, handle_ref):
+                if name == self.failing:
+                    return 87  # ERROR_INVALID_PARAMETER
+                self.registered += 1
+                handle_ref._obj.value = self.registered
+                return 0
+            return register
+
+        def CancelMibChangeNotify2(self, handle):
+            self.cancelled.append(handle.value)
+            return self.cancel_result
+
+    def check_windows_backend():
+        import ctypes
+        callback_type = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int)
+
+        # Falha no terceiro registro: os dois anteriores são cancelados
+        library = FakeIphlpapi(failing='NotifyRouteChange2')
+        backend = WindowsNotifyBackend(library, callback_type)
+        try:
+            backend.start(lambda kind: None)
+            check("registro com falha levanta OSError", False)
+        except OSError:
+            pass
+        check("handles registrados cancelados após falha", library.cancelled == [1, 2])
+        check("callbacks liberados após cancelamento", backend.callbacks == [] and backend.handles == [])
+
+        # Registro completo: os callbacks chegam ao observador
+        received = []
+        backend = WindowsNotifyBackend(FakeIphlpapi(), callback_type)
+        backend.start(received.append)
+        for callback in backend.callbacks:
+            callback(None, None, 0)
+        check("callbacks repassam os tipos", received == [CHANGE_LINK, CHANGE_ADDRESS, CHANGE_ROUTE])
+        backend.stop()
+        check("stop cancela todos", backend.iphlpapi.cancelled == [1, 2, 3] and not backend.callbacks)
+
+        # Cancelamento recusado: o callback continua referenciado
+        backend = WindowsNotifyBackend(FakeIphlpapi(cancel_result=6), callback_type)
+        backend.start(received.append)
+        backend.stop()
+        check("callbacks mantidos se o cancelamento falha", len(backend.callbacks) == 3)
+
+    def check_netlink_veth():
+        """Dentro de um namespace de rede isolado: cria veth, endereço e rota e confere as notificações"""
+        batches = []
+        watcher = NetworkChangeWatcher(batches.append, debounce=0.2, max_delay=1.0)
+        check("observador netlink ativo", watcher.start())
+        for command in ('ip link add v0 type veth peer name v1', 'ip addr add 10.9.9.1/24 dev v0',
+                        'ip link set v0 up', 'ip link set v1 up', 'ip route add 10.8.0.0/16 dev v0'):
+            subprocess.run(command.split(), check=True)
+        deadline = time.monotonic() + 5
+        kinds = set()
+        while time.monotonic() < deadline and kinds != {CHANGE_LINK, CHANGE_ADDRESS, CHANGE_ROUTE}:
+            time.sleep(0.1)
+            kinds = set().union(*batches)
+        check(f"link, endereço e rota notificados (recebido: {sorted(kinds)})",
+              kinds == {CHANGE_LINK, CHANGE_ADDRESS, CHANGE_ROUTE})
+        check("rajada agrupada pelo debounce", watcher.callbacks_fired < watcher.events_received)
+
+        # Depois de stop() nenhuma mudança chega ao callback
+        watcher.stop()
+        fired = len(batches)
+        subprocess.run('ip link del v0'.split(), check=True)
+        time.sleep(0.5)
+        check("nenhum callback após stop", len(batches) == fired)
+
+    if sys.argv[1:] == ['--veth']:
+        check_netlink_veth()
+        sys.exit(1 if failures else 0)
+
+    if sys.argv[1:] == ['--teste']:
+        check_windows_backend()
+        if sys.platform.startswith("linux"):
+            try:
+                isolated = subprocess.run(['unshare', '-rn', 'true'], capture_output=True).returncode == 0
+            except FileNotFoundError:
+                isolated = False
+            if isolated:
+                result = subprocess.run(['unshare', '-rn', sys.executable, '-m', 'utils.network_watcher', '--veth'])
+                check("verificação veth no namespace isolado", result.returncode == 0)
+            else:
+                print("Namespace de rede indisponível (unshare -rn); verificação veth ignorada")
+        print("Verificações concluídas" if not failures else f"{failures} verificações falharam")
+        sys.exit(1 if failures else 0)
+
+    def _print_changes(kinds):
+        print(f"{time.strftime('%H:%M:%S')} mudança de rede: {', '.join(sorted(kinds))}", flush=True)
+
+    watcher = NetworkChangeWatcher(_print_changes, debounce=0.5)
+    if not watcher.start():
+        print("Notificações de rede não suportadas nesta plataforma")
+        sys.exit(1)
+    print("Observando mudanças de rede (Ctrl+C para sair)...", flush=True)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        watcher.stop()
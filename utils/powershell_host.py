@@ -0,0 +1,410 @@
+"""
+Sessão persistente do PowerShell compartilhada por todos os módulos
+Evita pagar a inicialização do powershell.exe (300-1500 ms) a cada comando
+
+Protocolo (uma mensagem JSON por linha, prefixada por FRAME_MARKER):
+    requisição: FRAME_MARKER + {"id": 1, "script": "..."}
+    resposta:   FRAME_MARKER + {"id": 1, "ok": true, "stdout": "...", "stderr": "..."}
+
+Linhas sem o prefixo (ex.: Write-Host) são ignoradas. Qualquer processo que fale
+esse protocolo pode substituir o PowerShell (ex.: um script Python nos testes em Linux).
+
+Verificação (com um host substituto em Python): python -m utils.powershell_host
+"""
+
+import atexit
+import base64
+import itertools
+import json
+import queue
+import subprocess
+import threading
+import time
+
+from utils.command_runner import CommandResult
+
+
+FRAME_MARKER = "@@PSHOST@@ "
+
+# Loop executado dentro do PowerShell: lê requisições do stdin e responde no stdout
+_BOOTSTRAP_SCRIPT = r'''
+$ErrorActionPreference = "Continue"
+$ProgressPreference = "SilentlyContinue"
+$utf8 = New-Object System.Text.UTF8Encoding $false
+[Console]::OutputEncoding = $utf8
+$marker = "@@PSHOST@@ "
+$stdin = [Console]::In
+while ($true) {
+    $line = $stdin.ReadLine()
+    if ($line -eq $null) { break }
+    if (-not $line.StartsWith($marker)) { continue }
+    $request = $line.Substring($marker.Length) | ConvertFrom-Json
+    $errors = New-Object System.Collections.ArrayList
+    $ok = $true
+    try {
+        $block = [ScriptBlock]::Create($request.script)
+        $stdout = & $block 2>&1 | ForEach-Object {
+            if ($_ -is [System.Management.Automation.ErrorRecord]) {
+                [void]$errors.Add($_.ToString())
+            } else {
+                $_
+            }
+        } | Out-String -Width 4096
+    } catch {
+        $ok = $false
+        $stdout = ""
+        [void]$errors.Add($_.Exception.Message)
+    }
+    $response = @{
+        id = $request.id
+        ok = $ok
+        stdout = [string]$stdout
+        stderr = ($errors -join "`n")
+    } | ConvertTo-Json -Compress
+    [Console]::Out.WriteLine($marker + $response)
+    [Console]::Out.Flush()
+}
+'''
+
+
+class PowerShellHostError(OSError):
+    """Erro ao iniciar ou comunicar com a sessão do PowerShell"""
+
+
+def _default_command():
+    """Retorna a linha de comando padrão do host PowerShell"""
+    encoded = base64.b64encode(_BOOTSTRAP_SCRIPT.encode('utf-16-le')).decode('ascii')
+    return [
+        "powershell", "-NoLogo", "-NoProfile", "-NonInteractive",
+        "-ExecutionPolicy", "Bypass", "-EncodedCommand", encoded
+    ]
+
+
+class PowerShellHost:
+    """Processo PowerShell de longa duração com política de reinício"""
+
+    def __init__(self, command=None, max_restarts=3, restart_window=60.0):
+        """
+        Args:
+            command: Linha de comando do host (padrão: powershell com o loop do protocolo)
+            max_restarts: Número máximo de reinícios dentro de restart_window
+            restart_window: Janela (segundos) usada para contar reinícios
+        """
+        self.command = command or _default_command()
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.process = None
+        self.responses = None
+        self.restart_times = []
+        self.lock = threading.Lock()
+        self.request_ids = itertools.count(1)
+
+    def run(self, script, timeout=10):
+        """
+        Executa um script na sessão persistente
+
+        Args:
+            script: Código PowerShell a executar
+            timeout: Tempo máximo de espera pela resposta (segundos)
+
+        Returns:
+            CommandResult com returncode, stdout, stderr e duração; timed_out=True
+            se o script exceder o timeout (o host é reiniciado), como em run_command
+
+        Raises:
+            PowerShellHostError: Se o host não puder ser iniciado ou cair repetidamente
+            FileNotFoundError: Se o executável do host não existir
+        """
+        with self.lock:
+            try:
+                return self._run_locked(script, timeout)
+            except PowerShellHostError:
+                # O host caiu durante a execução: tenta uma vez com um processo novo
+                self._register_restart()
+                return self._run_locked(script, timeout)
+
+    def close(self):
+        """Encerra o processo do host"""
+        with self.lock:
+            self._kill()
+
+    def _run_locked(self, script, timeout):
+        """Envia a requisição e aguarda a resposta correspondente"""
+        self._ensure_started()
+        request_id = next(self.request_ids)
+        frame = FRAME_MARKER + json.dumps({'id': request_id, 'script': script}) + "\n"
+
+        try:
+            self.process.stdin.write(frame.encode('utf-8'))
+            self.process.stdin.flush()
+        except (OSError, ValueError):
+            self._kill()
+            raise PowerShellHostError("Sessão do PowerShell encerrada inesperadamente")
+
+        started = time.monotonic()
+        deadline = started + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # O host está ocupado com o script travado; recomeça do zero
+                self._kill()
+                return CommandResult(["powershell", "-Command", script], duration=time.monotonic() - started,
+                                     timed_out=True)
+            try:
+                response = self.responses.get(timeout=remaining)
+            except queue.Empty:
+                continue
+
+            if response is None:
+                self._kill()
+                raise PowerShellHostError("Sessão do PowerShell encerrada inesperadamente")
+            if response.get('id') != request_id:
+                # Resposta atrasada de uma requisição anterior
+                continue
+
+            return CommandResult(
+                ["powershell", "-Command", script],
+                returncode=0 if response.get('ok', True) else 1,
+                stdout=(response.get('stdout') or '').replace('\r\n', '\n'),
+                stderr=response.get('stderr') or '',
+                duration=time.monotonic() - started
+            )
+
+    def _ensure_started(self):
+        """Inicia o processo do host se ele não estiver em execução"""
+        if self.process and self.process.poll() is None:
+            return
+        if self.process:
+            # Processo morreu entre chamadas
+            self._kill()
+            self._register_restart()
+
+        self.process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+        )
+        self.responses = queue.Queue()
+        reader = threading.Thread(
+            target=self._read_responses,
+            args=(self.process.stdout, self.responses),
+            daemon=True
+        )
+        reader.start()
+
+    def _read_responses(self, stream, responses):
+        """Lê as respostas do host e coloca na fila (None indica fim do processo)"""
+        try:
+            for raw_line in iter(stream.readline, b''):
+                line = raw_line.decode('utf-8', errors='replace').strip().lstrip('\ufeff')
+                if not line.startswith(FRAME_MARKER):
+                    continue
+                try:
+                    responses.put(json.loads(line[len(FRAME_MARKER):]))
+                except ValueError:
+                    continue
+        except (OSError, ValueError):
+            pass
+        finally:
+            responses.put(None)
+
+    def _register_restart(self):
+        """Registra um reinício e falha se o limite da janela for excedido"""
+        now = time.monotonic()
+        self.restart_times = [t for t in self.restart_times if now - t < self.restart_window]
+        if len(self.restart_times) >= self.max_restarts:
+            raise PowerShellHostError(
+                f"Sessão do PowerShell reiniciada {len(self.restart_times)} vezes em "
+                f"{self.restart_window:.0f}s; desistindo"
+            )
+        self.restart_times.append(now)
+
+    def _kill(self):
+        """Finaliza o processo atual, se houver"""
+        process = self.process
+        self.process = None
+        if not process:
+            return
+        try:
+            process.stdin.close()
+        except (OSError, ValueError):
+            pass
+        try:
+            process.kill()
+            process.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+
+
+class PowerShellHostPool:
+    """Conjunto pequeno de hosts persistentes para scripts executados em paralelo"""
+
+    def __init__(self, size=3, command=None, **host_kwargs):
+        """
+        Args:
+            size: Número máximo de processos PowerShell (iniciados sob demanda)
+            command: Linha de comando de cada host (ver PowerShellHost)
+            host_kwargs: Demais parâmetros repassados a PowerShellHost
+        """
+        self.size = size
+        self.command = command
+        self.host_kwargs = host_kwargs
+        self.hosts = []
+        self.idle = []
+        self.condition = threading.Condition()
+
+    def run(self, script, timeout=10):
+        """Executa o script no primeiro host livre (mesma interface de PowerShellHost.run)"""
+        host = self._acquire()
+        try:
+            return host.run(script, timeout=timeout)
+        finally:
+            self._release(host)
+
+    def close(self):
+        """Encerra todos os hosts do conjunto"""
+        with self.condition:
+            hosts = list(self.hosts)
+        for host in hosts:
+            host.close()
+
+    def _acquire(self):
+        """Obtém um host livre, criando um novo se o limite permitir"""
+        with self.condition:
+            while True:
+                if self.idle:
+                    return self.idle.pop()
+                if len(self.hosts) < self.size:
+                    host = PowerShellHost(command=self.command, **self.host_kwargs)
+                    self.hosts.append(host)
+                    return host
+                self.condition.wait()
+
+    def _release(self, host):
+        """Devolve o host ao conjunto"""
+        with self.condition:
+            self.idle.append(host)
+            self.condition.notify()
+
+
+_shared_host = None
+_shared_host_lock = threading.Lock()
+
+
+def get_powershell_host():
+    """Retorna o conjunto de sessões PowerShell compartilhado pelo aplicativo"""
+    global _shared_host
+    with _shared_host_lock:
+        if _shared_host is None:
+            _shared_host = PowerShellHostPool()
+            atexit.register(_shared_host.close)
+        return _shared_host
+
+
+def set_powershell_host(host):
+    """Substitui a sessão compartilhada (ex.: por um host de teste que fala o protocolo)"""
+    global _shared_host
+    with _shared_host_lock:
+        previous = _shared_host
+        _shared_host = host
+    if previous and previous is not host:
+        previous.close()
+
+
+def run_powershell(script, timeout=10):
+    """Executa um script na sessão PowerShell compartilhada"""
+    return get_powershell_host().run(script, timeout=timeout)
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import tempfile
+
+    # Host substituto: fala o protocolo de linhas JSON e entende alguns "scripts"
+    #   echo TEXTO, fail, sleep SEGUNDOS, crash, crash-once ARQUIVO, pid
+    STAND_IN_SCRIPT = r"""
+import json, os, sys, time
+marker = "@@PSHOST@@ "
+sys.stdout.write("\ufeffbanner sem prefixo\n")
+sys.stdout.flush()
+for line in sys.stdin:
+    if not line.startswith(marker):
+        continue
+    request = json.loads(line[len(marker):])
+    command, _, argument = request["script"].partition(" ")
+    response = {"id": request["id"], "ok": True, "stdout": "", "stderr": ""}
+    if command == "echo":
+        response["stdout"] = argument + "\r\n"
+    elif command == "fail":
+        response.update(ok=False, stderr="falhou")
+    elif command == "sleep":
+        time.sleep(float(argument))
+    elif command == "crash":
+        os._exit(3)
+    elif command == "crash-once":
+        if not os.path.exists(argument):
+            open(argument, "w").close()
+            os._exit(3)
+    elif command == "pid":
+        response["stdout"] = str(os.getpid())
+    sys.stdout.write("Write-Host: ruído sem prefixo\n")
+    sys.stdout.write(marker + json.dumps(response) + "\n")
+    sys.stdout.flush()
+"""
+    command = [sys.executable, "-c", STAND_IN_SCRIPT]
+    failures = 0
+
+    def check(description, condition):
+        global failures
+        if not condition:
+            failures += 1
+            print(f"  FALHOU: {description}")
+
+    host = PowerShellHost(command=command, max_restarts=3)
+    result = host.run("echo olá mundo")
+    check(f"enquadramento e CRLF ({result.stdout!r})", result.ok and result.stdout == "olá mundo\n")
+    result = host.run("fail")
+    check("erro do script", result.returncode == 1 and result.stderr == "falhou" and not result.timed_out)
+    first_pid = host.run("pid").stdout
+
+    # Timeout: resultado com timed_out, como run_command, e o host é recriado
+    result = host.run("sleep 5", timeout=0.3)
+    check(f"timeout como CommandResult ({result!r})", result.timed_out and result.returncode is None and not result.ok)
+    second_pid = host.run("pid").stdout
+    check("host reiniciado após timeout", second_pid and second_pid != first_pid)
+    check("resposta atrasada descartada", host.run("echo depois").stdout == "depois\n")
+
+    # Queda durante o script: uma nova tentativa com um processo novo
+    with tempfile.TemporaryDirectory() as directory:
+        result = host.run(f"crash-once {os.path.join(directory, 'caiu')}")
+        check("queda recuperada com nova tentativa", result.ok and len(host.restart_times) == 1)
+
+    # Quedas repetidas: cada chamada falha, até o limite de reinícios da janela
+    errors = []
+    for _ in range(5):
+        try:
+            host.run("crash")
+        except PowerShellHostError as e:
+            errors.append(str(e))
+            if "desistindo" in str(e):
+                break
+    check(f"limite de reinícios ({errors})", len(errors) == 3 and "desistindo" in errors[-1])
+    host.close()
+
+    # Conjunto: três scripts lentos rodam em paralelo em hosts diferentes
+    pool = PowerShellHostPool(size=3, command=command)
+    threads = [threading.Thread(target=pool.run, args=("sleep 0.5",)) for _ in range(3)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    check(f"conjunto em paralelo ({elapsed:.2f} s)", len(pool.hosts) == 3 and elapsed < 1.4)
+    pool.close()
+
+    print("Verificações concluídas" if not failures else f"{failures} verificações falharam")
+    sys.exit(1 if failures else 0)
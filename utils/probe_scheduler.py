@@ -0,0 +1,298 @@
+"""
+Agendador de sondas baseado em grafo de dependências
+Executa em paralelo as sondas independentes; cada sonda espera apenas pelas
+sondas das quais depende. A latência total tende à da sonda mais lenta.
+
+Com skip_covered, o agendador acompanha quais campos já estão resolvidos e
+descarta sondas de menor prioridade cujas saídas possíveis já estão cobertas.
+
+Uma thread já iniciada não pode ser interrompida: o cancelamento é cooperativo.
+Cada sonda roda com um sinal de cancelamento próprio, ligado quando ela é
+descartada ou quando run() termina; check_cancelled() (chamado antes de cada
+comando) levanta ProbeCancelled e impede que uma sonda abandonada continue
+executando comandos ou gravando no cache da coleta seguinte.
+
+Verificação: python -m utils.probe_scheduler
+"""
+
+import contextvars
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class ProbeCancelled(Exception):
+    """A sonda da thread atual foi descartada pelo agendador"""
+
+
+# Sinal de cancelamento da sonda em execução (cada sonda roda em uma cópia do contexto)
+_cancel_event = contextvars.ContextVar('probe_cancel_event', default=None)
+
+
+def check_cancelled():
+    """Levanta ProbeCancelled se a sonda que está rodando nesta thread foi cancelada"""
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise ProbeCancelled()
+
+
+class Probe:
+    """Declaração de uma sonda no grafo"""
+
+    def __init__(self, name, func, deps=(), provides=(), override=False, auxiliary=False):
+        """
+        Args:
+            name: Nome único da sonda
+            func: Função que recebe um dict {dependência: resultado} e retorna o resultado
+            deps: Nomes das sondas que precisam terminar antes desta
+            provides: Campos que a sonda pode preencher (vazio = nunca é descartada)
+            override: Se True, os valores da sonda sobrescrevem os de qualquer outra
+            auxiliary: Sonda que só alimenta as dependentes (sem campos próprios):
+                é descartada quando todas as dependentes estão cobertas
+        """
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.provides = tuple(provides)
+        self.override = override
+        self.auxiliary = auxiliary
+
+
+class ProbeScheduler:
+    """Executa um conjunto de sondas respeitando as dependências declaradas"""
+
+    def __init__(self, max_workers=6, skip_covered=False, missing_values=(None, '', 'N/A')):
+        """
+        Args:
+            max_workers: Número máximo de sondas executando ao mesmo tempo
+            skip_covered: Descarta sondas cujos campos já foram resolvidos
+            missing_values: Valores que indicam campo não resolvido
+        """
+        self.max_workers = max_workers
+        self.skip_covered = skip_covered
+        self.missing_values = missing_values
+        self.last_timings = {}
+        self.last_errors = {}
+        self.last_skipped = []
+
+    def run(self, probes, on_result=None):
+        """
+        Executa as sondas e retorna {nome: resultado}
+
+        Sondas que falham ou são descartadas têm resultado None (o erro fica
+        em last_errors e os nomes descartados em last_skipped). A ordem de
+        declaração define a prioridade de início quando há mais sondas prontas
+        do que workers e, para sondas sem override, a precedência na mesclagem.
+
+        Args:
+            probes: Lista de Probe
+            on_result: Função opcional chamada como on_result(nome, resultado) assim
+                que cada sonda termina, na thread do agendador e antes de liberar
+                as sondas que dependem dela
+        """
+        probes = list(probes)
+        self._validate(probes)
+        ranks = {probe.name: index for index, probe in enumerate(probes)}
+
+        dependents = {probe.name: [other for other in probes if probe.name in other.deps] for probe in probes}
+
+        pending = {probe.name: probe for probe in probes}
+        results = {}
+        running = {}
+        cancel_events = {}
+        started = {}
+        self.last_timings = {}
+        self.last_errors = {}
+        self.last_skipped = []
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while pending or running:
+                for name, probe in list(pending.items()):
+                    if all(dep in results for dep in probe.deps):
+                        del pending[name]
+                        if self._is_covered(probe, probes, ranks, results, dependents):
+                            self.last_skipped.append(name)
+                            results[name] = None
+                            continue
+                        dep_results = {dep: results[dep] for dep in probe.deps}
+                        started[name] = time.monotonic()
+                        cancel_event = threading.Event()
+                        context = contextvars.copy_context()
+                        context.run(_cancel_event.set, cancel_event)
+                        future = executor.submit(context.run, probe.func, dep_results)
+                        running[future] = probe
+                        cancel_events[future] = cancel_event
+
+                if not running:
+                    continue
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    probe = running.pop(future)
+                    del cancel_events[future]
+                    self.last_timings[probe.name] = time.monotonic() - started[probe.name]
+                    try:
+                        results[probe.name] = future.result()
+                    except Exception as e:
+                        print(f"Erro na sonda {probe.name}: {e}")
+                        self.last_errors[probe.name] = e
+                        results[probe.name] = None
+                    if on_result:
+                        try:
+                            on_result(probe.name, results[probe.name])
+                        except Exception as e:
+                            print(f"Erro ao processar resultado da sonda {probe.name}: {e}")
+
+                # Sondas em andamento que ficaram cobertas são canceladas: as que ainda
+                # não começaram nem chegam a rodar, as demais param no próximo check_cancelled
+                for future, probe in list(running.items()):
+                    if self._is_covered(probe, probes, ranks, results, dependents):
+                        future.cancel()
+                        cancel_events.pop(future).set()
+                        del running[future]
+                        self.last_skipped.append(probe.name)
+                        results[probe.name] = None
+        finally:
+            # Em caso de erro, nenhuma sonda continua depois de run()
+            for cancel_event in cancel_events.values():
+                cancel_event.set()
+            executor.shutdown(wait=False)
+
+        return results
+
+    def _is_covered(self, probe, probes, ranks, results, dependents):
+        """
+        True se nem a sonda nem as dependentes dela mudariam o resultado final
+
+        Um campo está coberto para a sonda quando uma sonda já concluída o
+        resolveu e tem precedência sobre ela: declarada antes, ou com override.
+        A sonda continua necessária enquanto alguma dependente ainda não
+        concluída não estiver coberta (ela depende do resultado desta).
+        """
+        if not self.skip_covered:
+            return False
+        if not probe.provides and not (probe.auxiliary and dependents[probe.name]):
+            return False
+        for dependent in dependents[probe.name]:
+            if dependent.name not in results and not self._is_covered(dependent, probes, ranks, results, dependents):
+                return False
+        if probe.auxiliary:
+            return True
+        for field in probe.provides:
+            covered = False
+            for other in probes:
+                if other is probe or not other.provides or other.name not in results:
+                    continue
+                if not (other.override or ranks[other.name] < ranks[probe.name]):
+                    continue
+                other_result = results[other.name]
+                if other_result and other_result.get(field) not in self.missing_values:
+                    covered = True
+                    break
+            if not covered:
+                return False
+        return True
+
+    def _validate(self, probes):
+        """Verifica nomes duplicados, dependências desconhecidas e ciclos"""
+        names = [probe.name for probe in probes]
+        if len(set(names)) != len(names):
+            raise ValueError("Sondas com nomes duplicados")
+
+        by_name = {probe.name: probe for probe in probes}
+        for probe in probes:
+            for dep in probe.deps:
+                if dep not in by_name:
+                    raise ValueError(f"Sonda {probe.name} depende de sonda desconhecida: {dep}")
+
+        # Ordenação topológica para detectar ciclos
+        resolved = set()
+        remaining = list(probes)
+        while remaining:
+            ready = [probe for probe in remaining if all(dep in resolved for dep in probe.deps)]
+            if not ready:
+                cycle = ", ".join(probe.name for probe in remaining)
+                raise ValueError(f"Dependência circular entre sondas: {cycle}")
+            for probe in ready:
+                resolved.add(probe.name)
+                remaining.remove(probe)
+
+
+if __name__ == "__main__":
+    failures = 0
+
+    def check(description, condition):
+        global failures
+        if not condition:
+            failures += 1
+            print(f"  FALHOU: {description}")
+
+    def switch_probes(lldp_info, ran):
+        """Grafo reduzido da coleta do switch: LLDP, community SNMP, FDB e SNMP"""
+        def probe(name, result, delay=0.0):
+            def func(deps):
+                time.sleep(delay)
+                ran.append(name)
+                return result
+            return func
+        return [
+            Probe('lldp', probe('lldp', lldp_info), provides=['switch_name', 'switch_model', 'switch_ip',
+                                                              'port_id', 'vlan_id'], override=True),
+            Probe('gateway', probe('gateway', '10.0.0.1', delay=0.05)),
+            Probe('snmp_community', probe('snmp_community', {'community': 'public'}), deps=['gateway'],
+                  auxiliary=True),
+            Probe('bridge_fdb', probe('bridge_fdb', {'port_id': 'Gi1/0/7', 'vlan_id': '20'}),
+                  deps=['gateway', 'snmp_community'], provides=['port_id', 'vlan_id']),
+            Probe('snmp', probe('snmp', {'switch_name': 'SW', 'switch_model': 'X'}),
+                  deps=['gateway', 'snmp_community'], provides=['switch_model', 'switch_name', 'switch_ip']),
+        ]
+
+    # LLDP sem PVID: o SNMP é descartado, mas a community continua necessária para a FDB
+    ran = []
+    scheduler = ProbeScheduler(skip_covered=True)
+    results = scheduler.run(switch_probes({'switch_name': 'SW-ANDAR2', 'switch_model': 'S5720',
+                                           'switch_ip': '10.0.0.2', 'port_id': 'GE1/0/17'}, ran))
+    check(f"LLDP sem VLAN: FDB consultada (rodaram {ran})", 'snmp_community' in ran and 'bridge_fdb' in ran)
+    check(f"LLDP sem VLAN: SNMP descartado ({scheduler.last_skipped})", scheduler.last_skipped == ['snmp'])
+    check("VLAN vinda da FDB", results['bridge_fdb']['vlan_id'] == '20')
+
+    # LLDP completo: a community também é descartada, junto com as dependentes
+    ran = []
+    results = scheduler.run(switch_probes({'switch_name': 'SW-ANDAR2', 'switch_model': 'S5720',
+                                           'switch_ip': '10.0.0.2', 'port_id': 'GE1/0/17', 'vlan_id': '20'}, ran))
+    check(f"LLDP completo: só lldp e gateway rodaram ({ran})", sorted(ran) == ['gateway', 'lldp'])
+    check(f"LLDP completo: descartadas ({scheduler.last_skipped})",
+          sorted(scheduler.last_skipped) == ['bridge_fdb', 'snmp', 'snmp_community'])
+
+    # Sem LLDP nada é descartado
+    ran = []
+    scheduler.run(switch_probes({}, ran))
+    check(f"sem LLDP: todas rodaram ({ran})", len(ran) == 5 and not scheduler.last_skipped)
+
+    # Sonda em andamento que fica coberta para no próximo check_cancelled
+    steps = []
+    outcome = []
+
+    def slow_probe(deps):
+        try:
+            for step in range(50):
+                check_cancelled()
+                steps.append(step)
+                time.sleep(0.01)
+        except ProbeCancelled:
+            outcome.append('cancelada')
+            raise
+        return {'port_id': 'lenta'}
+
+    scheduler.run([
+        Probe('lldp', lambda deps: time.sleep(0.05) or {'port_id': 'Gi1/0/7'}, provides=['port_id'], override=True),
+        Probe('powershell', slow_probe, provides=['port_id']),
+    ])
+    time.sleep(0.1)
+    check(f"sonda coberta interrompida ({len(steps)} de 50 etapas)", outcome == ['cancelada'] and len(steps) < 20)
+    check("sonda coberta descartada", scheduler.last_skipped == ['powershell'])
+
+    print("Verificações concluídas" if not failures else f"{failures} verificações falharam")
+    sys.exit(1 if failures else 0)
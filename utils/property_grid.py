@@ -0,0 +1,260 @@
+"""
+Grade reutilizável de pares rótulo/valor para a interface
+Em vez de destruir e recriar os widgets a cada atualização, mantém um widget
+por linha (identificada por uma chave) e só altera os que mudaram.
+
+Benchmark (mede tempo, widgets criados e chamadas ao Tk por atualização, na
+grade e no caminho antigo de destruir e recriar os widgets):
+    python -m utils.property_grid
+"""
+
+import random
+import time
+import tkinter as tk
+from tkinter import ttk
+
+
+LABEL_FONT = ("Segoe UI", 9, "bold")
+VALUE_FONT = ("Segoe UI", 9)
+
+
+def field(key, label, value, foreground="", label_font=LABEL_FONT, value_font=VALUE_FONT,
+          wraplength=0, pady=5):
+    """Linha rótulo/valor"""
+    return {
+        'kind': 'field', 'key': key,
+        'label': {'text': label, 'font': label_font},
+        'value': {'text': value, 'font': value_font, 'foreground': foreground, 'wraplength': wraplength},
+        'pady': pady
+    }
+
+
+def message(key, text, foreground="", font=VALUE_FONT, pady=20):
+    """Linha de texto ocupando as duas colunas"""
+    return {
+        'kind': 'message', 'key': key,
+        'value': {'text': text, 'font': font, 'foreground': foreground},
+        'pady': pady
+    }
+
+
+def heading(key, text, font=LABEL_FONT, pady=5):
+    """Título de seção alinhado à esquerda ocupando as duas colunas"""
+    return {
+        'kind': 'heading', 'key': key,
+        'value': {'text': text, 'font': font},
+        'pady': pady
+    }
+
+
+def separator(key):
+    """Separador horizontal"""
+    return {'kind': 'separator', 'key': key, 'pady': 10}
+
+
+class PropertyGrid:
+    """Grade de linhas que atualiza apenas os widgets cujos valores mudaram"""
+
+    def __init__(self, parent, label_factory=None, separator_factory=None):
+        """
+        Args:
+            parent: Frame onde as linhas serão exibidas
+            label_factory: Construtor dos rótulos (padrão: ttk.Label)
+            separator_factory: Construtor dos separadores (padrão: ttk.Separator)
+        """
+        self.parent = parent
+        self.label_factory = label_factory or ttk.Label
+        self.separator_factory = separator_factory or ttk.Separator
+        self.rows = {}
+        self.stats = {'widgets_created': 0, 'tk_calls': 0, 'updates': 0}
+
+    def update(self, rows):
+        """
+        Exibe as linhas informadas, na ordem dada
+
+        Linhas já existentes são reaproveitadas; linhas que não aparecem
+        nesta atualização são ocultadas (grid_remove) para uso futuro.
+        """
+        self.stats['updates'] += 1
+        visible = set()
+        for index, spec in enumerate(rows):
+            key = spec['key']
+            visible.add(key)
+            row = self.rows.get(key)
+            if row is None or row['kind'] != spec['kind']:
+                if row is not None:
+                    self._destroy_row(row)
+                row = self._create_row(spec)
+                self.rows[key] = row
+            self._apply_row(row, spec, index)
+
+        for key, row in self.rows.items():
+            if key not in visible and row['position'] is not None:
+                for widget in row['widgets']:
+                    self._call(widget.grid_remove)
+                row['position'] = None
+
+    def set_value(self, key, text, **options):
+        """Altera apenas o valor de uma linha existente (ex.: resultado assíncrono)"""
+        row = self.rows.get(key)
+        if row is None:
+            return
+        options['text'] = text
+        self._configure(row, row['widgets'][-1], 'value', options)
+
+    def clear(self):
+        """Oculta todas as linhas"""
+        self.update([])
+
+    def _create_row(self, spec):
+        """Cria os widgets de uma linha"""
+        kind = spec['kind']
+        if kind == 'separator':
+            widgets = [self._new(self.separator_factory, self.parent, orient='horizontal')]
+        elif kind == 'field':
+            widgets = [self._new(self.label_factory, self.parent), self._new(self.label_factory, self.parent)]
+        else:
+            widgets = [self._new(self.label_factory, self.parent)]
+        return {'kind': kind, 'widgets': widgets, 'position': None, 'options': {}}
+
+    def _apply_row(self, row, spec, index):
+        """Atualiza textos/estilos alterados e reposiciona a linha se necessário"""
+        kind = spec['kind']
+        if kind == 'field':
+            self._configure(row, row['widgets'][0], 'label', spec['label'])
+            self._configure(row, row['widgets'][1], 'value', spec['value'])
+        elif kind != 'separator':
+            self._configure(row, row['widgets'][0], 'value', spec['value'])
+
+        position = (index, spec.get('pady'))
+        if row['position'] == position:
+            return
+        row['position'] = position
+        pady = spec.get('pady', 5)
+        widgets = row['widgets']
+        if kind == 'field':
+            self._call(widgets[0].grid, row=index, column=0, sticky=tk.W, pady=pady)
+            self._call(widgets[1].grid, row=index, column=1, sticky=tk.W, padx=(10, 0), pady=pady)
+        elif kind == 'separator':
+            self._call(widgets[0].grid, row=index, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=pady)
+        elif kind == 'heading':
+            self._call(widgets[0].grid, row=index, column=0, columnspan=2, sticky=tk.W, pady=pady)
+        else:
+            self._call(widgets[0].grid, row=index, column=0, columnspan=2, pady=pady)
+
+    def _configure(self, row, widget, slot, options):
+        """Aplica somente as opções que mudaram desde a última atualização"""
+        current = row['options'].setdefault(slot, {})
+        changed = {name: value for name, value in options.items() if current.get(name) != value}
+        if changed:
+            self._call(widget.configure, **changed)
+            current.update(changed)
+
+    def _destroy_row(self, row):
+        """Destrói os widgets de uma linha que mudou de tipo"""
+        for widget in row['widgets']:
+            self._call(widget.destroy)
+
+    def _new(self, factory, *args, **kwargs):
+        """Cria um widget contabilizando a alocação"""
+        self.stats['widgets_created'] += 1
+        self.stats['tk_calls'] += 1
+        return factory(*args, **kwargs)
+
+    def _call(self, method, *args, **kwargs):
+        """Chama um método do Tk contabilizando a chamada"""
+        self.stats['tk_calls'] += 1
+        return method(*args, **kwargs)
+
+
+class _StubWidget:
+    """Widget falso usado pelo benchmark quando não há display disponível"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def configure(self, **kwargs):
+        pass
+
+    def grid(self, **kwargs):
+        pass
+
+    def grid_remove(self):
+        pass
+
+    def destroy(self):
+        pass
+
+
+def _rebuild(parent, rows, factory, stats, widgets):
+    """Caminho anterior à grade: destrói todos os widgets do frame e recria cada linha"""
+    children = parent.winfo_children() if parent is not None else list(widgets)
+    for widget in children:
+        widget.destroy()
+        stats['tk_calls'] += 1
+    widgets.clear()
+    for index, spec in enumerate(rows):
+        label = factory(parent, **spec['label'])
+        label.grid(row=index, column=0, sticky=tk.W, pady=spec['pady'])
+        value = factory(parent, **spec['value'])
+        value.grid(row=index, column=1, sticky=tk.W, padx=(10, 0), pady=spec['pady'])
+        widgets += [label, value]
+        stats['widgets_created'] += 2
+        stats['tk_calls'] += 4
+
+
+def _benchmark(refreshes=200, fields=40, changes_per_refresh=2):
+    """Compara a grade diferencial com o destruir/recriar por atualização (ambos medidos)"""
+    root = None
+    try:
+        root = tk.Tk()
+        root.withdraw()
+        grid_parent = ttk.Frame(root)
+        rebuild_parent = ttk.Frame(root)
+        factory = ttk.Label
+        grid = PropertyGrid(grid_parent)
+        backend = "Tk"
+    except tk.TclError:
+        grid_parent = rebuild_parent = None
+        factory = _StubWidget
+        grid = PropertyGrid(grid_parent, label_factory=_StubWidget, separator_factory=_StubWidget)
+        backend = "stub (sem display)"
+
+    # A mesma sequência de atualizações para os dois caminhos
+    values = [f"valor {i}" for i in range(fields)]
+    updates = []
+    for _ in range(refreshes):
+        for index in random.sample(range(fields), changes_per_refresh):
+            values[index] = f"valor {random.random():.6f}"
+        updates.append([field(f"f{i}", f"Campo {i}:", values[i]) for i in range(fields)])
+
+    started = time.perf_counter()
+    for rows in updates:
+        grid.update(rows)
+        if root is not None:
+            root.update_idletasks()
+    elapsed = time.perf_counter() - started
+
+    rebuild_stats = {'widgets_created': 0, 'tk_calls': 0}
+    widgets = []
+    started = time.perf_counter()
+    for rows in updates:
+        _rebuild(rebuild_parent, rows, factory, rebuild_stats, widgets)
+        if root is not None:
+            root.update_idletasks()
+    rebuild_elapsed = time.perf_counter() - started
+
+    print(f"Backend: {backend}")
+    print(f"Atualizações: {refreshes} ({fields} campos, {changes_per_refresh} alterados por vez)")
+    for name, stats, total in (('Grade diferencial', grid.stats, elapsed),
+                               ('Destruir/recriar', rebuild_stats, rebuild_elapsed)):
+        print(f"{name}: {stats['widgets_created'] / refreshes:.2f} widgets e "
+              f"{stats['tk_calls'] / refreshes:.2f} chamadas Tk por atualização "
+              f"({total / refreshes * 1000:.3f} ms)")
+
+    if root is not None:
+        root.destroy()
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,418 @@
+"""
+Sondagem de alcance (ICMP echo / TCP connect) dentro do processo
+Substitui os subprocessos "ping": o loop de rede compartilhado envia os echos de
+todos os alvos por um único socket ICMP por família e casa as respostas pelo
+número de sequência, medindo RTT, perda e jitter de centenas de alvos ao
+mesmo tempo.
+
+Linux:   socket ICMP de datagrama sem privilégios (net.ipv4.ping_group_range),
+         socket raw se o processo tiver privilégio
+Windows: IcmpSendEcho2 (iphlpapi) em um pool limitado de threads
+Demais casos (ou ICMP bloqueado): tempo de conexão TCP, em que uma recusa
+(RST) também prova que o alvo respondeu
+"""
+
+import asyncio
+import concurrent.futures
+import ctypes
+import ipaddress
+import itertools
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+from utils.async_loop import get_network_loop
+
+
+METHOD_ICMP = 'icmp'
+METHOD_TCP = 'tcp'
+
+# Portas tentadas em paralelo quando o ICMP não está disponível
+DEFAULT_TCP_PORTS = (80, 443, 22, 53, 445)
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+ICMPV6_ECHO_REQUEST = 128
+ICMPV6_ECHO_REPLY = 129
+
+_ICMP_HEADER = struct.Struct('!BBHHH')
+_PAYLOAD = b'utilitario-probe'
+
+
+class ProbeResult:
+    """Resultado da sondagem de um alvo"""
+
+    __slots__ = ('target', 'address', 'method', 'rtts', 'error')
+
+    def __init__(self, target, address='', method='', rtts=None, error=None):
+        """
+        Args:
+            target: Alvo como informado (IP ou nome)
+            address: Endereço IP efetivamente sondado
+            method: METHOD_ICMP ou METHOD_TCP
+            rtts: RTT (segundos) de cada tentativa, None para as perdidas
+            error: Exceção que impediu a sondagem (ex.: nome não resolvido)
+        """
+        self.target = target
+        self.address = address
+        self.method = method
+        self.rtts = rtts if rtts is not None else []
+        self.error = error
+
+    @property
+    def sent(self):
+        return len(self.rtts)
+
+    @property
+    def received(self):
+        return sum(1 for rtt in self.rtts if rtt is not None)
+
+    @property
+    def reachable(self):
+        """True se ao menos uma tentativa teve resposta"""
+        return self.received > 0
+
+    @property
+    def loss(self):
+        """Fração de tentativas sem resposta (0.0 a 1.0)"""
+        return 1.0 - self.received / self.sent if self.sent else 1.0
+
+    @property
+    def rtt_ms(self):
+        """RTT médio em milissegundos (None se nenhuma resposta)"""
+        answered = [rtt for rtt in self.rtts if rtt is not None]
+        return sum(answered) * 1000 / len(answered) if answered else None
+
+    @property
+    def rtt_min_ms(self):
+        answered = [rtt for rtt in self.rtts if rtt is not None]
+        return min(answered) * 1000 if answered else None
+
+    @property
+    def rtt_max_ms(self):
+        answered = [rtt for rtt in self.rtts if rtt is not None]
+        return max(answered) * 1000 if answered else None
+
+    @property
+    def jitter_ms(self):
+        """Variação média entre RTTs consecutivos respondidos, em milissegundos"""
+        answered = [rtt for rtt in self.rtts if rtt is not None]
+        if len(answered) < 2:
+            return 0.0 if answered else None
+        deltas = [abs(current - previous) for previous, current in zip(answered, answered[1:])]
+        return sum(deltas) * 1000 / len(deltas)
+
+    def summary(self):
+        """Texto curto para exibição (ex.: '1.2 ms, perda 0%, jitter 0.3 ms')"""
+        if not self.reachable:
+            return "sem resposta"
+        text = f"{self.rtt_ms:.1f} ms"
+        if self.sent > 1:
+            text += f", perda {self.loss * 100:.0f}%, jitter {self.jitter_ms:.1f} ms"
+        if self.method == METHOD_TCP:
+            text += " (TCP)"
+        return text
+
+    def __repr__(self):
+        return f"ProbeResult({self.target!r}, method={self.method!r}, sent={self.sent}, received={self.received}, rtt_ms={self.rtt_ms})"
+
+
+def _checksum(data):
+    """Checksum da Internet (RFC 1071)"""
+    if len(data) % 2:
+        data += b'\0'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+
+class _IcmpEndpoint:
+    """Socket ICMP de uma família, compartilhado por todos os alvos"""
+
+    def __init__(self, loop, family):
+        self.loop = loop
+        self.family = family
+        self.sock = None
+        self.raw = False
+        self.identifier = os.getpid() & 0xffff
+        self.sequence = itertools.count(1)
+        self.pending = {}
+        protocol = socket.IPPROTO_ICMP if family == socket.AF_INET else socket.IPPROTO_ICMPV6
+        for sock_type in (socket.SOCK_DGRAM, socket.SOCK_RAW):
+            try:
+                self.sock = socket.socket(family, sock_type, protocol)
+                self.raw = sock_type == socket.SOCK_RAW
+                break
+            except OSError:
+                continue
+        if self.sock is None:
+            raise OSError("ICMP não permitido para este processo")
+        self.sock.setblocking(False)
+        self.loop.add_reader(self.sock.fileno(), self._on_readable)
+
+    async def echo(self, address, timeout):
+        """Envia um echo e retorna o RTT em segundos (None se expirar)"""
+        sequence = next(self.sequence) & 0xffff
+        request_type = ICMP_ECHO_REQUEST if self.family == socket.AF_INET else ICMPV6_ECHO_REQUEST
+        header = _ICMP_HEADER.pack(request_type, 0, 0, self.identifier, sequence)
+        if self.family == socket.AF_INET:
+            header = _ICMP_HEADER.pack(request_type, 0, _checksum(header + _PAYLOAD), self.identifier, sequence)
+        future = self.loop.create_future()
+        self.pending[sequence] = future
+        started = time.perf_counter()
+        try:
+            self.sock.sendto(header + _PAYLOAD, (address, 0))
+            received_at = await asyncio.wait_for(future, timeout)
+            return received_at - started
+        except (asyncio.TimeoutError, OSError):
+            return None
+        finally:
+            self.pending.pop(sequence, None)
+
+    def _on_readable(self):
+        """Casa as respostas recebidas com os echos pendentes"""
+        while True:
+            try:
+                data = self.sock.recv(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            received_at = time.perf_counter()
+            if self.raw and self.family == socket.AF_INET and data:
+                # Socket raw IPv4 entrega também o cabeçalho IP
+                data = data[(data[0] & 0x0f) * 4:]
+            if len(data) < _ICMP_HEADER.size:
+                continue
+            reply_type, _, _, identifier, sequence = _ICMP_HEADER.unpack_from(data)
+            if reply_type not in (ICMP_ECHO_REPLY, ICMPV6_ECHO_REPLY):
+                continue
+            # No socket de datagrama o kernel troca o identificador e só entrega as nossas respostas
+            if self.raw and identifier != self.identifier:
+                continue
+            future = self.pending.get(sequence)
+            if future and not future.done():
+                future.set_result(received_at)
+
+    def close(self):
+        try:
+            self.loop.remove_reader(self.sock.fileno())
+        except Exception:
+            pass
+        self.sock.close()
+
+
+class ICMP_ECHO_REPLY_STRUCT(ctypes.Structure):
+    _fields_ = [
+        ('Address', ctypes.c_uint32),
+        ('Status', ctypes.c_uint32),
+        ('RoundTripTime', ctypes.c_uint32),
+        ('DataSize', ctypes.c_ushort),
+        ('Reserved', ctypes.c_ushort),
+        ('Data', ctypes.c_void_p),
+        ('Ttl', ctypes.c_ubyte),
+        ('Tos', ctypes.c_ubyte),
+        ('Flags', ctypes.c_ubyte),
+        ('OptionsSize', ctypes.c_ubyte),
+        ('OptionsData', ctypes.c_void_p),
+    ]
+
+
+class _WindowsIcmpEndpoint:
+    """Echo IPv4 via IcmpSendEcho2, executado em um pool limitado de threads"""
+
+    def __init__(self, loop, max_workers=32):
+        from utils.iphlpapi import load_iphlpapi
+
+        self.loop = loop
+        self.iphlpapi = load_iphlpapi()
+        self.iphlpapi.IcmpCreateFile.restype = ctypes.c_void_p
+        self.iphlpapi.IcmpSendEcho2.argtypes = [
+            ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint32,
+            ctypes.c_void_p, ctypes.c_ushort, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint32, ctypes.c_uint32
+        ]
+        self.iphlpapi.IcmpCloseHandle.argtypes = [ctypes.c_void_p]
+        self.handle = self.iphlpapi.IcmpCreateFile()
+        if not self.handle or self.handle == ctypes.c_void_p(-1).value:
+            raise OSError("IcmpCreateFile falhou")
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+
+    def _send(self, address, timeout):
+        destination = struct.unpack('<I', socket.inet_aton(address))[0]
+        reply_size = ctypes.sizeof(ICMP_ECHO_REPLY_STRUCT) + len(_PAYLOAD) + 8
+        reply = ctypes.create_string_buffer(reply_size)
+        request = ctypes.create_string_buffer(_PAYLOAD)
+        started = time.perf_counter()
+        count = self.iphlpapi.IcmpSendEcho2(
+            self.handle, None, None, None, destination, request, len(_PAYLOAD), None,
+            reply, reply_size, max(1, int(timeout * 1000))
+        )
+        elapsed = time.perf_counter() - started
+        if not count:
+            return None
+        # Status 0 = IP_SUCCESS
+        if ICMP_ECHO_REPLY_STRUCT.from_buffer(reply).Status != 0:
+            return None
+        return elapsed
+
+    async def echo(self, address, timeout):
+        return await self.loop.run_in_executor(self.pool, self._send, address, timeout)
+
+    def close(self):
+        self.pool.shutdown(wait=False)
+        self.iphlpapi.IcmpCloseHandle(self.handle)
+
+
+class ReachabilityProber:
+    """Sondador assíncrono de alcance com loop de eventos próprio"""
+
+    def __init__(self, tcp_ports=DEFAULT_TCP_PORTS, use_icmp=True, loop_thread=None, icmp_workers=32):
+        """
+        Args:
+            tcp_ports: Portas tentadas em paralelo na sondagem TCP
+            use_icmp: False força a sondagem por TCP (ex.: rede que descarta ICMP)
+            loop_thread: AsyncLoopThread em que os sockets são registrados
+                (padrão: o loop de rede compartilhado)
+            icmp_workers: Echos simultâneos no Windows, onde cada um ocupa uma thread
+                até a resposta ou o timeout
+        """
+        self.tcp_ports = tuple(tcp_ports)
+        self.use_icmp = use_icmp
+        self.loop_thread = loop_thread or get_network_loop()
+        self.icmp_workers = icmp_workers
+        self.endpoints = {}
+
+    def probe(self, targets, count=1, timeout=1.0, interval=0.2):
+        """
+        Sonda os alvos ao mesmo tempo e aguarda os resultados (bloqueia a thread chamadora)
+
+        Args:
+            targets: Lista de IPs ou nomes
+            count: Tentativas por alvo
+            timeout: Espera máxima por resposta de cada tentativa (segundos)
+            interval: Pausa entre tentativas do mesmo alvo (segundos)
+
+        Returns:
+            Dicionário {alvo: ProbeResult}
+        """
+        return self.loop_thread.run(self.probe_async(targets, count, timeout, interval))
+
+    def probe_one(self, target, count=1, timeout=1.0, interval=0.2):
+        """Sonda um único alvo e retorna o ProbeResult"""
+        return self.probe([target], count, timeout, interval)[target]
+
+    async def probe_async(self, targets, count=1, timeout=1.0, interval=0.2):
+        """Corrotina de sondagem; deve rodar no loop do sondador"""
+        targets = list(dict.fromkeys(targets))
+        results = await asyncio.gather(*(self._probe_target(target, count, timeout, interval) for target in targets))
+        return dict(zip(targets, results))
+
+    def close(self):
+        """Fecha os sockets do sondador (o loop compartilhado continua ativo)"""
+        def close_endpoints():
+            for endpoint in self.endpoints.values():
+                if endpoint:
+                    endpoint.close()
+            self.endpoints = {}
+        self.loop_thread.call_soon(close_endpoints)
+
+    async def _probe_target(self, target, count, timeout, interval):
+        """Executa as tentativas de um alvo pelo melhor método disponível"""
+        result = ProbeResult(target)
+        try:
+            address = await self._resolve(target)
+        except (OSError, ValueError) as e:
+            result.error = e
+            return result
+        result.address = address
+        endpoint = self._icmp_endpoint(ipaddress.ip_address(address).version) if self.use_icmp else None
+        result.method = METHOD_ICMP if endpoint else METHOD_TCP
+        for attempt in range(count):
+            if attempt and interval:
+                await asyncio.sleep(interval)
+            if endpoint:
+                rtt = await endpoint.echo(address, timeout)
+            else:
+                rtt = await self._tcp_rtt(address, timeout)
+            result.rtts.append(rtt)
+        return result
+
+    async def _resolve(self, target):
+        """Retorna o IP do alvo (resolvendo nomes pelo loop)"""
+        try:
+            return str(ipaddress.ip_address(target))
+        except ValueError:
+            pass
+        infos = await asyncio.get_event_loop().getaddrinfo(target, None, type=socket.SOCK_STREAM)
+        if not infos:
+            raise OSError(f"Nome não resolvido: {target}")
+        return infos[0][4][0]
+
+    def _icmp_endpoint(self, version):
+        """Socket ICMP da família (criado na primeira vez; None se não permitido)"""
+        if version not in self.endpoints:
+            try:
+                loop = asyncio.get_event_loop()
+                if sys.platform == "win32":
+                    endpoint = _WindowsIcmpEndpoint(loop, self.icmp_workers) if version == 4 else None
+                else:
+                    family = socket.AF_INET if version == 4 else socket.AF_INET6
+                    endpoint = _IcmpEndpoint(loop, family)
+            except (OSError, AttributeError) as e:
+                print(f"ICMP indisponível (IPv{version}), usando TCP: {e}")  # Debug
+                endpoint = None
+            self.endpoints[version] = endpoint
+        return self.endpoints[version]
+
+    async def _tcp_rtt(self, address, timeout):
+        """Tempo até a primeira porta aceitar ou recusar a conexão (None se nenhuma responder)"""
+        tasks = [asyncio.ensure_future(self._tcp_connect(address, port, timeout)) for port in self.tcp_ports]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                rtt = await next_done
+                if rtt is not None:
+                    return rtt
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    async def _tcp_connect(address, port, timeout):
+        started = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(address, port), timeout)
+            elapsed = time.perf_counter() - started
+            writer.close()
+            return elapsed
+        except ConnectionRefusedError:
+            # RST: o alvo está ativo, apenas a porta está fechada
+            return time.perf_counter() - started
+        except (asyncio.TimeoutError, OSError):
+            return None
+
+
+_shared_prober = None
+_shared_prober_lock = threading.Lock()
+
+
+def get_prober():
+    """Retorna o sondador compartilhado pelo aplicativo"""
+    global _shared_prober
+    with _shared_prober_lock:
+        if _shared_prober is None:
+            _shared_prober = ReachabilityProber()
+        return _shared_prober
+
+
+if __name__ == "__main__":
+    targets = sys.argv[1:] or ['127.0.0.1']
+    started = time.perf_counter()
+    results = get_prober().probe(targets, count=4, timeout=1.0, interval=0.1)
+    print(f"{len(results)} alvo(s) em {(time.perf_counter() - started) * 1000:.0f} ms")
+    for target, result in results.items():
+        print(f"  {target:<20} {result.method:<5} {result.summary()}")
@@ -0,0 +1,427 @@
+"""
+Leitura nativa da tabela de rotas com índice de maior prefixo (longest prefix match)
+As rotas ficam em uma trie binária por família (IPv4/IPv6): a consulta de
+"qual interface e próximo salto alcançam o destino X" percorre no máximo
+32 (ou 128) níveis, independentemente do tamanho da tabela.
+
+Windows: GetIpForwardTable2 (iphlpapi) via ctypes
+Linux:   netlink (RTM_GETROUTE), com /proc/net/route e /proc/net/ipv6_route como alternativa
+"""
+
+import ctypes
+import ipaddress
+import socket
+import struct
+import sys
+import threading
+
+from utils import netlink
+from utils.iphlpapi import (
+    AF_UNSPEC, ERROR_SUCCESS, IP_ADDRESS_PREFIX, SOCKADDR_INET, load_iphlpapi, sockaddr_inet_to_ip
+)
+
+
+class Route:
+    """Uma entrada da tabela de rotas"""
+
+    __slots__ = ('network', 'next_hop', 'interface_index', 'interface_name', 'metric', 'protocol')
+
+    def __init__(self, network, next_hop='', interface_index=None, interface_name='', metric=0, protocol=''):
+        """
+        Args:
+            network: ipaddress.IPv4Network ou IPv6Network de destino
+            next_hop: Próximo salto em texto ('' = rede diretamente conectada)
+            interface_index: Índice da interface de saída
+            interface_name: Nome da interface de saída (se conhecido)
+            metric: Métrica da rota (menor vence entre prefixos iguais)
+            protocol: Origem da rota (ex.: 'dhcp', 'static', 'kernel')
+        """
+        self.network = network
+        self.next_hop = next_hop
+        self.interface_index = interface_index
+        self.interface_name = interface_name
+        self.metric = metric
+        self.protocol = protocol
+
+    def key(self):
+        """Identidade da rota para comparar tabelas"""
+        return (self.network, self.next_hop, self.interface_index, self.metric)
+
+    @property
+    def is_default(self):
+        """True para a rota padrão (0.0.0.0/0 ou ::/0)"""
+        return self.network.prefixlen == 0
+
+    def __repr__(self):
+        via = self.next_hop or 'on-link'
+        return f"Route({self.network} via {via} dev {self.interface_name or self.interface_index} metric {self.metric})"
+
+
+class PrefixTrie:
+    """Trie binária de prefixos de uma família de endereços"""
+
+    def __init__(self, max_length):
+        """
+        Args:
+            max_length: Número de bits do endereço (32 para IPv4, 128 para IPv6)
+        """
+        self.max_length = max_length
+        # Cada nó é [filho_0, filho_1, rotas]; rotas é None ou lista ordenada por métrica
+        self.root = [None, None, None]
+        self.size = 0
+
+    def insert(self, network, route):
+        """Adiciona uma rota ao prefixo (mantém as rotas do prefixo ordenadas por métrica)"""
+        node = self._walk(network, create=True)
+        if node[2] is None:
+            node[2] = []
+        node[2].append(route)
+        node[2].sort(key=lambda item: item.metric)
+        self.size += 1
+
+    def remove(self, network, route_key):
+        """Remove a rota com a identidade informada; retorna True se encontrou"""
+        node = self._walk(network, create=False)
+        if node is None or not node[2]:
+            return False
+        for index, route in enumerate(node[2]):
+            if route.key() == route_key:
+                del node[2][index]
+                if not node[2]:
+                    node[2] = None
+                self.size -= 1
+                return True
+        return False
+
+    def lookup(self, address):
+        """
+        Retorna as rotas do maior prefixo que contém o endereço (melhor métrica primeiro)
+
+        Args:
+            address: Endereço como inteiro
+        """
+        node = self.root
+        best = node[2]
+        for depth in range(self.max_length):
+            bit = (address >> (self.max_length - 1 - depth)) & 1
+            node = node[bit]
+            if node is None:
+                break
+            if node[2]:
+                best = node[2]
+        return list(best) if best else []
+
+    def routes_at(self, network):
+        """Rotas exatamente deste prefixo (melhor métrica primeiro), sem buscar prefixos maiores"""
+        node = self._walk(network, create=False)
+        return list(node[2]) if node is not None and node[2] else []
+
+    def _walk(self, network, create):
+        """Desce até o nó do prefixo (criando os nós intermediários se create)"""
+        address = int(network.network_address)
+        node = self.root
+        for depth in range(network.prefixlen):
+            bit = (address >> (self.max_length - 1 - depth)) & 1
+            child = node[bit]
+            if child is None:
+                if not create:
+                    return None
+                child = [None, None, None]
+                node[bit] = child
+            node = child
+        return node
+
+
+class RoutingTable:
+    """Tabela de rotas indexada por maior prefixo, atualizada incrementalmente"""
+
+    def __init__(self, reader=None):
+        """
+        Args:
+            reader: Função sem argumentos que retorna a lista de Route atual
+                (padrão: read_routes, da plataforma)
+        """
+        self.reader = reader or read_routes
+        self.tries = {4: PrefixTrie(32), 6: PrefixTrie(128)}
+        self.routes = {}
+        self.loaded = False
+        self.lock = threading.Lock()
+        self.last_changes = {'added': 0, 'removed': 0}
+
+    def refresh(self):
+        """
+        Relê a tabela do sistema e aplica ao índice só as rotas que mudaram
+
+        Returns:
+            Dicionário com o número de rotas adicionadas e removidas
+        """
+        current = {route.key(): route for route in self.reader()}
+        with self.lock:
+            removed = [key for key in self.routes if key not in current]
+            added = [key for key in current if key not in self.routes]
+            for key in removed:
+                route = self.routes.pop(key)
+                self.tries[route.network.version].remove(route.network, key)
+            for key in added:
+                route = current[key]
+                self.routes[key] = route
+                self.tries[route.network.version].insert(route.network, route)
+            self.loaded = True
+            self.last_changes = {'added': len(added), 'removed': len(removed)}
+            return dict(self.last_changes)
+
+    def lookup(self, destination):
+        """
+        Retorna a melhor rota para o destino (None se nenhuma rota o alcança)
+
+        Args:
+            destination: Endereço IP em texto ou objeto ipaddress
+        """
+        address = ipaddress.ip_address(destination)
+        with self.lock:
+            candidates = self.tries[address.version].lookup(int(address))
+        return candidates[0] if candidates else None
+
+    def default_gateway(self, version=4):
+        """Próximo salto da melhor rota padrão ('' se não houver)"""
+        # Lê o prefixo /0 direto: com rotas padrão divididas (0.0.0.0/1 e 128.0.0.0/1,
+        # instaladas por VPNs) a maior correspondência de 0.0.0.0 seria o /1
+        default = ipaddress.ip_network('0.0.0.0/0' if version == 4 else '::/0')
+        with self.lock:
+            candidates = self.tries[version].routes_at(default)
+        return candidates[0].next_hop if candidates else ''
+
+    def explain(self, destination):
+        """
+        Explica como o sistema alcançaria o destino
+
+        Returns:
+            Dicionário com destination, prefix, next_hop, interface, metric, protocol
+            e alternatives (outras rotas do mesmo prefixo), ou None se não houver rota
+        """
+        address = ipaddress.ip_address(destination)
+        with self.lock:
+            candidates = self.tries[address.version].lookup(int(address))
+        if not candidates:
+            return None
+        best = candidates[0]
+        return {
+            'destination': str(address),
+            'prefix': str(best.network),
+            'next_hop': best.next_hop or 'on-link',
+            'interface': best.interface_name or str(best.interface_index or ''),
+            'metric': best.metric,
+            'protocol': best.protocol,
+            'alternatives': candidates[1:]
+        }
+
+    def __len__(self):
+        with self.lock:
+            return len(self.routes)
+
+
+# === Windows: GetIpForwardTable2 ===
+
+class MIB_IPFORWARD_ROW2(ctypes.Structure):
+    _fields_ = [
+        ('InterfaceLuid', ctypes.c_uint64),
+        ('InterfaceIndex', ctypes.c_uint32),
+        ('DestinationPrefix', IP_ADDRESS_PREFIX),
+        ('NextHop', SOCKADDR_INET),
+        ('SitePrefixLength', ctypes.c_ubyte),
+        ('ValidLifetime', ctypes.c_uint32),
+        ('PreferredLifetime', ctypes.c_uint32),
+        ('Metric', ctypes.c_uint32),
+        ('Protocol', ctypes.c_int),
+        ('Loopback', ctypes.c_ubyte),
+        ('AutoconfigureAddress', ctypes.c_ubyte),
+        ('Publish', ctypes.c_ubyte),
+        ('Immortal', ctypes.c_ubyte),
+        ('Age', ctypes.c_uint32),
+        ('Origin', ctypes.c_int),
+    ]
+
+
+class MIB_IPFORWARD_TABLE2(ctypes.Structure):
+    _fields_ = [
+        ('NumEntries', ctypes.c_uint32),
+        ('Table', MIB_IPFORWARD_ROW2 * 1),
+    ]
+
+
+_WINDOWS_PROTOCOLS = {2: 'local', 3: 'static', 4: 'icmp', 8: 'rip', 13: 'ospf', 14: 'bgp', 10002: 'ndp'}
+
+
+def _windows_routes():
+    """Lê as rotas IPv4 e IPv6 com GetIpForwardTable2"""
+    from utils.native_interfaces import get_adapters
+
+    iphlpapi = load_iphlpapi()
+    names = {adapter['interface_index']: adapter['name'] for adapter in get_adapters()}
+    table = ctypes.POINTER(MIB_IPFORWARD_TABLE2)()
+    result = iphlpapi.GetIpForwardTable2(AF_UNSPEC, ctypes.byref(table))
+    if result != ERROR_SUCCESS:
+        raise OSError(result, "GetIpForwardTable2 falhou")
+    try:
+        count = table.contents.NumEntries
+        rows = ctypes.cast(
+            ctypes.addressof(table.contents.Table),
+            ctypes.POINTER(MIB_IPFORWARD_ROW2 * count)
+        ).contents
+        routes = []
+        for row in rows:
+            prefix = sockaddr_inet_to_ip(row.DestinationPrefix.Prefix)
+            if not prefix:
+                continue
+            next_hop = sockaddr_inet_to_ip(row.NextHop)
+            if next_hop in ('0.0.0.0', '::'):
+                next_hop = ''
+            routes.append(Route(
+                ipaddress.ip_network(f"{prefix}/{row.DestinationPrefix.PrefixLength}", strict=False),
+                next_hop=next_hop,
+                interface_index=row.InterfaceIndex,
+                interface_name=names.get(row.InterfaceIndex, ''),
+                metric=row.Metric,
+                protocol=_WINDOWS_PROTOCOLS.get(row.Protocol, str(row.Protocol))
+            ))
+        return routes
+    finally:
+        iphlpapi.FreeMibTable(table)
+
+
+# === Linux: netlink RTM_GETROUTE e /proc/net ===
+
+RTM_NEWROUTE = 24
+RTA_DST = 1
+RTA_OIF = 4
+RTA_GATEWAY = 5
+RTA_PRIORITY = 6
+RTA_TABLE = 15
+RT_TABLE_MAIN = 254
+RT_TABLE_LOCAL = 255
+RTN_UNICAST = 1
+RTN_LOCAL = 2
+
+_RTMSG = struct.Struct('=BBBBBBBBI')
+_LINUX_PROTOCOLS = {2: 'kernel', 3: 'boot', 4: 'static', 16: 'dhcp', 186: 'bgp', 188: 'ospf', 9: 'ra'}
+
+
+def _linux_routes_netlink():
+    """Lê as rotas da tabela principal (e as locais da tabela local) via netlink"""
+    names = dict(socket.if_nameindex())
+    routes = []
+    for message_type, body in netlink.dump(netlink.RTM_GETROUTE, _RTMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0, 0, 0, 0, 0)):
+        if message_type != RTM_NEWROUTE or len(body) < _RTMSG.size:
+            continue
+        family, dst_len, _, _, table, protocol, _, route_type, _ = _RTMSG.unpack_from(body)
+        if route_type not in (RTN_UNICAST, RTN_LOCAL) or family not in (socket.AF_INET, socket.AF_INET6):
+            continue
+        attributes = netlink.parse_attributes(body, _RTMSG.size)
+        if RTA_TABLE in attributes:
+            table = struct.unpack('=I', attributes[RTA_TABLE][:4])[0]
+        if (table, route_type) not in ((RT_TABLE_MAIN, RTN_UNICAST), (RT_TABLE_LOCAL, RTN_LOCAL)):
+            continue
+        if RTA_DST in attributes:
+            destination = socket.inet_ntop(family, attributes[RTA_DST])
+        else:
+            destination = '0.0.0.0' if family == socket.AF_INET else '::'
+        next_hop = socket.inet_ntop(family, attributes[RTA_GATEWAY]) if RTA_GATEWAY in attributes else ''
+        index = struct.unpack('=I', attributes[RTA_OIF][:4])[0] if RTA_OIF in attributes else None
+        metric = struct.unpack('=I', attributes[RTA_PRIORITY][:4])[0] if RTA_PRIORITY in attributes else 0
+        routes.append(Route(
+            ipaddress.ip_network(f"{destination}/{dst_len}", strict=False),
+            next_hop=next_hop,
+            interface_index=index,
+            interface_name=names.get(index, ''),
+            metric=metric,
+            protocol='local' if route_type == RTN_LOCAL else _LINUX_PROTOCOLS.get(protocol, str(protocol))
+        ))
+    return routes
+
+
+def _linux_routes_proc():
+    """Lê as rotas de /proc/net/route e /proc/net/ipv6_route"""
+    names = {name: index for index, name in socket.if_nameindex()}
+    routes = []
+    try:
+        with open("/proc/net/route") as f:
+            next(f, None)
+            for line in f:
+                parts = line.split()
+                if len(parts) < 8:
+                    continue
+                destination = socket.inet_ntoa(struct.pack('<I', int(parts[1], 16)))
+                gateway = socket.inet_ntoa(struct.pack('<I', int(parts[2], 16)))
+                mask = socket.inet_ntoa(struct.pack('<I', int(parts[7], 16)))
+                routes.append(Route(
+                    ipaddress.ip_network(f"{destination}/{mask}", strict=False),
+                    next_hop='' if gateway == '0.0.0.0' else gateway,
+                    interface_index=names.get(parts[0]),
+                    interface_name=parts[0],
+                    metric=int(parts[6])
+                ))
+    except OSError:
+        pass
+    try:
+        with open("/proc/net/ipv6_route") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) < 10 or parts[9] == 'lo':
+                    continue
+                destination = ipaddress.IPv6Address(bytes.fromhex(parts[0]))
+                gateway = ipaddress.IPv6Address(bytes.fromhex(parts[4]))
+                routes.append(Route(
+                    ipaddress.ip_network(f"{destination}/{int(parts[1], 16)}", strict=False),
+                    next_hop='' if gateway.is_unspecified else str(gateway),
+                    interface_index=names.get(parts[9]),
+                    interface_name=parts[9],
+                    metric=int(parts[5], 16)
+                ))
+    except OSError:
+        pass
+    return routes
+
+
+def read_routes():
+    """
+    Lê a tabela de rotas do sistema
+
+    Returns:
+        Lista de Route (vazia se não houver suporte)
+    """
+    if sys.platform == "win32":
+        return _windows_routes()
+    if sys.platform.startswith("linux"):
+        if netlink.is_available():
+            try:
+                return _linux_routes_netlink()
+            except OSError as e:
+                print(f"Netlink indisponível para rotas: {e}")
+        return _linux_routes_proc()
+    return []
+
+
+if __name__ == "__main__":
+    import time
+
+    # Rotas padrão divididas de VPN sobre a rota padrão da rede local
+    split = RoutingTable(reader=lambda: [
+        Route(ipaddress.ip_network('0.0.0.0/0'), '192.168.10.1', 12, metric=25),
+        Route(ipaddress.ip_network('0.0.0.0/1'), '10.8.0.1', 40, metric=5),
+        Route(ipaddress.ip_network('128.0.0.0/1'), '10.8.0.1', 40, metric=5),
+        Route(ipaddress.ip_network('::/0'), 'fe80::1', 12, metric=25),
+    ])
+    split.refresh()
+    if split.default_gateway() != '192.168.10.1' or split.default_gateway(6) != 'fe80::1':
+        print(f"  FALHOU: rota padrão com VPN: {split.default_gateway()!r} {split.default_gateway(6)!r}")
+    if split.lookup('8.8.8.8').next_hop != '10.8.0.1':
+        print("  FALHOU: destino externo pela VPN")
+    if RoutingTable(reader=list).default_gateway() != '':
+        print("  FALHOU: tabela sem rota padrão")
+
+    table = RoutingTable()
+    started = time.perf_counter()
+    table.refresh()
+    print(f"{len(table)} rota(s) carregadas em {(time.perf_counter() - started) * 1000:.2f} ms")
+    for destination in sys.argv[1:] or ['8.8.8.8']:
+        print(destination, '->', table.explain(destination))
@@ -0,0 +1,594 @@
+"""
+Cliente SNMP v2c assíncrono em Python puro (codificação BER própria)
+Substitui o "snmpget" e o objeto COM oleprn.OleSNMP: todas as consultas usam
+um único socket UDP no loop de rede compartilhado, as communities candidatas
+são testadas ao mesmo tempo, vários OIDs vão no mesmo PDU e as tabelas são
+percorridas com GETBULK.
+
+StandInAgent é um agente UDP local, com respostas pré-definidas e atraso
+simulado, para testes e benchmarks sem equipamento de rede.
+"""
+
+import asyncio
+import bisect
+import itertools
+import random
+import socket
+import sys
+import time
+
+from utils.async_loop import get_network_loop
+
+
+SNMP_PORT = 161
+SNMP_VERSION_2C = 1
+
+# OIDs do grupo "system" (RFC 1213)
+OID_SYS_DESCR = '1.3.6.1.2.1.1.1.0'
+OID_SYS_OBJECT_ID = '1.3.6.1.2.1.1.2.0'
+OID_SYS_UPTIME = '1.3.6.1.2.1.1.3.0'
+OID_SYS_CONTACT = '1.3.6.1.2.1.1.4.0'
+OID_SYS_NAME = '1.3.6.1.2.1.1.5.0'
+OID_SYS_LOCATION = '1.3.6.1.2.1.1.6.0'
+
+DEFAULT_COMMUNITIES = ('public', 'private', 'community')
+
+# Tags BER (universais, de aplicação SNMP e de contexto)
+TAG_INTEGER = 0x02
+TAG_OCTET_STRING = 0x04
+TAG_NULL = 0x05
+TAG_OID = 0x06
+TAG_SEQUENCE = 0x30
+TAG_IP_ADDRESS = 0x40
+TAG_COUNTER32 = 0x41
+TAG_GAUGE32 = 0x42
+TAG_TIMETICKS = 0x43
+TAG_OPAQUE = 0x44
+TAG_COUNTER64 = 0x46
+TAG_NO_SUCH_OBJECT = 0x80
+TAG_NO_SUCH_INSTANCE = 0x81
+TAG_END_OF_MIB_VIEW = 0x82
+
+PDU_GET = 0xA0
+PDU_GET_NEXT = 0xA1
+PDU_RESPONSE = 0xA2
+PDU_GET_BULK = 0xA5
+
+_UNSIGNED_TAGS = (TAG_COUNTER32, TAG_GAUGE32, TAG_TIMETICKS, TAG_COUNTER64)
+
+
+class SnmpError(Exception):
+    """Erro retornado pelo agente (error-status diferente de zero)"""
+
+    def __init__(self, status, index=0):
+        super().__init__(f"Erro SNMP {status} no varbind {index}")
+        self.status = status
+        self.index = index
+
+
+class SnmpTimeout(SnmpError):
+    """O agente não respondeu (community errada, ACL ou agente inexistente)"""
+
+    def __init__(self, host):
+        Exception.__init__(self, f"Sem resposta SNMP de {host}")
+        self.status = None
+        self.index = 0
+        self.host = host
+
+
+class _Exception:
+    """Valores de exceção do SNMP v2 (noSuchObject, noSuchInstance, endOfMibView)"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+
+NO_SUCH_OBJECT = _Exception('noSuchObject')
+NO_SUCH_INSTANCE = _Exception('noSuchInstance')
+END_OF_MIB_VIEW = _Exception('endOfMibView')
+_EXCEPTION_VALUES = {
+    TAG_NO_SUCH_OBJECT: NO_SUCH_OBJECT,
+    TAG_NO_SUCH_INSTANCE: NO_SUCH_INSTANCE,
+    TAG_END_OF_MIB_VIEW: END_OF_MIB_VIEW
+}
+
+
+def is_exception(value):
+    """True para noSuchObject, noSuchInstance e endOfMibView"""
+    return isinstance(value, _Exception)
+
+
+class IpAddress(str):
+    """IpAddress do SNMP (texto, mas codificado com a tag de aplicação)"""
+
+
+class TimeTicks(int):
+    """TimeTicks do SNMP (centésimos de segundo)"""
+
+
+def as_text(value):
+    """Converte um OCTET STRING em texto (UTF-8, com latin-1 como alternativa)"""
+    if isinstance(value, bytes):
+        try:
+            return value.decode('utf-8').strip('\0').strip()
+        except UnicodeDecodeError:
+            return value.decode('latin-1').strip('\0').strip()
+    return '' if value is None or is_exception(value) else str(value)
+
+
+def oid_tuple(oid):
+    """Converte '1.3.6.1...' (com ou sem ponto inicial) em tupla de inteiros"""
+    return tuple(int(part) for part in oid.strip('.').split('.') if part)
+
+
+def oid_in_subtree(oid, root):
+    """True se o OID pertence à subárvore root"""
+    oid, root = oid_tuple(oid), oid_tuple(root)
+    return oid[:len(root)] == root and len(oid) > len(root)
+
+
+# === Codificação BER ===
+
+def _encode_length(length):
+    if length < 0x80:
+        return bytes((length,))
+    data = length.to_bytes((length.bit_length() + 7) // 8, 'big')
+    return bytes((0x80 | len(data),)) + data
+
+
+def _encode_tlv(tag, value):
+    return bytes((tag,)) + _encode_length(len(value)) + value
+
+
+def _encode_integer(tag, value, signed=True):
+    length = max(1, (value.bit_length() + 8) // 8) if signed else max(1, (value.bit_length() + 7) // 8)
+    data = value.to_bytes(length, 'big', signed=signed)
+    if not signed and data[0] & 0x80:
+        data = b'\0' + data
+    return _encode_tlv(tag, data)
+
+
+def _encode_oid(oid):
+    parts = oid_tuple(oid)
+    if len(parts) < 2:
+        raise ValueError(f"OID inválido: {oid}")
+    data = bytearray((parts[0] * 40 + parts[1],))
+    for part in parts[2:]:
+        chunk = [part & 0x7f]
+        part >>= 7
+        while part:
+            chunk.append(0x80 | (part & 0x7f))
+            part >>= 7
+        data.extend(reversed(chunk))
+    return _encode_tlv(TAG_OID, bytes(data))
+
+
+def encode_value(value):
+    """Codifica um valor Python no tipo SNMP correspondente"""
+    if value is None:
+        return _encode_tlv(TAG_NULL, b'')
+    if is_exception(value):
+        tag = next(tag for tag, item in _EXCEPTION_VALUES.items() if item is value)
+        return _encode_tlv(tag, b'')
+    if isinstance(value, IpAddress):
+        return _encode_tlv(TAG_IP_ADDRESS, socket.inet_aton(value))
+    if isinstance(value, TimeTicks):
+        return _encode_integer(TAG_TIMETICKS, int(value), signed=False)
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int):
+        return _encode_integer(TAG_INTEGER, value)
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    if isinstance(value, (bytes, bytearray)):
+        return _encode_tlv(TAG_OCTET_STRING, bytes(value))
+    if isinstance(value, tuple):
+        return _encode_oid('.'.join(str(part) for part in value))
+    raise TypeError(f"Tipo SNMP não suportado: {type(value).__name__}")
+
+
+def encode_message(community, pdu_type, request_id, varbinds, error_status=0, error_index=0):
+    """
+    Codifica uma mensagem SNMP v2c
+
+    Args:
+        community: Community string
+        pdu_type: PDU_GET, PDU_GET_NEXT, PDU_GET_BULK ou PDU_RESPONSE
+        request_id: Identificador do pedido
+        varbinds: Lista de (oid, valor); nos pedidos o valor é None
+        error_status: error-status (non-repeaters no GETBULK)
+        error_index: error-index (max-repetitions no GETBULK)
+    """
+    encoded_varbinds = b''.join(
+        _encode_tlv(TAG_SEQUENCE, _encode_oid(oid) + encode_value(value)) for oid, value in varbinds
+    )
+    pdu = _encode_tlv(pdu_type, (
+        _encode_integer(TAG_INTEGER, request_id)
+        + _encode_integer(TAG_INTEGER, error_status)
+        + _encode_integer(TAG_INTEGER, error_index)
+        + _encode_tlv(TAG_SEQUENCE, encoded_varbinds)
+    ))
+    if isinstance(community, str):
+        community = community.encode('utf-8')
+    return _encode_tlv(TAG_SEQUENCE, (
+        _encode_integer(TAG_INTEGER, SNMP_VERSION_2C) + _encode_tlv(TAG_OCTET_STRING, community) + pdu
+    ))
+
+
+# === Decodificação BER ===
+
+def _decode_tlv(data, offset):
+    """Retorna (tag, início do valor, fim do valor)"""
+    if offset + 2 > len(data):
+        raise ValueError("Mensagem SNMP truncada")
+    tag = data[offset]
+    length = data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        count = length & 0x7f
+        length = int.from_bytes(data[offset:offset + count], 'big')
+        offset += count
+    end = offset + length
+    if end > len(data):
+        raise ValueError("Mensagem SNMP truncada")
+    return tag, offset, end
+
+
+def _decode_oid(data):
+    if not data:
+        return ''
+    parts = [data[0] // 40, data[0] % 40] if data[0] < 80 else [2, data[0] - 80]
+    value = 0
+    for byte in data[1:]:
+        value = (value << 7) | (byte & 0x7f)
+        if not byte & 0x80:
+            parts.append(value)
+            value = 0
+    return '.'.join(str(part) for part in parts)
+
+
+def decode_value(tag, data):
+    """Decodifica um valor SNMP em tipo Python"""
+    if tag == TAG_INTEGER:
+        return int.from_bytes(data, 'big', signed=True)
+    if tag == TAG_TIMETICKS:
+        return TimeTicks(int.from_bytes(data, 'big'))
+    if tag in _UNSIGNED_TAGS:
+        return int.from_bytes(data, 'big')
+    if tag in (TAG_OCTET_STRING, TAG_OPAQUE):
+        return bytes(data)
+    if tag == TAG_OID:
+        return _decode_oid(data)
+    if tag == TAG_IP_ADDRESS:
+        return IpAddress(socket.inet_ntoa(bytes(data))) if len(data) == 4 else bytes(data)
+    if tag in _EXCEPTION_VALUES:
+        return _EXCEPTION_VALUES[tag]
+    return None
+
+
+def decode_message(data):
+    """
+    Decodifica uma mensagem SNMP v2c
+
+    Returns:
+        Dicionário com version, community, pdu_type, request_id, error_status,
+        error_index e varbinds (lista de (oid, valor))
+
+    Raises:
+        ValueError: Se a mensagem estiver malformada
+    """
+    tag, start, end = _decode_tlv(data, 0)
+    if tag != TAG_SEQUENCE:
+        raise ValueError("Mensagem SNMP inválida")
+    tag, value_start, offset = _decode_tlv(data, start)
+    version = int.from_bytes(data[value_start:offset], 'big', signed=True)
+    tag, value_start, offset = _decode_tlv(data, offset)
+    community = bytes(data[value_start:offset])
+    pdu_type, offset, pdu_end = _decode_tlv(data, offset)
+    fields = []
+    for _ in range(3):
+        tag, value_start, offset = _decode_tlv(data, offset)
+        fields.append(int.from_bytes(data[value_start:offset], 'big', signed=True))
+    tag, offset, varbinds_end = _decode_tlv(data, offset)
+    varbinds = []
+    while offset < varbinds_end:
+        tag, varbind_start, varbind_end = _decode_tlv(data, offset)
+        tag, oid_start, oid_end = _decode_tlv(data, varbind_start)
+        oid = _decode_oid(data[oid_start:oid_end])
+        tag, value_start, value_end = _decode_tlv(data, oid_end)
+        varbinds.append((oid, decode_value(tag, data[value_start:value_end])))
+        offset = varbind_end
+    return {
+        'version': version,
+        'community': community,
+        'pdu_type': pdu_type,
+        'request_id': fields[0],
+        'error_status': fields[1],
+        'error_index': fields[2],
+        'varbinds': varbinds
+    }
+
+
+# === Cliente ===
+
+class _ClientProtocol(asyncio.DatagramProtocol):
+    """Entrega as respostas ao pedido pendente com o mesmo request-id"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def datagram_received(self, data, address):
+        self.client._on_response(data, address)
+
+    def error_received(self, exc):
+        # ICMP port unreachable: o agente não existe; os pedidos expiram normalmente
+        pass
+
+
+class SnmpClient:
+    """Cliente SNMP v2c assíncrono sobre um único socket UDP"""
+
+    def __init__(self, port=SNMP_PORT, timeout=1.0, retries=1, loop_thread=None):
+        """
+        Args:
+            port: Porta UDP dos agentes (161)
+            timeout: Espera por resposta de cada tentativa (segundos)
+            retries: Reenvios após a primeira tentativa sem resposta
+            loop_thread: AsyncLoopThread em que o socket é registrado
+                (padrão: o loop de rede compartilhado)
+        """
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.loop_thread = loop_thread or get_network_loop()
+        self.transports = {}
+        self.pending = {}
+        self.request_ids = itertools.count(random.randint(1, 0x3fffffff))
+        self.stats = {'requests': 0, 'responses': 0, 'timeouts': 0}
+
+    # --- API síncrona (para as threads do aplicativo) ---
+
+    def get(self, host, oids, community='public'):
+        """GET de vários OIDs em um único PDU; retorna {oid: valor}"""
+        return self.loop_thread.run(self.get_async(host, oids, community))
+
+    def walk(self, host, root, community='public', max_repetitions=25):
+        """Percorre a subárvore com GETBULK; retorna lista de (oid, valor)"""
+        return self.loop_thread.run(self.walk_async(host, root, community, max_repetitions))
+
+    def find_community(self, host, communities=DEFAULT_COMMUNITIES, oids=(OID_SYS_DESCR, OID_SYS_NAME)):
+        """Testa as communities ao mesmo tempo; retorna (community, {oid: valor}) ou (None, {})"""
+        return self.loop_thread.run(self.find_community_async(host, communities, oids))
+
+    def close(self):
+        """Fecha os sockets do cliente"""
+        def close_transports():
+            for transport in self.transports.values():
+                transport.close()
+            self.transports = {}
+        self.loop_thread.call_soon(close_transports)
+
+    # --- API assíncrona (no loop de rede) ---
+
+    async def get_async(self, host, oids, community='public'):
+        response = await self._request(host, community, PDU_GET, [(oid, None) for oid in oids])
+        return dict(response['varbinds'])
+
+    async def get_next_async(self, host, oids, community='public'):
+        response = await self._request(host, community, PDU_GET_NEXT, [(oid, None) for oid in oids])
+        return response['varbinds']
+
+    async def get_bulk_async(self, host, oids, community='public', non_repeaters=0, max_repetitions=25):
+        response = await self._request(
+            host, community, PDU_GET_BULK, [(oid, None) for oid in oids], non_repeaters, max_repetitions
+        )
+        return response['varbinds']
+
+    async def walk_async(self, host, root, community='public', max_repetitions=25):
+        """Percorre a subárvore root com GETBULK; retorna lista de (oid, valor)"""
+        return [item async for item in self.walk_iter_async(host, root, community, max_repetitions)]
+
+    async def walk_iter_async(self, host, root, community='public', max_repetitions=25):
+        """
+        Percorre a subárvore root com GETBULK, entregando (oid, valor) à medida que chegam
+
+        Só um lote de max_repetitions linhas fica em memória por vez, então
+        tabelas grandes (ex.: FDB com dezenas de milhares de MACs) podem ser
+        filtradas sem serem acumuladas.
+        """
+        root = root.strip('.')
+        prefix = root + '.'
+        current, current_key = root, oid_tuple(root)
+        while True:
+            varbinds = await self.get_bulk_async(host, [current], community, 0, max_repetitions)
+            if not varbinds:
+                return
+            for oid, value in varbinds:
+                if value is END_OF_MIB_VIEW or not oid.startswith(prefix):
+                    return
+                key = oid_tuple(oid)
+                if key <= current_key:
+                    # Agente fora de ordem: evita laço infinito
+                    return
+                yield oid, value
+                current, current_key = oid, key
+
+    async def find_community_async(self, host, communities=DEFAULT_COMMUNITIES,
+                                   oids=(OID_SYS_DESCR, OID_SYS_NAME)):
+        """
+        Envia o mesmo GET com cada community ao mesmo tempo
+
+        Agentes descartam em silêncio as communities erradas, então a primeira
+        resposta identifica a community válida; a espera total é a de um único
+        pedido, e não a soma das tentativas.
+        """
+        async def attempt(community):
+            return community, await self.get_async(host, oids, community)
+
+        tasks = [asyncio.ensure_future(attempt(community)) for community in dict.fromkeys(communities)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    return await next_done
+                except SnmpError:
+                    continue
+            return None, {}
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _request(self, host, community, pdu_type, varbinds, error_status=0, error_index=0):
+        """Envia o pedido (com reenvios) e aguarda a resposta correspondente"""
+        transport = await self._transport_for(host)
+        loop = asyncio.get_event_loop()
+        for _ in range(self.retries + 1):
+            request_id = next(self.request_ids) & 0x7fffffff
+            message = encode_message(community, pdu_type, request_id, varbinds, error_status, error_index)
+            future = loop.create_future()
+            self.pending[request_id] = future
+            self.stats['requests'] += 1
+            try:
+                transport.sendto(message, (host, self.port))
+                response = await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError:
+                self.stats['timeouts'] += 1
+                continue
+            finally:
+                self.pending.pop(request_id, None)
+            if response['error_status']:
+                raise SnmpError(response['error_status'], response['error_index'])
+            return response
+        raise SnmpTimeout(host)
+
+    async def _transport_for(self, host):
+        """Socket UDP da família do host (um por família, compartilhado por todos os pedidos)"""
+        family = socket.AF_INET6 if ':' in host else socket.AF_INET
+        transport = self.transports.get(family)
+        if transport is None or transport.is_closing():
+            loop = asyncio.get_event_loop()
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: _ClientProtocol(self), family=family
+            )
+            self.transports[family] = transport
+        return transport
+
+    def _on_response(self, data, address):
+        try:
+            response = decode_message(data)
+        except (ValueError, IndexError):
+            return
+        future = self.pending.get(response['request_id'])
+        if future and not future.done():
+            self.stats['responses'] += 1
+            future.set_result(response)
+
+
+# === Agente local para testes ===
+
+class _AgentProtocol(asyncio.DatagramProtocol):
+    def __init__(self, agent):
+        self.agent = agent
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, address):
+        self.agent._on_request(self.transport, data, address)
+
+
+class StandInAgent:
+    """Agente SNMP v2c local com MIB pré-definida e atraso simulado"""
+
+    def __init__(self, values, communities=('public',), delay=0.0):
+        """
+        Args:
+            values: Dicionário {oid: valor} servido pelo agente
+            communities: Communities aceitas (as demais são ignoradas, como num agente real)
+            delay: Atraso simulado de cada resposta (segundos)
+        """
+        self.values = {oid.strip('.'): value for oid, value in values.items()}
+        self.ordered = sorted(self.values, key=oid_tuple)
+        self.ordered_keys = [oid_tuple(oid) for oid in self.ordered]
+        self.communities = {community.encode('utf-8') for community in communities}
+        self.delay = delay
+        self.transport = None
+        self.requests = 0
+
+    async def start(self, host='127.0.0.1', port=0):
+        """Abre o socket do agente; retorna a porta UDP em uso"""
+        loop = asyncio.get_event_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: _AgentProtocol(self), local_addr=(host, port)
+        )
+        return self.transport.get_extra_info('sockname')[1]
+
+    def close(self):
+        if self.transport:
+            self.transport.close()
+
+    def _next_oid(self, oid):
+        position = bisect.bisect_right(self.ordered_keys, oid_tuple(oid))
+        return self.ordered[position] if position < len(self.ordered) else None
+
+    def _on_request(self, transport, data, address):
+        try:
+            request = decode_message(data)
+        except (ValueError, IndexError):
+            return
+        self.requests += 1
+        if request['community'] not in self.communities:
+            return
+        varbinds = []
+        if request['pdu_type'] == PDU_GET:
+            for oid, _ in request['varbinds']:
+                varbinds.append((oid, self.values.get(oid, NO_SUCH_INSTANCE)))
+        elif request['pdu_type'] in (PDU_GET_NEXT, PDU_GET_BULK):
+            repetitions = request['error_index'] if request['pdu_type'] == PDU_GET_BULK else 1
+            for oid, _ in request['varbinds']:
+                current = oid
+                for _ in range(max(1, repetitions)):
+                    current = self._next_oid(current)
+                    if current is None:
+                        varbinds.append((oid, END_OF_MIB_VIEW))
+                        break
+                    varbinds.append((current, self.values[current]))
+        else:
+            return
+        response = encode_message(request['community'], PDU_RESPONSE, request['request_id'], varbinds)
+        loop = asyncio.get_event_loop()
+        loop.call_later(self.delay, transport.sendto, response, address)
+
+
+if __name__ == "__main__":
+    # Benchmark contra um agente local: descoberta de community, GET e GETBULK
+    mib = {
+        OID_SYS_DESCR: b'Stand-in Switch 48P',
+        OID_SYS_NAME: b'sw-lab-01',
+        OID_SYS_UPTIME: TimeTicks(123456),
+    }
+    for port in range(1, 501):
+        mib[f'1.3.6.1.2.1.31.1.1.1.1.{port}'] = f'Gi1/0/{port}'.encode()
+
+    async def benchmark():
+        agent = StandInAgent(mib, communities=('segredo',), delay=0.05)
+        port = await agent.start()
+        client = SnmpClient(port=port, timeout=0.5, retries=0, loop_thread=network_loop)
+        started = time.perf_counter()
+        community, values = await client.find_community_async('127.0.0.1', ('public', 'private', 'segredo'))
+        print(f"community={community!r} em {(time.perf_counter() - started) * 1000:.0f} ms: "
+              f"{[as_text(value) for value in values.values()]}")
+        started = time.perf_counter()
+        rows = await client.walk_async('127.0.0.1', '1.3.6.1.2.1.31.1.1.1.1', community)
+        print(f"GETBULK: {len(rows)} linhas em {(time.perf_counter() - started) * 1000:.0f} ms, "
+              f"{agent.requests} pedidos ao agente")
+        agent.close()
+
+    network_loop = get_network_loop()
+    network_loop.run(benchmark())
+    if len(sys.argv) > 1:
+        client = SnmpClient()
+        print(client.find_community(sys.argv[1]))